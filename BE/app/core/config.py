@@ -21,9 +21,102 @@ class Settings(BaseSettings):
     clerk_webhook_signing_secret: str = ""
     clerk_plus_plan_id: str = ""
     
-    # Image generation API keys (optional, defaults to .env)
+    # LLM / image generation API keys (optional, defaults to .env)
     google_api_key: str = ""
     openai_api_key: str = ""
+    anthropic_api_keys: str = ""
+
+    # Provider HTTP connection pools (shared per worker process)
+    provider_max_connections: int = 100
+    provider_max_keepalive_connections: int = 20
+    provider_keepalive_expiry: float = 30.0
+    provider_connect_timeout: float = 10.0
+    provider_read_timeout: float = 600.0
+
+    # LLM response cache (per-service TTLs live in app/shared/llm/llm_config.py)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_sqlite_path: str = ""  # Empty = memory-only
+
+    # Hedged / failover LLM routing (per-service policies live in llm_config.py)
+    llm_routing_enabled: bool = True
+
+    # Provider rate limiting (per-provider budgets live in app/shared/providers/rate_limit.py)
+    rate_limit_enabled: bool = True
+    rate_limit_max_wait: float = 120.0  # Seconds a caller may queue before failing
+    rate_limit_output_token_reserve: int = 1024  # Output tokens reserved per call for TPM admission
+
+    # Provider retries and circuit breakers (SDK-level retries are disabled)
+    provider_retry_max_attempts: int = 3
+    provider_retry_base_delay: float = 0.5
+    provider_retry_max_delay: float = 20.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_timeout: float = 30.0
+
+    # Offline batch execution for bulk LLM jobs
+    llm_batch_dir: str = ".llm_batches"
+    llm_batch_poll_interval: float = 30.0
+    llm_batch_max_requests: int = 1000
+    llm_batch_force_local: bool = False  # Run batches in-process instead of provider batch APIs
+
+    # Local token estimation: "auto" (tiktoken if available), "tiktoken" or "heuristic"
+    llm_token_estimator: str = "auto"
+    llm_tiktoken_encoding: str = "o200k_base"
+
+    # Usage accounting (write-behind credit ledger)
+    usage_write_behind_enabled: bool = True
+    usage_flush_interval_ms: int = 2000
+    usage_flush_max_events: int = 100
+    usage_spool_path: str = ".usage_spool.jsonl"
+    usage_ledger_enabled: bool = True
+
+    # Metrics (`/metrics`, Prometheus text format)
+    metrics_enabled: bool = True
+    metrics_token: str = ""  # Required outside DEBUG
+
+    # Local stand-in providers (offline development, load tests, benchmarks)
+    llm_provider_override: str = ""  # e.g. "local" routes every LLM call to the local provider
+    image_provider_override: str = ""  # e.g. "local" for procedurally generated images
+    local_llm_latency_ms: float = 0.0
+    local_llm_latency_stddev_ms: float = 0.0
+    local_llm_ms_per_output_token: float = 0.0
+    local_llm_output_tokens: int = 400
+    local_llm_output_tokens_stddev: int = 100
+    local_llm_array_items: int = 3
+    local_image_latency_ms: float = 0.0
+    local_image_latency_stddev_ms: float = 0.0
+    local_image_size: int = 512
+
+    # Provider cassettes: "" (off) | record | replay | auto
+    provider_cassette_mode: str = ""
+    provider_cassette_dir: str = ".cassettes"
+    provider_cassette_timing_scale: float = 1.0  # 0 replays without delays
+    provider_cassette_mask_uuids: bool = True
+
+    # Background jobs (persistent SQLite queue + per-process asyncio workers)
+    job_queue_path: str = ".jobs.sqlite3"
+    job_workers: int = 2  # 0 = this process only enqueues
+    job_max_attempts: int = 3
+    job_retry_backoff_ms: int = 5000  # Multiplied by the attempt number
+    job_poll_interval_ms: int = 1000
+    job_lease_seconds: float = 300.0  # A job whose worker stops renewing is re-claimed
+
+    # Studio generation: stream the final script and persist pages spread by spread
+    studio_stream_spreads_enabled: bool = True
+    # Checkpoint bible/arc to creation_params as each stage finishes, so retries resume from them
+    studio_checkpoint_stages: bool = True
+    # Final script drafting: "single" (one 14-spread call) or "act_parallel" (one call per act)
+    studio_draft_mode: str = "single"
+    studio_draft_seam_pass: bool = True  # act_parallel: smooth the spreads where acts meet
+    # Studio edits: rewrite only the spreads an edit touches and patch them into the script
+    studio_rewrite_targeted: bool = True
+    studio_rewrite_max_spreads: int = 6  # Edits planned to touch more spreads rewrite the whole script
+    studio_rewrite_context_spreads: int = 1  # Unchanged neighbours shown read-only on each side
+
+    # Progress events (in-process pub/sub behind the generation SSE stream)
+    event_subscriber_buffer: int = 256  # Per subscriber; a lagging client loses the oldest events
+    event_topic_history: int = 128  # Events of the current run replayed to late or reconnecting clients
+    event_stream_heartbeat_seconds: float = 15.0
     
     class Config:
         env_file = ".env"
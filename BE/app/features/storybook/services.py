@@ -60,7 +60,12 @@ class StorybookService:
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to list storybooks: {e}")
 
-    def create_storybook(self, user_id: str, req: CreateStorybookRequest) -> Storybook:
+    def create_storybook(
+        self,
+        user_id: str,
+        req: CreateStorybookRequest,
+        extra_creation_params: Optional[Dict[str, Any]] = None,
+    ) -> Storybook:
         try:
             insert = {
                 "user_id": user_id,
@@ -78,6 +83,7 @@ class StorybookService:
                     "character_ids": req.character_ids or [],
                     "arc": {},
                     "bible": {},
+                    **(extra_creation_params or {}),
                 },
             }
 
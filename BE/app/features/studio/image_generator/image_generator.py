@@ -2,6 +2,7 @@ from typing import Any, Dict, List
 
 from fastapi import HTTPException, status
 
+from app.features.studio.storybook_generator.services.progress import publish_progress, start_run
 from app.shared.database.supabase_client import supabase
 from app.shared.image.base import Provider, generate_image, generate_image_from_reference
 from app.shared.image.image_config import (
@@ -23,6 +24,9 @@ class ImageGeneratorService:
         Generate images for all pages of the given storybook that have an image_prompt
         but no image_url yet. Stores images under path "{storybook_id}/{page_number}".
 
+        Each stored image is published as an `image_uploaded` progress event on the
+        storybook's topic, so Studio can show pages as they are illustrated.
+
         Returns a structured summary with per-page results.
         """
         try:
@@ -59,6 +63,8 @@ class ImageGeneratorService:
             skipped: List[Dict[str, Any]] = []
             page_results: List[Dict[str, Any]] = []
 
+            start_run(storybook_id, "images_started", {"page_count": len(pages)})
+
             for page in pages:
                 page_id = page.get("id")
                 page_number = page.get("page_number")
@@ -118,6 +124,7 @@ class ImageGeneratorService:
                             "page_number": page_number,
                             "reason": "DB update returned empty data",
                         })
+                        publish_progress(storybook_id, "image_failed", failed[-1])
                         continue
 
                     succeeded += 1
@@ -128,6 +135,11 @@ class ImageGeneratorService:
                         "file_size": result.file_size,
                         "mime_type": result.mime_type,
                     })
+                    publish_progress(storybook_id, "image_uploaded", {
+                        "page_id": page_id,
+                        "page_number": page_number,
+                        "image_url": result.url,
+                    })
                     
                     # === NEW: 첫 이미지를 레퍼런스로 설정 ===
                     if not reference_image_url:
@@ -140,6 +152,14 @@ class ImageGeneratorService:
                         "page_number": page_number,
                         "reason": str(e),
                     })
+                    publish_progress(storybook_id, "image_failed", failed[-1])
+
+            publish_progress(storybook_id, "images_finished", {
+                "processed": processed,
+                "succeeded": succeeded,
+                "failed_count": len(failed),
+                "skipped_count": len(skipped),
+            })
 
             return {
                 "storybook_id": storybook_id,
@@ -14,7 +14,7 @@ class ImagePromptGenerator:
     """Generate image prompts for storybook pages."""
     
     def __init__(self):
-        self.system_prompt = "Create a fairy tale illustration for the following story script"
+        self.system_prompt = IMAGE_PROMPT_SYSTEM_PROMPT
     
     def generate_image_prompts_for_storybook(self, storybook_id: str) -> Dict[str, Any]:
         """
@@ -50,13 +50,9 @@ class ImagePromptGenerator:
             # Extract character visual features from Story Bible
             creation_params = storybook.get("creation_params", {})
             bible_data = creation_params.get("bible", {})
-            characters_info = bible_data.get("characters", [])
             
             # Build character visual mapping (name -> visual_features)
-            character_visuals = {
-                char["character_name"]: char["visual_features"] 
-                for char in characters_info
-            }
+            character_visuals = character_visuals_from_bible(bible_data)
             
             # Get all pages for this storybook
             pages_res = (
@@ -139,18 +135,42 @@ class ImagePromptGenerator:
         Returns:
             str: Combined image prompt
         """
-        # Clean up the script text
-        cleaned_script = script_text.strip()
-        
-        # Include character visual features if available
-        if character_visuals:
-            char_desc = "; ".join([f"{name}: {visual}" for name, visual in character_visuals.items()])
-            image_prompt = f"{self.system_prompt}: {cleaned_script}. Characters: {char_desc}"
-        else:
-            image_prompt = f"{self.system_prompt}: {cleaned_script}"
-        
-        return image_prompt
+        return build_image_prompt(script_text, character_visuals, self.system_prompt)
+
+
+IMAGE_PROMPT_SYSTEM_PROMPT = "Create a fairy tale illustration for the following story script"
+
+
+def character_visuals_from_bible(bible_data: Dict[str, Any]) -> Dict[str, str]:
+    """Map character name -> visual_features from a Story Bible dict."""
+    return {
+        char["character_name"]: char["visual_features"]
+        for char in (bible_data or {}).get("characters", [])
+    }
+
+
+def build_image_prompt(
+    script_text: str,
+    character_visuals: Dict[str, str] = None,
+    system_prompt: str = IMAGE_PROMPT_SYSTEM_PROMPT,
+) -> str:
+    """
+    Combine the illustration instruction, a page script and character visual features.
+    
+    Used by `ImagePromptGenerator` and by the generation pipeline, which fills
+    `image_prompt` while each spread's pages are written.
+    """
+    # Clean up the script text
+    cleaned_script = script_text.strip()
+    
+    # Include character visual features if available
+    if character_visuals:
+        char_desc = "; ".join([f"{name}: {visual}" for name, visual in character_visuals.items()])
+        image_prompt = f"{system_prompt}: {cleaned_script}. Characters: {char_desc}"
+    else:
+        image_prompt = f"{system_prompt}: {cleaned_script}"
     
+    return image_prompt
 
 
 # Create a singleton instance
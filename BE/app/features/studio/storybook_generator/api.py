@@ -2,37 +2,183 @@
 FastAPI endpoints for storybook rewrite operations.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+from typing import Any, AsyncIterator, Optional
 
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
 from app.features.auth.deps import get_current_user_id
+from app.shared.events import Subscription, get_event_broker
+from app.shared.jobs import JobStatus
+from app.shared.providers.resilience import ProviderUnavailableError
 
 from .models import (
     ChatRequest,
     ChatResponse,
+    GenerateStorybookAccepted,
     GenerateStorybookRequest,
+    GenerationStatusResponse,
     RewriteScriptRequest,
     RewriteScriptResponse,
 )
+from .services.chat import answer_question, classify_message, stream_answer
+from .services.generate import (
+    enqueue_storybook_generation,
+    get_generation_status,
+    resume_storybook_generation,
+)
+from .services.progress import TERMINAL_EVENTS, storybook_topic
 from .output_schemas.draft import FinalScriptSchema
-from .services.chat import answer_question, classify_message
-from .services.generate import generate_storybook_with_script
-from .services.rewrite import rewrite_full_script, rewrite_full_script_with_summary
-from app.features.storybook.models import StorybookResponse
+from .services.rewrite import rewrite_full_script, rewrite_script_with_summary
 
 
 router = APIRouter()
 
 @router.post(
     "/generate",
-    response_model=StorybookResponse,
-    summary="Generate a new storybook (settings -> bible/arc/script/pages)",
+    response_model=GenerateStorybookAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue generation of a new storybook (settings -> bible/arc/script/pages)",
 )
 async def generate_storybook(
     payload: GenerateStorybookRequest,
     current_user_id: str = Depends(get_current_user_id),
-) -> StorybookResponse:
-    storybook = generate_storybook_with_script(current_user_id, payload)
-    return StorybookResponse(storybook=storybook)
+) -> GenerateStorybookAccepted:
+    """
+    Create the storybook and queue its generation; returns immediately.
+
+    Stream `GET /{storybook_id}/generation/events`, or poll
+    `GET /{storybook_id}/generation` (or the storybook itself), for progress:
+    `status` moves through script_generating -> script_generated, or to
+    failed once every attempt has failed.
+    """
+    storybook, job = await asyncio.to_thread(enqueue_storybook_generation, current_user_id, payload)
+    return GenerateStorybookAccepted(
+        storybook_id=storybook.id,
+        status=storybook.status,
+        job_id=job.id,
+        status_url=f"/api/studio/storybooks/{storybook.id}/generation",
+    )
+
+
+@router.get(
+    "/{storybook_id}/generation",
+    response_model=GenerationStatusResponse,
+    summary="Get the progress of a queued storybook generation",
+)
+async def get_storybook_generation(
+    storybook_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+) -> GenerationStatusResponse:
+    return await asyncio.to_thread(get_generation_status, current_user_id, storybook_id)
+
+
+@router.get(
+    "/{storybook_id}/generation/events",
+    summary="Stream storybook generation progress as Server-Sent Events",
+)
+async def stream_storybook_generation_events(
+    storybook_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events alternative to polling `/{storybook_id}/generation`.
+
+    Events (each with an `id`; reconnect with `Last-Event-ID` to resume):
+    - `status`: `GenerationStatusResponse` snapshot, sent first and when the stream ends
+      without a terminal event
+    - `generation_started`, `stage_started` / `stage_finished` / `stage_failed`
+      (`{"stage", "started_at", "duration"}` in seconds), `bible_ready`, `arc_ready`
+    - `spread_drafted`: `{"spread_number", "page_numbers", "script_1", "script_2"}`
+      once the spread's pages are saved
+    - `images_started`, `image_uploaded` (`{"page_id", "page_number", "image_url"}`), `image_failed`
+    - `attempt_failed`: a failed attempt that will be retried
+    - `lagged`: `{"dropped": n}` events were dropped for this slow client; re-read the storybook
+    - `generation_finished`, `generation_failed`, `images_finished`: last event of the stream
+
+    Events of the current run are replayed on connect, so late subscribers
+    catch up. Progress is published in-process, so the stream needs a job
+    worker on the serving node; without one it reports `status` snapshots only.
+    """
+    # Ownership and existence are checked before the stream opens
+    progress = await asyncio.to_thread(get_generation_status, current_user_id, storybook_id)
+    subscription = get_event_broker().subscribe(
+        storybook_topic(storybook_id),
+        after=int(last_event_id) if last_event_id and last_event_id.isdigit() else None,
+    )
+    return StreamingResponse(
+        _generation_event_stream(subscription, progress, current_user_id, storybook_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _run_in_progress(progress: GenerationStatusResponse, subscription: Subscription) -> bool:
+    if progress.job is not None and progress.job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+        return True
+    # Runs without a job (e.g. image generation) are open until their terminal event
+    history = get_event_broker().history(subscription.topic)
+    return bool(history) and history[-1].type not in TERMINAL_EVENTS
+
+
+async def _generation_event_stream(
+    subscription: Subscription,
+    progress: GenerationStatusResponse,
+    current_user_id: str,
+    storybook_id: str,
+) -> AsyncIterator[str]:
+    with subscription:
+        yield _sse_event("status", progress.model_dump(mode="json"))
+        if not _run_in_progress(progress, subscription) and not get_event_broker().history(subscription.topic):
+            return  # Nothing running and nothing to replay: the snapshot is the whole story
+        reported_drops = 0
+        while True:
+            event = await subscription.get(timeout=settings.event_stream_heartbeat_seconds)
+            if subscription.dropped > reported_drops:
+                reported_drops = subscription.dropped
+                yield _sse_event("lagged", {"dropped": reported_drops})
+            if event is not None:
+                yield _sse_event(event.type, event.data, event_id=event.id)
+                if event.type in TERMINAL_EVENTS:
+                    return
+                continue
+
+            # Quiet period: the run may have ended in another process (or never started)
+            progress = await asyncio.to_thread(get_generation_status, current_user_id, storybook_id)
+            if not _run_in_progress(progress, subscription):
+                yield _sse_event("status", progress.model_dump(mode="json"))
+                return
+            yield ": keep-alive\n\n"
+
+
+@router.post(
+    "/{storybook_id}/generation/resume",
+    response_model=GenerateStorybookAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Resume a failed storybook generation from its checkpoints",
+)
+async def resume_storybook_generation_endpoint(
+    storybook_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+) -> GenerateStorybookAccepted:
+    """
+    Re-queue a failed generation on the same storybook. Bible and arc are
+    reused when their inputs are unchanged; 409 if it is still running or
+    did not fail.
+    """
+    storybook_status, job = await asyncio.to_thread(
+        resume_storybook_generation, current_user_id, storybook_id
+    )
+    return GenerateStorybookAccepted(
+        storybook_id=storybook_id,
+        status=storybook_status,
+        job_id=job.id,
+        status_url=f"/api/studio/storybooks/{storybook_id}/generation",
+    )
 
 
 @router.post(
@@ -49,7 +195,9 @@ async def handle_studio_chat(
 
     - Classifies the user's message (edit vs question) via LLM structured output.
     - Answers questions directly using the current story context.
-    - Performs a full rewrite (with change summary) when modifications are requested.
+    - When modifications are requested, rewrites only the spreads the edit
+      touches (`spread_numbers`, or planned from the message) and patches them
+      into the script, or the whole script for book-wide edits; with a change summary.
     """
     if payload.script.user_id != current_user_id:
         raise HTTPException(
@@ -58,10 +206,15 @@ async def handle_studio_chat(
         )
 
     try:
-        classification = classify_message(
+        classification = await classify_message(
             payload.message,
             user_id=current_user_id,
         )
+    except ProviderUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+        ) from exc
     except Exception as exc:  # pragma: no cover - LLM failures are rare but possible
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -70,11 +223,16 @@ async def handle_studio_chat(
 
     if classification.action == "question":
         try:
-            assistant_message = answer_question(
+            assistant_message = await answer_question(
                 payload.script,
                 payload.message,
                 user_id=current_user_id,
             )
+        except ProviderUnavailableError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(exc),
+            ) from exc
         except Exception as exc:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,11 +245,17 @@ async def handle_studio_chat(
 
     # classification.action == "edit"
     try:
-        rewrite_result = rewrite_full_script_with_summary(
+        rewrite_result = await rewrite_script_with_summary(
             script_data=payload.script.model_dump(),
             edit_request=payload.message,
             requesting_user_id=current_user_id,
+            spread_numbers=payload.spread_numbers,
         )
+    except ProviderUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+        ) from exc
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -103,16 +267,103 @@ async def handle_studio_chat(
             detail="Failed to rewrite storybook script.",
         ) from exc
 
-    updated_script = FinalScriptSchema.model_validate(
-        rewrite_result.model_dump(exclude={"change_summary"})
-    )
     return ChatResponse(
         assistant_message=rewrite_result.change_summary,
         action="edit",
-        script=updated_script,
+        script=rewrite_result.script,
+        changed_spreads=rewrite_result.changed_spreads,
     )
 
 
+@router.post(
+    "/chat/stream",
+    summary="Stream a Studio chat reply as Server-Sent Events",
+)
+async def stream_studio_chat(
+    payload: ChatRequest,
+    current_user_id: str = Depends(get_current_user_id),
+) -> StreamingResponse:
+    """
+    Server-Sent Events variant of `/chat`.
+
+    Events:
+    - `classification`: `{"action": "edit" | "question"}`
+    - `delta`: `{"text": "..."}` answer fragments (questions only)
+    - `done`: final `ChatResponse` payload
+    - `error`: `{"detail": "..."}` when generation fails mid-stream
+    """
+    if payload.script.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to interact with this storybook.",
+        )
+
+    return StreamingResponse(
+        _chat_event_stream(payload, current_user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _chat_event_stream(payload: ChatRequest, current_user_id: str) -> AsyncIterator[str]:
+    try:
+        classification = await classify_message(
+            payload.message,
+            user_id=current_user_id,
+        )
+    except Exception:  # pragma: no cover - LLM failures are rare but possible
+        yield _sse_event("error", {"detail": "Failed to classify the chat message."})
+        return
+
+    yield _sse_event("classification", {"action": classification.action})
+
+    if classification.action == "question":
+        parts: list[str] = []
+        try:
+            async for delta in stream_answer(
+                payload.script,
+                payload.message,
+                user_id=current_user_id,
+            ):
+                parts.append(delta)
+                yield _sse_event("delta", {"text": delta})
+        except Exception:
+            yield _sse_event("error", {"detail": "Failed to generate an answer for the question."})
+            return
+        response = ChatResponse(assistant_message="".join(parts), action="question")
+        yield _sse_event("done", response.model_dump(mode="json"))
+        return
+
+    # classification.action == "edit"
+    try:
+        rewrite_result = await rewrite_script_with_summary(
+            script_data=payload.script.model_dump(),
+            edit_request=payload.message,
+            requesting_user_id=current_user_id,
+            spread_numbers=payload.spread_numbers,
+        )
+    except ValueError as exc:
+        yield _sse_event("error", {"detail": str(exc)})
+        return
+    except Exception:  # pragma: no cover
+        yield _sse_event("error", {"detail": "Failed to rewrite storybook script."})
+        return
+
+    response = ChatResponse(
+        assistant_message=rewrite_result.change_summary,
+        action="edit",
+        script=rewrite_result.script,
+        changed_spreads=rewrite_result.changed_spreads,
+    )
+    yield _sse_event("done", response.model_dump(mode="json"))
+
+
+def _sse_event(event: str, data: dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Format a single Server-Sent Events frame."""
+    frame = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return frame if event_id is None else f"id: {event_id}\n{frame}"
+
+
 @router.post(
     "/rewrite",
     response_model=RewriteScriptResponse,
@@ -127,7 +378,8 @@ async def rewrite_storybook_script(
 
     The client supplies the current script and edit instructions. The rewritten
     script is returned without persisting changes to the database. Automatic
-    saving is handled elsewhere in the Studio feature.
+    saving is handled elsewhere in the Studio feature. With `spread_numbers`
+    only those spreads are rewritten and the rest are returned unchanged.
     """
     # Ensure the requester matches the script's owner for basic authorization.
     if payload.script.user_id != current_user_id:
@@ -137,11 +389,28 @@ async def rewrite_storybook_script(
         )
 
     try:
-        rewritten_script_data = rewrite_full_script(
-            script_data=payload.script.model_dump(),
-            edit_request=payload.edit_request,
-            requesting_user_id=current_user_id,
-        )
+        if payload.spread_numbers:
+            rewrite_result = await rewrite_script_with_summary(
+                script_data=payload.script.model_dump(),
+                edit_request=payload.edit_request,
+                requesting_user_id=current_user_id,
+                spread_numbers=payload.spread_numbers,
+            )
+            rewritten_script = rewrite_result.script
+            changed_spreads = rewrite_result.changed_spreads
+        else:
+            rewritten_script_data = await rewrite_full_script(
+                script_data=payload.script.model_dump(),
+                edit_request=payload.edit_request,
+                requesting_user_id=current_user_id,
+            )
+            rewritten_script = FinalScriptSchema.model_validate(rewritten_script_data)
+            changed_spreads = None
+    except ProviderUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+        ) from exc
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -153,7 +422,9 @@ async def rewrite_storybook_script(
             detail="Failed to rewrite storybook script.",
         ) from exc
 
-    rewritten_script = FinalScriptSchema.model_validate(rewritten_script_data)
-    return RewriteScriptResponse(script=rewritten_script)
+    return RewriteScriptResponse(
+        script=rewritten_script,
+        changed_spreads=changed_spreads,
+    )
 
 
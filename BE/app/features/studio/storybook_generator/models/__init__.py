@@ -2,14 +2,22 @@
 
 from .chat import ChatRequest, ChatResponse
 from .classification import ClassificationSchema
-from .generate import GenerateStorybookRequest
+from .generate import (
+    GenerateStorybookAccepted,
+    GenerateStorybookRequest,
+    GenerationJobInfo,
+    GenerationStatusResponse,
+)
 from .rewrite import RewriteScriptRequest, RewriteScriptResponse
 
 __all__ = [
     "ChatRequest",
     "ChatResponse",
     "ClassificationSchema",
+    "GenerateStorybookAccepted",
     "GenerateStorybookRequest",
+    "GenerationJobInfo",
+    "GenerationStatusResponse",
     "RewriteScriptRequest",
     "RewriteScriptResponse",
 ]
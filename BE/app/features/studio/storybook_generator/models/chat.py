@@ -1,6 +1,6 @@
 """Pydantic models for the Studio chat endpoint."""
 
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -16,6 +16,14 @@ class ChatRequest(BaseModel):
     message: str = Field(
         ..., min_length=1, description="User's chat message or rewrite request."
     )
+    spread_numbers: Optional[List[int]] = Field(
+        None,
+        min_length=1,
+        description=(
+            "Spreads (1-14) an edit applies to, e.g. the spreads selected in the editor. "
+            "Planned from the message when omitted."
+        ),
+    )
 
 
 class ChatResponse(BaseModel):
@@ -31,5 +39,9 @@ class ChatResponse(BaseModel):
         None,
         description="Updated story script when a rewrite was requested. Present only for edit actions.",
     )
+    changed_spreads: Optional[List[int]] = Field(
+        None,
+        description="Spreads rewritten by a targeted edit; absent when the whole script was rewritten.",
+    )
 
 
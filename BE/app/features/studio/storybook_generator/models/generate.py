@@ -1,11 +1,13 @@
 """
-Request model for Studio storybook generation.
+Request and response models for Studio storybook generation.
 """
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from app.features.storybook.models import StorybookStatus
+
 
 class GenerateStorybookRequest(BaseModel):
     """Payload to generate a new storybook from Studio settings."""
@@ -24,17 +26,45 @@ class GenerateStorybookRequest(BaseModel):
         description="Desired page count. If omitted, it will be set to the generated page total.",
         alias="pageCount",
     )
+    draft_mode: Optional[Literal["single", "act_parallel"]] = Field(
+        default=None,
+        description="Final script drafting: one call for all spreads, or one concurrent call per act. "
+        "Defaults to STUDIO_DRAFT_MODE.",
+        alias="draftMode",
+    )
 
     class Config:
         populate_by_name = True
 
 
+class GenerateStorybookAccepted(BaseModel):
+    """202 response: the storybook row exists and its generation job is queued."""
 
+    storybook_id: str = Field(description="ID of the storybook being generated")
+    status: StorybookStatus = Field(description="Pipeline status at the time of the response")
+    job_id: str = Field(description="Background job ID (same as the storybook ID)")
+    status_url: str = Field(description="Endpoint to poll for progress")
 
 
+class GenerationJobInfo(BaseModel):
+    """Background job bookkeeping for a storybook generation."""
 
+    status: str = Field(description="queued | running | succeeded | failed")
+    attempts: int
+    max_attempts: int
+    errors: List[str] = Field(default_factory=list, description="Error of each failed attempt")
+    created_at: float
+    updated_at: float
+    finished_at: Optional[float] = None
 
 
+class GenerationStatusResponse(BaseModel):
+    """Progress of a storybook generation."""
 
-
-
+    storybook_id: str
+    status: StorybookStatus
+    page_count: int = 0
+    job: Optional[GenerationJobInfo] = Field(
+        default=None,
+        description="Job details; missing if the job was purged or ran on another host",
+    )
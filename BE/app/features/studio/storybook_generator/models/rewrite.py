@@ -2,6 +2,8 @@
 Pydantic models for storybook rewrite requests and responses.
 """
 
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
 from ..output_schemas.draft import FinalScriptSchema
@@ -19,6 +21,11 @@ class RewriteScriptRequest(BaseModel):
         min_length=1,
         description="Instructions describing how the script should be rewritten.",
     )
+    spread_numbers: Optional[List[int]] = Field(
+        None,
+        min_length=1,
+        description="Rewrite only these spreads (1-14) and keep the rest; the whole script when omitted.",
+    )
 
 
 class RewriteScriptResponse(BaseModel):
@@ -28,3 +35,7 @@ class RewriteScriptResponse(BaseModel):
         ...,
         description="Rewritten storybook script following the standard schema.",
     )
+    changed_spreads: Optional[List[int]] = Field(
+        None,
+        description="Spreads that were rewritten when spread_numbers was given.",
+    )
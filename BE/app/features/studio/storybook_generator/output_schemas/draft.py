@@ -28,6 +28,16 @@ class FinalScriptSchema(BaseModel):
     # 14 Spread Scripts
     spreads: List[SpreadScript] = Field(..., description="14 spread scripts", min_length=14, max_length=14)
 
+class ActScriptSchema(BaseModel):
+    """Act Script Schema - the spreads of one act (act-parallel drafting and seam revisions)"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "additionalProperties": False
+        }
+    )
+    
+    spreads: List[SpreadScript] = Field(..., description="Spread scripts, in order")
+
 # JSON Schema Example:
 """
 {
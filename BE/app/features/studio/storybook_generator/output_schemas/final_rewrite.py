@@ -2,9 +2,11 @@
 Structured output for story rewrites that also includes a change summary.
 """
 
-from pydantic import Field
+from typing import List, Literal
 
-from .draft import FinalScriptSchema
+from pydantic import BaseModel, ConfigDict, Field
+
+from .draft import FinalScriptSchema, SpreadScript
 
 
 class FinalRewriteSchema(FinalScriptSchema):
@@ -19,3 +21,40 @@ class FinalRewriteSchema(FinalScriptSchema):
     )
 
 
+class RewritePlanSchema(BaseModel):
+    """Which spreads an edit request touches (planning step of a targeted rewrite)."""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "additionalProperties": False
+        }
+    )
+
+    scope: Literal["spreads", "full"] = Field(
+        ...,
+        description=(
+            "`spreads` when the edit only concerns specific spreads, "
+            "`full` when it changes the whole story (tone, length, a character throughout)."
+        ),
+    )
+    spread_numbers: List[int] = Field(
+        ...,
+        description="Spread numbers (1-14) that must change; empty when scope is `full`.",
+    )
+
+
+class SpreadPatchSchema(BaseModel):
+    """Rewritten versions of only the targeted spreads, with a change summary."""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "additionalProperties": False
+        }
+    )
+
+    spreads: List[SpreadScript] = Field(..., description="Rewritten spread scripts, in order")
+    change_summary: str = Field(
+        ...,
+        description=(
+            "1-2 sentence summary describing the key changes made to the story. "
+            "This will be surfaced to the user in the chat interface."
+        ),
+    )
@@ -6,17 +6,20 @@ Creates 3-act structure and 14-spread structure based on user input and story bi
 """
 
 import json
-import os
-from typing import Dict, Any
-from app.shared.llm.base import Provider, generate_structured
+from typing import Dict, Any, Optional
+from app.shared.llm.base import Provider, agenerate_structured
 from app.shared.llm.llm_config import DEFAULT_ARC_PROVIDER, DEFAULT_ARC_MODEL
-from app.shared.database.supabase_client import supabase
+from app.shared.prompts import PromptTemplate
 from ..output_schemas.arc import StoryArcSchema
+from .context import StoryContext
+from .utils import get_prompt_template
 
 
-def generate_story_arc(storybook_id: str) -> StoryArcSchema:
+async def generate_story_arc(storybook_id: str) -> StoryArcSchema:
     """
-    Generate a story arc for the given storybook.
+    Generate a story arc for the given storybook and save it to creation_params.
+    
+    Thin wrapper over `build_story_arc` for callers that only have an ID.
     
     Args:
         storybook_id: The storybook ID to generate arc for
@@ -32,49 +35,56 @@ def generate_story_arc(storybook_id: str) -> StoryArcSchema:
         raise ValueError("storybook_id must be provided")
     
     try:
-        # Fetch storybook from database
-        response = (
-            supabase.table("storybooks")
-            .select("creation_params, user_id")
-            .eq("id", storybook_id)
-            .execute()
-        )
-        
-        if not response.data:
-            raise ValueError(f"Storybook with id {storybook_id} not found")
-        
-        storybook_data = response.data[0]
-        creation_params = storybook_data.get("creation_params")
-        user_id = storybook_data.get("user_id")
-        
-        if not creation_params:
-            raise ValueError(f"Storybook {storybook_id} has no creation_params")
-        if not user_id:
-            raise ValueError(f"Storybook {storybook_id} has no user_id")
+        context = StoryContext.load(storybook_id)
+        story_arc = await build_story_arc(context)
+        context.persist()
+        return story_arc
+    except Exception as e:
+        if isinstance(e, ValueError):
+            raise
+        raise ValueError(f"Failed to generate story arc for {storybook_id}: {e}")
+
+
+async def build_story_arc(
+    context: StoryContext,
+    *,
+    prompt_template: Optional[PromptTemplate] = None,
+) -> StoryArcSchema:
+    """
+    Generate the story arc for a generation context and store it on `context.arc`.
+    
+    Uses `context.bible` when present. Nothing is written to the database;
+    see `StoryContext.persist`.
+    
+    Args:
+        context: Generation context
+        prompt_template: Preloaded arc.md template; read if omitted
         
-        # Extract prompt from creation_params
-        user_input = creation_params.get("prompt", "")
-        if not user_input:
-            raise ValueError(f"Storybook {storybook_id} has no prompt in creation_params")
+    Raises:
+        ValueError: If LLM generation fails
+    """
+    storybook_id = context.storybook_id
+    try:
+        user_id = context.user_id
+        user_input = context.prompt
         
-        # Load and format prompt template
-        prompt_template = _load_prompt_template("arc.md")
-        formatted_prompt = prompt_template.replace("{{user_input}}", user_input)
+        if prompt_template is None:
+            prompt_template = get_prompt_template("arc.md")
         
         # Extract story_bible from creation_params if available
         story_bible_text = ""
-        if "bible" in creation_params:
-            bible_data = creation_params["bible"]
+        if context.bible is not None:
+            bible_data = context.bible.model_dump()
             # Convert bible data to a readable text format
             story_bible_text = f"Characters: {', '.join([char.get('character_name', '') for char in bible_data.get('characters', [])])}\n"
             story_bible_text += f"Setting: {bible_data.get('name', '')} - {bible_data.get('description', '')}\n"
             story_bible_text += f"Theme: {bible_data.get('main_theme', '')}\n"
             story_bible_text += f"Conflict: {bible_data.get('main_conflict', '')}"
         
-        formatted_prompt = formatted_prompt.replace("{{story_bible}}", story_bible_text)
+        formatted_prompt = prompt_template.render(user_input=user_input, story_bible=story_bible_text)
         
         # Generate structured output
-        result = generate_structured(
+        result = await agenerate_structured(
             provider=Provider(DEFAULT_ARC_PROVIDER),
             model=DEFAULT_ARC_MODEL,
             input_text=formatted_prompt,
@@ -87,34 +97,10 @@ def generate_story_arc(storybook_id: str) -> StoryArcSchema:
         )
         
         story_arc = result.parsed
-        
-        # Save the generated arc to creation_params
-        updated_creation_params = creation_params.copy()
-        updated_creation_params["arc"] = story_arc.model_dump()
-        
-        # Update the database
-        supabase.table("storybooks").update({
-            "creation_params": updated_creation_params
-        }).eq("id", storybook_id).execute()
-        
+        context.arc = story_arc
         return story_arc
         
     except Exception as e:
         if isinstance(e, ValueError):
             raise
         raise ValueError(f"Failed to generate story arc for {storybook_id}: {e}")
-
-
-def _load_prompt_template(template_name: str) -> str:
-    """Load prompt template from prompts directory."""
-    current_dir = os.path.dirname(__file__)
-    prompts_dir = os.path.join(current_dir, "..", "prompts")
-    template_path = os.path.join(prompts_dir, template_name)
-    
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
-        raise ValueError(f"Prompt template {template_name} not found in {prompts_dir}")
-    except Exception as e:
-        raise ValueError(f"Failed to load prompt template {template_name}: {e}")
@@ -6,18 +6,22 @@ Creates character information, setting details, and story elements based on user
 """
 
 import json
-import os
-from typing import Dict, Any, List
-from app.shared.llm.base import Provider, generate_structured
+from typing import Dict, Any, List, Optional
+from app.shared.llm.base import Provider, agenerate_structured
 from app.shared.llm.llm_config import DEFAULT_BIBLE_PROVIDER, DEFAULT_BIBLE_MODEL
 from app.shared.database.supabase_client import supabase
+from app.shared.prompts import PromptTemplate
 from ..output_schemas.bible import StoryBibleSchema, SettingOnlySchema, Character
-from .utils import get_characters_for_page
+from .characters import CharacterLoader
+from .context import StoryContext
+from .utils import get_prompt_template
 
 
-def generate_story_bible(storybook_id: str) -> StoryBibleSchema:
+async def generate_story_bible(storybook_id: str) -> StoryBibleSchema:
     """
-    Generate a story bible for the given storybook.
+    Generate a story bible for the given storybook and save it to creation_params.
+    
+    Thin wrapper over `build_story_bible` for callers that only have an ID.
     
     Args:
         storybook_id: The storybook ID to generate bible for
@@ -33,56 +37,54 @@ def generate_story_bible(storybook_id: str) -> StoryBibleSchema:
         raise ValueError("storybook_id must be provided")
     
     try:
-        # Fetch storybook from database
-        response = (
-            supabase.table("storybooks")
-            .select("creation_params, user_id")
-            .eq("id", storybook_id)
-            .execute()
-        )
-        
-        if not response.data:
-            raise ValueError(f"Storybook with id {storybook_id} not found")
-        
-        storybook_data = response.data[0]
-        creation_params = storybook_data.get("creation_params")
-        user_id = storybook_data.get("user_id")
-        if not creation_params:
-            raise ValueError(f"Storybook {storybook_id} has no creation_params")
-        if not user_id:
-            raise ValueError(f"Storybook {storybook_id} has no user_id")
-        
-        # Extract prompt from creation_params
-        user_input = creation_params.get("prompt", "")
-        if not user_input:
-            raise ValueError(f"Storybook {storybook_id} has no prompt in creation_params")
+        context = StoryContext.load(storybook_id)
+        story_bible = await build_story_bible(context)
+        context.persist()
+        return story_bible
+    except Exception as e:
+        if isinstance(e, ValueError):
+            raise
+        raise ValueError(f"Failed to generate story bible for {storybook_id}: {e}")
+
+
+async def build_story_bible(
+    context: StoryContext,
+    *,
+    prompt_template: Optional[PromptTemplate] = None,
+) -> StoryBibleSchema:
+    """
+    Generate the story bible for a generation context and store it on `context.bible`.
+    
+    Nothing is written to the database; see `StoryContext.persist`.
+    
+    Args:
+        context: Generation context; `context.preset_characters` is fetched if not preloaded
+        prompt_template: Preloaded bible.md template; read if omitted
         
-        # Check for preset characters (prefer creation_params; fall back to storybook field)
-        character_ids = creation_params.get("character_ids") or storybook_data.get("character_ids") or []
+    Raises:
+        ValueError: If preset characters are missing or LLM generation fails
+    """
+    storybook_id = context.storybook_id
+    try:
+        user_id = context.user_id
+        user_input = context.prompt
+        character_ids = context.character_ids
+        if prompt_template is None:
+            prompt_template = get_prompt_template("bible.md")
         
         if character_ids:
             # === Path 1: Use preset characters ===
             # 1. Fetch preset characters from database
-            char_response = supabase.table("characters").select("*").in_("id", character_ids).execute()
-            if not char_response.data:
-                raise ValueError(f"No characters found for IDs: {character_ids}")
-            
-            preset_characters = []
-            for char_data in char_response.data:
-                preset_characters.append(Character(
-                    character_name=char_data["character_name"],
-                    description=char_data.get("description") or "",
-                    visual_features=char_data["visual_features"]
-                ))
+            if context.preset_characters is None:
+                context.preset_characters = load_preset_characters(character_ids)
+            preset_characters = context.preset_characters
             
             # 2. Include preset characters in prompt
             preset_info = json.dumps([c.model_dump() for c in preset_characters], ensure_ascii=False)
-            prompt_template = _load_prompt_template("bible.md")
-            formatted_prompt = prompt_template.replace("{{preset_characters}}", preset_info)
-            formatted_prompt = formatted_prompt.replace("{{user_input}}", user_input)
+            formatted_prompt = prompt_template.render(preset_characters=preset_info, user_input=user_input)
             
             # 3. Generate setting only (using SettingOnlySchema)
-            result = generate_structured(
+            result = await agenerate_structured(
                 provider=Provider(DEFAULT_BIBLE_PROVIDER),
                 model=DEFAULT_BIBLE_MODEL,
                 input_text=formatted_prompt,
@@ -110,12 +112,10 @@ def generate_story_bible(storybook_id: str) -> StoryBibleSchema:
             )
         else:
             # === Path 2: Generate complete story bible (existing approach) ===
-            prompt_template = _load_prompt_template("bible.md")
-            formatted_prompt = prompt_template.replace("{{preset_characters}}", "")
-            formatted_prompt = formatted_prompt.replace("{{user_input}}", user_input)
+            formatted_prompt = prompt_template.render(preset_characters="", user_input=user_input)
             
             # Generate complete Story Bible (using StoryBibleSchema)
-            result = generate_structured(
+            result = await agenerate_structured(
                 provider=Provider(DEFAULT_BIBLE_PROVIDER),
                 model=DEFAULT_BIBLE_MODEL,
                 input_text=formatted_prompt,
@@ -129,15 +129,7 @@ def generate_story_bible(storybook_id: str) -> StoryBibleSchema:
             )
             story_bible = result.parsed
         
-        # Save the generated bible to creation_params
-        updated_creation_params = creation_params.copy()
-        updated_creation_params["bible"] = story_bible.model_dump()
-        
-        # Update the database
-        supabase.table("storybooks").update({
-            "creation_params": updated_creation_params
-        }).eq("id", storybook_id).execute()
-        
+        context.bible = story_bible
         return story_bible
         
     except Exception as e:
@@ -146,6 +138,27 @@ def generate_story_bible(storybook_id: str) -> StoryBibleSchema:
         raise ValueError(f"Failed to generate story bible for {storybook_id}: {e}")
 
 
+def load_preset_characters(character_ids: List[str]) -> List[Character]:
+    """
+    Fetch preset characters selected in Studio.
+    
+    Raises:
+        ValueError: If none of the IDs exist
+    """
+    char_response = supabase.table("characters").select("*").in_("id", character_ids).execute()
+    if not char_response.data:
+        raise ValueError(f"No characters found for IDs: {character_ids}")
+    
+    return [
+        Character(
+            character_name=char_data["character_name"],
+            description=char_data.get("description") or "",
+            visual_features=char_data["visual_features"]
+        )
+        for char_data in char_response.data
+    ]
+
+
 def enrich_bible_with_page_characters(storybook_id: str, bible: StoryBibleSchema) -> StoryBibleSchema:
     """
     Enrich bible with page-specific characters by merging characters from all pages.
@@ -158,10 +171,10 @@ def enrich_bible_with_page_characters(storybook_id: str, bible: StoryBibleSchema
         StoryBibleSchema with merged characters (deduplicated by character_name)
     """
     try:
-        # Fetch all pages for this storybook
-        pages_response = supabase.table("pages").select("id, character_ids").eq("storybook_id", storybook_id).execute()
+        # Fetch all pages and their characters in one batch
+        loader = CharacterLoader(storybook_id)
         
-        if not pages_response.data:
+        if not loader.pages():
             # No pages found, return bible as-is
             return bible
         
@@ -173,14 +186,11 @@ def enrich_bible_with_page_characters(storybook_id: str, bible: StoryBibleSchema
             character_map[char.character_name] = char
         
         # Then, add characters from pages
-        for page_data in pages_response.data:
-            page_id = page_data.get("id")
-            if page_id:
-                page_characters = get_characters_for_page(page_id, storybook_id)
-                for char in page_characters:
-                    # Only add if not already present (by character_name)
-                    if char.character_name not in character_map:
-                        character_map[char.character_name] = char
+        for page_characters in loader.page_map().values():
+            for char in page_characters:
+                # Only add if not already present (by character_name)
+                if char.character_name not in character_map:
+                    character_map[char.character_name] = char
         
         # Create new bible with merged characters
         enriched_bible = StoryBibleSchema(
@@ -200,18 +210,3 @@ def enrich_bible_with_page_characters(storybook_id: str, bible: StoryBibleSchema
     except Exception as e:
         # On error, return original bible
         return bible
-
-
-def _load_prompt_template(template_name: str) -> str:
-    """Load prompt template from prompts directory."""
-    current_dir = os.path.dirname(__file__)
-    prompts_dir = os.path.join(current_dir, "..", "prompts")
-    template_path = os.path.join(prompts_dir, template_name)
-    
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
-        raise ValueError(f"Prompt template {template_name} not found in {prompts_dir}")
-    except Exception as e:
-        raise ValueError(f"Failed to load prompt template {template_name}: {e}")
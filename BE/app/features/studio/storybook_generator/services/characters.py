@@ -0,0 +1,159 @@
+"""
+Batched Character Loader
+
+Resolves page- and spread-level characters for one storybook with at most
+three queries: all pages, every character those pages reference, and the
+storybook bible (skipped when the caller already holds the bible). Results
+are memoized on the loader, so create one per request and share it between
+the helpers that need character context.
+
+Lookup rules match `get_characters_for_page` / `get_characters_for_spread`:
+a page's own `character_ids` win, otherwise the storybook bible characters
+are used.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.shared.database.supabase_client import supabase
+
+from ..output_schemas.bible import Character, StoryBibleSchema
+
+SPREAD_COUNT = 14
+
+
+def spread_page_numbers(spread_number: int) -> Tuple[int, int]:
+    """(left, right) page numbers of a spread; pages are numbered from 1."""
+    left_page_number = (spread_number - 1) * 2 + 1
+    return left_page_number, left_page_number + 1
+
+
+class CharacterLoader:
+    """Memoized page/spread -> characters lookups for one storybook."""
+
+    def __init__(self, storybook_id: str, bible: Optional[StoryBibleSchema] = None) -> None:
+        self.storybook_id = storybook_id
+        self._bible = bible
+        self._pages: Optional[List[Dict[str, Any]]] = None
+        self._characters: Optional[Dict[str, Character]] = None
+        self._bible_characters: Optional[List[Character]] = None
+        self._by_spread: Dict[int, List[Character]] = {}
+
+    # ------------------------------------------------------------------
+    # Batched fetches (one query each, on first use)
+    # ------------------------------------------------------------------
+
+    def pages(self) -> List[Dict[str, Any]]:
+        """All pages of the storybook (id, page_number, character_ids)."""
+        if self._pages is None:
+            try:
+                response = (
+                    supabase.table("pages")
+                    .select("id, page_number, character_ids")
+                    .eq("storybook_id", self.storybook_id)
+                    .execute()
+                )
+                self._pages = response.data or []
+            except Exception:
+                self._pages = []
+        return self._pages
+
+    def _referenced_characters(self) -> Dict[str, Character]:
+        if self._characters is None:
+            character_ids = sorted({
+                character_id
+                for page in self.pages()
+                for character_id in (page.get("character_ids") or [])
+            })
+            self._characters = {}
+            if character_ids:
+                try:
+                    response = supabase.table("characters").select("*").in_("id", character_ids).execute()
+                    for char_data in response.data or []:
+                        self._characters[char_data["id"]] = Character(
+                            character_name=char_data["character_name"],
+                            description=char_data.get("description") or "",
+                            visual_features=char_data.get("visual_features") or ""
+                        )
+                except Exception:
+                    pass  # Pages fall back to the bible characters
+        return self._characters
+
+    def bible_characters(self) -> List[Character]:
+        """Storybook-level bible characters (the fallback for pages without their own)."""
+        if self._bible_characters is None:
+            if self._bible is not None:
+                self._bible_characters = list(self._bible.characters)
+            else:
+                self._bible_characters = self._load_bible_characters()
+        return [char.model_copy() for char in self._bible_characters]
+
+    def _load_bible_characters(self) -> List[Character]:
+        try:
+            response = (
+                supabase.table("storybooks")
+                .select("creation_params")
+                .eq("id", self.storybook_id)
+                .execute()
+            )
+            if not response.data:
+                return []
+            bible_data = (response.data[0].get("creation_params") or {}).get("bible") or {}
+            return [
+                Character(
+                    character_name=char_data.get("character_name", ""),
+                    description=char_data.get("description", ""),
+                    visual_features=char_data.get("visual_features", "")
+                )
+                for char_data in bible_data.get("characters", [])
+            ]
+        except Exception:
+            return []
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def page_ids_for_spread(self, spread_number: int) -> Tuple[Optional[str], Optional[str]]:
+        """(left_page_id, right_page_id) of a spread; None for a missing page."""
+        by_number = {page["page_number"]: page["id"] for page in self.pages()}
+        left_page_number, right_page_number = spread_page_numbers(spread_number)
+        return by_number.get(left_page_number), by_number.get(right_page_number)
+
+    def for_page(self, page_id: str) -> List[Character]:
+        """Characters of one page: its own character_ids, else the bible characters."""
+        page = next((p for p in self.pages() if p["id"] == page_id), None)
+        if page is not None:
+            characters = self._referenced_characters()
+            own = [
+                characters[character_id].model_copy()
+                for character_id in (page.get("character_ids") or [])
+                if character_id in characters
+            ]
+            if own:
+                return own
+        return self.bible_characters()
+
+    def for_spread(self, spread_number: int) -> List[Character]:
+        """Characters of both pages of a spread (deduplicated by name), else the bible characters."""
+        if spread_number not in self._by_spread:
+            all_characters: List[Character] = []
+            character_names_seen = set()
+            for page_id in self.page_ids_for_spread(spread_number):
+                if not page_id:
+                    continue
+                for char in self.for_page(page_id):
+                    if char.character_name not in character_names_seen:
+                        all_characters.append(char)
+                        character_names_seen.add(char.character_name)
+            self._by_spread[spread_number] = all_characters or self.bible_characters()
+        return [char.model_copy() for char in self._by_spread[spread_number]]
+
+    def spread_map(self, spread_numbers: Optional[Iterable[int]] = None) -> Dict[int, List[Character]]:
+        """spread_number -> characters, for spreads 1-14 unless given."""
+        if spread_numbers is None:
+            spread_numbers = range(1, SPREAD_COUNT + 1)
+        return {spread_number: self.for_spread(spread_number) for spread_number in spread_numbers}
+
+    def page_map(self) -> Dict[str, List[Character]]:
+        """page_id -> characters for every page of the storybook."""
+        return {page["id"]: self.for_page(page["id"]) for page in self.pages() if page.get("id")}
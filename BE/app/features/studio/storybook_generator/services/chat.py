@@ -3,10 +3,16 @@ High-level chat services for the Studio experience.
 """
 
 import logging
-from typing import Iterable
-
-from app.shared.llm.base import Provider, generate_structured, generate_text
+from typing import AsyncIterator, Iterable
+
+from app.shared.llm.base import (
+    Provider,
+    agenerate_structured,
+    agenerate_text,
+    agenerate_text_stream,
+)
 from app.shared.llm.llm_config import DEFAULT_REWRITE_MODEL, DEFAULT_REWRITE_PROVIDER
+from app.shared.providers.resilience import ProviderUnavailableError
 
 from ..models.classification import ClassificationSchema
 from ..output_schemas.draft import FinalScriptSchema, SpreadScript
@@ -41,10 +47,16 @@ Answer the question in 2-4 sentences:
 """
 
 
-def classify_message(message: str, user_id: str | None = None) -> ClassificationSchema:
-    """Classify the incoming chat message using an LLM with heuristic fallback."""
+async def classify_message(message: str, user_id: str | None = None) -> ClassificationSchema:
+    """
+    Classify the incoming chat message using an LLM with heuristic fallback.
+
+    Raises:
+        ProviderUnavailableError: If the provider is unavailable; the reply
+            would need it too, so there is nothing to fall back to
+    """
     try:
-        result = generate_structured(
+        result = await agenerate_structured(
             provider=Provider(DEFAULT_REWRITE_PROVIDER),
             model=DEFAULT_REWRITE_MODEL,
             input_text=CLASSIFICATION_PROMPT.format(message=message),
@@ -55,6 +67,8 @@ def classify_message(message: str, user_id: str | None = None) -> Classification
             },
         )
         return result.parsed
+    except ProviderUnavailableError:
+        raise
     except Exception as exc:
         logging.getLogger(__name__).warning(
             "LLM classification failed, using heuristic fallback: %s", exc
@@ -63,7 +77,7 @@ def classify_message(message: str, user_id: str | None = None) -> Classification
         return ClassificationSchema(action=action)
 
 
-def answer_question(
+async def answer_question(
     script: FinalScriptSchema,
     message: str,
     user_id: str | None = None,
@@ -76,7 +90,7 @@ def answer_question(
         story_context=story_context,
         question=message,
     )
-    result = generate_text(
+    result = await agenerate_text(
         provider=Provider(DEFAULT_REWRITE_PROVIDER),
         model=DEFAULT_REWRITE_MODEL,
         input_text=prompt,
@@ -91,6 +105,39 @@ def answer_question(
     return result.text
 
 
+async def stream_answer(
+    script: FinalScriptSchema,
+    message: str,
+    user_id: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the answer to a question about the current story as text deltas.
+    """
+    story_context = _build_story_context(script.spreads)
+    prompt = QUESTION_ANSWER_PROMPT.format(
+        story_context=story_context,
+        question=message,
+    )
+    has_text = False
+    async for chunk in agenerate_text_stream(
+        provider=Provider(DEFAULT_REWRITE_PROVIDER),
+        model=DEFAULT_REWRITE_MODEL,
+        input_text=prompt,
+        user_id=user_id,
+        usage_metadata={
+            "service": "studio.chat.answer",
+            "storybook_id": script.storybook_id,
+            "streamed": True,
+        },
+    ):
+        if chunk.done:
+            break
+        has_text = True
+        yield chunk.delta
+    if not has_text:
+        raise ValueError("Failed to generate an answer for the question.")
+
+
 def _build_story_context(spreads: Iterable[SpreadScript]) -> str:
     """
     Convert spreads into a compact textual context for prompting.
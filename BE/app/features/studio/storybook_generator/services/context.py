@@ -0,0 +1,124 @@
+"""
+Story Context
+
+In-memory state of one storybook generation. It is seeded once (from the
+freshly created row or a single select) and threaded through the bible, arc
+and draft stages, so they do not re-read `storybooks` or write
+`creation_params` back one stage at a time. `persist()` writes everything
+the stages produced in a single update.
+
+Stage outputs are checkpointed with a fingerprint of the inputs they were
+generated from (`creation_params["checkpoints"]`), so a retried or resumed
+generation reuses a bible or arc whose inputs have not changed.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.shared.database.supabase_client import supabase
+
+from ..output_schemas.arc import StoryArcSchema
+from ..output_schemas.bible import Character, StoryBibleSchema
+from .utils import load_storybook_row
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of a stage's inputs (JSON-serializable values or Pydantic models)."""
+    encoded = json.dumps(
+        [part.model_dump() if hasattr(part, "model_dump") else part for part in parts],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class StoryContext:
+    """Inputs and stage outputs of a storybook generation."""
+
+    storybook_id: str
+    user_id: str
+    creation_params: Dict[str, Any]
+    character_ids: List[str] = field(default_factory=list)
+    preset_characters: Optional[List[Character]] = None
+    bible: Optional[StoryBibleSchema] = None
+    arc: Optional[StoryArcSchema] = None
+    # stage -> {"fingerprint": ..., "at": ...}
+    checkpoints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, storybook_id: str, row: Dict[str, Any]) -> "StoryContext":
+        """
+        Seed a context from a storybook row (or any dict with the same fields).
+
+        Raises:
+            ValueError: If creation_params, user_id or the prompt is missing
+        """
+        creation_params = dict(row.get("creation_params") or {})
+        if not creation_params:
+            raise ValueError(f"Storybook {storybook_id} has no creation_params")
+        if not row.get("user_id"):
+            raise ValueError(f"Storybook {storybook_id} has no user_id")
+        if not creation_params.get("prompt", ""):
+            raise ValueError(f"Storybook {storybook_id} has no prompt in creation_params")
+
+        bible = creation_params.get("bible")
+        arc = creation_params.get("arc")
+        return cls(
+            storybook_id=storybook_id,
+            user_id=row["user_id"],
+            creation_params=creation_params,
+            # Prefer creation_params; fall back to the storybook field
+            character_ids=creation_params.get("character_ids") or row.get("character_ids") or [],
+            # Empty dicts are the "not generated yet" placeholders of a new row
+            bible=StoryBibleSchema(**bible) if bible else None,
+            arc=StoryArcSchema(**arc) if arc else None,
+            checkpoints=dict(creation_params.get("checkpoints") or {}),
+        )
+
+    @classmethod
+    def load(cls, storybook_id: str) -> "StoryContext":
+        """Seed a context with one select on `storybooks`."""
+        return cls.from_row(storybook_id, load_storybook_row(storybook_id))
+
+    @property
+    def prompt(self) -> str:
+        return self.creation_params["prompt"]
+
+    def has_checkpoint(self, stage: str, stage_fingerprint: str) -> bool:
+        """True if `stage` output is present and was generated from the same inputs."""
+        output = getattr(self, stage, None)
+        checkpoint = self.checkpoints.get(stage) or {}
+        return output is not None and checkpoint.get("fingerprint") == stage_fingerprint
+
+    def checkpoint(self, stage: str, stage_fingerprint: str) -> None:
+        """Record that `stage` output was generated from inputs with this fingerprint."""
+        self.checkpoints[stage] = {
+            "fingerprint": stage_fingerprint,
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def params_snapshot(self) -> Dict[str, Any]:
+        """creation_params with the generated bible, arc and checkpoints merged in."""
+        params = dict(self.creation_params)
+        if self.bible is not None:
+            params["bible"] = self.bible.model_dump()
+        if self.arc is not None:
+            params["arc"] = self.arc.model_dump()
+        if self.checkpoints:
+            params["checkpoints"] = dict(self.checkpoints)
+        return params
+
+    def persist(self, **columns: Any) -> None:
+        """
+        Write creation_params (and any extra storybook columns, e.g. status
+        or page_count) in one update.
+        """
+        supabase.table("storybooks").update({
+            "creation_params": self.params_snapshot(),
+            **columns,
+        }).eq("id", self.storybook_id).execute()
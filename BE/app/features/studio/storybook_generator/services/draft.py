@@ -6,21 +6,40 @@ Creates 14 spreads with complete story following the FinalScriptSchema structure
 """
 
 import json
-import os
-from typing import Dict, Any
-from app.shared.llm.base import Provider, generate_structured
+from typing import Dict, Any, Optional
+from app.core.config import settings
+from app.shared.llm.base import Provider, agenerate_structured
 from app.shared.llm.llm_config import DEFAULT_DRAFT_PROVIDER, DEFAULT_DRAFT_MODEL
-from app.shared.database.supabase_client import supabase
+from app.shared.prompts import PromptTemplate
+from ..output_schemas.bible import StoryBibleSchema
 from ..output_schemas.draft import FinalScriptSchema
-from .utils import get_characters_for_spread
+from .characters import CharacterLoader
+from .context import StoryContext
+from .utils import (
+    SpreadCallback,
+    generate_spreads_streaming,
+    get_prompt_template,
+)
 
+DRAFT_MODES = ("single", "act_parallel")
 
-def generate_final_script(storybook_id: str) -> FinalScriptSchema:
+
+async def generate_final_script(
+    storybook_id: str,
+    on_spread: Optional[SpreadCallback] = None,
+    mode: Optional[str] = None,
+) -> FinalScriptSchema:
     """
     Generate the final script for the given storybook.
     
+    Thin wrapper over `build_final_script` for callers that only have an ID.
+    
     Args:
         storybook_id: The storybook ID to generate script for
+        on_spread: Optional callback; when given, the script is streamed and
+            each SpreadScript is passed to it as soon as it is generated
+        mode: "single" (one call for all 14 spreads) or "act_parallel" (one
+            concurrent call per act, see draft_acts); STUDIO_DRAFT_MODE if omitted
         
     Returns:
         FinalScriptSchema object containing 14 spreads with complete story
@@ -33,72 +52,84 @@ def generate_final_script(storybook_id: str) -> FinalScriptSchema:
         raise ValueError("storybook_id must be provided")
     
     try:
-        # Fetch storybook from database
-        response = supabase.table("storybooks").select("creation_params, user_id").eq("id", storybook_id).execute()
-        
-        if not response.data:
-            raise ValueError(f"Storybook with id {storybook_id} not found")
-        
-        storybook_data = response.data[0]
-        creation_params = storybook_data.get("creation_params")
-        user_id = storybook_data.get("user_id")
-        
-        if not creation_params:
-            raise ValueError(f"Storybook {storybook_id} has no creation_params")
-        
-        if not user_id:
-            raise ValueError(f"Storybook {storybook_id} has no user_id")
-        
-        # Extract prompt from creation_params
-        user_input = creation_params.get("prompt", "")
-        if not user_input:
-            raise ValueError(f"Storybook {storybook_id} has no prompt in creation_params")
-        
-        # Load and format prompt template
-        prompt_template = _load_prompt_template("draft.md")
-        formatted_prompt = prompt_template.replace("{{user_input}}", user_input)
-        
-        # Extract story_bible and story_arc from creation_params if available
-        story_bible_text = ""
-        if "bible" in creation_params:
-            bible_data = creation_params["bible"]
-            story_bible_text = f"Characters: {', '.join([char.get('character_name', '') for char in bible_data.get('characters', [])])}\n"
-            story_bible_text += f"Setting: {bible_data.get('name', '')} - {bible_data.get('description', '')}\n"
-            story_bible_text += f"Theme: {bible_data.get('main_theme', '')}\n"
-            story_bible_text += f"Conflict: {bible_data.get('main_conflict', '')}"
+        mode = mode or settings.studio_draft_mode
+        if mode not in DRAFT_MODES:
+            raise ValueError(f"Unknown draft mode {mode!r}; expected one of {DRAFT_MODES}")
+        context = StoryContext.load(storybook_id)
+        if mode == "act_parallel":
+            from .draft_acts import build_final_script_by_act
+            return await build_final_script_by_act(context, on_spread)
+        return await build_final_script(context, on_spread)
+    except Exception as e:
+        if isinstance(e, ValueError):
+            raise
+        raise ValueError(f"Failed to generate final script for {storybook_id}: {e}")
+
+
+async def build_final_script(
+    context: StoryContext,
+    on_spread: Optional[SpreadCallback] = None,
+    *,
+    prompt_template: Optional[PromptTemplate] = None,
+    page_specific_characters: Optional[str] = None,
+) -> FinalScriptSchema:
+    """
+    Generate the final script from a generation context's bible and arc.
+    
+    Args:
+        context: Generation context
+        on_spread: Optional callback; see `generate_final_script`
+        prompt_template: Preloaded draft.md template; read if omitted
+        page_specific_characters: Prebuilt per-spread character text; built if omitted
         
-        story_arc_text = ""
-        if "arc" in creation_params:
-            arc_data = creation_params["arc"]
-            story_arc_text = f"3-Act Structure:\n"
-            for act in arc_data.get('acts', []):
-                story_arc_text += f"Act {act.get('act_number', '')}: {act.get('act_name', '')} - {act.get('description', '')}\n"
-            story_arc_text += f"\n14-Spread Structure:\n"
-            for spread in arc_data.get('spreads', []):
-                story_arc_text += f"Spread {spread.get('spread_number', '')}: {spread.get('description', '')}\n"
+    Raises:
+        ValueError: If LLM generation fails
+    """
+    storybook_id = context.storybook_id
+    try:
+        user_id = context.user_id
+        user_input = context.prompt
         
-        formatted_prompt = formatted_prompt.replace("{{story_bible}}", story_bible_text)
-        formatted_prompt = formatted_prompt.replace("{{story_arc}}", story_arc_text)
+        if prompt_template is None:
+            prompt_template = get_prompt_template("draft.md")
         
         # Get page-specific character information for each spread
-        page_specific_characters_text = _build_page_specific_characters_text(storybook_id)
-        formatted_prompt = formatted_prompt.replace("{{page_specific_characters}}", page_specific_characters_text)
+        if page_specific_characters is None:
+            page_specific_characters = build_page_specific_characters_text(storybook_id, context.bible)
+        formatted_prompt = prompt_template.render(
+            user_input=user_input,
+            story_bible=format_story_bible_text(context),
+            story_arc=format_story_arc_text(context),
+            page_specific_characters=page_specific_characters,
+        )
         
         # Generate structured output
-        result = generate_structured(
-            provider=Provider(DEFAULT_DRAFT_PROVIDER),
-            model=DEFAULT_DRAFT_MODEL,
-            input_text=formatted_prompt,
-            schema=FinalScriptSchema,
-            user_id=user_id,
-            usage_metadata={
-                "storybook_id": storybook_id,
-                "service": "storybook.draft.final_script",
-            },
-        )
+        usage_metadata = {
+            "storybook_id": storybook_id,
+            "service": "storybook.draft.final_script",
+        }
+        if on_spread is not None:
+            final_script = await generate_spreads_streaming(
+                provider=Provider(DEFAULT_DRAFT_PROVIDER),
+                model=DEFAULT_DRAFT_MODEL,
+                input_text=formatted_prompt,
+                schema=FinalScriptSchema,
+                on_spread=on_spread,
+                user_id=user_id,
+                usage_metadata=usage_metadata,
+            )
+        else:
+            result = await agenerate_structured(
+                provider=Provider(DEFAULT_DRAFT_PROVIDER),
+                model=DEFAULT_DRAFT_MODEL,
+                input_text=formatted_prompt,
+                schema=FinalScriptSchema,
+                user_id=user_id,
+                usage_metadata=usage_metadata,
+            )
+            final_script = result.parsed
         
         # Set storybook_id and user_id from database
-        final_script = result.parsed
         final_script.storybook_id = storybook_id
         final_script.user_id = user_id
         
@@ -110,21 +141,53 @@ def generate_final_script(storybook_id: str) -> FinalScriptSchema:
         raise ValueError(f"Failed to generate final script for {storybook_id}: {e}")
 
 
-def _build_page_specific_characters_text(storybook_id: str) -> str:
+def format_story_bible_text(context: StoryContext) -> str:
+    """Summarize the context's bible for draft prompts (empty if there is none)."""
+    story_bible_text = ""
+    if context.bible is not None:
+        bible_data = context.bible.model_dump()
+        story_bible_text = f"Characters: {', '.join([char.get('character_name', '') for char in bible_data.get('characters', [])])}\n"
+        story_bible_text += f"Setting: {bible_data.get('name', '')} - {bible_data.get('description', '')}\n"
+        story_bible_text += f"Theme: {bible_data.get('main_theme', '')}\n"
+        story_bible_text += f"Conflict: {bible_data.get('main_conflict', '')}"
+    return story_bible_text
+
+
+def format_story_arc_text(context: StoryContext) -> str:
+    """Render the context's 3-act and 14-spread arc for draft prompts (empty if there is none)."""
+    story_arc_text = ""
+    if context.arc is not None:
+        arc_data = context.arc.model_dump()
+        story_arc_text = f"3-Act Structure:\n"
+        for act in arc_data.get('acts', []):
+            story_arc_text += f"Act {act.get('act_number', '')}: {act.get('act_name', '')} - {act.get('description', '')}\n"
+        story_arc_text += f"\n14-Spread Structure:\n"
+        for spread in arc_data.get('spreads', []):
+            story_arc_text += f"Spread {spread.get('spread_number', '')}: {spread.get('description', '')}\n"
+    return story_arc_text
+
+
+def build_page_specific_characters_text(
+    storybook_id: str,
+    bible: Optional[StoryBibleSchema] = None,
+    loader: Optional[CharacterLoader] = None,
+) -> str:
     """
     Build text describing page-specific characters for each spread.
     
     Args:
         storybook_id: The storybook ID
+        bible: In-memory bible for the storybook-level fallback; read from
+            creation_params if omitted
+        loader: Shared character loader for this request; created if omitted
         
     Returns:
         Formatted text with spread-specific character information
     """
+    loader = loader or CharacterLoader(storybook_id, bible)
     spread_characters_text = []
     
-    for spread_number in range(1, 15):  # Spreads 1-14
-        characters = get_characters_for_spread(storybook_id, spread_number)
-        
+    for spread_number, characters in loader.spread_map().items():  # Spreads 1-14
         if characters:
             char_names = [char.character_name for char in characters]
             char_descriptions = []
@@ -143,18 +206,3 @@ def _build_page_specific_characters_text(storybook_id: str) -> str:
         return "\n".join(spread_characters_text)
     else:
         return "No page-specific character information available. Use storybook-level characters from the Story Bible."
-
-
-def _load_prompt_template(template_name: str) -> str:
-    """Load prompt template from prompts directory."""
-    current_dir = os.path.dirname(__file__)
-    prompts_dir = os.path.join(current_dir, "..", "prompts")
-    template_path = os.path.join(prompts_dir, template_name)
-    
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except FileNotFoundError:
-        raise ValueError(f"Prompt template {template_name} not found in {prompts_dir}")
-    except Exception as e:
-        raise ValueError(f"Failed to load prompt template {template_name}: {e}")
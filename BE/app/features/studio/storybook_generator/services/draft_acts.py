@@ -0,0 +1,321 @@
+"""
+Act-Parallel Final Script Generation
+
+Alternative to the single-call draft: each act of the story arc is drafted
+concurrently (one structured call per act, conditioned on the full arc and the
+spreads just outside the act), then the acts are stitched in spread order and
+an optional seam pass rewrites only the spreads where two acts meet. Draft
+latency becomes the slowest act plus the short seam call instead of one
+14-spread completion.
+"""
+
+import asyncio
+import inspect
+import logging
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+from pydantic import Field, create_model
+
+from app.core.config import settings
+from app.shared.llm.base import Provider, agenerate_structured
+from app.shared.llm.llm_config import DEFAULT_DRAFT_PROVIDER, DEFAULT_DRAFT_MODEL
+from app.shared.prompts import PromptTemplate
+from ..output_schemas.arc import Arc, Spread
+from ..output_schemas.draft import ActScriptSchema, FinalScriptSchema, SpreadScript
+from .context import StoryContext
+from .draft import (
+    build_final_script,
+    build_page_specific_characters_text,
+    format_story_arc_text,
+    format_story_bible_text,
+)
+from .utils import SpreadCallback, generate_spreads_streaming, get_prompt_template
+
+logger = logging.getLogger(__name__)
+
+SPREAD_COUNT = 14
+
+
+@lru_cache(maxsize=None)
+def _act_schema(spread_count: int) -> type[ActScriptSchema]:
+    """ActScriptSchema constrained to exactly `spread_count` spreads."""
+    return create_model(
+        f"ActScript{spread_count}Schema",
+        __base__=ActScriptSchema,
+        spreads=(
+            List[SpreadScript],
+            Field(
+                ...,
+                description=f"{spread_count} spread scripts, in order",
+                min_length=spread_count,
+                max_length=spread_count,
+            ),
+        ),
+    )
+
+
+def plan_acts(context: StoryContext) -> List[Tuple[Arc, List[Spread]]]:
+    """
+    Group the arc's spreads by act, in spread order.
+
+    Raises:
+        ValueError: If there is no arc, or its spreads are not 1-14 in
+            contiguous blocks of the arc's acts (the act-parallel mode cannot split it)
+    """
+    if context.arc is None:
+        raise ValueError("Act-parallel drafting needs a story arc")
+    spreads = sorted(context.arc.spreads, key=lambda spread: spread.spread_number)
+    if [spread.spread_number for spread in spreads] != list(range(1, SPREAD_COUNT + 1)):
+        raise ValueError("Story arc must define spreads 1-14 for act-parallel drafting")
+
+    acts_by_number = {act.act_number: act for act in context.arc.acts}
+    plan: List[Tuple[Arc, List[Spread]]] = []
+    for spread in spreads:
+        if plan and plan[-1][0].act_number == spread.act_number:
+            plan[-1][1].append(spread)
+            continue
+        if spread.act_number not in acts_by_number:
+            raise ValueError(f"Spread {spread.spread_number} belongs to unknown act {spread.act_number}")
+        if any(act.act_number == spread.act_number for act, _ in plan):
+            raise ValueError(f"Spreads of act {spread.act_number} are not contiguous in the story arc")
+        plan.append((acts_by_number[spread.act_number], [spread]))
+    return plan
+
+
+def _spread_range(spreads: List[Spread]) -> str:
+    first, last = spreads[0].spread_number, spreads[-1].spread_number
+    return str(first) if first == last else f"{first}-{last}"
+
+
+def _format_act_prompt(
+    template: PromptTemplate,
+    context: StoryContext,
+    plan: List[Tuple[Arc, List[Spread]]],
+    index: int,
+    story_bible_text: str,
+    story_arc_text: str,
+    page_specific_characters: str,
+) -> str:
+    act, spreads = plan[index]
+    previous_spread = (
+        f"Spread {plan[index - 1][1][-1].spread_number}: {plan[index - 1][1][-1].description}"
+        if index > 0 else "None - this act opens the book."
+    )
+    next_spread = (
+        f"Spread {plan[index + 1][1][0].spread_number}: {plan[index + 1][1][0].description}"
+        if index + 1 < len(plan) else "None - this act ends the book; close the story warmly."
+    )
+    return template.render(
+        user_input=context.prompt,
+        story_bible=story_bible_text,
+        story_arc=story_arc_text,
+        act=f"Act {act.act_number}: {act.act_name} - {act.description}",
+        spread_numbers=_spread_range(spreads),
+        spread_count=len(spreads),
+        previous_spread=previous_spread,
+        next_spread=next_spread,
+        page_specific_characters=page_specific_characters,
+    )
+
+
+def _renumber(
+    spreads: List[SpreadScript],
+    planned: Sequence[Union[Spread, SpreadScript]],
+    label: str,
+) -> List[SpreadScript]:
+    """Map generated spreads onto their planned spread numbers, by position."""
+    if len(spreads) < len(planned):
+        raise ValueError(f"{label} returned {len(spreads)} spreads, expected {len(planned)}")
+    return [
+        SpreadScript(spread_number=plan.spread_number, script_1=spread.script_1, script_2=spread.script_2)
+        for spread, plan in zip(spreads, planned)
+    ]
+
+
+class _SeamHoldback:
+    """
+    Forward streamed spreads to `on_spread`, renumbered by position, except the
+    seam spreads; those are released after the seam pass may have revised them.
+    """
+
+    def __init__(self, on_spread: SpreadCallback, planned: List[Spread], seam_numbers: set[int]) -> None:
+        self.on_spread = on_spread
+        self.planned = planned
+        self.seam_numbers = seam_numbers
+        self.received = 0
+
+    async def __call__(self, spread: SpreadScript) -> None:
+        if self.received >= len(self.planned):
+            return
+        spread_number = self.planned[self.received].spread_number
+        self.received += 1
+        if spread_number in self.seam_numbers:
+            return
+        outcome = self.on_spread(spread.model_copy(update={"spread_number": spread_number}))
+        if inspect.isawaitable(outcome):
+            await outcome
+
+
+def _seam_numbers(plan: List[Tuple[Arc, List[Spread]]]) -> set[int]:
+    numbers: set[int] = set()
+    for (_, before), (_, after) in zip(plan, plan[1:]):
+        numbers.update((before[-1].spread_number, after[0].spread_number))
+    return numbers
+
+
+async def _revise_seams(
+    context: StoryContext,
+    spreads: List[SpreadScript],
+    seam_numbers: set[int],
+    template: PromptTemplate,
+    story_bible_text: str,
+) -> List[SpreadScript]:
+    """One short call that rewrites the seam spreads; other spreads are kept as-is."""
+    seam_spreads = [spread for spread in spreads if spread.spread_number in seam_numbers]
+    script_text = "\n".join(
+        f"Spread {spread.spread_number}:\n  script_1: {spread.script_1}\n  script_2: {spread.script_2}"
+        for spread in spreads
+    )
+    formatted_prompt = template.render(
+        story_bible=story_bible_text,
+        script=script_text,
+        seam_spreads=", ".join(str(number) for number in sorted(seam_numbers)),
+    )
+    result = await agenerate_structured(
+        provider=Provider(DEFAULT_DRAFT_PROVIDER),
+        model=DEFAULT_DRAFT_MODEL,
+        input_text=formatted_prompt,
+        schema=_act_schema(len(seam_numbers)),
+        user_id=context.user_id,
+        usage_metadata={
+            "storybook_id": context.storybook_id,
+            "service": "storybook.draft.act_seams",
+        },
+    )
+    # Revisions come back in seam order (the schema fixes their count)
+    revised = {
+        spread.spread_number: spread
+        for spread in _renumber(result.parsed.spreads, seam_spreads, "Seam pass")
+    }
+    return [revised.get(spread.spread_number, spread) for spread in spreads]
+
+
+async def build_final_script_by_act(
+    context: StoryContext,
+    on_spread: Optional[SpreadCallback] = None,
+    *,
+    act_prompt_template: Optional[PromptTemplate] = None,
+    seam_prompt_template: Optional[PromptTemplate] = None,
+    draft_prompt_template: Optional[PromptTemplate] = None,
+    page_specific_characters: Optional[str] = None,
+) -> FinalScriptSchema:
+    """
+    Generate the final script with one concurrent call per act.
+
+    Falls back to the single-call draft when the arc cannot be split into
+    acts (see `plan_acts`).
+
+    Args:
+        context: Generation context (must have an arc)
+        on_spread: Optional callback; each act is streamed and its spreads are
+            passed on as they complete (seam spreads once the seam pass is done)
+        act_prompt_template: Preloaded draft_act.md template; read if omitted
+        seam_prompt_template: Preloaded draft_seams.md template; read if omitted
+        draft_prompt_template: Preloaded draft.md template for the single-call
+            fallback; read if omitted
+        page_specific_characters: Prebuilt per-spread character text; built if omitted
+
+    Returns:
+        FinalScriptSchema with spreads 1-14
+
+    Raises:
+        ValueError: If LLM generation fails
+    """
+    storybook_id = context.storybook_id
+    try:
+        plan = plan_acts(context)
+    except ValueError as e:
+        logger.warning("Drafting storybook %s in one call: %s", storybook_id, e)
+        return await build_final_script(
+            context,
+            on_spread,
+            prompt_template=draft_prompt_template,
+            page_specific_characters=page_specific_characters,
+        )
+
+    try:
+        if act_prompt_template is None:
+            act_prompt_template = get_prompt_template("draft_act.md")
+        story_bible_text = format_story_bible_text(context)
+        story_arc_text = format_story_arc_text(context)
+        if page_specific_characters is None:
+            page_specific_characters = build_page_specific_characters_text(storybook_id, context.bible)
+        seam_numbers = _seam_numbers(plan) if settings.studio_draft_seam_pass else set()
+
+        async def draft_act(index: int) -> List[SpreadScript]:
+            act, planned = plan[index]
+            formatted_prompt = _format_act_prompt(
+                act_prompt_template, context, plan, index,
+                story_bible_text, story_arc_text, page_specific_characters,
+            )
+            schema = _act_schema(len(planned))
+            usage_metadata = {
+                "storybook_id": storybook_id,
+                "service": "storybook.draft.act",
+                "act_number": act.act_number,
+            }
+            if on_spread is not None:
+                act_script = await generate_spreads_streaming(
+                    provider=Provider(DEFAULT_DRAFT_PROVIDER),
+                    model=DEFAULT_DRAFT_MODEL,
+                    input_text=formatted_prompt,
+                    schema=schema,
+                    on_spread=_SeamHoldback(on_spread, planned, seam_numbers),
+                    user_id=context.user_id,
+                    usage_metadata=usage_metadata,
+                )
+            else:
+                result = await agenerate_structured(
+                    provider=Provider(DEFAULT_DRAFT_PROVIDER),
+                    model=DEFAULT_DRAFT_MODEL,
+                    input_text=formatted_prompt,
+                    schema=schema,
+                    user_id=context.user_id,
+                    usage_metadata=usage_metadata,
+                )
+                act_script = result.parsed
+            return _renumber(act_script.spreads, planned, f"Act {act.act_number}")
+
+        # On the first failed act, cancel the others so they stop streaming
+        # (and writing pages) before the caller discards or retries
+        tasks = [asyncio.create_task(draft_act(index)) for index in range(len(plan))]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in tasks:
+                if task in done and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        spreads = [spread for task in tasks for spread in task.result()]
+
+        if seam_numbers:
+            if seam_prompt_template is None:
+                seam_prompt_template = get_prompt_template("draft_seams.md")
+            spreads = await _revise_seams(context, spreads, seam_numbers, seam_prompt_template, story_bible_text)
+
+        if on_spread is not None:
+            for spread in spreads:
+                if spread.spread_number in seam_numbers:
+                    outcome = on_spread(spread)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+
+        return FinalScriptSchema(storybook_id=storybook_id, user_id=context.user_id, spreads=spreads)
+
+    except Exception as e:
+        if isinstance(e, ValueError):
+            raise
+        raise ValueError(f"Failed to generate act-parallel final script for {storybook_id}: {e}")
@@ -1,23 +1,78 @@
 """
 End-to-end storybook generation workflow used by Studio.
+
+`/generate` only creates the storybook row and queues a background job; the
+bible -> arc -> script -> pages pipeline runs on the job workers and reports
+progress through `storybooks.status` and, for clients that stream it, as
+events on the storybook's topic (see `progress.py`).
 """
 
-from typing import List, Dict, Any
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
 
 from fastapi import HTTPException, status
 
-from app.features.storybook.models import CreateStorybookRequest, Storybook
+from app.core.config import settings
+from app.features.storybook.models import CreateStorybookRequest, Storybook, StorybookStatus
 from app.features.storybook.services import storybook_service
 from app.shared.database.supabase_client import supabase
+from app.features.studio.image_generator.prompt import build_image_prompt, character_visuals_from_bible
+from app.shared.jobs import (
+    JobRecord,
+    JobStatus,
+    PermanentJobError,
+    enqueue_job,
+    get_job_queue,
+    register_job_handler,
+    retry_job,
+)
+from app.shared.llm.llm_config import (
+    DEFAULT_ARC_MODEL,
+    DEFAULT_ARC_PROVIDER,
+    DEFAULT_BIBLE_MODEL,
+    DEFAULT_BIBLE_PROVIDER,
+)
+from app.shared.pipeline import PipelineDAG, Stage
+from app.shared.prompts import PromptTemplate
+
+from ..models.generate import (
+    GenerateStorybookRequest,
+    GenerationJobInfo,
+    GenerationStatusResponse,
+)
+from ..output_schemas.arc import StoryArcSchema
+from ..output_schemas.bible import Character, StoryBibleSchema
+from ..output_schemas.draft import FinalScriptSchema, SpreadScript
+from .arc import build_story_arc
+from .bible import build_story_bible, load_preset_characters
+from .context import StoryContext, fingerprint
+from .draft import DRAFT_MODES, build_final_script, build_page_specific_characters_text
+from .draft_acts import build_final_script_by_act
+from .progress import (
+    publish_arc_ready,
+    publish_bible_ready,
+    publish_progress,
+    publish_spreads_drafted,
+    stage_listener,
+    start_run,
+)
+from .utils import get_prompt_template
 
-from ..models.generate import GenerateStorybookRequest
-from .arc import generate_story_arc
-from .bible import generate_story_bible
-from .draft import generate_final_script
+logger = logging.getLogger(__name__)
+
+GENERATE_STORYBOOK_JOB = "studio.generate_storybook"
+# Storybook IDs per status update when reconciling failed jobs at startup
+RECOVERY_BATCH_SIZE = 100
 
 
 def _create_storybook_record(user_id: str, payload: GenerateStorybookRequest) -> Storybook:
-    """Create a base storybook row with creation_params from Studio settings."""
+    """
+    Create a base storybook row with creation_params from Studio settings.
+
+    An explicit draft mode is kept in creation_params so a resumed generation
+    drafts the same way even when its job record is gone.
+    """
     try:
         create_req = CreateStorybookRequest(
             title=payload.title or "",
@@ -27,7 +82,8 @@ def _create_storybook_record(user_id: str, payload: GenerateStorybookRequest) ->
             page_count=payload.page_count,
             prompt=payload.prompt,
         )
-        return storybook_service.create_storybook(user_id, create_req)
+        extra = {"draft_mode": payload.draft_mode} if payload.draft_mode else None
+        return storybook_service.create_storybook(user_id, create_req, extra_creation_params=extra)
     except HTTPException:
         raise
     except Exception as exc:
@@ -37,36 +93,40 @@ def _create_storybook_record(user_id: str, payload: GenerateStorybookRequest) ->
         )
 
 
-def _persist_spreads_as_pages(
+def _spread_page_rows(
     storybook_id: str,
-    spreads: List[Dict[str, Any]],
-) -> int:
+    spread: Dict[str, Any],
+    character_visuals: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
     """
-    Write generated spreads into the pages table as individual pages.
-    Returns the resulting page count.
+    Map one spread to its left/right page rows.
+
+    With `character_visuals`, each row also gets its `image_prompt`, so image
+    generation can start on a spread as soon as it is written.
     """
-    page_rows = []
-    for spread in spreads:
-        spread_number = spread["spread_number"]
-        left_page_number = (spread_number - 1) * 2 + 1
-        right_page_number = left_page_number + 1
+    spread_number = spread["spread_number"]
+    left_page_number = (spread_number - 1) * 2 + 1
+    right_page_number = left_page_number + 1
+    rows = [
+        {
+            "storybook_id": storybook_id,
+            "page_number": left_page_number,
+            "script_text": spread.get("script_1"),
+        },
+        {
+            "storybook_id": storybook_id,
+            "page_number": right_page_number,
+            "script_text": spread.get("script_2"),
+        },
+    ]
+    if character_visuals is not None:
+        for row in rows:
+            if row["script_text"] and row["script_text"].strip():
+                row["image_prompt"] = build_image_prompt(row["script_text"], character_visuals)
+    return rows
 
-        page_rows.append(
-            {
-                "storybook_id": storybook_id,
-                "page_number": left_page_number,
-                "script_text": spread.get("script_1"),
-            }
-        )
-        page_rows.append(
-            {
-                "storybook_id": storybook_id,
-                "page_number": right_page_number,
-                "script_text": spread.get("script_2"),
-            }
-        )
 
-    # Insert all pages in one call
+def _insert_page_rows(page_rows: List[Dict[str, Any]]) -> None:
     res = supabase.table("pages").insert(page_rows).execute()
     if not res.data:
         raise HTTPException(
@@ -74,15 +134,299 @@ def _persist_spreads_as_pages(
             detail="Failed to persist generated pages",
         )
 
-    # Update storybook page_count
-    supabase.table("storybooks").update({"page_count": len(page_rows)}).eq("id", storybook_id).execute()
+
+def _persist_spreads_as_pages(
+    storybook_id: str,
+    spreads: List[Dict[str, Any]],
+    character_visuals: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Write generated spreads into the pages table as individual pages.
+    Returns the resulting page count (the caller stores it on the storybook).
+    """
+    page_rows = []
+    for spread in spreads:
+        page_rows.extend(_spread_page_rows(storybook_id, spread, character_visuals))
+
+    # Insert all pages in one call
+    _insert_page_rows(page_rows)
     return len(page_rows)
 
 
-def generate_storybook_with_script(user_id: str, payload: GenerateStorybookRequest) -> Storybook:
+class _ProgressivePageWriter:
     """
-    Create a storybook and generate bible, arc, and draft script.
-    Returns the storybook with pages populated.
+    `on_spread` callback that persists each spread's pages as soon as it is
+    generated, so Studio can show spread 1 while later spreads are streaming.
+    """
+
+    def __init__(self, storybook_id: str, character_visuals: Optional[Dict[str, str]] = None) -> None:
+        self.storybook_id = storybook_id
+        self.character_visuals = character_visuals
+        self.spread_numbers: set[int] = set()
+
+    async def __call__(self, spread: SpreadScript) -> None:
+        # The model numbers spreads itself; keep the first copy of any duplicate
+        if spread.spread_number in self.spread_numbers:
+            return
+        rows = _spread_page_rows(self.storybook_id, spread.model_dump(), self.character_visuals)
+        await asyncio.to_thread(_insert_page_rows, rows)
+        self.spread_numbers.add(spread.spread_number)
+        publish_spreads_drafted(self.storybook_id, [spread])
+
+    def finish(self, spreads: List[SpreadScript]) -> int:
+        """Persist any spreads the stream did not deliver; returns the page count."""
+        missing = [spread for spread in spreads if spread.spread_number not in self.spread_numbers]
+        page_rows = [
+            row for spread in missing
+            for row in _spread_page_rows(self.storybook_id, spread.model_dump(), self.character_visuals)
+        ]
+        if page_rows:
+            _insert_page_rows(page_rows)
+            publish_spreads_drafted(self.storybook_id, missing)
+        return 2 * (len(self.spread_numbers) + len(missing))
+
+    def discard(self) -> None:
+        """Remove partially persisted pages after a failed generation."""
+        if self.spread_numbers:
+            supabase.table("pages").delete().eq("storybook_id", self.storybook_id).execute()
+            self.spread_numbers.clear()
+
+
+def _set_storybook_status(storybook_id: str, new_status: StorybookStatus) -> None:
+    supabase.table("storybooks").update({"status": new_status.value}).eq("id", storybook_id).execute()
+
+
+def _delete_pages(storybook_id: str) -> None:
+    supabase.table("pages").delete().eq("storybook_id", storybook_id).execute()
+
+
+# ----------------------------------------------------------------------------
+# Pipeline stages (see GENERATION_PIPELINE for how they connect)
+# ----------------------------------------------------------------------------
+
+def _reset_stage(storybook_id: str) -> None:
+    # Pages from an earlier attempt would collide with the new ones
+    _delete_pages(storybook_id)
+
+
+def _templates_stage() -> Dict[str, PromptTemplate]:
+    names = ("bible", "arc", "draft", "draft_act", "draft_seams")
+    return {name: get_prompt_template(f"{name}.md") for name in names}
+
+
+def _preset_characters_stage(context: StoryContext) -> List[Character]:
+    if context.preset_characters is None:
+        context.preset_characters = (
+            load_preset_characters(context.character_ids) if context.character_ids else []
+        )
+    return context.preset_characters
+
+
+async def _bible_stage(
+    context: StoryContext,
+    preset_characters: List[Character],
+    templates: Dict[str, PromptTemplate],
+) -> StoryBibleSchema:
+    stage_fingerprint = fingerprint(
+        context.prompt,
+        context.character_ids,
+        preset_characters,
+        templates["bible"].version,
+        settings.llm_provider_override or DEFAULT_BIBLE_PROVIDER,
+        DEFAULT_BIBLE_MODEL,
+    )
+    if context.has_checkpoint("bible", stage_fingerprint):
+        logger.info("Reusing checkpointed bible for storybook %s", context.storybook_id)
+        publish_bible_ready(context.storybook_id, context.bible, reused=True)
+        return context.bible
+    bible = await build_story_bible(context, prompt_template=templates["bible"])
+    context.checkpoint("bible", stage_fingerprint)
+    if settings.studio_checkpoint_stages:
+        await asyncio.to_thread(context.persist)
+    publish_bible_ready(context.storybook_id, bible, reused=False)
+    return bible
+
+
+def _character_visuals_stage(bible: StoryBibleSchema) -> Dict[str, str]:
+    return character_visuals_from_bible(bible.model_dump())
+
+
+def _spread_characters_stage(storybook_id: str, bible: StoryBibleSchema, reset: None) -> str:
+    # Pages were just cleared, so spreads fall back to the in-memory bible
+    return build_page_specific_characters_text(storybook_id, bible)
+
+
+async def _arc_stage(context: StoryContext, bible: StoryBibleSchema, templates: Dict[str, PromptTemplate]) -> StoryArcSchema:
+    # Chained to the bible checkpoint: a regenerated bible invalidates the arc
+    stage_fingerprint = fingerprint(
+        context.prompt,
+        context.checkpoints["bible"]["fingerprint"],
+        templates["arc"].version,
+        settings.llm_provider_override or DEFAULT_ARC_PROVIDER,
+        DEFAULT_ARC_MODEL,
+    )
+    if context.has_checkpoint("arc", stage_fingerprint):
+        logger.info("Reusing checkpointed arc for storybook %s", context.storybook_id)
+        publish_arc_ready(context.storybook_id, context.arc, reused=True)
+        return context.arc
+    arc = await build_story_arc(context, prompt_template=templates["arc"])
+    context.checkpoint("arc", stage_fingerprint)
+    if settings.studio_checkpoint_stages:
+        await asyncio.to_thread(context.persist)
+    publish_arc_ready(context.storybook_id, arc, reused=False)
+    return arc
+
+
+async def _script_stage(
+    context: StoryContext,
+    arc: StoryArcSchema,
+    templates: Dict[str, PromptTemplate],
+    spread_characters: str,
+    character_visuals: Dict[str, str],
+    draft_mode: str,
+    reset: None,
+) -> Dict[str, Any]:
+    # When streaming, pages (with image prompts) are written as each spread arrives
+    page_writer = (
+        _ProgressivePageWriter(context.storybook_id, character_visuals)
+        if settings.studio_stream_spreads_enabled else None
+    )
+    try:
+        if draft_mode == "act_parallel":
+            final_script = await build_final_script_by_act(
+                context,
+                on_spread=page_writer,
+                act_prompt_template=templates["draft_act"],
+                seam_prompt_template=templates["draft_seams"],
+                draft_prompt_template=templates["draft"],
+                page_specific_characters=spread_characters,
+            )
+        else:
+            final_script = await build_final_script(
+                context,
+                on_spread=page_writer,
+                prompt_template=templates["draft"],
+                page_specific_characters=spread_characters,
+            )
+    except BaseException:
+        if page_writer is not None:
+            await asyncio.to_thread(page_writer.discard)
+        raise
+    return {"script": final_script, "page_writer": page_writer}
+
+
+def _pages_stage(
+    context: StoryContext,
+    script: FinalScriptSchema,
+    page_writer: Optional[_ProgressivePageWriter],
+    character_visuals: Dict[str, str],
+) -> int:
+    # Persist spreads into pages table (only those the stream did not already write)
+    if page_writer is not None:
+        page_count = page_writer.finish(script.spreads)
+    else:
+        spreads_dicts = [spread.model_dump() for spread in script.spreads]
+        page_count = _persist_spreads_as_pages(context.storybook_id, spreads_dicts, character_visuals)
+        publish_spreads_drafted(context.storybook_id, script.spreads)
+    # Bible, arc, page_count and status in one write
+    context.persist(page_count=page_count, status=StorybookStatus.script_generated.value)
+    return page_count
+
+
+GENERATION_PIPELINE = PipelineDAG(
+    "storybook.generate",
+    [
+        Stage("reset", _reset_stage, inputs=("storybook_id",)),
+        Stage("templates", _templates_stage),
+        Stage("preset_characters", _preset_characters_stage, inputs=("context",)),
+        Stage("bible", _bible_stage, inputs=("context", "preset_characters", "templates")),
+        Stage("character_visuals", _character_visuals_stage, inputs=("bible",)),
+        Stage("spread_characters", _spread_characters_stage, inputs=("storybook_id", "bible", "reset")),
+        Stage("arc", _arc_stage, inputs=("context", "bible", "templates")),
+        Stage(
+            "script",
+            _script_stage,
+            inputs=(
+                "context", "arc", "templates", "spread_characters",
+                "character_visuals", "draft_mode", "reset",
+            ),
+            outputs=("script", "page_writer"),
+        ),
+        Stage("pages", _pages_stage, inputs=("context", "script", "page_writer", "character_visuals")),
+    ],
+    initial=("storybook_id", "context", "draft_mode"),
+)
+
+
+def _begin_generation(storybook_id: str) -> Optional[Dict[str, Any]]:
+    """Mark the storybook script_generating; returns the updated row, or None if it is gone."""
+    res = (
+        supabase.table("storybooks")
+        .update({"status": StorybookStatus.script_generating.value})
+        .eq("id", storybook_id)
+        .execute()
+    )
+    return res.data[0] if res.data else None
+
+
+async def run_storybook_generation(
+    storybook_id: str,
+    context: Optional[StoryContext] = None,
+    draft_mode: Optional[str] = None,
+) -> int:
+    """
+    Generate bible, arc and the 14-spread script for an existing storybook row
+    and persist the pages, updating `status` as the stages progress.
+
+    Stages run as a DAG (GENERATION_PIPELINE) over one in-memory StoryContext:
+    prompt templates and preset characters load concurrently, page-character
+    context is built while the arc is generated, and bible, arc, page_count and
+    status are written together at the end. Stage timings, bible/arc
+    summaries and each persisted spread are published as progress events.
+    With STUDIO_CHECKPOINT_STAGES,
+    bible and arc are also written as they finish, with a fingerprint of
+    their inputs; a re-run (job retry or `resume_storybook_generation`)
+    reuses any checkpoint whose inputs are unchanged instead of calling the
+    LLM again. Pages from earlier attempts are removed first. Returns the
+    resulting page count.
+
+    Args:
+        storybook_id: Storybook to generate
+        context: Context already seeded from the row (status already set to
+            script_generating); loaded if omitted
+        draft_mode: "single" or "act_parallel" final script drafting;
+            STUDIO_DRAFT_MODE if omitted
+
+    Raises:
+        ValueError: If the storybook cannot be generated (bad input or LLM failure)
+        ProviderUnavailableError: If a provider's circuit breaker is open
+    """
+    draft_mode = draft_mode or settings.studio_draft_mode
+    if draft_mode not in DRAFT_MODES:
+        raise ValueError(f"Unknown draft mode {draft_mode!r}; expected one of {DRAFT_MODES}")
+    if context is None:
+        row = await asyncio.to_thread(_begin_generation, storybook_id)
+        if row is None:
+            raise ValueError(f"Storybook with id {storybook_id} not found")
+        context = StoryContext.from_row(storybook_id, row)
+    start_run(storybook_id, "generation_started", {"draft_mode": draft_mode})
+    run = await GENERATION_PIPELINE.run(
+        {"storybook_id": storybook_id, "context": context, "draft_mode": draft_mode},
+        on_stage=stage_listener(storybook_id),
+    )
+    publish_progress(storybook_id, "generation_finished", {
+        "status": StorybookStatus.script_generated.value,
+        "page_count": run["pages"],
+        "wall_time": round(run.wall_time, 3),
+    })
+    return run["pages"]
+
+
+def enqueue_storybook_generation(user_id: str, payload: GenerateStorybookRequest) -> tuple[Storybook, JobRecord]:
+    """
+    Create the storybook row and queue its generation job.
+
+    The job ID is the storybook ID, so status lookups need only the storybook.
     """
     if not payload.prompt or not payload.prompt.strip():
         raise HTTPException(
@@ -90,52 +434,164 @@ def generate_storybook_with_script(user_id: str, payload: GenerateStorybookReque
             detail="Prompt is required to generate a storybook.",
         )
 
-    # 1) Create storybook base row
     storybook = _create_storybook_record(user_id, payload)
-
-    # 2) Generate supporting content (bible, arc)
     try:
-        generate_story_bible(storybook.id)
-        generate_story_arc(storybook.id)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(exc),
+        job = enqueue_job(
+            GENERATE_STORYBOOK_JOB,
+            {"storybook_id": storybook.id, "user_id": user_id, "draft_mode": payload.draft_mode},
+            job_id=storybook.id,
         )
     except Exception as exc:
+        _set_storybook_status(storybook.id, StorybookStatus.failed)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate story context: {exc}",
+            detail=f"Failed to queue storybook generation: {exc}",
         )
+    return storybook, job
+
 
-    # 3) Generate final script (14 spreads)
+async def _handle_generation_job(job: JobRecord) -> None:
+    storybook_id = job.payload["storybook_id"]
+    # The status update returns the row, which seeds the context for every stage
+    row = await asyncio.to_thread(_begin_generation, storybook_id)
+    if row is None:
+        raise PermanentJobError(f"Storybook {storybook_id} no longer exists")
     try:
-        final_script = generate_final_script(storybook.id)
+        context = StoryContext.from_row(storybook_id, row)
     except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(exc),
-        )
+        raise PermanentJobError(str(exc)) from exc
+    try:
+        await run_storybook_generation(storybook_id, context, job.payload.get("draft_mode"))
     except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate final script: {exc}",
-        )
+        publish_progress(storybook_id, "attempt_failed", {
+            "attempt": job.attempts,
+            "max_attempts": job.max_attempts,
+            "detail": str(exc),
+        })
+        raise
 
-    # 4) Persist spreads into pages table
-    spreads_dicts = [spread.model_dump() for spread in final_script.spreads]
-    _persist_spreads_as_pages(storybook.id, spreads_dicts)
 
-    # 5) Return hydrated storybook with pages
-    return storybook_service.get_storybook(user_id, storybook.id)
+async def _handle_generation_failure(job: JobRecord, exc: BaseException) -> None:
+    await asyncio.to_thread(_set_storybook_status, job.payload["storybook_id"], StorybookStatus.failed)
+    publish_progress(job.payload["storybook_id"], "generation_failed", {
+        "status": StorybookStatus.failed.value,
+        "detail": str(exc),
+    })
 
 
+register_job_handler(GENERATE_STORYBOOK_JOB, _handle_generation_job, on_failure=_handle_generation_failure)
 
 
+def resume_storybook_generation(user_id: str, storybook_id: str) -> tuple[StorybookStatus, JobRecord]:
+    """
+    Re-queue generation of a failed storybook on its existing row.
 
+    Stages whose checkpointed inputs are unchanged (bible, arc) are reused,
+    so a failure in the final script costs only the script call on resume.
+    """
+    res = (
+        supabase.table("storybooks")
+        .select("id, user_id, status, creation_params")
+        .eq("id", storybook_id)
+        .execute()
+    )
+    if not res.data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Storybook not found")
+    row = res.data[0]
+    if row.get("user_id") != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
+    queue = get_job_queue()
+    job = queue.get(storybook_id)
+    storybook_status = StorybookStatus(row.get("status", "pending"))
+    if job is not None and job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Generation is already in progress")
+    if storybook_status != StorybookStatus.failed and not (job is not None and job.status == JobStatus.FAILED):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed generations can be resumed (status: {storybook_status.value})",
+        )
 
+    _set_storybook_status(storybook_id, StorybookStatus.pending)
+    if job is not None:
+        job = retry_job(storybook_id)
+    if job is None:
+        # Purged (or never queued on this host): start a fresh job for the same row
+        job = enqueue_job(
+            GENERATE_STORYBOOK_JOB,
+            {
+                "storybook_id": storybook_id,
+                "user_id": user_id,
+                "draft_mode": (row.get("creation_params") or {}).get("draft_mode"),
+            },
+            job_id=storybook_id,
+        )
+    return StorybookStatus.pending, job
 
 
+def recover_orphaned_generations() -> int:
+    """
+    Mark storybooks whose generation job failed in this host's queue, but are
+    still script_generating, as failed so they can be resumed.
+
+    That happens when the failure hook never ran (e.g. the last attempt's
+    worker crashed and the lease expiry failed the job). Only jobs this queue
+    owns are considered: a script_generating row without a local job may be
+    generating on another node and is left alone, and queued or lease-expired
+    running jobs are picked up again by the workers. Returns the number of
+    rows updated.
+    """
+    job_ids = get_job_queue().ids(kind=GENERATE_STORYBOOK_JOB, status=JobStatus.FAILED)
+    recovered = 0
+    for start in range(0, len(job_ids), RECOVERY_BATCH_SIZE):
+        # Conditional on the status, so rows that moved on since are not touched
+        res = (
+            supabase.table("storybooks")
+            .update({"status": StorybookStatus.failed.value})
+            .in_("id", job_ids[start:start + RECOVERY_BATCH_SIZE])
+            .eq("status", StorybookStatus.script_generating.value)
+            .execute()
+        )
+        recovered += len(res.data or [])
+    if recovered:
+        logger.info("Marked %d storybooks with failed generation jobs as failed", recovered)
+    return recovered
+
+
+def get_generation_status(user_id: str, storybook_id: str) -> GenerationStatusResponse:
+    """Storybook pipeline status plus the attempts and errors of its generation job."""
+    res = (
+        supabase.table("storybooks")
+        .select("id, user_id, status, page_count")
+        .eq("id", storybook_id)
+        .execute()
+    )
+    if not res.data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Storybook not found")
+    row = res.data[0]
+    if row.get("user_id") != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
+    storybook_status = StorybookStatus(row.get("status", "pending"))
+    job = get_job_queue().get(storybook_id)
+    if job is not None and job.status == JobStatus.FAILED and storybook_status not in (
+        StorybookStatus.failed,
+        StorybookStatus.canceled,
+    ):
+        # A job that exhausted its attempts by worker crashes never ran its failure hook
+        storybook_status = StorybookStatus.failed
 
+    return GenerationStatusResponse(
+        storybook_id=storybook_id,
+        status=storybook_status,
+        page_count=row.get("page_count") or 0,
+        job=GenerationJobInfo(
+            status=job.status,
+            attempts=job.attempts,
+            max_attempts=job.max_attempts,
+            errors=[error["error"] for error in job.errors],
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            finished_at=job.finished_at,
+        ) if job is not None else None,
+    )
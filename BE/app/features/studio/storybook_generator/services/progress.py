@@ -0,0 +1,84 @@
+"""
+Generation Progress Events
+
+Events published on a storybook's topic while it is generated or
+illustrated, streamed to Studio by `GET /{storybook_id}/generation/events`.
+
+Each run on a storybook (a generation attempt, an image run) starts with
+`start_run()`, which clears the topic history so late subscribers replay
+only the current run. Event types:
+
+- generation_started / generation_finished / attempt_failed / generation_failed
+- stage_started / stage_finished / stage_failed: pipeline stage timings
+- bible_ready, arc_ready: summaries of the stage output
+- spread_drafted: a spread's script, once its pages are persisted
+- images_started / image_uploaded / image_failed / images_finished
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from app.shared.events import get_event_broker, publish_event
+from app.shared.pipeline import StageListener, StageTiming
+
+from ..output_schemas.arc import StoryArcSchema
+from ..output_schemas.bible import StoryBibleSchema
+from ..output_schemas.draft import SpreadScript
+from .characters import spread_page_numbers
+
+# A stream ends after delivering one of these
+TERMINAL_EVENTS = ("generation_finished", "generation_failed", "images_finished")
+
+
+def storybook_topic(storybook_id: str) -> str:
+    return f"storybook:{storybook_id}"
+
+
+def publish_progress(storybook_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+    publish_event(storybook_topic(storybook_id), event_type, data)
+
+
+def start_run(storybook_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+    """Clear the storybook's event history and publish the run's first event."""
+    get_event_broker().reset(storybook_topic(storybook_id))
+    publish_progress(storybook_id, event_type, data)
+
+
+def stage_listener(storybook_id: str) -> StageListener:
+    """PipelineDAG `on_stage` listener publishing stage_started/finished/failed."""
+
+    def on_stage(phase: str, timing: StageTiming) -> None:
+        data: Dict[str, Any] = {"stage": timing.stage, "started_at": round(timing.started_at, 3)}
+        if timing.duration is not None:
+            data["duration"] = round(timing.duration, 3)
+        if timing.error:
+            data["error"] = timing.error
+        publish_progress(storybook_id, f"stage_{phase}", data)
+
+    return on_stage
+
+
+def publish_bible_ready(storybook_id: str, bible: StoryBibleSchema, reused: bool) -> None:
+    publish_progress(storybook_id, "bible_ready", {
+        "reused": reused,
+        "setting": bible.name,
+        "main_theme": bible.main_theme,
+        "characters": [char.character_name for char in bible.characters],
+    })
+
+
+def publish_arc_ready(storybook_id: str, arc: StoryArcSchema, reused: bool) -> None:
+    publish_progress(storybook_id, "arc_ready", {
+        "reused": reused,
+        "acts": [{"act_number": act.act_number, "act_name": act.act_name} for act in arc.acts],
+        "spread_count": len(arc.spreads),
+    })
+
+
+def publish_spreads_drafted(storybook_id: str, spreads: Iterable[SpreadScript]) -> None:
+    for spread in spreads:
+        publish_progress(storybook_id, "spread_drafted", {
+            "spread_number": spread.spread_number,
+            "page_numbers": list(spread_page_numbers(spread.spread_number)),
+            "script_1": spread.script_1,
+            "script_2": spread.script_2,
+        })
@@ -2,17 +2,42 @@
 Storybook Rewrite Service
 
 Provides text editing capabilities for children's picture books using LLM text generation.
-Supports both plain text editing and full script rewriting with proper formatting.
+Supports plain text editing, full script rewriting with proper formatting, and
+targeted rewrites that regenerate only the spreads an edit touches and patch
+them into the script.
 """
 
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional
 
-from app.shared.llm.base import Provider, generate_structured, generate_text
-from app.shared.llm.llm_config import DEFAULT_REWRITE_PROVIDER, DEFAULT_REWRITE_MODEL
+from pydantic import Field, create_model
 
-from ..output_schemas.draft import FinalScriptSchema
-from ..output_schemas.final_rewrite import FinalRewriteSchema
-from .utils import get_characters_for_page, get_characters_for_spread
+from app.core.config import settings
+from app.shared.llm.base import Provider, agenerate_structured, agenerate_text
+from app.shared.providers.resilience import ProviderUnavailableError
+from app.shared.llm.llm_config import (
+    DEFAULT_REWRITE_MODEL,
+    DEFAULT_REWRITE_PLAN_MODEL,
+    DEFAULT_REWRITE_PLAN_PROVIDER,
+    DEFAULT_REWRITE_PROVIDER,
+)
+
+from ..output_schemas.draft import FinalScriptSchema, SpreadScript
+from ..output_schemas.final_rewrite import FinalRewriteSchema, RewritePlanSchema, SpreadPatchSchema
+from .characters import CharacterLoader
+from .utils import (
+    SpreadCallback,
+    generate_spreads_streaming,
+    get_characters_for_page,
+)
+
+logger = logging.getLogger(__name__)
+
+SPREAD_COUNT = 14
 
 
 # System Prompts
@@ -97,8 +122,72 @@ Return a JSON object that matches the FinalRewriteSchema structure:
 - change_summary: 1-2 sentences summarising the key changes for the user in friendly language.
 """
 
+REWRITE_PLAN_PROMPT = """You are planning an edit to a children's picture book script (14 spreads, 28 pages; spread N holds pages 2N-1 and 2N).
+
+Current Script:
+{formatted_spreads}
+
+User's Request:
+{edit_request}
+
+Decide which spreads must change to carry out the request.
+- scope "spreads": the request concerns particular moments, pages or spreads (e.g. "change the last page", "make the ending more exciting", "add an owl when they enter the forest"). List every spread that must change, and only those.
+- scope "full": the request changes the whole book (overall tone, reading level or length, a main character throughout, retelling the story). Leave spread_numbers empty.
+
+Output strict JSON matching the RewritePlanSchema structure."""
+
+SPREAD_REWRITE_PROMPT = """You are an expert editor for children's picture books (ages 4-5).
+
+Your task is to rewrite only the target spreads of the script according to the user's request.
+
+Context:
+- Format: 14 spreads (28 pages total)
+- Each spread has script_1 (left page) and script_2 (right page)
+- Age-appropriate vocabulary for 4-5 year olds
+
+Guidelines:
+- Rewrite spreads {target_numbers} only; read-only spreads are shown for context and will not change
+- Keep continuity: each target spread must follow on from the spread before it and lead into the spread after it
+- Keep each spread about the same length unless the request asks otherwise
+- Keep simple sentences, active voice and the page turn strategy (script_2 should create anticipation)
+- Consider the characters appearing in each spread when editing
+
+{character_context}
+
+Script Excerpt:
+{formatted_spreads}
+
+User's Request:
+{edit_request}
+
+Return a JSON object that matches the SpreadPatchSchema structure:
+- spreads: the {spread_count} target spreads rewritten, in order, keeping their spread numbers
+- change_summary: 1-2 sentences summarising the key changes for the user in friendly language.
+"""
 
-def rewrite_plain_text(
+# "spread 3", "spreads 3-5", "page 7", "pages 7 and 8", "first page", "the last spread"
+_SPREAD_REFERENCE = re.compile(
+    r"\b(spread|page)s?\s+(\d{1,2})(?:\s*(-|to|and|&|,)\s*(\d{1,2}))?", re.IGNORECASE
+)
+_EDGE_REFERENCE = re.compile(
+    r"\b(first|opening|last|final)\s+(spread|page)\b", re.IGNORECASE
+)
+# Requests that reach beyond the spreads they name ("make page 3 funnier and the whole book shorter")
+_WHOLE_BOOK_REFERENCE = re.compile(
+    r"\b(whole|entire|every|throughout|overall|all\s+(?:the\s+)?(?:pages|spreads))\b", re.IGNORECASE
+)
+
+
+@dataclass
+class ScriptRewrite:
+    """Outcome of a Studio edit request."""
+    script: FinalScriptSchema
+    change_summary: str
+    # Spreads rewritten and patched in; None when the whole script was rewritten
+    changed_spreads: Optional[List[int]] = None
+
+
+async def rewrite_plain_text(
     original_text: str,
     edit_request: str,
     page_id: Optional[str] = None,
@@ -131,7 +220,7 @@ def rewrite_plain_text(
         # Get character context if page_id is provided
         character_context = ""
         if page_id and storybook_id:
-            characters = get_characters_for_page(page_id, storybook_id)
+            characters = await asyncio.to_thread(get_characters_for_page, page_id, storybook_id)
             if characters:
                 char_descriptions = []
                 for char in characters:
@@ -153,7 +242,7 @@ def rewrite_plain_text(
         )
         
         # Generate edited text using LLM
-        result = generate_text(
+        result = await agenerate_text(
             provider=Provider(DEFAULT_REWRITE_PROVIDER),
             model=DEFAULT_REWRITE_MODEL,
             input_text=prompt,
@@ -167,11 +256,13 @@ def rewrite_plain_text(
         
         return result.text or original_text
         
+    except ProviderUnavailableError:
+        raise
     except Exception as e:
         raise ValueError(f"Failed to rewrite text: {e}")
 
 
-def rewrite_full_script(
+async def rewrite_full_script(
     script_data: Dict,
     edit_request: str,
     requesting_user_id: Optional[str] = None,
@@ -179,7 +270,7 @@ def rewrite_full_script(
     """
     Backwards-compatible wrapper that returns only the rewritten script.
     """
-    rewrite_result = rewrite_full_script_with_summary(
+    rewrite_result = await rewrite_full_script_with_summary(
         script_data,
         edit_request,
         requesting_user_id=requesting_user_id,
@@ -187,13 +278,17 @@ def rewrite_full_script(
     return rewrite_result.model_dump(exclude={"change_summary"})
 
 
-def rewrite_full_script_with_summary(
+async def rewrite_full_script_with_summary(
     script_data: Dict,
     edit_request: str,
     requesting_user_id: Optional[str] = None,
+    on_spread: Optional[SpreadCallback] = None,
 ) -> FinalRewriteSchema:
     """
     Rewrite the entire storybook script and provide a natural-language change summary.
+
+    When `on_spread` is given the rewrite is streamed and each rewritten
+    SpreadScript is passed to it as soon as it is generated.
     """
     spreads = _validate_script_inputs(script_data, edit_request)
     storybook_id = script_data["storybook_id"]
@@ -202,7 +297,7 @@ def rewrite_full_script_with_summary(
         formatted_spreads = _format_spreads_for_prompt(spreads)
         
         # Get character context for each spread
-        character_context = _build_spread_character_context(storybook_id, spreads)
+        character_context = await asyncio.to_thread(_build_spread_character_context, storybook_id, spreads)
         
         prompt = FULL_SCRIPT_REWRITE_WITH_SUMMARY_PROMPT.format(
             character_context=character_context,
@@ -210,34 +305,232 @@ def rewrite_full_script_with_summary(
             edit_request=edit_request,
         )
         billing_user_id = requesting_user_id or script_data.get("user_id")
-        result = generate_structured(
+        usage_metadata = {
+            "storybook_id": storybook_id,
+            "service": "studio.rewrite.full_script",
+        }
+        if on_spread is not None:
+            parsed: FinalRewriteSchema = await generate_spreads_streaming(
+                provider=Provider(DEFAULT_REWRITE_PROVIDER),
+                model=DEFAULT_REWRITE_MODEL,
+                input_text=prompt,
+                schema=FinalRewriteSchema,
+                on_spread=on_spread,
+                user_id=billing_user_id,
+                usage_metadata=usage_metadata,
+            )
+        else:
+            result = await agenerate_structured(
+                provider=Provider(DEFAULT_REWRITE_PROVIDER),
+                model=DEFAULT_REWRITE_MODEL,
+                input_text=prompt,
+                schema=FinalRewriteSchema,
+                user_id=billing_user_id,
+                usage_metadata=usage_metadata,
+            )
+            parsed = result.parsed
+        # Ensure identifiers remain consistent with the source script.
+        parsed.storybook_id = script_data["storybook_id"]
+        parsed.user_id = script_data["user_id"]
+        return parsed
+    except ProviderUnavailableError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to rewrite script with summary: {e}")
+
+
+async def rewrite_script_with_summary(
+    script_data: Dict,
+    edit_request: str,
+    requesting_user_id: Optional[str] = None,
+    spread_numbers: Optional[List[int]] = None,
+) -> ScriptRewrite:
+    """
+    Apply an edit request, rewriting only the spreads it touches when possible.
+
+    Spread numbers given by the caller are used as-is. Otherwise, with
+    STUDIO_REWRITE_TARGETED, they are planned from the request (see
+    `plan_rewrite_spreads`); edits that touch the whole book fall back to a
+    full rewrite.
+
+    Raises:
+        ValueError: If the inputs are invalid or LLM generation fails
+    """
+    _validate_script_inputs(script_data, edit_request)
+    if spread_numbers is None and settings.studio_rewrite_targeted:
+        spread_numbers = await plan_rewrite_spreads(
+            script_data,
+            edit_request,
+            user_id=requesting_user_id or script_data.get("user_id"),
+        )
+
+    if not spread_numbers:
+        rewrite_result = await rewrite_full_script_with_summary(
+            script_data,
+            edit_request,
+            requesting_user_id=requesting_user_id,
+        )
+        return ScriptRewrite(
+            script=FinalScriptSchema.model_validate(rewrite_result.model_dump(exclude={"change_summary"})),
+            change_summary=rewrite_result.change_summary,
+        )
+
+    patch = await rewrite_spreads_with_summary(
+        script_data,
+        edit_request,
+        spread_numbers,
+        requesting_user_id=requesting_user_id,
+    )
+    return ScriptRewrite(
+        script=apply_spread_patch(FinalScriptSchema.model_validate(script_data), patch.spreads),
+        change_summary=patch.change_summary,
+        changed_spreads=[spread.spread_number for spread in patch.spreads],
+    )
+
+
+async def plan_rewrite_spreads(
+    script_data: Dict,
+    edit_request: str,
+    user_id: Optional[str] = None,
+) -> Optional[List[int]]:
+    """
+    Spread numbers an edit request touches, or None to rewrite the whole script.
+
+    Explicit references ("page 7", "spreads 3-5", "the last page") are read
+    from the request directly; anything else goes through one short
+    structured call on the planning model. Plans touching more than
+    STUDIO_REWRITE_MAX_SPREADS spreads, and planning failures, return None.
+    """
+    numbers = _explicit_spread_numbers(edit_request)
+    if numbers is None:
+        spreads = _validate_script_inputs(script_data, edit_request)
+        try:
+            result = await agenerate_structured(
+                provider=Provider(DEFAULT_REWRITE_PLAN_PROVIDER),
+                model=DEFAULT_REWRITE_PLAN_MODEL,
+                input_text=REWRITE_PLAN_PROMPT.format(
+                    formatted_spreads=_format_spreads_for_prompt(spreads),
+                    edit_request=edit_request,
+                ),
+                schema=RewritePlanSchema,
+                user_id=user_id,
+                usage_metadata={
+                    "storybook_id": script_data.get("storybook_id"),
+                    "service": "studio.rewrite.plan",
+                },
+            )
+        except Exception as exc:
+            logger.warning("Rewrite planning failed, rewriting the whole script: %s", exc)
+            return None
+        plan: RewritePlanSchema = result.parsed
+        if plan.scope == "full":
+            return None
+        numbers = sorted({number for number in plan.spread_numbers if 1 <= number <= SPREAD_COUNT})
+
+    if not numbers or len(numbers) > settings.studio_rewrite_max_spreads:
+        return None
+    return numbers
+
+
+async def rewrite_spreads_with_summary(
+    script_data: Dict,
+    edit_request: str,
+    spread_numbers: List[int],
+    requesting_user_id: Optional[str] = None,
+) -> SpreadPatchSchema:
+    """
+    Rewrite only `spread_numbers`, with STUDIO_REWRITE_CONTEXT_SPREADS
+    unchanged neighbours on each side as read-only context.
+
+    Output (and so latency) scales with the number of target spreads rather
+    than the whole book. Apply the result with `apply_spread_patch`.
+
+    Returns:
+        SpreadPatchSchema with the rewritten target spreads, in spread order
+
+    Raises:
+        ValueError: If the inputs are invalid or LLM generation fails
+    """
+    spreads = _validate_script_inputs(script_data, edit_request)
+    targets = sorted(set(spread_numbers))
+    if not targets or any(not 1 <= number <= SPREAD_COUNT for number in targets):
+        raise ValueError(f"spread_numbers must be between 1 and {SPREAD_COUNT}")
+    storybook_id = script_data["storybook_id"]
+
+    try:
+        reach = max(0, settings.studio_rewrite_context_spreads)
+        target_set = set(targets)
+        formatted_spreads = "\n".join(
+            f"Spread {spread['spread_number']} ({'rewrite' if spread['spread_number'] in target_set else 'read-only'}):\n"
+            f"  Left Page (script_1): {spread['script_1']}\n"
+            f"  Right Page (script_2): {spread['script_2']}\n"
+            for spread in spreads
+            if any(abs(spread["spread_number"] - number) <= reach for number in targets)
+        )
+        character_context = await asyncio.to_thread(
+            _build_spread_character_context,
+            storybook_id,
+            [spread for spread in spreads if spread["spread_number"] in target_set],
+        )
+        prompt = SPREAD_REWRITE_PROMPT.format(
+            target_numbers=", ".join(str(number) for number in targets),
+            character_context=character_context,
+            formatted_spreads=formatted_spreads,
+            edit_request=edit_request,
+            spread_count=len(targets),
+        )
+        result = await agenerate_structured(
             provider=Provider(DEFAULT_REWRITE_PROVIDER),
             model=DEFAULT_REWRITE_MODEL,
             input_text=prompt,
-            schema=FinalRewriteSchema,
-            user_id=billing_user_id,
+            schema=_patch_schema(len(targets)),
+            user_id=requesting_user_id or script_data.get("user_id"),
             usage_metadata={
                 "storybook_id": storybook_id,
-                "service": "studio.rewrite.full_script",
+                "service": "studio.rewrite.spreads",
+                "spread_count": len(targets),
             },
         )
-        parsed: FinalRewriteSchema = result.parsed
-        # Ensure identifiers remain consistent with the source script.
-        parsed.storybook_id = script_data["storybook_id"]
-        parsed.user_id = script_data["user_id"]
-        return parsed
+        parsed: SpreadPatchSchema = result.parsed
+        # Rewrites come back in target order (the schema fixes their count)
+        return SpreadPatchSchema(
+            spreads=[
+                SpreadScript(spread_number=number, script_1=spread.script_1, script_2=spread.script_2)
+                for number, spread in zip(targets, parsed.spreads)
+            ],
+            change_summary=parsed.change_summary,
+        )
+    except ProviderUnavailableError:
+        raise
     except Exception as e:
-        raise ValueError(f"Failed to rewrite script with summary: {e}")
+        raise ValueError(f"Failed to rewrite spreads {targets}: {e}")
+
+
+def apply_spread_patch(script: FinalScriptSchema, spreads: List[SpreadScript]) -> FinalScriptSchema:
+    """
+    A copy of `script` with the given spreads replaced, matched by spread number.
+
+    Raises:
+        ValueError: If a patched spread is not part of the script
+    """
+    patched = {spread.spread_number: spread for spread in spreads}
+    unknown = patched.keys() - {spread.spread_number for spread in script.spreads}
+    if unknown:
+        raise ValueError(f"Patch targets spreads not in the script: {sorted(unknown)}")
+    return script.model_copy(
+        update={"spreads": [patched.get(spread.spread_number, spread) for spread in script.spreads]}
+    )
 
 
 def _build_spread_character_context(storybook_id: str, spreads: List[Dict]) -> str:
     """Build character context for each spread."""
     character_contexts = []
+    loader = CharacterLoader(storybook_id)
     
     for spread in spreads:
         spread_number = spread.get("spread_number")
         if spread_number:
-            characters = get_characters_for_spread(storybook_id, spread_number)
+            characters = loader.for_spread(spread_number)
             if characters:
                 char_names = [char.character_name for char in characters]
                 char_descriptions = []
@@ -294,3 +587,44 @@ def _validate_script_inputs(script_data: Dict, edit_request: str) -> List[Dict]:
 
     return spreads
 
+
+@lru_cache(maxsize=None)
+def _patch_schema(spread_count: int) -> type[SpreadPatchSchema]:
+    """SpreadPatchSchema constrained to exactly `spread_count` spreads."""
+    return create_model(
+        f"SpreadPatch{spread_count}Schema",
+        __base__=SpreadPatchSchema,
+        spreads=(
+            List[SpreadScript],
+            Field(
+                ...,
+                description=f"{spread_count} rewritten spread scripts, in order",
+                min_length=spread_count,
+                max_length=spread_count,
+            ),
+        ),
+    )
+
+
+def _explicit_spread_numbers(edit_request: str) -> Optional[List[int]]:
+    """Spreads the request names outright, or None if it names none (or the whole book)."""
+    if _WHOLE_BOOK_REFERENCE.search(edit_request):
+        return None
+    numbers: set[int] = set()
+    for unit, first, joiner, second in _SPREAD_REFERENCE.findall(edit_request):
+        if not second:
+            named = [int(first)]
+        elif joiner.lower() in ("-", "to"):
+            named = range(int(first), int(second) + 1)
+        else:
+            named = [int(first), int(second)]
+        numbers.update(_to_spread(unit, number) for number in named)
+    for position, _ in _EDGE_REFERENCE.findall(edit_request):
+        numbers.add(1 if position.lower() in ("first", "opening") else SPREAD_COUNT)
+    numbers = {number for number in numbers if 1 <= number <= SPREAD_COUNT}
+    return sorted(numbers) if numbers else None
+
+
+def _to_spread(unit: str, number: int) -> int:
+    # Pages are numbered 1-28; spread N holds pages 2N-1 and 2N
+    return (number + 1) // 2 if unit.lower() == "page" else number
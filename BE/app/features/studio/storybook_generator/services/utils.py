@@ -2,12 +2,82 @@
 Utility functions for storybook generation services
 """
 
-from typing import List, Optional, Tuple
+import inspect
+import os
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
 from app.shared.database.supabase_client import supabase
-from ..output_schemas.bible import Character
+from app.shared.llm.base import Provider, agenerate_structured_stream
+from app.shared.prompts import PromptRegistry, PromptTemplate
+from ..output_schemas.bible import Character, StoryBibleSchema
+from ..output_schemas.draft import SpreadScript
+from .characters import CharacterLoader
+
+# Called with each SpreadScript as soon as the model finishes writing it
+SpreadCallback = Callable[[SpreadScript], Optional[Awaitable[None]]]
+
+
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "prompts")
+
+
+@lru_cache(maxsize=1)
+def get_prompt_registry() -> PromptRegistry:
+    """Compiled storybook prompt templates; edits are picked up without a restart in DEBUG."""
+    return PromptRegistry(PROMPTS_DIR, hot_reload=settings.debug)
+
+
+def get_prompt_template(template_name: str) -> PromptTemplate:
+    """
+    Compiled prompt template from the prompts directory (read from disk once).
+
+    Raises:
+        ValueError: If the template does not exist or cannot be read
+    """
+    return get_prompt_registry().get(template_name)
+
+
+def load_storybook_row(storybook_id: str) -> Dict[str, Any]:
+    """
+    Fetch and validate the storybook fields the generation stages read.
 
+    Returns:
+        Row dict with creation_params, user_id and character_ids
 
-def get_characters_for_page(page_id: str, storybook_id: str) -> List[Character]:
+    Raises:
+        ValueError: If the storybook is missing or has no creation_params, user_id or prompt
+    """
+    if not storybook_id:
+        raise ValueError("storybook_id must be provided")
+
+    response = (
+        supabase.table("storybooks")
+        .select("creation_params, user_id, character_ids")
+        .eq("id", storybook_id)
+        .execute()
+    )
+    if not response.data:
+        raise ValueError(f"Storybook with id {storybook_id} not found")
+
+    storybook_data = response.data[0]
+    creation_params = storybook_data.get("creation_params")
+    if not creation_params:
+        raise ValueError(f"Storybook {storybook_id} has no creation_params")
+    if not storybook_data.get("user_id"):
+        raise ValueError(f"Storybook {storybook_id} has no user_id")
+    if not creation_params.get("prompt", ""):
+        raise ValueError(f"Storybook {storybook_id} has no prompt in creation_params")
+    return storybook_data
+
+
+def get_characters_for_page(
+    page_id: str,
+    storybook_id: str,
+    bible: Optional[StoryBibleSchema] = None,
+) -> List[Character]:
     """
     Get characters for a specific page.
     
@@ -18,6 +88,7 @@ def get_characters_for_page(page_id: str, storybook_id: str) -> List[Character]:
     Args:
         page_id: The page ID to get characters for
         storybook_id: The storybook ID (for fallback to bible)
+        bible: In-memory bible to fall back to instead of the persisted one
         
     Returns:
         List of Character objects
@@ -28,7 +99,7 @@ def get_characters_for_page(page_id: str, storybook_id: str) -> List[Character]:
         
         if not page_response.data:
             # Page not found, fallback to storybook bible
-            return _get_storybook_bible_characters(storybook_id)
+            return _get_storybook_bible_characters(storybook_id, bible)
         
         page_data = page_response.data
         character_ids = page_data.get("character_ids")
@@ -49,23 +120,30 @@ def get_characters_for_page(page_id: str, storybook_id: str) -> List[Character]:
                 return characters
         
         # 3. Fallback to storybook-level bible characters
-        return _get_storybook_bible_characters(storybook_id)
+        return _get_storybook_bible_characters(storybook_id, bible)
         
     except Exception as e:
         # On any error, fallback to storybook bible
-        return _get_storybook_bible_characters(storybook_id)
+        return _get_storybook_bible_characters(storybook_id, bible)
 
 
-def _get_storybook_bible_characters(storybook_id: str) -> List[Character]:
+def _get_storybook_bible_characters(
+    storybook_id: str,
+    bible: Optional[StoryBibleSchema] = None,
+) -> List[Character]:
     """
     Get characters from storybook-level bible as fallback.
     
     Args:
         storybook_id: The storybook ID
+        bible: In-memory bible (e.g. not persisted yet); skips the storybook select
         
     Returns:
         List of Character objects from bible, or empty list if not found
     """
+    if bible is not None:
+        return [char.model_copy() for char in bible.characters]
+    
     try:
         # Fetch storybook creation_params
         response = supabase.table("storybooks").select("creation_params").eq("id", storybook_id).single().execute()
@@ -106,9 +184,9 @@ def get_page_ids_for_spread(storybook_id: str, spread_number: int) -> Tuple[Opti
     """
     Get page IDs for a specific spread.
     
-    A spread contains 2 pages:
-    - Left page (script_1): page_number = (spread_number - 1) * 2
-    - Right page (script_2): page_number = (spread_number - 1) * 2 + 1
+    A spread contains 2 pages (see `spread_page_numbers`):
+    - Left page (script_1): page_number = (spread_number - 1) * 2 + 1
+    - Right page (script_2): page_number = (spread_number - 1) * 2 + 2
     
     Args:
         storybook_id: The storybook ID
@@ -117,63 +195,62 @@ def get_page_ids_for_spread(storybook_id: str, spread_number: int) -> Tuple[Opti
     Returns:
         Tuple of (left_page_id, right_page_id), or (None, None) if not found
     """
-    try:
-        # Calculate page numbers (0-based indexing)
-        left_page_number = (spread_number - 1) * 2
-        right_page_number = left_page_number + 1
-        
-        # Fetch pages
-        pages_response = supabase.table("pages").select("id, page_number").eq("storybook_id", storybook_id).in_("page_number", [left_page_number, right_page_number]).execute()
-        
-        if not pages_response.data:
-            return (None, None)
-        
-        # Map page numbers to IDs
-        page_map = {page["page_number"]: page["id"] for page in pages_response.data}
-        
-        left_page_id = page_map.get(left_page_number)
-        right_page_id = page_map.get(right_page_number)
-        
-        return (left_page_id, right_page_id)
-        
-    except Exception:
-        return (None, None)
+    return CharacterLoader(storybook_id).page_ids_for_spread(spread_number)
 
 
-def get_characters_for_spread(storybook_id: str, spread_number: int) -> List[Character]:
+def get_characters_for_spread(
+    storybook_id: str,
+    spread_number: int,
+    bible: Optional[StoryBibleSchema] = None,
+) -> List[Character]:
     """
     Get characters for a specific spread by combining characters from both pages.
     
+    For more than one spread, use a shared `CharacterLoader` instead.
+    
     Args:
         storybook_id: The storybook ID
         spread_number: The spread number (1-14)
+        bible: In-memory bible to fall back to instead of the persisted one
         
     Returns:
         List of Character objects (deduplicated by character_name)
     """
-    left_page_id, right_page_id = get_page_ids_for_spread(storybook_id, spread_number)
-    
-    # Get characters from both pages
-    all_characters = []
-    character_names_seen = set()
-    
-    if left_page_id:
-        left_chars = get_characters_for_page(left_page_id, storybook_id)
-        for char in left_chars:
-            if char.character_name not in character_names_seen:
-                all_characters.append(char)
-                character_names_seen.add(char.character_name)
-    
-    if right_page_id:
-        right_chars = get_characters_for_page(right_page_id, storybook_id)
-        for char in right_chars:
-            if char.character_name not in character_names_seen:
-                all_characters.append(char)
-                character_names_seen.add(char.character_name)
-    
-    # If no page-specific characters found, fallback to storybook bible
-    if not all_characters:
-        return _get_storybook_bible_characters(storybook_id)
-    
-    return all_characters
+    return CharacterLoader(storybook_id, bible).for_spread(spread_number)
+
+
+async def generate_spreads_streaming(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+    on_spread: SpreadCallback,
+    user_id: Optional[str] = None,
+    usage_metadata: Optional[Dict[str, Any]] = None,
+) -> BaseModel:
+    """
+    Generate a spreads-based script, handing each spread to `on_spread` as it completes.
+
+    Args:
+        schema: FinalScriptSchema, ActScriptSchema or a subclass (must have a `spreads` list)
+        on_spread: Sync or async callback invoked once per spread, in order
 
+    Returns:
+        The complete, validated `schema` instance
+    """
+    async for chunk in agenerate_structured_stream(
+        provider=provider,
+        model=model,
+        input_text=input_text,
+        schema=schema,
+        item_path=("spreads",),
+        item_schema=SpreadScript,
+        user_id=user_id,
+        usage_metadata=usage_metadata,
+    ):
+        if chunk.done:
+            return chunk.parsed
+        outcome = on_spread(chunk.item)
+        if inspect.isawaitable(outcome):
+            await outcome
+    raise ValueError("Structured stream ended without a final result")
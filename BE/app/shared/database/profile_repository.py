@@ -1,7 +1,7 @@
 """
 프로필 관련 데이터베이스 연산을 담당하는 모듈.
 
-현재는 LLM 토큰 사용량에 따른 credits_used 증가만을 책임진다.
+LLM 토큰 사용량에 따른 credits_used 증가(단건/일괄)를 책임진다.
 """
 
 from __future__ import annotations
@@ -15,6 +15,23 @@ class ProfileRepositoryError(Exception):
     """profiles 테이블 조작 중 발생한 예외."""
 
 
+class PartialCreditUpdateError(ProfileRepositoryError):
+    """일괄 증가 중 일부 사용자만 실패한 경우. 실패한 사용자 ID 를 담는다."""
+
+    def __init__(self, failed_user_ids: set[str]) -> None:
+        super().__init__(f"Failed to update credits for users {sorted(failed_user_ids)}")
+        self.failed_user_ids = failed_user_ids
+
+
+# PostgREST 가 "함수 없음" 을 알리는 코드 (스키마 캐시에 없는 RPC / 404)
+_MISSING_RPC_CODES = {"PGRST202", "404"}
+
+
+def _is_missing_rpc(exc: Exception) -> bool:
+    """RPC 호출 실패가 함수 미구현 때문인지 판별한다."""
+    return str(getattr(exc, "code", "")) in _MISSING_RPC_CODES
+
+
 def increment_credits_used(user_id: str | None, amount: int) -> None:
     """
     주어진 사용자 ID의 credits_used 값을 amount 만큼 증가시킨다.
@@ -63,3 +80,45 @@ def increment_credits_used(user_id: str | None, amount: int) -> None:
         ) from exc
 
 
+def increment_credits_used_bulk(deltas: dict[str, int]) -> None:
+    """
+    여러 사용자의 credits_used 를 한 번의 RPC 로 증가시킨다.
+
+    `increment_profile_credits_bulk(p_deltas jsonb)` RPC 는
+    [{"user_id": ..., "amount": ...}, ...] 배열을 받아 원자적으로 반영해야 한다.
+    RPC 가 없을 때(PGRST202 / 404)만 사용자별 `increment_credits_used` 로 폴백한다.
+    그 외 실패(타임아웃, 연결 끊김, 5xx)는 RPC 가 이미 반영되었을 수 있으므로
+    폴백하지 않고 그대로 올린다 - 이중 청구를 막기 위함이다.
+
+    Args:
+        deltas: 사용자 ID -> 증가시킬 크레딧 (토큰 수). 0 이하는 무시된다.
+
+    Raises:
+        ProfileRepositoryError: 일괄 RPC 가 함수 미구현 외의 이유로 실패한 경우.
+        PartialCreditUpdateError: 폴백 경로에서 일부 사용자 갱신에 실패한 경우.
+            나머지 사용자의 증가분은 이미 반영되었으므로 `failed_user_ids` 만 재시도해야 한다.
+    """
+    payload = [
+        {"user_id": user_id, "amount": amount}
+        for user_id, amount in deltas.items()
+        if user_id and amount > 0
+    ]
+    if not payload:
+        return
+
+    try:
+        supabase.rpc("increment_profile_credits_bulk", {"p_deltas": payload}).execute()
+        return
+    except Exception as exc:
+        # 일괄 RPC 미구현 시에만 사용자별 증가로 폴백한다.
+        if not _is_missing_rpc(exc):
+            raise ProfileRepositoryError("Bulk credit increment RPC failed") from exc
+
+    failed: set[str] = set()
+    for item in payload:
+        try:
+            increment_credits_used(item["user_id"], item["amount"])
+        except Exception:
+            failed.add(item["user_id"])
+    if failed:
+        raise PartialCreditUpdateError(failed)
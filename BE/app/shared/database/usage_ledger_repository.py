@@ -0,0 +1,40 @@
+"""
+LLM 사용량 원장(ledger) 테이블 연산 모듈.
+
+`llm_usage_ledger` 는 감사용 append-only 테이블이며, 호출 단위로
+user_id / provider / model / 토큰 수 / usage_metadata(jsonb) / created_at 을 저장한다.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app.shared.database.supabase_client import supabase
+
+LEDGER_TABLE = "llm_usage_ledger"
+
+
+class UsageLedgerError(Exception):
+    """llm_usage_ledger 테이블 조작 중 발생한 예외."""
+
+
+def insert_usage_ledger_rows(rows: list[dict[str, Any]]) -> None:
+    """
+    원장 행들을 한 번의 insert 로 추가한다.
+
+    Args:
+        rows: 원장 행 목록. 비어 있으면 아무것도 하지 않는다.
+
+    Raises:
+        UsageLedgerError: insert 실패 시
+    """
+    if not rows:
+        return
+
+    try:
+        supabase.table(LEDGER_TABLE).insert(rows).execute()
+    except Exception as exc:
+        raise UsageLedgerError(f"Failed to insert {len(rows)} usage ledger rows") from exc
+
+
+__all__ = ["LEDGER_TABLE", "UsageLedgerError", "insert_usage_ledger_rows"]
@@ -0,0 +1,68 @@
+"""
+Progress Events
+
+Process-wide pub/sub for streaming progress to clients: long-running work
+publishes structured events on a topic, and each subscriber (e.g. an SSE
+response) reads them from its own bounded buffer. Slow subscribers lose their
+oldest events rather than slowing the publisher.
+
+Usage:
+    from app.shared.events import get_event_broker, publish_event
+
+    publish_event("storybook:123", "stage_finished", {"stage": "bible", "duration": 4.2})
+
+    with get_event_broker().subscribe("storybook:123", after=last_event_id) as subscription:
+        while (event := await subscription.get(timeout=15)) is not None:
+            send(event.id, event.type, event.data)
+        if subscription.dropped:
+            ...  # Fell behind; re-read the current state
+
+Events are in-process only: a subscriber sees events published by workers
+in the same process (`JOB_WORKERS` > 0 on the API node).
+"""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import settings
+
+from .broker import Event, EventBroker, Subscription
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_event_broker() -> EventBroker:
+    return EventBroker(
+        buffer_size=settings.event_subscriber_buffer,
+        history_size=settings.event_topic_history,
+    )
+
+
+def publish_event(topic: str, event_type: str, data: dict[str, Any] | None = None) -> Event | None:
+    """Publish on the process broker; progress reporting never fails the caller."""
+    try:
+        return get_event_broker().publish(topic, event_type, data)
+    except Exception:
+        logger.exception("Failed to publish %s event on %s", event_type, topic)
+        return None
+
+
+def get_event_stats() -> dict[str, int]:
+    """Broker counters (empty if nothing was published or subscribed yet)."""
+    if not get_event_broker.cache_info().currsize:
+        return {}
+    return get_event_broker().stats()
+
+
+__all__ = [
+    "Event",
+    "EventBroker",
+    "Subscription",
+    "get_event_broker",
+    "publish_event",
+    "get_event_stats",
+]
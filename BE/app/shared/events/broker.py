@@ -0,0 +1,185 @@
+"""
+In-Process Event Broker
+
+Topic-based pub/sub for progress events. Publishers (pipeline stages, worker
+threads) never block: each subscriber has a bounded buffer, and when a slow
+subscriber falls behind its oldest events are dropped and counted, so the
+subscriber can tell it lagged and re-read state instead of the publisher
+waiting on it.
+
+Each topic also keeps a short history of the current run (cleared with
+`reset()`), so a subscriber that connects mid-run, or reconnects with the
+last event id it saw, replays what it missed.
+
+`publish()` is thread-safe; subscriptions belong to the event loop they were
+created on and are woken with `call_soon_threadsafe`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Event:
+    """One published event; `id` increases monotonically across all topics."""
+    id: int
+    topic: str
+    type: str
+    data: dict[str, Any] = field(default_factory=dict)
+    at: float = 0.0
+
+
+class Subscription:
+    """A subscriber's bounded buffer on one topic."""
+
+    def __init__(self, broker: "EventBroker", topic: str, buffer_size: int) -> None:
+        self.broker = broker
+        self.topic = topic
+        self.dropped = 0
+        self.closed = False
+        self._buffer: deque[Event] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def _push(self, event: Event) -> None:
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1  # deque(maxlen) evicts the oldest event
+            self._buffer.append(event)
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._ready.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # The subscriber's loop is gone; nothing left to wake
+
+    async def get(self, timeout: float | None = None) -> Event | None:
+        """
+        Next buffered event, waiting up to `timeout` seconds.
+
+        Returns None on timeout or once the subscription is closed and drained.
+        """
+        while True:
+            with self._lock:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self.closed:
+                    return None
+                self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def close(self) -> None:
+        """Unsubscribe; events already buffered can still be read."""
+        if not self.closed:
+            self.closed = True
+            self.broker._unsubscribe(self)
+            self._wake()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class EventBroker:
+    """Fan-out of published events to per-topic subscribers."""
+
+    def __init__(self, buffer_size: int = 256, history_size: int = 128, max_topics: int = 1024) -> None:
+        self.buffer_size = max(1, buffer_size)
+        self.history_size = max(0, history_size)
+        self.max_topics = max(1, max_topics)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers: dict[str, set[Subscription]] = {}
+        # Least recently published topics are forgotten first
+        self._history: OrderedDict[str, deque[Event]] = OrderedDict()
+        self._published = 0
+        self._dropped_closed = 0
+
+    def publish(self, topic: str, event_type: str, data: dict[str, Any] | None = None) -> Event:
+        """Deliver an event to the topic's subscribers and history; never blocks."""
+        with self._lock:
+            event = Event(next(self._ids), topic, event_type, dict(data or {}), time.time())
+            self._published += 1
+            if self.history_size:
+                history = self._history.get(topic)
+                if history is None:
+                    history = self._history[topic] = deque(maxlen=self.history_size)
+                    while len(self._history) > self.max_topics:
+                        self._history.popitem(last=False)
+                else:
+                    self._history.move_to_end(topic)
+                history.append(event)
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription._push(event)
+        return event
+
+    def subscribe(self, topic: str, *, replay: bool = True, after: int | None = None) -> Subscription:
+        """
+        Subscribe on the running event loop.
+
+        Args:
+            topic: Topic to follow
+            replay: Pre-fill the buffer with the topic's history of the current run
+            after: Only replay events with a greater id (e.g. SSE Last-Event-ID)
+        """
+        subscription = Subscription(self, topic, self.buffer_size)
+        with self._lock:
+            if replay:
+                for event in self._history.get(topic, ()):
+                    if after is None or event.id > after:
+                        subscription._buffer.append(event)
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+            self._dropped_closed += subscription.dropped
+
+    def reset(self, topic: str) -> None:
+        """Forget the topic's history (call when a new run starts on it)."""
+        with self._lock:
+            self._history.pop(topic, None)
+
+    def history(self, topic: str) -> list[Event]:
+        with self._lock:
+            return list(self._history.get(topic, ()))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            subscribers = [s for subs in self._subscribers.values() for s in subs]
+            return {
+                "published": self._published,
+                "subscribers": len(subscribers),
+                "topics": len(self._history),
+                "dropped": self._dropped_closed + sum(s.dropped for s in subscribers),
+            }
+
+
+__all__ = ["Event", "Subscription", "EventBroker"]
@@ -8,15 +8,20 @@ import uuid
 import base64
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Callable, Optional
 
+from app.core.config import settings
 from app.shared.database.supabase_client import supabase
+from app.shared.metrics import track_image_call
+from app.shared.providers.rate_limit import get_rate_limiter
+from app.shared.providers.resilience import ProviderUnavailableError, call_with_retry
 
 
 class Provider(str, Enum):
     """Supported image generation providers."""
     OPENAI = "openai"
     GOOGLE = "google"
+    LOCAL = "local"
 
 
 @dataclass
@@ -97,9 +102,9 @@ def _download_from_supabase_url(url: str) -> bytes:
         ValueError: If download fails
     """
     try:
-        import requests
+        from app.shared.providers.clients import get_http_client
         
-        response = requests.get(url)
+        response = get_http_client().get(url)
         response.raise_for_status()
         
         return response.content
@@ -108,6 +113,24 @@ def _download_from_supabase_url(url: str) -> bytes:
         raise ValueError(f"Failed to download image from URL: {str(e)}")
 
 
+def _call_provider(provider: str, model_id: str, operation: str, call: Callable[[], bytes]) -> bytes:
+    """Run one image call rate-limited, retried, and behind the provider's image breaker."""
+    def attempt() -> bytes:
+        with get_rate_limiter(provider, model_id).limit():
+            return call()
+
+    with track_image_call(provider, model_id, operation) as info:
+        image_data = call_with_retry(f"{provider}.image", attempt)
+        info["bytes"] = len(image_data)
+    return image_data
+
+
+def _provider_override(provider: Provider) -> Provider:
+    """Apply `IMAGE_PROVIDER_OVERRIDE` (e.g. "local" to generate images offline)."""
+    override = settings.image_provider_override
+    return Provider(override) if override else provider
+
+
 def generate_image(provider: Provider, model: str, prompt: str, custom_path: str = None, aspect_ratio: str = None) -> ImageResult:
     """
     Generate an image from text prompt.
@@ -125,18 +148,24 @@ def generate_image(provider: Provider, model: str, prompt: str, custom_path: str
     Raises:
         ValueError: If generation fails or model alias is invalid
     """
+    provider = _provider_override(provider)
     try:
         # Resolve model alias to actual model ID
         if provider == Provider.OPENAI:
             from .image_config import get_openai_model_id
             from .openai import openai_generate_image
             model_id = get_openai_model_id(model)
-            image_data = openai_generate_image(model_id, prompt, aspect_ratio)
+            image_data = _call_provider("openai", model_id, "generate", lambda: openai_generate_image(model_id, prompt, aspect_ratio))
         elif provider == Provider.GOOGLE:
             from .image_config import get_google_model_id
             from .google import google_generate_image
             model_id = get_google_model_id(model)
-            image_data = google_generate_image(model_id, prompt, aspect_ratio)
+            image_data = _call_provider("google", model_id, "generate", lambda: google_generate_image(model_id, prompt, aspect_ratio))
+        elif provider == Provider.LOCAL:
+            from .image_config import get_local_model_id
+            from .local import local_generate_image
+            model_id = get_local_model_id(model)
+            image_data = _call_provider("local", model_id, "generate", lambda: local_generate_image(model_id, prompt, aspect_ratio))
         else:
             raise ValueError(f"Unsupported provider: {provider}")
         
@@ -150,6 +179,8 @@ def generate_image(provider: Provider, model: str, prompt: str, custom_path: str
             mime_type="image/png"
         )
     
+    except ProviderUnavailableError:
+        raise
     except ImportError as e:
         raise ValueError(f"Provider {provider} SDK not installed: {e}")
     except Exception as e:
@@ -179,18 +210,24 @@ def generate_image_from_reference(
     Raises:
         ValueError: If generation fails or model alias is invalid
     """
+    provider = _provider_override(provider)
     try:
         # Resolve model alias to actual model ID
         if provider == Provider.OPENAI:
             from .image_config import get_openai_model_id
             from .openai import openai_generate_image_from_reference
             model_id = get_openai_model_id(model)
-            image_data = openai_generate_image_from_reference(model_id, prompt, reference_url)
+            image_data = _call_provider("openai", model_id, "reference", lambda: openai_generate_image_from_reference(model_id, prompt, reference_url))
         elif provider == Provider.GOOGLE:
             from .image_config import get_google_model_id
             from .google import google_generate_image_from_reference
             model_id = get_google_model_id(model)
-            image_data = google_generate_image_from_reference(model_id, prompt, reference_url)
+            image_data = _call_provider("google", model_id, "reference", lambda: google_generate_image_from_reference(model_id, prompt, reference_url))
+        elif provider == Provider.LOCAL:
+            from .image_config import get_local_model_id
+            from .local import local_generate_image_from_reference
+            model_id = get_local_model_id(model)
+            image_data = _call_provider("local", model_id, "reference", lambda: local_generate_image_from_reference(model_id, prompt, reference_url))
         else:
             raise ValueError(f"Unsupported provider: {provider}")
         
@@ -204,6 +241,8 @@ def generate_image_from_reference(
             mime_type="image/png"
         )
     
+    except ProviderUnavailableError:
+        raise
     except ImportError as e:
         raise ValueError(f"Provider {provider} SDK not installed: {e}")
     except Exception as e:
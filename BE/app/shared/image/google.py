@@ -3,15 +3,15 @@
 # ============================================================================
 
 import base64
-import requests
 from io import BytesIO
-from pathlib import Path
-from dotenv import load_dotenv
-import os
 
 from PIL import Image
 
+from app.shared.providers.cassette import recorded
+from app.shared.providers.clients import get_google_client, get_http_client
 
+
+@recorded("google", "image.generate")
 def google_generate_image(model: str, prompt: str, aspect_ratio: str = None) -> bytes:
     """
     Generate image using Google Gemini API.
@@ -27,16 +27,9 @@ def google_generate_image(model: str, prompt: str, aspect_ratio: str = None) ->
     Raises:
         ValueError: If generation fails
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from google import genai
     from google.genai import types
     
-    client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    client = get_google_client()
     
     try:
         # Build config with aspect ratio (default to 3:2)
@@ -73,6 +66,7 @@ def google_generate_image(model: str, prompt: str, aspect_ratio: str = None) ->
         raise ValueError(f"Google image generation failed: {str(e)}")
 
 
+@recorded("google", "image.reference", ignore=("reference_url",))
 def google_generate_image_from_reference(model: str, prompt: str, reference_url: str) -> bytes:
     """
     Generate image using Google Gemini API with reference image.
@@ -88,20 +82,13 @@ def google_generate_image_from_reference(model: str, prompt: str, reference_url:
     Raises:
         ValueError: If generation fails
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from google import genai
     from google.genai import types
     
-    client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    client = get_google_client()
     
     try:
         # Download reference image
-        response = requests.get(reference_url)
+        response = get_http_client().get(reference_url)
         response.raise_for_status()
         reference_image_data = response.content
         
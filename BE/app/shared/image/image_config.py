@@ -19,6 +19,11 @@ OPENAI_IMAGE_MODELS = {
     "dall-e-2": "dall-e-2"
 }
 
+# Local stand-in image models: alias -> model ID (any alias is accepted)
+LOCAL_IMAGE_MODELS = {
+    "local-image": "local-image",
+}
+
 
 def get_google_model_id(alias: str) -> str:
     """
@@ -56,6 +61,19 @@ def get_openai_model_id(alias: str) -> str:
     return OPENAI_IMAGE_MODELS[alias]
 
 
+def get_local_model_id(alias: str) -> str:
+    """
+    Get the local stand-in image model ID for an alias.
+
+    Args:
+        alias: Any image model alias; unknown aliases map to themselves
+
+    Returns:
+        Model ID used to seed the local provider
+    """
+    return LOCAL_IMAGE_MODELS.get(alias, alias)
+
+
 def get_google_models() -> list[str]:
     """Get all available Google image model aliases."""
     return list(GOOGLE_IMAGE_MODELS.keys())
@@ -0,0 +1,103 @@
+# ============================================================================
+# Local Stand-in Image Generation Implementation
+# ============================================================================
+#
+# Procedurally generated PNGs for offline development, load tests and
+# benchmarks. The picture (a gradient sky, hills and a few shapes) is seeded
+# from the model and prompt, so the same request always yields the same image.
+# Latency is configured with LOCAL_IMAGE_LATENCY_MS / LOCAL_IMAGE_LATENCY_STDDEV_MS.
+
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.shared.providers.local import image_latency_profile, seeded_rng, simulate_latency
+
+
+def local_generate_image(model: str, prompt: str, aspect_ratio: str = None) -> bytes:
+    """
+    Generate a deterministic PNG for a prompt.
+
+    Args:
+        model: Model alias being stood in for (part of the seed)
+        prompt: Text description of the desired image
+        aspect_ratio: Aspect ratio (e.g., "3:2", "16:9", "1:1"); defaults to "3:2"
+
+    Returns:
+        PNG image bytes
+    """
+    rng = seeded_rng("image", model, prompt, aspect_ratio or "3:2")
+    width, height = _image_size(aspect_ratio or "3:2", settings.local_image_size)
+    image_data = _render_png(rng, width, height)
+    simulate_latency(image_latency_profile().sample(rng))
+    return image_data
+
+
+def local_generate_image_from_reference(model: str, prompt: str, reference_url: str) -> bytes:
+    """
+    Generate a deterministic PNG for a prompt and reference image.
+
+    The reference is not downloaded; its URL only seeds the output.
+
+    Args:
+        model: Model alias being stood in for (part of the seed)
+        prompt: Text description of the desired changes/addition
+        reference_url: URL of the reference image
+
+    Returns:
+        PNG image bytes
+    """
+    return local_generate_image(model, f"{prompt}\n{reference_url}", "3:2")
+
+
+def _image_size(aspect_ratio: str, long_edge: int) -> tuple[int, int]:
+    """Map "W:H" to a pixel size whose longer edge is `long_edge`."""
+    try:
+        ratio_w, ratio_h = (float(part) for part in aspect_ratio.split(":", 1))
+        if ratio_w <= 0 or ratio_h <= 0:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid aspect ratio: {aspect_ratio}")
+    if ratio_w >= ratio_h:
+        return long_edge, max(1, round(long_edge * ratio_h / ratio_w))
+    return max(1, round(long_edge * ratio_w / ratio_h)), long_edge
+
+
+def _render_png(rng, width: int, height: int) -> bytes:
+    top = tuple(rng.randint(60, 200) for _ in range(3))
+    bottom = tuple(rng.randint(150, 255) for _ in range(3))
+
+    image = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(image)
+    for y in range(height):
+        t = y / max(1, height - 1)
+        draw.line([(0, y), (width, y)], fill=tuple(round(a + (b - a) * t) for a, b in zip(top, bottom)))
+
+    # Rolling hills
+    for layer in range(rng.randint(1, 3)):
+        base = height * (0.55 + 0.12 * layer)
+        color = tuple(rng.randint(40, 160) for _ in range(3))
+        points = [(0, height)]
+        for step in range(9):
+            x = width * step / 8
+            points.append((x, base + rng.uniform(-0.08, 0.08) * height))
+        points.append((width, height))
+        draw.polygon(points, fill=color)
+
+    # Sun / moon and a few shapes standing in for characters
+    radius = rng.uniform(0.05, 0.1) * min(width, height) * 2
+    cx, cy = rng.uniform(0.1, 0.9) * width, rng.uniform(0.1, 0.35) * height
+    draw.ellipse([cx - radius, cy - radius, cx + radius, cy + radius], fill=(255, 236, 170))
+    for _ in range(rng.randint(1, 4)):
+        size = rng.uniform(0.06, 0.16) * min(width, height)
+        x, y = rng.uniform(0.1, 0.9) * width, rng.uniform(0.55, 0.85) * height
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse([x - size, y - size, x + size, y + size], fill=color)
+        else:
+            draw.rectangle([x - size, y - size, x + size, y + size], fill=color)
+
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -3,15 +3,15 @@
 # ============================================================================
 
 import base64
-import requests
 from io import BytesIO
-from pathlib import Path
-from dotenv import load_dotenv
-import os
 
 from PIL import Image
 
+from app.shared.providers.cassette import recorded
+from app.shared.providers.clients import get_http_client, get_openai_client
 
+
+@recorded("openai", "image.generate")
 def openai_generate_image(model: str, prompt: str, aspect_ratio: str = None) -> bytes:
     """
     Generate image using OpenAI API.
@@ -27,15 +27,7 @@ def openai_generate_image(model: str, prompt: str, aspect_ratio: str = None) ->
     Raises:
         ValueError: If generation fails
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from openai import OpenAI
-    
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_openai_client()
     
     try:
         # Determine size based on aspect ratio (default to 3:2 landscape)
@@ -79,6 +71,7 @@ def openai_generate_image(model: str, prompt: str, aspect_ratio: str = None) ->
         raise ValueError(f"OpenAI image generation failed: {str(e)}")
 
 
+@recorded("openai", "image.reference", ignore=("reference_url",))
 def openai_generate_image_from_reference(model: str, prompt: str, reference_url: str) -> bytes:
     """
     Generate image using OpenAI API with reference image.
@@ -94,19 +87,11 @@ def openai_generate_image_from_reference(model: str, prompt: str, reference_url:
     Raises:
         ValueError: If generation fails
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from openai import OpenAI
-    
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_openai_client()
     
     try:
         # Download reference image
-        response = requests.get(reference_url)
+        response = get_http_client().get(reference_url)
         response.raise_for_status()
         reference_image_data = response.content
         
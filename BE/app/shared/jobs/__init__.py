@@ -0,0 +1,126 @@
+"""
+Background Jobs
+
+Persistent job queue (SQLite, survives restarts) and a bounded pool of
+asyncio workers that run long pipelines, such as Studio storybook
+generation, outside the HTTP request.
+
+Usage:
+    from app.shared.jobs import enqueue_job, get_job_queue, register_job_handler
+
+    async def run_generation(job: JobRecord) -> None:
+        ...  # Raise to retry; raise PermanentJobError to fail at once
+
+    register_job_handler("studio.generate_storybook", run_generation)
+
+    job = enqueue_job("studio.generate_storybook", {"storybook_id": sid})
+    print(get_job_queue().get(job.id).status)  # queued | running | succeeded | failed
+
+Workers are started and stopped by the app lifespan (`start_job_workers` /
+`stop_job_workers`); `JOB_WORKERS=0` turns a process into an enqueue-only
+API node.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import settings
+
+from .queue import JobRecord, JobStatus, SQLiteJobQueue
+from .worker import JobFailureHook, JobHandler, JobWorkerPool, PermanentJobError
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> SQLiteJobQueue:
+    return SQLiteJobQueue(settings.job_queue_path, lease_seconds=settings.job_lease_seconds)
+
+
+# Handlers registered at import time; applied when the pool is first created,
+# so importing a feature module does not open the queue file.
+_handlers: dict[str, tuple[JobHandler, JobFailureHook | None]] = {}
+
+
+@lru_cache(maxsize=1)
+def get_job_worker_pool() -> JobWorkerPool:
+    pool = JobWorkerPool(
+        get_job_queue(),
+        concurrency=settings.job_workers,
+        poll_interval=settings.job_poll_interval_ms / 1000.0,
+        retry_backoff=settings.job_retry_backoff_ms / 1000.0,
+    )
+    for kind, (handler, on_failure) in _handlers.items():
+        pool.register(kind, handler, on_failure)
+    return pool
+
+
+def register_job_handler(kind: str, handler: JobHandler, on_failure: JobFailureHook | None = None) -> None:
+    """Register the coroutine that runs jobs of `kind` (call before workers start)."""
+    _handlers[kind] = (handler, on_failure)
+    if get_job_worker_pool.cache_info().currsize:
+        get_job_worker_pool().register(kind, handler, on_failure)
+
+
+def enqueue_job(
+    kind: str,
+    payload: dict[str, Any],
+    *,
+    job_id: str | None = None,
+    max_attempts: int | None = None,
+) -> JobRecord:
+    """Persist a job and wake an idle worker."""
+    job = get_job_queue().enqueue(
+        kind,
+        payload,
+        job_id=job_id,
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    get_job_worker_pool().notify()
+    return job
+
+
+def retry_job(job_id: str) -> JobRecord | None:
+    """Re-queue a finished job (see `SQLiteJobQueue.retry`) and wake an idle worker."""
+    job = get_job_queue().retry(job_id)
+    if job is not None:
+        get_job_worker_pool().notify()
+    return job
+
+
+def start_job_workers() -> None:
+    """Start this process's workers on the running event loop (no-op if JOB_WORKERS=0)."""
+    if settings.job_workers > 0:
+        get_job_worker_pool().start()
+
+
+async def stop_job_workers() -> None:
+    """Stop workers; interrupted jobs return to the queue for the next worker."""
+    if get_job_worker_pool.cache_info().currsize:
+        await get_job_worker_pool().stop()
+
+
+def get_job_stats() -> dict[str, int]:
+    """Worker counters and job counts per status (empty if the queue was never opened)."""
+    if not get_job_worker_pool.cache_info().currsize:
+        return {}
+    return get_job_worker_pool().stats()
+
+
+__all__ = [
+    "JobStatus",
+    "JobRecord",
+    "SQLiteJobQueue",
+    "JobHandler",
+    "JobFailureHook",
+    "JobWorkerPool",
+    "PermanentJobError",
+    "get_job_queue",
+    "get_job_worker_pool",
+    "register_job_handler",
+    "enqueue_job",
+    "retry_job",
+    "start_job_workers",
+    "stop_job_workers",
+    "get_job_stats",
+]
@@ -0,0 +1,325 @@
+"""
+Persistent Job Queue
+
+SQLite-backed queue and job table for long-running background work
+(e.g. Studio storybook generation). The file lives on local disk
+(`JOB_QUEUE_PATH`), so queued jobs survive a worker restart, and several
+worker processes on the same host can share it: claiming a job is a single
+`BEGIN IMMEDIATE` transaction.
+
+Every job row keeps its attempt count and the error of each failed attempt.
+A running job holds a lease that its worker renews; if the worker dies, the
+lease expires and the job is claimed again by the next worker. Lease
+operations name the attempt they belong to, so a worker whose lease expired
+cannot overwrite the outcome of the attempt that replaced it.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+class JobStatus:
+    """Job lifecycle: queued -> running -> succeeded | failed (retries go back to queued)."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    ALL = (QUEUED, RUNNING, SUCCEEDED, FAILED)
+
+
+@dataclass
+class JobRecord:
+    """One row of the job table."""
+    id: str
+    kind: str
+    payload: dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def last_error(self) -> str | None:
+        return self.errors[-1]["error"] if self.errors else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_COLUMNS = (
+    "id, kind, payload, status, attempts, max_attempts, errors, "
+    "created_at, updated_at, started_at, finished_at"
+)
+
+
+class SQLiteJobQueue:
+    """Job table plus FIFO claim/lease operations on a single SQLite file."""
+
+    def __init__(self, path: str, lease_seconds: float = 300.0) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "max_attempts INTEGER NOT NULL, errors TEXT NOT NULL DEFAULT '[]', "
+            "available_at REAL NOT NULL, lease_until REAL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at, created_at)"
+        )
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        *,
+        job_id: str | None = None,
+        max_attempts: int = 3,
+    ) -> JobRecord:
+        """Add a job; it becomes claimable immediately."""
+        now = time.time()
+        job_id = job_id or str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, attempts, max_attempts, errors, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, 0, ?, '[]', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False), JobStatus.QUEUED,
+                 max(1, max_attempts), now, now, now),
+            )
+        return self.get(job_id)
+
+    def claim(self, kinds: list[str] | None = None) -> JobRecord | None:
+        """
+        Take the oldest claimable job and mark it running under a fresh lease.
+
+        Claimable: queued jobs whose retry delay has passed, and running jobs
+        whose lease expired (their worker died mid-attempt).
+        """
+        if kinds is not None and not kinds:
+            return None
+        now = time.time()
+        kind_filter = ""
+        params: list[Any] = [JobStatus.QUEUED, now, JobStatus.RUNNING, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT id, status, attempts, max_attempts, errors FROM jobs "
+                        "WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_until <= ?))"
+                        + kind_filter + " ORDER BY created_at LIMIT 1",
+                        params,
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    job_id, status, attempts, max_attempts, errors_json = row
+                    if status == JobStatus.RUNNING:
+                        # The previous worker died mid-attempt; that attempt counts as failed
+                        errors = json.loads(errors_json)
+                        errors.append({"attempt": attempts, "error": "Worker lease expired", "at": now})
+                        if attempts >= max_attempts:
+                            self._conn.execute(
+                                "UPDATE jobs SET status = ?, errors = ?, lease_until = NULL, "
+                                "finished_at = ?, updated_at = ? WHERE id = ?",
+                                (JobStatus.FAILED, json.dumps(errors), now, now, job_id),
+                            )
+                            continue
+                        self._conn.execute("UPDATE jobs SET errors = ? WHERE id = ?", (json.dumps(errors), job_id))
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, "
+                        "started_at = ?, updated_at = ? WHERE id = ?",
+                        (JobStatus.RUNNING, now + self.lease_seconds, now, now, job_id),
+                    )
+                    self._conn.execute("COMMIT")
+                    break
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(job_id)
+
+    def renew(self, job_id: str, attempt: int) -> None:
+        """Extend the lease of attempt `attempt` of a running job."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (now + self.lease_seconds, now, job_id, JobStatus.RUNNING, attempt),
+            )
+
+    def complete(self, job_id: str, attempt: int) -> bool:
+        """
+        Mark attempt `attempt` of a running job as succeeded.
+
+        Returns False (and changes nothing) if that attempt no longer owns the
+        job, e.g. its lease expired and another worker claimed it.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL, finished_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (JobStatus.SUCCEEDED, now, now, job_id, JobStatus.RUNNING, attempt),
+            )
+            return bool(cursor.rowcount)
+
+    def fail(
+        self,
+        job_id: str,
+        attempt: int,
+        error: str,
+        *,
+        retry: bool = True,
+        retry_delay: float = 0.0,
+    ) -> bool | None:
+        """
+        Record the failure of attempt `attempt` of a running job.
+
+        Returns:
+            True if the job was re-queued for another attempt, False if it is
+            now permanently failed (attempts exhausted or `retry=False`), None
+            if that attempt no longer owns the job (see `complete`)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts, errors FROM jobs WHERE id = ? AND status = ? AND attempts = ?",
+                (job_id, JobStatus.RUNNING, attempt),
+            ).fetchone()
+            if row is None:
+                return None
+            attempts, max_attempts, errors_json = row
+            errors = json.loads(errors_json)
+            errors.append({"attempt": attempts, "error": error, "at": now})
+            requeue = retry and attempts < max_attempts
+            if requeue:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, errors = ?, available_at = ?, lease_until = NULL, "
+                    "updated_at = ? WHERE id = ?",
+                    (JobStatus.QUEUED, json.dumps(errors), now + retry_delay, now, job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, errors = ?, lease_until = NULL, finished_at = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (JobStatus.FAILED, json.dumps(errors), now, now, job_id),
+                )
+        return requeue
+
+    def release(self, job_id: str, attempt: int) -> None:
+        """Put an interrupted job (e.g. worker shutdown) back without counting the attempt."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), available_at = ?, "
+                "lease_until = NULL, updated_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (JobStatus.QUEUED, now, now, job_id, JobStatus.RUNNING, attempt),
+            )
+
+    def retry(self, job_id: str) -> JobRecord | None:
+        """
+        Re-queue a finished job for a fresh set of attempts (its error history
+        is kept). Returns None if the job does not exist or is still queued/running.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, available_at = ?, lease_until = NULL, "
+                "finished_at = NULL, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (JobStatus.QUEUED, now, now, job_id, JobStatus.SUCCEEDED, JobStatus.FAILED),
+            )
+            if not cursor.rowcount:
+                return None
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _record(row) if row else None
+
+    def ids(self, *, kind: str | None = None, status: str | None = None) -> list[str]:
+        """IDs of the jobs of `kind` in `status` (all when omitted), oldest first."""
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id FROM jobs{where} ORDER BY created_at", params).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def purge_finished(self, older_than: float) -> int:
+        """Delete succeeded/failed jobs finished more than `older_than` seconds ago."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at <= ?",
+                (JobStatus.SUCCEEDED, JobStatus.FAILED, time.time() - older_than),
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _record(row: tuple) -> JobRecord:
+    (job_id, kind, payload, status, attempts, max_attempts, errors,
+     created_at, updated_at, started_at, finished_at) = row
+    return JobRecord(
+        id=job_id,
+        kind=kind,
+        payload=json.loads(payload),
+        status=status,
+        attempts=attempts,
+        max_attempts=max_attempts,
+        errors=json.loads(errors),
+        created_at=created_at,
+        updated_at=updated_at,
+        started_at=started_at,
+        finished_at=finished_at,
+    )
+
+
+__all__ = ["JobStatus", "JobRecord", "SQLiteJobQueue"]
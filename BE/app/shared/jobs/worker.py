@@ -0,0 +1,167 @@
+"""
+Background Job Workers
+
+A bounded pool of asyncio workers that run jobs from the persistent queue
+inside the API process. Each worker claims one job at a time, so at most
+`JOB_WORKERS` jobs run concurrently per process; HTTP handlers only enqueue.
+
+Handlers are registered per job kind. A handler that raises has its attempt
+recorded and the job is retried after `JOB_RETRY_BACKOFF_MS * attempt`, up to
+the job's `max_attempts`; raising `PermanentJobError` fails it at once. The
+optional `on_failure` hook runs once a job has failed for good.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from .queue import JobRecord, JobStatus, SQLiteJobQueue
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[JobRecord], Awaitable[None]]
+JobFailureHook = Callable[[JobRecord, BaseException], Awaitable[None]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot help (e.g. bad input)."""
+
+
+@dataclass(frozen=True)
+class _Registration:
+    handler: JobHandler
+    on_failure: JobFailureHook | None = None
+
+
+class JobWorkerPool:
+    """Runs registered job kinds from a `SQLiteJobQueue` with bounded concurrency."""
+
+    def __init__(
+        self,
+        queue: SQLiteJobQueue,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        retry_backoff: float = 5.0,
+    ) -> None:
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self._handlers: dict[str, _Registration] = {}
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._running: dict[str, JobRecord] = {}
+        self._stats = {"succeeded": 0, "retried": 0, "failed": 0, "interrupted": 0}
+
+    def register(self, kind: str, handler: JobHandler, on_failure: JobFailureHook | None = None) -> None:
+        self._handlers[kind] = _Registration(handler, on_failure)
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """Start the workers on the running event loop (idempotent)."""
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(index), name=f"job-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        logger.info("Started %d job workers (%s)", self.concurrency, ", ".join(self._handlers) or "no handlers")
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running go back to the queue."""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake idle workers after an enqueue instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stats(self) -> dict[str, int]:
+        counts = self.queue.counts()
+        return {
+            **self._stats,
+            "workers": len(self._workers),
+            "running": len(self._running),
+            **{f"jobs_{status}": counts.get(status, 0) for status in JobStatus.ALL},
+        }
+
+    async def _worker_loop(self, index: int) -> None:
+        kinds = list(self._handlers)
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, kinds)
+            if job is None:
+                await self._idle()
+                continue
+            await self._run(job)
+
+    async def _idle(self) -> None:
+        assert self._wakeup is not None
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            return
+        self._wakeup.clear()
+
+    async def _run(self, job: JobRecord) -> None:
+        registration = self._handlers[job.kind]
+        self._running[job.id] = job
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, job.attempts))
+        try:
+            await registration.handler(job)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, job.id, job.attempts)
+            self._stats["interrupted"] += 1
+            raise
+        except Exception as exc:
+            retry = not isinstance(exc, PermanentJobError)
+            delay = self.retry_backoff * job.attempts
+            requeued = await asyncio.to_thread(
+                self.queue.fail, job.id, job.attempts, f"{type(exc).__name__}: {exc}",
+                retry=retry, retry_delay=delay,
+            )
+            if requeued is None:
+                logger.warning("Job %s (%s) attempt %d failed after losing its lease: %s",
+                               job.id, job.kind, job.attempts, exc)
+            elif requeued:
+                self._stats["retried"] += 1
+                logger.warning("Job %s (%s) attempt %d failed, retrying in %.0fs: %s",
+                               job.id, job.kind, job.attempts, delay, exc)
+            else:
+                self._stats["failed"] += 1
+                logger.error("Job %s (%s) failed after %d attempts: %s", job.id, job.kind, job.attempts, exc)
+                if registration.on_failure is not None:
+                    try:
+                        await registration.on_failure(job, exc)
+                    except Exception:
+                        logger.exception("on_failure hook for job %s raised", job.id)
+        else:
+            if await asyncio.to_thread(self.queue.complete, job.id, job.attempts):
+                self._stats["succeeded"] += 1
+            else:
+                logger.warning("Job %s (%s) attempt %d finished after losing its lease",
+                               job.id, job.kind, job.attempts)
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job.id, None)
+
+    async def _heartbeat(self, job_id: str, attempt: int) -> None:
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.queue.renew, job_id, attempt)
+            except Exception:
+                logger.exception("Failed to renew lease for job %s", job_id)
+
+
+__all__ = ["JobHandler", "JobFailureHook", "PermanentJobError", "JobWorkerPool"]
@@ -29,6 +29,45 @@ Usage:
     print(result.text)  # Pretty-printed JSON
     print(result.parsed)  # Pydantic instance
     
+    # Async-native variants for FastAPI handlers (do not block the event loop)
+    from app.shared.llm import agenerate_structured
+    
+    result = await agenerate_structured(
+        provider=Provider.OPENAI,
+        model="gpt-5-mini",
+        input_text="Give me a chocolate chip cookie recipe",
+        schema=Recipe
+    )
+    
+    # Services with a policy in LLM_ROUTING_POLICIES hedge / fail over automatically;
+    # the result reports which leg won
+    print(result.provider, result.model, result.route_leg)
+    
+    # Streaming text (deltas, then a final chunk with usage)
+    from app.shared.llm import generate_text_stream
+    
+    for chunk in generate_text_stream(Provider.OPENAI, "gpt-5-mini", "Tell me a story"):
+        print(chunk.delta, end="")
+    
+    # Streaming structured output: array elements arrive as each one closes
+    # (cached and routed like agenerate_structured until the first element)
+    from app.shared.llm import agenerate_structured_stream
+    
+    async for chunk in agenerate_structured_stream(
+        Provider.OPENAI, "gpt-5-mini", prompt, FinalScriptSchema,
+        item_path=("spreads",), item_schema=SpreadScript,
+    ):
+        if not chunk.done:
+            save_spread(chunk.index, chunk.item)
+    
+    # Bulk jobs: provider batch APIs (OpenAI Batch / Claude Message Batches)
+    from app.shared.llm import generate_structured_batch
+    
+    results = generate_structured_batch([
+        {"provider": Provider.OPENAI, "model": "gpt-5-mini", "input_text": p, "schema": Recipe}
+        for p in prompts
+    ])
+    
     # Get available model aliases
     from app.shared.llm import get_openai_models, OPENAI_MODELS
     
@@ -36,7 +75,25 @@ Usage:
     print(OPENAI_MODELS["gpt-4o"])  # 'gpt-4o-2024-08-06'
 """
 
-from .base import Provider, LLMResult, generate_text, generate_structured
+from .base import (
+    Provider,
+    LLMResult,
+    generate_text,
+    generate_structured,
+    agenerate_text,
+    agenerate_structured,
+    LLMStreamChunk,
+    generate_text_stream,
+    agenerate_text_stream,
+    LLMStructuredChunk,
+    agenerate_structured_stream,
+    estimate_tokens,
+)
+from .tokens import count_tokens, get_token_estimator, register_token_estimator
+from .cache import get_llm_cache, get_llm_cache_stats
+from .schema import CompiledSchema, compile_schema
+from .routing import RouteLeg, RoutePolicy, get_route_policy
+from .batch import BatchQueue, BatchHandle, get_batch_queue, generate_structured_batch
 from .llm_config import (
     get_openai_models,
     get_google_models,
@@ -54,6 +111,28 @@ __all__ = [
     "LLMResult",
     "generate_text",
     "generate_structured",
+    "agenerate_text",
+    "agenerate_structured",
+    "LLMStreamChunk",
+    "generate_text_stream",
+    "agenerate_text_stream",
+    "LLMStructuredChunk",
+    "agenerate_structured_stream",
+    "estimate_tokens",
+    "count_tokens",
+    "get_token_estimator",
+    "register_token_estimator",
+    "get_llm_cache",
+    "get_llm_cache_stats",
+    "CompiledSchema",
+    "compile_schema",
+    "RouteLeg",
+    "RoutePolicy",
+    "get_route_policy",
+    "BatchQueue",
+    "BatchHandle",
+    "get_batch_queue",
+    "generate_structured_batch",
     "get_openai_models",
     "get_google_models",
     "get_claude_models",
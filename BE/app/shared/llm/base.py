@@ -2,24 +2,46 @@
 Base LLM Service - Provider-agnostic interface
 
 Unified API for text generation and structured outputs across OpenAI, Google, and Claude.
+Synchronous (`generate_*`), async-native (`agenerate_*`) and streaming
+(`*_text_stream`, `agenerate_structured_stream`) entry points share model
+resolution, token estimation and usage tracking.
 """
 
+import asyncio
 import json
-import math
-from dataclasses import dataclass
+import logging
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 
 from pydantic import BaseModel
 
+from app.core.config import settings
+from app.shared.metrics import record_llm_cache_lookup, record_llm_tokens, track_llm_call
+from app.shared.providers.rate_limit import get_rate_limiter
+from app.shared.providers.resilience import (
+    ProviderUnavailableError,
+    acall_with_retry,
+    call_with_retry,
+    get_circuit_breaker,
+)
+
+from .cache import cache_ttl_for, get_llm_cache
+from .partial_json import IncrementalJSONParser
+from .tokens import count_tokens
+from .routing import RouteLeg, RouteOutcome, RoutePolicy, arun_hedged, get_route_policy, run_with_failover
 from .usage_tracker import record_llm_usage
 
+logger = logging.getLogger(__name__)
+
 
 class Provider(str, Enum):
     """Supported LLM providers."""
     OPENAI = "openai"
     GOOGLE = "google"
     CLAUDE = "claude"
+    LOCAL = "local"
 
 
 @dataclass
@@ -29,16 +51,505 @@ class LLMResult:
     parsed: Any | None
     input_tokens: int
     output_tokens: int
+    cached: bool = False
+    provider: str | None = None  # Provider that produced the result
+    model: str | None = None  # Model alias that produced the result
+    route_leg: int = 0  # Winning routing leg (0 = primary, >0 = hedge/failover)
+
+
+@dataclass
+class LLMStreamChunk:
+    """
+    Incremental piece of a streamed text generation.
+
+    Intermediate chunks carry a text `delta`. The final chunk has `done=True`,
+    an empty delta, the full `text`, and the token usage that was billed.
+    """
+    delta: str
+    done: bool = False
+    text: str | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+
+
+@dataclass
+class LLMStructuredChunk:
+    """
+    Incremental piece of a streamed structured generation.
+
+    Intermediate chunks carry one completed element (`item`, validated against
+    `item_schema` when given) of the streamed array and its `index`. The final
+    chunk has `done=True`, the full validated `parsed` object, and token usage.
+    """
+    item: Any | None = None
+    index: int | None = None
+    done: bool = False
+    parsed: Any | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cached: bool = False  # Final chunk: the response was replayed from the cache
 
 
 def estimate_tokens(text: str) -> int:
     """
-    Rough token estimation: ~4 characters per token.
+    Local token estimate used for rate-limit admission and as the billing
+    fallback when a provider reports no usage (see tokens.py).
     Returns at least 1 token for non-empty strings.
     """
-    if not text:
-        return 0
-    return max(1, math.ceil(len(text) / 4))
+    return count_tokens(text)
+
+
+def _admission_tokens(input_text: str) -> int:
+    """Tokens reserved against the TPM budget before a call (settled afterwards)."""
+    return estimate_tokens(input_text) + settings.rate_limit_output_token_reserve
+
+
+def _resolve_model_id(provider: Provider, model: str) -> str:
+    """Resolve a model alias to the provider's model ID."""
+    if provider == Provider.OPENAI:
+        from .llm_config import get_openai_model_id
+        return get_openai_model_id(model)
+    if provider == Provider.GOOGLE:
+        from .llm_config import get_google_model_id
+        return get_google_model_id(model)
+    if provider == Provider.CLAUDE:
+        from .llm_config import get_claude_model_id
+        return get_claude_model_id(model)
+    if provider == Provider.LOCAL:
+        from .llm_config import get_local_model_id
+        return get_local_model_id(model)
+    raise ValueError(f"Unsupported provider: {provider}")
+
+
+def _build_text_result(
+    input_text: str,
+    text: str,
+    input_tok: int | None,
+    output_tok: int | None,
+) -> LLMResult:
+    # Fallback to estimation if tokens not provided
+    if input_tok is None:
+        input_tok = estimate_tokens(input_text)
+    if output_tok is None:
+        output_tok = estimate_tokens(text)
+
+    return LLMResult(
+        text=text,
+        parsed=None,
+        input_tokens=input_tok,
+        output_tokens=output_tok,
+    )
+
+
+def _build_structured_result(
+    input_text: str,
+    parsed_dict: dict[str, Any],
+    schema: type[BaseModel],
+    input_tok: int | None,
+    output_tok: int | None,
+) -> LLMResult:
+    # Convert to pretty JSON string
+    text = json.dumps(parsed_dict, indent=2, ensure_ascii=False)
+
+    # Validate and parse with Pydantic
+    parsed = schema(**parsed_dict)
+
+    # Fallback to estimation if tokens not provided
+    if input_tok is None:
+        input_tok = estimate_tokens(input_text)
+    if output_tok is None:
+        output_tok = estimate_tokens(text)
+
+    return LLMResult(
+        text=text,
+        parsed=parsed,
+        input_tokens=input_tok,
+        output_tokens=output_tok,
+    )
+
+
+def _cache_key(
+    provider: Provider,
+    model_id: str,
+    input_text: str,
+    schema: type[BaseModel] | None,
+    usage_metadata: dict[str, Any] | None,
+    cache: bool,
+) -> tuple[str | None, float | None]:
+    """Return (key, ttl) for a cacheable call, or (None, None)."""
+    ttl = cache_ttl_for(usage_metadata, cache)
+    if ttl is None:
+        return None, None
+    return get_llm_cache().make_key(provider.value, model_id, input_text, schema), ttl
+
+
+def _cache_lookup(key: str | None, usage_metadata: dict[str, Any] | None) -> dict[str, Any] | None:
+    if key is None:
+        return None
+    try:
+        cached = get_llm_cache().get(key)
+    except Exception:
+        cached = None
+    record_llm_cache_lookup(usage_metadata, cached is not None)
+    return cached
+
+
+def _cache_store(key: str | None, ttl: float | None, value: dict[str, Any]) -> None:
+    if key is None:
+        return
+    try:
+        get_llm_cache().set(key, value, ttl)
+    except Exception:
+        pass
+
+
+def _cached_text_result(input_text: str, cached: dict[str, Any]) -> LLMResult:
+    result = _build_text_result(
+        input_text, cached["text"], cached.get("input_tokens"), cached.get("output_tokens")
+    )
+    result.cached = True
+    return result
+
+
+def _cached_structured_result(
+    input_text: str,
+    cached: dict[str, Any],
+    schema: type[BaseModel],
+) -> LLMResult:
+    result = _build_structured_result(
+        input_text, cached["parsed"], schema, cached.get("input_tokens"), cached.get("output_tokens")
+    )
+    result.cached = True
+    return result
+
+
+def _record_usage(
+    result: LLMResult,
+    provider: Provider,
+    model: str,
+    user_id: str | None,
+    usage_metadata: dict[str, Any] | None,
+) -> None:
+    record_llm_tokens(provider.value, model, usage_metadata, result.input_tokens, result.output_tokens)
+    record_llm_usage(
+        user_id=user_id,
+        provider=provider.value,
+        model=model,
+        input_tokens=result.input_tokens,
+        output_tokens=result.output_tokens,
+        metadata=usage_metadata,
+    )
+
+
+def _record_partial_usage(
+    input_text: str,
+    text: str,
+    input_tok: int | None,
+    output_tok: int | None,
+    provider: Provider,
+    model: str,
+    user_id: str | None,
+    usage_metadata: dict[str, Any] | None,
+) -> None:
+    """Record usage of a stream that ended early (client disconnect or mid-stream error)."""
+    try:
+        result = _build_text_result(input_text, text, input_tok, output_tok)
+        _record_usage(result, provider, model, user_id, {**(usage_metadata or {}), "partial": True})
+    except Exception:
+        logger.exception("Failed to record usage of an interrupted %s stream", provider.value)
+
+
+def _text_call(provider: Provider, model_id: str, input_text: str) -> LLMResult:
+    """One rate-limited provider call."""
+    with get_rate_limiter(provider.value, model_id).limit(_admission_tokens(input_text)) as permit:
+        if provider == Provider.OPENAI:
+            from .openai import openai_generate_text
+            text, input_tok, output_tok = openai_generate_text(model_id, input_text)
+        elif provider == Provider.GOOGLE:
+            from .google import google_generate_text
+            text, input_tok, output_tok = google_generate_text(model_id, input_text)
+        elif provider == Provider.LOCAL:
+            from .local import local_generate_text
+            text, input_tok, output_tok = local_generate_text(model_id, input_text)
+        else:
+            from .claude import claude_generate_text
+            text, input_tok, output_tok = claude_generate_text(model_id, input_text)
+
+        result = _build_text_result(input_text, text, input_tok, output_tok)
+        permit.settle(result.input_tokens + result.output_tokens)
+        return result
+
+
+def _structured_call(
+    provider: Provider,
+    model_id: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], LLMResult]:
+    """One rate-limited provider call; returns the raw dict and the validated result."""
+    with get_rate_limiter(provider.value, model_id).limit(_admission_tokens(input_text)) as permit:
+        if provider == Provider.OPENAI:
+            from .openai import openai_generate_structured
+            parsed_dict, input_tok, output_tok = openai_generate_structured(
+                model_id, input_text, schema
+            )
+        elif provider == Provider.GOOGLE:
+            from .google import google_generate_structured
+            parsed_dict, input_tok, output_tok = google_generate_structured(
+                model_id, input_text, schema
+            )
+        elif provider == Provider.LOCAL:
+            from .local import local_generate_structured
+            parsed_dict, input_tok, output_tok = local_generate_structured(
+                model_id, input_text, schema
+            )
+        else:
+            from .claude import claude_generate_structured
+            parsed_dict, input_tok, output_tok = claude_generate_structured(
+                model_id, input_text, schema
+            )
+
+        result = _build_structured_result(input_text, parsed_dict, schema, input_tok, output_tok)
+        permit.settle(result.input_tokens + result.output_tokens)
+        return parsed_dict, result
+
+
+async def _atext_call(provider: Provider, model_id: str, input_text: str) -> LLMResult:
+    """Async `_text_call`."""
+    async with get_rate_limiter(provider.value, model_id).alimit(_admission_tokens(input_text)) as permit:
+        if provider == Provider.OPENAI:
+            from .openai import openai_agenerate_text
+            text, input_tok, output_tok = await openai_agenerate_text(model_id, input_text)
+        elif provider == Provider.GOOGLE:
+            from .google import google_agenerate_text
+            text, input_tok, output_tok = await google_agenerate_text(model_id, input_text)
+        elif provider == Provider.LOCAL:
+            from .local import local_agenerate_text
+            text, input_tok, output_tok = await local_agenerate_text(model_id, input_text)
+        else:
+            from .claude import claude_agenerate_text
+            text, input_tok, output_tok = await claude_agenerate_text(model_id, input_text)
+
+        result = _build_text_result(input_text, text, input_tok, output_tok)
+        permit.settle(result.input_tokens + result.output_tokens)
+        return result
+
+
+async def _astructured_call(
+    provider: Provider,
+    model_id: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], LLMResult]:
+    """Async `_structured_call`."""
+    async with get_rate_limiter(provider.value, model_id).alimit(_admission_tokens(input_text)) as permit:
+        if provider == Provider.OPENAI:
+            from .openai import openai_agenerate_structured
+            parsed_dict, input_tok, output_tok = await openai_agenerate_structured(
+                model_id, input_text, schema
+            )
+        elif provider == Provider.GOOGLE:
+            from .google import google_agenerate_structured
+            parsed_dict, input_tok, output_tok = await google_agenerate_structured(
+                model_id, input_text, schema
+            )
+        elif provider == Provider.LOCAL:
+            from .local import local_agenerate_structured
+            parsed_dict, input_tok, output_tok = await local_agenerate_structured(
+                model_id, input_text, schema
+            )
+        else:
+            from .claude import claude_agenerate_structured
+            parsed_dict, input_tok, output_tok = await claude_agenerate_structured(
+                model_id, input_text, schema
+            )
+
+        result = _build_structured_result(input_text, parsed_dict, schema, input_tok, output_tok)
+        permit.settle(result.input_tokens + result.output_tokens)
+        return parsed_dict, result
+
+
+def _generate_text_once(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+) -> LLMResult:
+    """Generate text with a single provider/model (no routing)."""
+    try:
+        # Resolve model alias to actual model ID
+        model_id = _resolve_model_id(provider, model)
+        cache_key, cache_ttl = _cache_key(provider, model_id, input_text, None, usage_metadata, cache)
+        cached = _cache_lookup(cache_key, usage_metadata)
+        if cached is not None:
+            return _cached_text_result(input_text, cached)
+
+        with track_llm_call(provider.value, model, usage_metadata):
+            result = call_with_retry(provider.value, lambda: _text_call(provider, model_id, input_text))
+        _cache_store(cache_key, cache_ttl, {
+            "text": result.text,
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+        })
+        _record_usage(result, provider, model, user_id, usage_metadata)
+        return result
+
+    except ProviderUnavailableError:
+        raise
+    except ImportError as e:
+        raise ValueError(f"Provider {provider} SDK not installed: {e}")
+    except Exception as e:
+        raise ValueError(f"Text generation failed for {provider}: {e}")
+
+
+def _generate_structured_once(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+) -> LLMResult:
+    """Generate structured output with a single provider/model (no routing)."""
+    try:
+        # Resolve model alias to actual model ID
+        model_id = _resolve_model_id(provider, model)
+        cache_key, cache_ttl = _cache_key(provider, model_id, input_text, schema, usage_metadata, cache)
+        cached = _cache_lookup(cache_key, usage_metadata)
+        if cached is not None:
+            return _cached_structured_result(input_text, cached, schema)
+
+        with track_llm_call(provider.value, model, usage_metadata):
+            parsed_dict, result = call_with_retry(
+                provider.value, lambda: _structured_call(provider, model_id, input_text, schema)
+            )
+        _cache_store(cache_key, cache_ttl, {
+            "parsed": parsed_dict,
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+        })
+        _record_usage(result, provider, model, user_id, usage_metadata)
+        return result
+
+    except ProviderUnavailableError:
+        raise
+    except ImportError as e:
+        raise ValueError(f"Provider {provider} SDK not installed: {e}")
+    except Exception as e:
+        raise ValueError(f"Structured generation failed for {provider}: {e}")
+
+
+async def _agenerate_text_once(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+) -> LLMResult:
+    """Async `_generate_text_once`."""
+    try:
+        model_id = _resolve_model_id(provider, model)
+        cache_key, cache_ttl = _cache_key(provider, model_id, input_text, None, usage_metadata, cache)
+        cached = _cache_lookup(cache_key, usage_metadata)
+        if cached is not None:
+            return _cached_text_result(input_text, cached)
+
+        with track_llm_call(provider.value, model, usage_metadata):
+            result = await acall_with_retry(provider.value, lambda: _atext_call(provider, model_id, input_text))
+        _cache_store(cache_key, cache_ttl, {
+            "text": result.text,
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+        })
+        await asyncio.to_thread(_record_usage, result, provider, model, user_id, usage_metadata)
+        return result
+
+    except ProviderUnavailableError:
+        raise
+    except ImportError as e:
+        raise ValueError(f"Provider {provider} SDK not installed: {e}")
+    except Exception as e:
+        raise ValueError(f"Text generation failed for {provider}: {e}")
+
+
+async def _agenerate_structured_once(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+) -> LLMResult:
+    """Async `_generate_structured_once`."""
+    try:
+        model_id = _resolve_model_id(provider, model)
+        cache_key, cache_ttl = _cache_key(provider, model_id, input_text, schema, usage_metadata, cache)
+        cached = _cache_lookup(cache_key, usage_metadata)
+        if cached is not None:
+            return _cached_structured_result(input_text, cached, schema)
+
+        with track_llm_call(provider.value, model, usage_metadata):
+            parsed_dict, result = await acall_with_retry(
+                provider.value, lambda: _astructured_call(provider, model_id, input_text, schema)
+            )
+        _cache_store(cache_key, cache_ttl, {
+            "parsed": parsed_dict,
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+        })
+        await asyncio.to_thread(_record_usage, result, provider, model, user_id, usage_metadata)
+        return result
+
+    except ProviderUnavailableError:
+        raise
+    except ImportError as e:
+        raise ValueError(f"Provider {provider} SDK not installed: {e}")
+    except Exception as e:
+        raise ValueError(f"Structured generation failed for {provider}: {e}")
+
+
+def _provider_override(provider: Provider) -> Provider:
+    """Apply `LLM_PROVIDER_OVERRIDE` (e.g. "local" to run every call offline)."""
+    override = settings.llm_provider_override
+    return Provider(override) if override else provider
+
+
+def _route_policy(usage_metadata: dict[str, Any] | None, route: bool) -> RoutePolicy | None:
+    if not route or settings.llm_provider_override:
+        return None
+    return get_route_policy((usage_metadata or {}).get("service"))
+
+
+def _routed_result(outcome: RouteOutcome[LLMResult], usage_metadata: dict[str, Any] | None) -> LLMResult:
+    result = outcome.result
+    result.provider = outcome.leg.provider
+    result.model = outcome.leg.model
+    result.route_leg = outcome.leg_index
+    if outcome.leg_index > 0:
+        logger.info(
+            "LLM route for %s won by leg %d (%s/%s) after starting %d legs",
+            (usage_metadata or {}).get("service"),
+            outcome.leg_index,
+            outcome.leg.provider,
+            outcome.leg.model,
+            outcome.attempted,
+        )
+    return result
+
+
+def _primary_result(result: LLMResult, provider: Provider, model: str) -> LLMResult:
+    result.provider = provider.value
+    result.model = model
+    return result
 
 
 def generate_text(
@@ -48,67 +559,47 @@ def generate_text(
     *,
     user_id: str | None = None,
     usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+    route: bool = True,
 ) -> LLMResult:
     """
     Generate text from the specified provider.
-    
+
     Args:
         provider: LLM provider to use
         model: Model alias (e.g., "gpt-4o", "gemini-flash", "claude-sonnet")
         input_text: Input prompt text
-        
+        cache: Set False to bypass the response cache for this call
+        route: Set False to ignore the service's routing policy
+
     Returns:
-        LLMResult with generated text and token usage
-        
+        LLMResult with generated text and token usage. Cache hits are flagged
+        with `cached=True` and are not billed. `provider`, `model` and
+        `route_leg` identify the leg that produced the result.
+
+    If `usage_metadata["service"]` has a routing policy, failed calls fail over
+    to the policy's fallback legs (see routing.py).
+
     Raises:
         ValueError: If generation fails or model alias is invalid
     """
-    try:
-        # Resolve model alias to actual model ID
-        if provider == Provider.OPENAI:
-            from .llm_config import get_openai_model_id
-            from .openai import openai_generate_text
-            model_id = get_openai_model_id(model)
-            text, input_tok, output_tok = openai_generate_text(model_id, input_text)
-        elif provider == Provider.GOOGLE:
-            from .llm_config import get_google_model_id
-            from .google import google_generate_text
-            model_id = get_google_model_id(model)
-            text, input_tok, output_tok = google_generate_text(model_id, input_text)
-        elif provider == Provider.CLAUDE:
-            from .llm_config import get_claude_model_id
-            from .claude import claude_generate_text
-            model_id = get_claude_model_id(model)
-            text, input_tok, output_tok = claude_generate_text(model_id, input_text)
-        else:
-            raise ValueError(f"Unsupported provider: {provider}")
-        
-        # Fallback to estimation if tokens not provided
-        if input_tok is None:
-            input_tok = estimate_tokens(input_text)
-        if output_tok is None:
-            output_tok = estimate_tokens(text)
-        
-        result = LLMResult(
-            text=text,
-            parsed=None,
-            input_tokens=input_tok,
-            output_tokens=output_tok,
-        )
-        record_llm_usage(
-            user_id=user_id,
-            provider=str(provider),
-            model=model,
-            input_tokens=input_tok,
-            output_tokens=output_tok,
-            metadata=usage_metadata,
+    provider = _provider_override(provider)
+    policy = _route_policy(usage_metadata, route)
+    if policy is None:
+        result = _generate_text_once(
+            provider, model, input_text,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
         )
-        return result
-    
-    except ImportError as e:
-        raise ValueError(f"Provider {provider} SDK not installed: {e}")
-    except Exception as e:
-        raise ValueError(f"Text generation failed for {provider}: {e}")
+        return _primary_result(result, provider, model)
+
+    outcome = run_with_failover(
+        policy.legs(RouteLeg(provider.value, model)),
+        lambda leg: _generate_text_once(
+            Provider(leg.provider), leg.model, input_text,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        ),
+    )
+    return _routed_result(outcome, usage_metadata)
 
 
 def generate_structured(
@@ -119,78 +610,573 @@ def generate_structured(
     *,
     user_id: str | None = None,
     usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+    route: bool = True,
 ) -> LLMResult:
     """
     Generate structured output validated against a Pydantic schema.
-    
+
     Args:
         provider: LLM provider to use
         model: Model alias (e.g., "gpt-4o", "gemini-flash", "claude-sonnet")
         input_text: Input prompt text
         schema: Pydantic model class for validation
-        
+        cache: Set False to bypass the response cache for this call
+        route: Set False to ignore the service's routing policy
+
     Returns:
-        LLMResult with parsed object and JSON text
-        
+        LLMResult with parsed object and JSON text. Cache hits are flagged
+        with `cached=True` and are not billed. `provider`, `model` and
+        `route_leg` identify the leg that produced the result.
+
+    If `usage_metadata["service"]` has a routing policy, failed calls fail over
+    to the policy's fallback legs (see routing.py).
+
     Raises:
         ValueError: If generation, validation fails, or model alias is invalid
     """
+    provider = _provider_override(provider)
+    policy = _route_policy(usage_metadata, route)
+    if policy is None:
+        result = _generate_structured_once(
+            provider, model, input_text, schema,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        )
+        return _primary_result(result, provider, model)
+
+    outcome = run_with_failover(
+        policy.legs(RouteLeg(provider.value, model)),
+        lambda leg: _generate_structured_once(
+            Provider(leg.provider), leg.model, input_text, schema,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        ),
+    )
+    return _routed_result(outcome, usage_metadata)
+
+
+async def agenerate_text(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+    route: bool = True,
+) -> LLMResult:
+    """
+    Async-native counterpart of `generate_text`.
+
+    Awaits the provider's async SDK client, so the event loop stays free for
+    other requests during the round trip. Usage is recorded off-loop.
+
+    If `usage_metadata["service"]` has a routing policy, a hedge request is
+    fired at the next leg after the policy's `hedge_after` delay (or at once
+    on failure). The first valid result wins and the other legs are cancelled.
+
+    Raises:
+        ValueError: If generation fails on every leg or model alias is invalid
+    """
+    provider = _provider_override(provider)
+    policy = _route_policy(usage_metadata, route)
+    if policy is None:
+        result = await _agenerate_text_once(
+            provider, model, input_text,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        )
+        return _primary_result(result, provider, model)
+
+    outcome = await arun_hedged(
+        policy.legs(RouteLeg(provider.value, model)),
+        lambda leg: _agenerate_text_once(
+            Provider(leg.provider), leg.model, input_text,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        ),
+        hedge_after=policy.hedge_after,
+    )
+    return _routed_result(outcome, usage_metadata)
+
+
+async def agenerate_structured(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+    route: bool = True,
+) -> LLMResult:
+    """
+    Async-native counterpart of `generate_structured`, with the same hedging
+    behavior as `agenerate_text`.
+
+    Raises:
+        ValueError: If generation or validation fails on every leg, or model alias is invalid
+    """
+    provider = _provider_override(provider)
+    policy = _route_policy(usage_metadata, route)
+    if policy is None:
+        result = await _agenerate_structured_once(
+            provider, model, input_text, schema,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        )
+        return _primary_result(result, provider, model)
+
+    outcome = await arun_hedged(
+        policy.legs(RouteLeg(provider.value, model)),
+        lambda leg: _agenerate_structured_once(
+            Provider(leg.provider), leg.model, input_text, schema,
+            user_id=user_id, usage_metadata=usage_metadata, cache=cache,
+        ),
+        hedge_after=policy.hedge_after,
+    )
+    return _routed_result(outcome, usage_metadata)
+
+
+def _open_text_stream(provider: Provider, model_id: str, input_text: str) -> Iterator[tuple[str, int | None, int | None]]:
+    if provider == Provider.OPENAI:
+        from .openai import openai_stream_text
+        return openai_stream_text(model_id, input_text)
+    if provider == Provider.GOOGLE:
+        from .google import google_stream_text
+        return google_stream_text(model_id, input_text)
+    if provider == Provider.LOCAL:
+        from .local import local_stream_text
+        return local_stream_text(model_id, input_text)
+    from .claude import claude_stream_text
+    return claude_stream_text(model_id, input_text)
+
+
+def _open_async_text_stream(provider: Provider, model_id: str, input_text: str) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    if provider == Provider.OPENAI:
+        from .openai import openai_astream_text
+        return openai_astream_text(model_id, input_text)
+    if provider == Provider.GOOGLE:
+        from .google import google_astream_text
+        return google_astream_text(model_id, input_text)
+    if provider == Provider.LOCAL:
+        from .local import local_astream_text
+        return local_astream_text(model_id, input_text)
+    from .claude import claude_astream_text
+    return claude_astream_text(model_id, input_text)
+
+
+def generate_text_stream(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+) -> Iterator[LLMStreamChunk]:
+    """
+    Stream text from the specified provider as it is generated.
+
+    Args:
+        provider: LLM provider to use
+        model: Model alias (e.g., "gpt-5-mini", "gemini-2.5-flash", "claude-sonnet-4-5")
+        input_text: Input prompt text
+
+    Yields:
+        LLMStreamChunk deltas, then one final chunk (`done=True`) with the
+        full text and token usage. Usage is recorded once the stream completes,
+        or for the output so far if the stream is abandoned or fails midway.
+
+    Raises:
+        ValueError: If generation fails or model alias is invalid
+    """
+    parts: list[str] = []
+    input_tok: int | None = None
+    output_tok: int | None = None
+    recorded = False
+    provider = _provider_override(provider)
     try:
-        # Resolve model alias to actual model ID
-        if provider == Provider.OPENAI:
-            from .llm_config import get_openai_model_id
-            from .openai import openai_generate_structured
-            model_id = get_openai_model_id(model)
-            parsed_dict, input_tok, output_tok = openai_generate_structured(
-                model_id, input_text, schema
-            )
-        elif provider == Provider.GOOGLE:
-            from .llm_config import get_google_model_id
-            from .google import google_generate_structured
-            model_id = get_google_model_id(model)
-            parsed_dict, input_tok, output_tok = google_generate_structured(
-                model_id, input_text, schema
+        try:
+            model_id = _resolve_model_id(provider, model)
+            # Streams are not retried once deltas may have been sent; the breaker still applies
+            breaker = get_circuit_breaker(provider.value)
+            breaker.before_call()
+            try:
+                with track_llm_call(provider.value, model, usage_metadata):
+                    with get_rate_limiter(provider.value, model_id).limit(_admission_tokens(input_text)) as permit:
+                        for delta, chunk_input, chunk_output in _open_text_stream(provider, model_id, input_text):
+                            input_tok = chunk_input if chunk_input is not None else input_tok
+                            output_tok = chunk_output if chunk_output is not None else output_tok
+                            if delta:
+                                parts.append(delta)
+                                yield LLMStreamChunk(delta=delta)
+                        result = _build_text_result(input_text, "".join(parts), input_tok, output_tok)
+                        permit.settle(result.input_tokens + result.output_tokens)
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+            except BaseException:
+                breaker.record_neutral()
+                raise
+            breaker.record_success()
+        except ProviderUnavailableError:
+            raise
+        except ImportError as e:
+            raise ValueError(f"Provider {provider} SDK not installed: {e}")
+        except Exception as e:
+            raise ValueError(f"Streaming text generation failed for {provider}: {e}")
+
+        _record_usage(result, provider, model, user_id, usage_metadata)
+        recorded = True
+        yield LLMStreamChunk(
+            delta="",
+            done=True,
+            text=result.text,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+        )
+    finally:
+        # Abandoned (e.g. client disconnect) or failed midway: bill what was generated
+        if not recorded and (parts or input_tok is not None or output_tok is not None):
+            _record_partial_usage(
+                input_text, "".join(parts), input_tok, output_tok, provider, model, user_id, usage_metadata
             )
-        elif provider == Provider.CLAUDE:
-            from .llm_config import get_claude_model_id
-            from .claude import claude_generate_structured
-            model_id = get_claude_model_id(model)
-            parsed_dict, input_tok, output_tok = claude_generate_structured(
-                model_id, input_text, schema
+
+
+async def agenerate_text_stream(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    *,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+) -> AsyncIterator[LLMStreamChunk]:
+    """
+    Async-native counterpart of `generate_text_stream`.
+
+    Raises:
+        ValueError: If generation fails or model alias is invalid
+    """
+    parts: list[str] = []
+    input_tok: int | None = None
+    output_tok: int | None = None
+    recorded = False
+    provider = _provider_override(provider)
+    try:
+        try:
+            model_id = _resolve_model_id(provider, model)
+            # Streams are not retried once deltas may have been sent; the breaker still applies
+            breaker = get_circuit_breaker(provider.value)
+            breaker.before_call()
+            try:
+                with track_llm_call(provider.value, model, usage_metadata):
+                    async with get_rate_limiter(provider.value, model_id).alimit(_admission_tokens(input_text)) as permit:
+                        async for delta, chunk_input, chunk_output in _open_async_text_stream(provider, model_id, input_text):
+                            input_tok = chunk_input if chunk_input is not None else input_tok
+                            output_tok = chunk_output if chunk_output is not None else output_tok
+                            if delta:
+                                parts.append(delta)
+                                yield LLMStreamChunk(delta=delta)
+                        result = _build_text_result(input_text, "".join(parts), input_tok, output_tok)
+                        permit.settle(result.input_tokens + result.output_tokens)
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+            except BaseException:
+                breaker.record_neutral()
+                raise
+            breaker.record_success()
+        except ProviderUnavailableError:
+            raise
+        except ImportError as e:
+            raise ValueError(f"Provider {provider} SDK not installed: {e}")
+        except Exception as e:
+            raise ValueError(f"Streaming text generation failed for {provider}: {e}")
+
+        await asyncio.to_thread(_record_usage, result, provider, model, user_id, usage_metadata)
+        recorded = True
+        yield LLMStreamChunk(
+            delta="",
+            done=True,
+            text=result.text,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+        )
+    finally:
+        # Abandoned (e.g. client disconnect) or failed midway: bill what was generated
+        if not recorded and (parts or input_tok is not None or output_tok is not None):
+            _record_partial_usage(
+                input_text, "".join(parts), input_tok, output_tok, provider, model, user_id, usage_metadata
             )
+
+
+def _open_async_structured_stream(
+    provider: Provider,
+    model_id: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    if provider == Provider.OPENAI:
+        from .openai import openai_astream_structured
+        return openai_astream_structured(model_id, input_text, schema)
+    if provider == Provider.GOOGLE:
+        from .google import google_astream_structured
+        return google_astream_structured(model_id, input_text, schema)
+    if provider == Provider.LOCAL:
+        from .local import local_astream_structured
+        return local_astream_structured(model_id, input_text, schema)
+    from .claude import claude_astream_structured
+    return claude_astream_structured(model_id, input_text, schema)
+
+
+@dataclass
+class _OpenedStructuredStream:
+    """A structured stream read up to its first completed item (or its end)."""
+    provider: Provider
+    model: str
+    model_id: str
+    stream: AsyncIterator[tuple[str, int | None, int | None]]
+    parser: IncrementalJSONParser
+    # Held until the stream is consumed: call tracking and the rate limit permit
+    resources: AsyncExitStack
+    permit: Any = None
+    pending: list[tuple[int, Any]] = field(default_factory=list)
+    parts: list[str] = field(default_factory=list)
+    finished: bool = False
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+
+    def feed(self, delta: str, chunk_input: int | None, chunk_output: int | None) -> None:
+        self.input_tokens = chunk_input if chunk_input is not None else self.input_tokens
+        self.output_tokens = chunk_output if chunk_output is not None else self.output_tokens
+        if delta:
+            self.parts.append(delta)
+        self.pending.extend(self.parser.feed(delta))
+
+    async def aclose(self, error: BaseException | None = None) -> None:
+        try:
+            await self.stream.aclose()
+        except Exception:
+            pass
+        if error is None:
+            await self.resources.aclose()
         else:
-            raise ValueError(f"Unsupported provider: {provider}")
-        
-        # Convert to pretty JSON string
-        text = json.dumps(parsed_dict, indent=2, ensure_ascii=False)
-        
-        # Validate and parse with Pydantic
-        parsed = schema(**parsed_dict)
-        
-        # Fallback to estimation if tokens not provided
-        if input_tok is None:
-            input_tok = estimate_tokens(input_text)
-        if output_tok is None:
-            output_tok = estimate_tokens(text)
-        
-        result = LLMResult(
-            text=text,
-            parsed=parsed,
-            input_tokens=input_tok,
-            output_tokens=output_tok,
+            await self.resources.__aexit__(type(error), error, error.__traceback__)
+
+
+async def _open_structured_stream(
+    provider: Provider,
+    model: str,
+    model_id: str,
+    input_text: str,
+    schema: type[BaseModel],
+    item_path: tuple[str, ...],
+    usage_metadata: dict[str, Any] | None,
+) -> _OpenedStructuredStream:
+    """Open a structured stream and read until its first item is complete, so failures before it can be retried."""
+    resources = AsyncExitStack()
+    opened = _OpenedStructuredStream(
+        provider=provider,
+        model=model,
+        model_id=model_id,
+        stream=_open_async_structured_stream(provider, model_id, input_text, schema),
+        parser=IncrementalJSONParser(item_path=item_path),
+        resources=resources,
+    )
+    try:
+        resources.enter_context(track_llm_call(provider.value, model, usage_metadata))
+        opened.permit = await resources.enter_async_context(
+            get_rate_limiter(provider.value, model_id).alimit(_admission_tokens(input_text))
         )
-        record_llm_usage(
-            user_id=user_id,
-            provider=str(provider),
-            model=model,
-            input_tokens=input_tok,
-            output_tokens=output_tok,
-            metadata=usage_metadata,
+        async for delta, chunk_input, chunk_output in opened.stream:
+            opened.feed(delta, chunk_input, chunk_output)
+            if opened.pending:
+                return opened
+        opened.finished = True
+        return opened
+    except BaseException as e:
+        await opened.aclose(e)
+        raise
+
+
+async def _aopen_structured_stream_routed(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+    item_path: tuple[str, ...],
+    usage_metadata: dict[str, Any] | None,
+    route: bool,
+) -> _OpenedStructuredStream:
+    """Open the stream with retries, hedging and failover up to its first item."""
+    opened_legs: list[_OpenedStructuredStream] = []
+
+    async def open_leg(leg_provider: Provider, leg_model: str) -> _OpenedStructuredStream:
+        model_id = _resolve_model_id(leg_provider, leg_model)
+        opened = await acall_with_retry(
+            leg_provider.value,
+            lambda: _open_structured_stream(
+                leg_provider, leg_model, model_id, input_text, schema, item_path, usage_metadata
+            ),
         )
-        return result
-    
+        opened_legs.append(opened)
+        return opened
+
+    policy = _route_policy(usage_metadata, route)
+    if policy is None:
+        return await open_leg(provider, model)
+    outcome: RouteOutcome[_OpenedStructuredStream] | None = None
+    try:
+        outcome = await arun_hedged(
+            policy.legs(RouteLeg(provider.value, model)),
+            lambda leg: open_leg(Provider(leg.provider), leg.model),
+            hedge_after=policy.hedge_after,
+        )
+    finally:
+        # Close legs that also reached their first item but lost the race
+        for opened in opened_legs:
+            if outcome is None or opened is not outcome.result:
+                await opened.aclose()
+    if outcome.leg_index > 0:
+        logger.info(
+            "LLM stream route for %s won by leg %d (%s/%s) after starting %d legs",
+            (usage_metadata or {}).get("service"),
+            outcome.leg_index,
+            outcome.leg.provider,
+            outcome.leg.model,
+            outcome.attempted,
+        )
+    return outcome.result
+
+
+async def agenerate_structured_stream(
+    provider: Provider,
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+    *,
+    item_path: tuple[str, ...],
+    item_schema: type[BaseModel] | None = None,
+    user_id: str | None = None,
+    usage_metadata: dict[str, Any] | None = None,
+    cache: bool = True,
+    route: bool = True,
+) -> AsyncIterator[LLMStructuredChunk]:
+    """
+    Stream a structured output, yielding elements of one array as they complete.
+
+    The provider's JSON output is parsed incrementally, so e.g. spread 1 of a
+    FinalScriptSchema can be persisted while later spreads are still being
+    generated. A cached response (see `agenerate_structured`) is replayed
+    without opening a stream. Until the first element has been emitted,
+    failures are retried and the service's routing policy hedges and fails
+    over as for `agenerate_structured`; after that the stream is committed
+    to its provider.
+
+    Args:
+        provider: LLM provider to use
+        model: Model alias
+        input_text: Input prompt text
+        schema: Pydantic model class for the whole output
+        item_path: Keys from the root to the streamed array, e.g. ("spreads",)
+        item_schema: Optional Pydantic model class to validate each element with
+
+    Yields:
+        LLMStructuredChunk per completed element, then one final chunk
+        (`done=True`) with the validated object and token usage. Usage is
+        recorded once the stream completes, or for the output so far if the
+        stream is abandoned or fails midway.
+
+    Raises:
+        ValueError: If generation or validation fails, or model alias is invalid
+    """
+    provider = _provider_override(provider)
+    model_id = _resolve_model_id(provider, model)
+    cache_key, _ = _cache_key(provider, model_id, input_text, schema, usage_metadata, cache)
+    cached = _cache_lookup(cache_key, usage_metadata)
+    if cached is not None:
+        result = _cached_structured_result(input_text, cached, schema)
+        items: Any = cached["parsed"]
+        for key in item_path:
+            items = items[key]
+        for index, item in enumerate(items):
+            yield LLMStructuredChunk(
+                item=item_schema.model_validate(item) if item_schema is not None else item,
+                index=index,
+            )
+        yield LLMStructuredChunk(
+            done=True,
+            parsed=result.parsed,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            cached=True,
+        )
+        return
+
+    try:
+        opened = await _aopen_structured_stream_routed(
+            provider, model, input_text, schema, item_path, usage_metadata, route
+        )
+    except ProviderUnavailableError:
+        raise
     except ImportError as e:
         raise ValueError(f"Provider {provider} SDK not installed: {e}")
+    except ValueError:
+        raise
     except Exception as e:
-        raise ValueError(f"Structured generation failed for {provider}: {e}")
+        raise ValueError(f"Streaming structured generation failed for {provider}: {e}")
 
+    # Committed to the winning leg: later failures are not retried
+    breaker = get_circuit_breaker(opened.provider.value)
+    recorded = False
+    try:
+        try:
+            while True:
+                for index, item in opened.pending:
+                    if item_schema is not None:
+                        item = item_schema.model_validate(item)
+                    yield LLMStructuredChunk(item=item, index=index)
+                opened.pending.clear()
+                if opened.finished:
+                    break
+                try:
+                    delta, chunk_input, chunk_output = await anext(opened.stream)
+                except StopAsyncIteration:
+                    opened.finished = True
+                    continue
+                opened.feed(delta, chunk_input, chunk_output)
+            parsed_dict = opened.parser.close()
+            result = _build_structured_result(
+                input_text, parsed_dict, schema, opened.input_tokens, opened.output_tokens
+            )
+            opened.permit.settle(result.input_tokens + result.output_tokens)
+        except Exception as e:
+            breaker.record_failure(e)
+            await opened.aclose(e)
+            if isinstance(e, ProviderUnavailableError):
+                raise
+            raise ValueError(f"Streaming structured generation failed for {opened.provider}: {e}")
+        except BaseException as e:
+            await opened.aclose(e)
+            raise
+        await opened.aclose()
+
+        # Keyed by the leg that produced it, like each leg of a routed non-streaming call
+        cache_key, cache_ttl = _cache_key(opened.provider, opened.model_id, input_text, schema, usage_metadata, cache)
+        _cache_store(cache_key, cache_ttl, {
+            "parsed": parsed_dict,
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+        })
+        await asyncio.to_thread(_record_usage, result, opened.provider, opened.model, user_id, usage_metadata)
+        recorded = True
+        yield LLMStructuredChunk(
+            done=True,
+            parsed=result.parsed,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+        )
+    finally:
+        # Abandoned (e.g. client disconnect) or failed midway: bill what was generated
+        if not recorded:
+            _record_partial_usage(
+                input_text, "".join(opened.parts), opened.input_tokens, opened.output_tokens,
+                opened.provider, opened.model, user_id, usage_metadata,
+            )
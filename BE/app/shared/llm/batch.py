@@ -0,0 +1,582 @@
+"""
+Offline Batch Execution for bulk LLM jobs
+
+Collects many `generate_structured` requests and submits them as provider
+batches. These run at batch pricing and outside the interactive rate limits.
+
+- OpenAI: Batch API (`/v1/responses`, 24h completion window)
+- Claude: Message Batches API
+- Anything else (or `LLM_BATCH_FORCE_LOCAL=true`): a local backend that runs
+  the requests in-process when the batch is polled. It can be used offline.
+
+Requests are appended to a file-backed queue under `LLM_BATCH_DIR`. `flush()`
+submits them, `poll()` collects finished batches, and each result is written
+to disk and fanned back to its `BatchHandle`. If the process restarts, batches
+that were already submitted are picked up again by the next `poll()`, and
+results can be read with `load_result()`.
+
+Usage:
+    from app.shared.llm.batch import get_batch_queue
+
+    queue = get_batch_queue()
+    handles = [
+        queue.enqueue(Provider.OPENAI, "gpt-5-mini", prompt, StoryArcSchema,
+                      usage_metadata={"service": "storybook.arc", "storybook_id": sid})
+        for sid, prompt in prompts
+    ]
+    results = queue.wait(handles)  # flush + poll until every handle resolves
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Protocol
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+from app.shared.providers.resilience import is_retryable_error
+
+from .base import (
+    LLMResult,
+    Provider,
+    _build_structured_result,
+    _provider_override,
+    _record_usage,
+    _resolve_model_id,
+    _structured_call,
+)
+
+# (parsed_dict, input_tokens, output_tokens, error) per custom_id
+BatchItemResult = tuple[dict[str, Any] | None, int | None, int | None, str | None]
+
+
+class BatchBackend(Protocol):
+    """Provider batch API used by `BatchQueue`."""
+
+    name: str
+
+    def submit(self, model_id: str, requests: list[tuple[str, str, type[BaseModel]]]) -> str: ...
+
+    def status(self, batch_id: str) -> str: ...
+
+    def results(self, batch_id: str) -> dict[str, BatchItemResult]: ...
+
+
+class OpenAIBatchBackend:
+    name = "openai"
+
+    def submit(self, model_id: str, requests: list[tuple[str, str, type[BaseModel]]]) -> str:
+        from .openai import openai_submit_batch
+        return openai_submit_batch(model_id, requests)
+
+    def status(self, batch_id: str) -> str:
+        from .openai import openai_batch_status
+        return openai_batch_status(batch_id)
+
+    def results(self, batch_id: str) -> dict[str, BatchItemResult]:
+        from .openai import openai_batch_results
+        return openai_batch_results(batch_id)
+
+
+class ClaudeBatchBackend:
+    name = "claude"
+
+    def submit(self, model_id: str, requests: list[tuple[str, str, type[BaseModel]]]) -> str:
+        from .claude import claude_submit_batch
+        return claude_submit_batch(model_id, requests)
+
+    def status(self, batch_id: str) -> str:
+        from .claude import claude_batch_status
+        return claude_batch_status(batch_id)
+
+    def results(self, batch_id: str) -> dict[str, BatchItemResult]:
+        from .claude import claude_batch_results
+        return claude_batch_results(batch_id)
+
+
+class LocalBatchBackend:
+    """
+    In-process stand-in for a provider batch API.
+
+    Submitted requests run on the first `status()` call through `runner`. The
+    default runner makes one provider call per request, with the usual rate
+    limiting and retries.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        provider: Provider,
+        runner: Callable[[Provider, str, str, type[BaseModel]], BatchItemResult] | None = None,
+    ) -> None:
+        self.provider = provider
+        self.runner = runner or _run_single
+        self._pending: dict[str, tuple[str, list[tuple[str, str, type[BaseModel]]]]] = {}
+        self._results: dict[str, dict[str, BatchItemResult]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, model_id: str, requests: list[tuple[str, str, type[BaseModel]]]) -> str:
+        batch_id = f"local-{uuid.uuid4().hex}"
+        with self._lock:
+            self._pending[batch_id] = (model_id, list(requests))
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        with self._lock:
+            if batch_id in self._results:
+                return "completed"
+            job = self._pending.pop(batch_id, None)
+        if job is None:
+            return "failed"  # Lost with a previous process
+        model_id, requests = job
+        results = {
+            custom_id: self.runner(self.provider, model_id, input_text, schema)
+            for custom_id, input_text, schema in requests
+        }
+        with self._lock:
+            self._results[batch_id] = results
+        return "completed"
+
+    def results(self, batch_id: str) -> dict[str, BatchItemResult]:
+        with self._lock:
+            return self._results.pop(batch_id, {})
+
+
+def _run_single(provider: Provider, model_id: str, input_text: str, schema: type[BaseModel]) -> BatchItemResult:
+    try:
+        parsed_dict, result = _structured_call(provider, model_id, input_text, schema)
+        return parsed_dict, result.input_tokens, result.output_tokens, None
+    except Exception as e:
+        return None, None, None, str(e)
+
+
+@dataclass
+class BatchRequest:
+    """One queued structured-generation request."""
+    custom_id: str
+    provider: str
+    model: str
+    input_text: str
+    schema_path: str
+    user_id: str | None = None
+    usage_metadata: dict[str, Any] | None = None
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class BatchHandle:
+    """Caller-side handle that resolves to an LLMResult when the batch finishes."""
+
+    def __init__(self, custom_id: str, future: Future) -> None:
+        self.custom_id = custom_id
+        self._future = future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: float | None = None) -> LLMResult:
+        """Block until resolved. Raises ValueError if the request failed."""
+        return self._future.result(timeout)
+
+    async def aresult(self) -> LLMResult:
+        return await asyncio.wrap_future(self._future)
+
+
+def _schema_path(schema: type[BaseModel]) -> str:
+    return f"{schema.__module__}:{schema.__qualname__}"
+
+
+@lru_cache(maxsize=128)
+def _load_schema(path: str) -> type[BaseModel]:
+    module_name, qualname = path.split(":", 1)
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class BatchQueue:
+    """File-backed queue of batchable requests plus the batches submitted from it."""
+
+    def __init__(self, root: str | os.PathLike[str], max_requests_per_batch: int = 1000) -> None:
+        self.root = Path(root)
+        self.max_requests_per_batch = max(1, max_requests_per_batch)
+        self._pending_path = self.root / "pending.jsonl"
+        self._batches_dir = self.root / "batches"
+        self._results_dir = self.root / "results"
+        self._batches_dir.mkdir(parents=True, exist_ok=True)
+        self._results_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._futures: dict[str, Future] = {}
+        self._backends: dict[str, BatchBackend] = {}
+        self._worker: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        provider: Provider,
+        model: str,
+        input_text: str,
+        schema: type[BaseModel],
+        *,
+        user_id: str | None = None,
+        usage_metadata: dict[str, Any] | None = None,
+    ) -> BatchHandle:
+        """
+        Queue a structured request for the next batch submission.
+
+        Raises:
+            ValueError: If the model alias is invalid, or the schema cannot be
+                re-imported by module path (e.g. `create_model` or function-local classes)
+        """
+        provider = _provider_override(provider)
+        _resolve_model_id(provider, model)  # Fail fast on bad aliases
+        schema_path = _schema_path(schema)
+        try:
+            importable = _load_schema(schema_path) is schema
+        except Exception:
+            importable = False
+        if not importable:
+            raise ValueError(f"Batch schema {schema_path} must be a module-level class")
+        request = BatchRequest(
+            custom_id=uuid.uuid4().hex,
+            provider=provider.value,
+            model=model,
+            input_text=input_text,
+            schema_path=schema_path,
+            user_id=user_id,
+            usage_metadata=usage_metadata,
+        )
+        future: Future = Future()
+        with self._lock:
+            self._futures[request.custom_id] = future
+            with self._pending_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(request), ensure_ascii=False) + "\n")
+        return BatchHandle(request.custom_id, future)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._read_pending())
+
+    # ------------------------------------------------------------------
+    # Submit / poll
+    # ------------------------------------------------------------------
+
+    def flush(self) -> list[str]:
+        """
+        Submit queued requests, one batch per (provider, model) chunk.
+
+        Groups that fail to submit with a transient error stay queued for the
+        next flush; any other submit error (bad auth, invalid request) or a
+        schema that no longer imports fails the affected requests.
+
+        Returns:
+            Local IDs of the batches that were submitted
+        """
+        with self._lock:
+            pending = self._read_pending()
+            if not pending:
+                return []
+
+            groups: dict[tuple[str, str], list[BatchRequest]] = {}
+            for request in pending:
+                groups.setdefault((request.provider, request.model), []).append(request)
+
+            submitted: list[str] = []
+            remaining: list[BatchRequest] = []
+            for (provider_name, model), requests in groups.items():
+                provider = Provider(provider_name)
+                model_id = _resolve_model_id(provider, model)
+                backend = self._backend_for(provider)
+                loadable: list[tuple[BatchRequest, type[BaseModel]]] = []
+                for request in requests:
+                    try:
+                        loadable.append((request, _load_schema(request.schema_path)))
+                    except Exception as e:
+                        self._resolve(request, (None, None, None, f"schema not importable: {e}"))
+                for start in range(0, len(loadable), self.max_requests_per_batch):
+                    entries = loadable[start:start + self.max_requests_per_batch]
+                    chunk = [request for request, _ in entries]
+                    try:
+                        remote_id = backend.submit(
+                            model_id,
+                            [(r.custom_id, r.input_text, schema) for r, schema in entries],
+                        )
+                    except Exception as e:
+                        if is_retryable_error(e):
+                            remaining.extend(chunk)
+                        else:
+                            for request in chunk:
+                                self._resolve(request, (None, None, None, f"submit failed: {e}"))
+                        continue
+                    batch_id = uuid.uuid4().hex
+                    self._write_batch({
+                        "id": batch_id,
+                        "provider": provider_name,
+                        "model": model,
+                        "backend": backend.name,
+                        "remote_id": remote_id,
+                        "status": "submitted",
+                        "submitted_at": time.time(),
+                        "requests": [asdict(r) for r in chunk],
+                    })
+                    submitted.append(batch_id)
+
+            self._write_pending(remaining)
+            return submitted
+
+    def poll(self) -> int:
+        """
+        Check submitted batches and fan out the results of finished ones.
+
+        Returns:
+            Number of requests resolved by this poll
+        """
+        with self._lock:
+            resolved = 0
+            for batch in self._list_batches(status="submitted"):
+                provider = Provider(batch["provider"])
+                backend = self._backend_for(provider)
+                try:
+                    status = backend.status(batch["remote_id"])
+                    if status == "pending":
+                        continue
+                    results = backend.results(batch["remote_id"]) if status == "completed" else {}
+                except Exception:
+                    continue  # Try again on the next poll
+
+                for data in batch["requests"]:
+                    request = BatchRequest(**data)
+                    item = results.get(request.custom_id) or (None, None, None, f"batch {status}")
+                    self._resolve(request, item)
+                    resolved += 1
+
+                batch["status"] = status
+                batch["finished_at"] = time.time()
+                self._write_batch(batch)
+            return resolved
+
+    def wait(
+        self,
+        handles: list[BatchHandle],
+        poll_interval: float | None = None,
+        timeout: float | None = None,
+    ) -> list[LLMResult | Exception]:
+        """
+        Flush and poll until every handle resolves.
+
+        Returns:
+            One LLMResult (or the exception it failed with) per handle, in order
+
+        Raises:
+            TimeoutError: If `timeout` elapses first
+        """
+        poll_interval = settings.llm_batch_poll_interval if poll_interval is None else poll_interval
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.flush()
+        while not all(handle.done() for handle in handles):
+            self.poll()
+            if all(handle.done() for handle in handles):
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("Timed out waiting for LLM batch results")
+            time.sleep(poll_interval)
+            self.flush()
+
+        outcomes: list[LLMResult | Exception] = []
+        for handle in handles:
+            try:
+                outcomes.append(handle.result())
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+    def load_result(self, custom_id: str) -> dict[str, Any] | None:
+        """Read a persisted result (e.g. after a restart lost the in-memory handle)."""
+        path = self._results_dir / f"{custom_id}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    # ------------------------------------------------------------------
+    # Background worker
+    # ------------------------------------------------------------------
+
+    def start_worker(self, interval: float | None = None) -> None:
+        """Flush and poll periodically on a daemon thread."""
+        interval = settings.llm_batch_poll_interval if interval is None else interval
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.flush()
+                    self.poll()
+                except Exception:
+                    pass
+
+        self._worker = threading.Thread(target=run, name="llm-batch-worker", daemon=True)
+        self._worker.start()
+
+    def stop_worker(self) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def stats(self) -> dict[str, Any]:
+        batches = self._list_batches()
+        by_status: dict[str, int] = {}
+        for batch in batches:
+            by_status[batch["status"]] = by_status.get(batch["status"], 0) + 1
+        return {"pending_requests": self.pending_count(), "batches": by_status}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _backend_for(self, provider: Provider) -> BatchBackend:
+        backend = self._backends.get(provider.value)
+        if backend is None:
+            if settings.llm_batch_force_local:
+                backend = LocalBatchBackend(provider)
+            elif provider == Provider.OPENAI:
+                backend = OpenAIBatchBackend()
+            elif provider == Provider.CLAUDE:
+                backend = ClaudeBatchBackend()
+            else:
+                backend = LocalBatchBackend(provider)
+            self._backends[provider.value] = backend
+        return backend
+
+    def set_backend(self, provider: Provider, backend: BatchBackend) -> None:
+        """Override the backend used for a provider (e.g. a LocalBatchBackend with a custom runner)."""
+        self._backends[provider.value] = backend
+
+    def _resolve(self, request: BatchRequest, item: BatchItemResult) -> None:
+        parsed_dict, input_tok, output_tok, error = item
+        provider = Provider(request.provider)
+        outcome: LLMResult | Exception
+        if error is None and parsed_dict is not None:
+            try:
+                result = _build_structured_result(
+                    request.input_text, parsed_dict, _load_schema(request.schema_path), input_tok, output_tok
+                )
+                result.provider = request.provider
+                result.model = request.model
+                _record_usage(
+                    result, provider, request.model, request.user_id,
+                    {**(request.usage_metadata or {}), "batch": True},
+                )
+                outcome = result
+            except Exception as e:
+                error = f"validation failed: {e}"
+        if error is not None or parsed_dict is None:
+            outcome = ValueError(f"Batch request {request.custom_id} failed for {provider}: {error}")
+
+        record = {
+            "custom_id": request.custom_id,
+            "parsed": parsed_dict if error is None else None,
+            "input_tokens": input_tok,
+            "output_tokens": output_tok,
+            "error": error,
+        }
+        (self._results_dir / f"{request.custom_id}.json").write_text(
+            json.dumps(record, ensure_ascii=False), encoding="utf-8"
+        )
+
+        with self._lock:
+            future = self._futures.pop(request.custom_id, None)
+        if future is not None and not future.done():
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def _read_pending(self) -> list[BatchRequest]:
+        if not self._pending_path.exists():
+            return []
+        requests = []
+        for line in self._pending_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                requests.append(BatchRequest(**json.loads(line)))
+        return requests
+
+    def _write_pending(self, requests: list[BatchRequest]) -> None:
+        tmp_path = self._pending_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            "".join(json.dumps(asdict(r), ensure_ascii=False) + "\n" for r in requests),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self._pending_path)
+
+    def _write_batch(self, batch: dict[str, Any]) -> None:
+        path = self._batches_dir / f"{batch['id']}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(batch, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _list_batches(self, status: str | None = None) -> list[dict[str, Any]]:
+        batches = []
+        for path in sorted(self._batches_dir.glob("*.json")):
+            batch = json.loads(path.read_text(encoding="utf-8"))
+            if status is None or batch.get("status") == status:
+                batches.append(batch)
+        return batches
+
+
+@lru_cache(maxsize=1)
+def get_batch_queue() -> BatchQueue:
+    """Return the process-wide batch queue rooted at `LLM_BATCH_DIR`."""
+    return BatchQueue(settings.llm_batch_dir, settings.llm_batch_max_requests)
+
+
+def generate_structured_batch(
+    requests: list[dict[str, Any]],
+    poll_interval: float | None = None,
+    timeout: float | None = None,
+) -> list[LLMResult | Exception]:
+    """
+    Run many structured requests through the batch queue and wait for them.
+
+    Args:
+        requests: Keyword arguments for `BatchQueue.enqueue` (provider, model,
+            input_text, schema, optional user_id / usage_metadata)
+
+    Returns:
+        One LLMResult (or the exception it failed with) per request, in order
+    """
+    queue = get_batch_queue()
+    handles = [queue.enqueue(**request) for request in requests]
+    return queue.wait(handles, poll_interval=poll_interval, timeout=timeout)
+
+
+__all__ = [
+    "BatchBackend",
+    "OpenAIBatchBackend",
+    "ClaudeBatchBackend",
+    "LocalBatchBackend",
+    "BatchRequest",
+    "BatchHandle",
+    "BatchQueue",
+    "get_batch_queue",
+    "generate_structured_batch",
+]
@@ -0,0 +1,258 @@
+"""
+LLM Response Cache
+
+Content-addressed cache in front of `generate_text` / `generate_structured`.
+Entries are keyed by provider, resolved model ID, a hash of the prompt and a
+fingerprint of the output schema. A bounded in-memory LRU is always used; an
+optional SQLite tier (`LLM_CACHE_SQLITE_PATH`) survives restarts and is shared
+by workers on the same host.
+
+Caching is opt-in per service: only services listed in `LLM_CACHE_TTLS`
+(`usage_metadata["service"]`) are cached, and callers can still pass
+`cache=False` to bypass it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Mapping, Protocol
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+from .llm_config import LLM_CACHE_TTLS
+from .schema import compile_schema
+
+
+class CacheBackend(Protocol):
+    """Storage tier used by `LLMResponseCache`."""
+
+    def get(self, key: str) -> tuple[dict[str, Any], float | None] | None:
+        """Return `(value, expires_at)` for a live entry, or None."""
+        ...
+
+    def set(self, key: str, value: dict[str, Any], ttl: float | None) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class MemoryCacheBackend:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max(1, max_entries)
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float | None, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict[str, Any], ttl: float | None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk tier backed by a single SQLite file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> tuple[dict[str, Any], float | None] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: dict[str, Any], ttl: float | None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def schema_fingerprint(schema: type[BaseModel] | None) -> str:
+    """Stable fingerprint of a Pydantic schema's JSON Schema ("text" for plain text)."""
+    if schema is None:
+        return "text"
+    return compile_schema(schema, "raw").fingerprint
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + optional disk) response cache with hit/miss counters."""
+
+    def __init__(self, memory: MemoryCacheBackend, disk: CacheBackend | None = None) -> None:
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_id: str,
+        input_text: str,
+        schema: type[BaseModel] | None = None,
+    ) -> str:
+        prompt_hash = hashlib.sha256(input_text.encode("utf-8")).hexdigest()
+        return f"{provider}:{model_id}:{schema_fingerprint(schema)}:{prompt_hash}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits", "memory_hits")
+            return value
+
+        if self.disk is not None:
+            try:
+                entry = self.disk.get(key)
+            except Exception:
+                entry = None
+            if entry is not None:
+                value, expires_at = entry
+                # Promote to memory with whatever TTL the disk entry has left.
+                remaining = None if expires_at is None else max(expires_at - time.time(), 0.001)
+                self.memory.set(key, value, remaining)
+                self._count("hits", "disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: dict[str, Any], ttl: float | None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, ttl)
+            except Exception:
+                pass
+        self._count("stores")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "disk_enabled": self.disk is not None,
+        }
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide response cache configured from settings."""
+    disk: CacheBackend | None = None
+    if settings.llm_cache_sqlite_path:
+        disk = SQLiteCacheBackend(settings.llm_cache_sqlite_path)
+    return LLMResponseCache(MemoryCacheBackend(settings.llm_cache_max_entries), disk)
+
+
+def cache_ttl_for(usage_metadata: Mapping[str, Any] | None, cache: bool = True) -> float | None:
+    """
+    Resolve the TTL for a call, or None when the call must not be cached.
+
+    Args:
+        usage_metadata: Call metadata; `service` selects the TTL from `LLM_CACHE_TTLS`
+        cache: Per-call opt-out flag
+    """
+    if not cache or not settings.llm_cache_enabled:
+        return None
+    service = (usage_metadata or {}).get("service")
+    ttl = LLM_CACHE_TTLS.get(service) if service else None
+    return ttl if ttl and ttl > 0 else None
+
+
+def get_llm_cache_stats() -> dict[str, Any]:
+    """Hit/miss counters and sizes of the process-wide cache."""
+    return get_llm_cache().stats()
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "LLMResponseCache",
+    "schema_fingerprint",
+    "get_llm_cache",
+    "cache_ttl_for",
+    "get_llm_cache_stats",
+]
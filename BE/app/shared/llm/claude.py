@@ -3,34 +3,29 @@
 # ============================================================================
 
 import json
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 from pydantic import BaseModel
-from pathlib import Path
-from dotenv import load_dotenv
-import os
 
+from app.shared.providers.cassette import recorded
+from app.shared.providers.clients import get_anthropic_client, get_async_anthropic_client
 
+from .schema import compile_schema
+
+
+@recorded("claude", "llm.text")
 def claude_generate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
     """
     Generate text using Claude Messages API.
-    
+
     Args:
         model: Claude model name
         input_text: Input prompt text
-        
+
     Returns:
         Tuple of (output_text, input_tokens, output_tokens)
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    import anthropic
-    
-    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEYS"))
-    
+    client = get_anthropic_client()
+
     message = client.messages.create(
         model=model,
         max_tokens=4096,
@@ -38,17 +33,14 @@ def claude_generate_text(model: str, input_text: str) -> tuple[str, int | None,
             {"role": "user", "content": input_text}
         ]
     )
-    
+
     # Extract text from response
     text = message.content[0].text if message.content else ""
-    
-    # Extract token usage
-    input_tokens = message.usage.input_tokens if message.usage else None
-    output_tokens = message.usage.output_tokens if message.usage else None
-    
+    input_tokens, output_tokens = _extract_usage(message)
     return text, input_tokens, output_tokens
 
 
+@recorded("claude", "llm.structured")
 def claude_generate_structured(
     model: str,
     input_text: str,
@@ -56,51 +48,241 @@ def claude_generate_structured(
 ) -> tuple[dict[str, Any], int | None, int | None]:
     """
     Generate structured output using Claude Messages API.
-    
+
     Args:
         model: Claude model name
         input_text: Input prompt text
         schema: Pydantic model class for validation
-        
+
     Returns:
         Tuple of (parsed_dict, input_tokens, output_tokens)
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    import anthropic
-    
-    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEYS"))
-    
-    # Get schema as JSON Schema
-    json_schema = schema.model_json_schema()
-    
-    # Create prompt that instructs model to output JSON matching the schema
-    structured_prompt = f"""Please respond with valid JSON that matches this schema:
-
-{json.dumps(json_schema, indent=2)}
-
-User request: {input_text}
+    client = get_anthropic_client()
 
-Respond with ONLY the JSON object, no other text."""
-    
     message = client.messages.create(
         model=model,
         max_tokens=4096,
         messages=[
-            {"role": "user", "content": structured_prompt}
+            {"role": "user", "content": _structured_prompt(input_text, schema)}
         ]
     )
-    
+
     # Extract and parse JSON from response
     text = message.content[0].text if message.content else "{}"
-    parsed_dict = json.loads(text)
-    
-    # Extract token usage
-    input_tokens = message.usage.input_tokens if message.usage else None
-    output_tokens = message.usage.output_tokens if message.usage else None
-    
-    return parsed_dict, input_tokens, output_tokens
\ No newline at end of file
+    input_tokens, output_tokens = _extract_usage(message)
+    return json.loads(text), input_tokens, output_tokens
+
+
+@recorded("claude", "llm.text")
+async def claude_agenerate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
+    """Async variant of `claude_generate_text` using `AsyncAnthropic`."""
+    client = get_async_anthropic_client()
+
+    message = await client.messages.create(
+        model=model,
+        max_tokens=4096,
+        messages=[
+            {"role": "user", "content": input_text}
+        ]
+    )
+
+    text = message.content[0].text if message.content else ""
+    input_tokens, output_tokens = _extract_usage(message)
+    return text, input_tokens, output_tokens
+
+
+@recorded("claude", "llm.structured")
+async def claude_agenerate_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], int | None, int | None]:
+    """Async variant of `claude_generate_structured` using `AsyncAnthropic`."""
+    client = get_async_anthropic_client()
+
+    message = await client.messages.create(
+        model=model,
+        max_tokens=4096,
+        messages=[
+            {"role": "user", "content": _structured_prompt(input_text, schema)}
+        ]
+    )
+
+    text = message.content[0].text if message.content else "{}"
+    input_tokens, output_tokens = _extract_usage(message)
+    return json.loads(text), input_tokens, output_tokens
+
+
+@recorded("claude", "llm.stream")
+def claude_stream_text(model: str, input_text: str) -> Iterator[tuple[str, int | None, int | None]]:
+    """
+    Stream text using Claude Messages API.
+
+    Args:
+        model: Claude model name
+        input_text: Input prompt text
+
+    Yields:
+        Tuples of (text_delta, input_tokens, output_tokens). Input tokens arrive
+        with `message_start`, output tokens with the closing `message_delta`.
+    """
+    client = get_anthropic_client()
+
+    stream = client.messages.create(
+        model=model,
+        max_tokens=4096,
+        messages=[
+            {"role": "user", "content": input_text}
+        ],
+        stream=True,
+    )
+    for event in stream:
+        chunk = _stream_event_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+@recorded("claude", "llm.stream")
+async def claude_astream_text(model: str, input_text: str) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """Async variant of `claude_stream_text` using `AsyncAnthropic`."""
+    client = get_async_anthropic_client()
+
+    stream = await client.messages.create(
+        model=model,
+        max_tokens=4096,
+        messages=[
+            {"role": "user", "content": input_text}
+        ],
+        stream=True,
+    )
+    async for event in stream:
+        chunk = _stream_event_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+@recorded("claude", "llm.structured_stream")
+async def claude_astream_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """
+    Stream structured output (raw JSON text deltas) using Claude Messages API.
+
+    Args:
+        model: Claude model name
+        input_text: Input prompt text
+        schema: Pydantic model class the JSON must match
+
+    Yields:
+        Tuples of (json_text_delta, input_tokens, output_tokens)
+    """
+    client = get_async_anthropic_client()
+
+    stream = await client.messages.create(
+        model=model,
+        max_tokens=4096,
+        messages=[
+            {"role": "user", "content": _structured_prompt(input_text, schema)}
+        ],
+        stream=True,
+    )
+    async for event in stream:
+        chunk = _stream_event_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+def claude_submit_batch(
+    model: str,
+    requests: list[tuple[str, str, type[BaseModel]]],
+) -> str:
+    """
+    Submit structured requests to the Anthropic Message Batches API.
+
+    Args:
+        model: Claude model name
+        requests: (custom_id, input_text, schema) per request
+
+    Returns:
+        Message batch ID
+    """
+    client = get_anthropic_client()
+
+    batch = client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": model,
+                    "max_tokens": 4096,
+                    "messages": [
+                        {"role": "user", "content": _structured_prompt(input_text, schema)}
+                    ],
+                },
+            }
+            for custom_id, input_text, schema in requests
+        ]
+    )
+    return batch.id
+
+
+def claude_batch_status(batch_id: str) -> str:
+    """Return "pending" or "completed" for an Anthropic message batch."""
+    client = get_anthropic_client()
+    batch = client.messages.batches.retrieve(batch_id)
+    return "completed" if batch.processing_status == "ended" else "pending"
+
+
+def claude_batch_results(batch_id: str) -> dict[str, tuple[dict[str, Any] | None, int | None, int | None, str | None]]:
+    """
+    Stream the results of an ended Anthropic message batch.
+
+    Returns:
+        Mapping of custom_id to (parsed_dict, input_tokens, output_tokens, error)
+    """
+    client = get_anthropic_client()
+
+    results: dict[str, tuple[dict[str, Any] | None, int | None, int | None, str | None]] = {}
+    for entry in client.messages.batches.results(batch_id):
+        if entry.result.type != "succeeded":
+            results[entry.custom_id] = (None, None, None, entry.result.type)
+            continue
+        message = entry.result.message
+        text = message.content[0].text if message.content else "{}"
+        input_tokens, output_tokens = _extract_usage(message)
+        try:
+            results[entry.custom_id] = (json.loads(text), input_tokens, output_tokens, None)
+        except json.JSONDecodeError as e:
+            results[entry.custom_id] = (None, input_tokens, output_tokens, f"invalid JSON: {e}")
+    return results
+
+
+def _stream_event_chunk(event: Any) -> tuple[str, int | None, int | None] | None:
+    event_type = getattr(event, "type", None)
+    if event_type == "content_block_delta" and getattr(event.delta, "type", None) == "text_delta":
+        return event.delta.text, None, None
+    if event_type == "message_start" and event.message.usage:
+        return "", event.message.usage.input_tokens, None
+    if event_type == "message_delta" and event.usage:
+        return "", None, event.usage.output_tokens
+    return None
+
+
+def _structured_prompt(input_text: str, schema: type[BaseModel]) -> str:
+    """Create prompt that instructs model to output JSON matching the schema."""
+    # Compact serialization is memoized per schema class and keeps the prompt small
+    return f"""Please respond with valid JSON that matches this schema:
+
+{compile_schema(schema, "claude").compact_json}
+
+User request: {input_text}
+
+Respond with ONLY the JSON object, no other text."""
+
+
+def _extract_usage(message: Any) -> tuple[int | None, int | None]:
+    if not message.usage:
+        return None, None
+    return message.usage.input_tokens, message.usage.output_tokens
@@ -3,50 +3,37 @@
 # ============================================================================
 
 import json
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 from pydantic import BaseModel
-from pathlib import Path
-from dotenv import load_dotenv
-import os
 
+from app.shared.providers.cassette import recorded
+from app.shared.providers.clients import get_google_client
 
+
+@recorded("google", "llm.text")
 def google_generate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
     """
     Generate text using Google Gemini API.
-    
+
     Args:
         model: Gemini model name
         input_text: Input prompt text
-        
+
     Returns:
         Tuple of (output_text, input_tokens, output_tokens)
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from google import genai
-    
-    client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-    
+    client = get_google_client()
+
     response = client.models.generate_content(
         model=model,
         contents=input_text,
     )
-    
-    # Extract text
-    text = response.text
-    
-    # Google SDK may not expose usage metadata directly
-    # Return None to trigger estimation fallback
-    input_tokens = None
-    output_tokens = None
-    
-    return text, input_tokens, output_tokens
 
+    input_tokens, output_tokens = _extract_usage(response)
+    return response.text, input_tokens, output_tokens
 
+
+@recorded("google", "llm.structured")
 def google_generate_structured(
     model: str,
     input_text: str,
@@ -54,40 +41,135 @@ def google_generate_structured(
 ) -> tuple[dict[str, Any], int | None, int | None]:
     """
     Generate structured output using Google Gemini API with Pydantic schema.
-    
+
     Args:
         model: Gemini model name
         input_text: Input prompt text
         schema: Pydantic model class for validation
-        
+
     Returns:
         Tuple of (parsed_dict, input_tokens, output_tokens)
     """
-    # Load .env locally
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from google import genai
-    
-    client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-    
+    client = get_google_client()
+
     response = client.models.generate_content(
         model=model,
         contents=input_text,
-        config={
-            "response_mime_type": "application/json",
-            "response_schema": schema,
-        },
+        config=_structured_config(schema),
+    )
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return json.loads(response.text), input_tokens, output_tokens
+
+
+@recorded("google", "llm.text")
+async def google_agenerate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
+    """Async variant of `google_generate_text` using the genai `aio` client."""
+    client = get_google_client()
+
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=input_text,
+    )
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return response.text, input_tokens, output_tokens
+
+
+@recorded("google", "llm.structured")
+async def google_agenerate_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], int | None, int | None]:
+    """Async variant of `google_generate_structured` using the genai `aio` client."""
+    client = get_google_client()
+
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=input_text,
+        config=_structured_config(schema),
     )
-    
-    # Parse the JSON response
-    parsed_dict = json.loads(response.text)
-    
-    # Google SDK may not expose usage metadata directly
-    # Return None to trigger estimation fallback
-    input_tokens = None
-    output_tokens = None
-    
-    return parsed_dict, input_tokens, output_tokens
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return json.loads(response.text), input_tokens, output_tokens
+
+
+@recorded("google", "llm.stream")
+def google_stream_text(model: str, input_text: str) -> Iterator[tuple[str, int | None, int | None]]:
+    """
+    Stream text using Google Gemini API.
+
+    Args:
+        model: Gemini model name
+        input_text: Input prompt text
+
+    Yields:
+        Tuples of (text_delta, input_tokens, output_tokens). Usage metadata is
+        cumulative, so the last chunk carries the billed totals.
+    """
+    client = get_google_client()
+
+    for response in client.models.generate_content_stream(
+        model=model,
+        contents=input_text,
+    ):
+        yield (response.text or "", *_extract_usage(response))
+
+
+@recorded("google", "llm.stream")
+async def google_astream_text(model: str, input_text: str) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """Async variant of `google_stream_text` using the genai `aio` client."""
+    client = get_google_client()
+
+    async for response in await client.aio.models.generate_content_stream(
+        model=model,
+        contents=input_text,
+    ):
+        yield (response.text or "", *_extract_usage(response))
+
+
+@recorded("google", "llm.structured_stream")
+async def google_astream_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """
+    Stream structured output (raw JSON text deltas) using the genai `aio` client.
+
+    Args:
+        model: Gemini model name
+        input_text: Input prompt text
+        schema: Pydantic model class the JSON must match
+
+    Yields:
+        Tuples of (json_text_delta, input_tokens, output_tokens)
+    """
+    client = get_google_client()
+
+    async for response in await client.aio.models.generate_content_stream(
+        model=model,
+        contents=input_text,
+        config=_structured_config(schema),
+    ):
+        yield (response.text or "", *_extract_usage(response))
+
+
+def _structured_config(schema: type[BaseModel]) -> dict[str, Any]:
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": schema,
+    }
+
+
+def _extract_usage(response: Any) -> tuple[int | None, int | None]:
+    """Read prompt / candidate token counts from `usage_metadata` (thinking tokens bill as output)."""
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return None, None
+    output_tokens = usage.candidates_token_count
+    thoughts = getattr(usage, "thoughts_token_count", None)
+    if thoughts:
+        output_tokens = (output_tokens or 0) + thoughts
+    return usage.prompt_token_count, output_tokens
@@ -26,6 +26,13 @@ CLAUDE_MODELS = {
     "claude-haiku-4-5": "claude-haiku-4-5-20251001",
 }
 
+# Local stand-in models: alias -> model ID. The local provider accepts any
+# alias (it stands in for whichever model a service is configured with);
+# these are only the names it advertises.
+LOCAL_MODELS = {
+    "local": "local",
+}
+
 
 def get_openai_model_id(alias: str) -> str:
     """
@@ -81,6 +88,19 @@ def get_claude_model_id(alias: str) -> str:
     return CLAUDE_MODELS[alias]
 
 
+def get_local_model_id(alias: str) -> str:
+    """
+    Get the local stand-in model ID for an alias.
+
+    Args:
+        alias: Any model alias; unknown aliases map to themselves
+
+    Returns:
+        Model ID used to seed the local provider
+    """
+    return LOCAL_MODELS.get(alias, alias)
+
+
 def get_openai_models() -> list[str]:
     """Get all available OpenAI model aliases."""
     return list(OPENAI_MODELS.keys())
@@ -96,10 +116,19 @@ def get_claude_models() -> list[str]:
     return list(CLAUDE_MODELS.keys())
 
 
+def get_local_models() -> list[str]:
+    """Get the advertised local stand-in model aliases."""
+    return list(LOCAL_MODELS.keys())
+
+
 # Default model for rewrite operations
 DEFAULT_REWRITE_PROVIDER = "openai"
 DEFAULT_REWRITE_MODEL = "gpt-5-mini"
 
+# Default model for planning targeted rewrites (which spreads an edit touches)
+DEFAULT_REWRITE_PLAN_PROVIDER = "openai"
+DEFAULT_REWRITE_PLAN_MODEL = "gpt-5-nano"
+
 # Default model for bible generation
 DEFAULT_BIBLE_PROVIDER = "openai"
 DEFAULT_BIBLE_MODEL = "gpt-5-mini"
@@ -112,3 +141,53 @@ DEFAULT_ARC_MODEL = "gpt-5-mini"
 DEFAULT_DRAFT_PROVIDER = "openai"
 DEFAULT_DRAFT_MODEL = "gpt-5-mini"
 
+
+# Response cache TTLs (seconds) by usage_metadata["service"].
+# Services not listed here are never cached.
+LLM_CACHE_TTLS = {
+    "studio.chat.classify": 24 * 60 * 60,
+    "studio.rewrite.plan": 15 * 60,
+    "storybook.bible.setting_only": 15 * 60,
+    "storybook.bible.full_generation": 15 * 60,
+    "storybook.arc": 15 * 60,
+    "storybook.draft.final_script": 15 * 60,
+    "storybook.draft.act": 15 * 60,
+    "storybook.draft.act_seams": 15 * 60,
+}
+
+
+# Hedge / failover routing by usage_metadata["service"].
+# Keys match on dotted prefixes ("storybook.bible" covers "storybook.bible.full_generation").
+# The caller's provider/model is the primary leg; `fallbacks` are (provider, model alias)
+# legs tried in order. Async calls fire the next leg after `hedge_after` seconds without
+# a result (None = fail over only on errors); the first valid result wins.
+LLM_ROUTING_POLICIES = {
+    "studio.chat.classify": {
+        "fallbacks": [("google", "gemini-2.5-flash")],
+        "hedge_after": 4.0,
+    },
+    "studio.chat.answer": {
+        "fallbacks": [("google", "gemini-2.5-flash")],
+        "hedge_after": 8.0,
+    },
+    "storybook.bible": {
+        "fallbacks": [("claude", "claude-haiku-4-5")],
+        "hedge_after": 45.0,
+    },
+    "storybook.arc": {
+        "fallbacks": [("claude", "claude-haiku-4-5")],
+        "hedge_after": 45.0,
+    },
+    "storybook.draft": {
+        "fallbacks": [("claude", "claude-sonnet-4-5")],
+        "hedge_after": 90.0,
+    },
+    "studio.rewrite": {
+        "fallbacks": [("claude", "claude-sonnet-4-5")],
+        "hedge_after": 90.0,
+    },
+    "studio.rewrite.plan": {
+        "fallbacks": [("google", "gemini-2.5-flash")],
+        "hedge_after": 4.0,
+    },
+}
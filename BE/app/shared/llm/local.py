@@ -0,0 +1,314 @@
+# ============================================================================
+# Local Stand-in Client Implementation
+# ============================================================================
+#
+# Deterministic, offline provider for development, load tests and benchmarks.
+# Text is synthesized from a seeded RNG (same model + prompt -> same output);
+# structured output is synthesized from the Pydantic schema and is always
+# schema-valid. Latency and output length are configured with the LOCAL_LLM_*
+# settings (see app/shared/providers/local.py).
+
+import json
+import re
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Iterator
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.shared.providers.local import (
+    asimulate_latency,
+    llm_latency_profile,
+    sample_count,
+    seeded_rng,
+    simulate_latency,
+)
+
+from .schema import compile_schema
+from .tokens import count_tokens
+
+_WORDS = (
+    "the", "little", "bear", "forest", "moon", "gentle", "river", "brave", "friend",
+    "lantern", "whispered", "garden", "quietly", "bright", "morning", "adventure",
+    "cloud", "honey", "smiled", "path", "window", "dream", "together", "soft",
+    "star", "wandered", "secret", "warm", "hill", "found", "song", "kind",
+)
+
+# Words per token for synthesized English text (o200k_base averages ~0.75)
+_WORDS_PER_TOKEN = 0.75
+# "14-spread structure", "3 acts" -> 14, 3: array lengths hinted in field descriptions
+_COUNT_HINT = re.compile(r"\b(\d{1,2})[\s-]+[a-zA-Z]")
+_MAX_HINTED_ITEMS = 50
+
+
+def local_generate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
+    """
+    Generate deterministic placeholder text.
+
+    Args:
+        model: Model alias being stood in for (part of the seed)
+        input_text: Input prompt text
+
+    Returns:
+        Tuple of (output_text, input_tokens, output_tokens)
+    """
+    text, input_tokens, output_tokens, latency = _text_response(model, input_text)
+    simulate_latency(latency)
+    return text, input_tokens, output_tokens
+
+
+def local_generate_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], int | None, int | None]:
+    """
+    Synthesize a schema-valid object for `schema`.
+
+    Args:
+        model: Model alias being stood in for (part of the seed)
+        input_text: Input prompt text
+        schema: Pydantic model class the output must validate against
+
+    Returns:
+        Tuple of (parsed_dict, input_tokens, output_tokens)
+    """
+    parsed, input_tokens, output_tokens, latency = _structured_response(model, input_text, schema)
+    simulate_latency(latency)
+    return parsed, input_tokens, output_tokens
+
+
+async def local_agenerate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
+    """Async variant of `local_generate_text`."""
+    text, input_tokens, output_tokens, latency = _text_response(model, input_text)
+    await asimulate_latency(latency)
+    return text, input_tokens, output_tokens
+
+
+async def local_agenerate_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], int | None, int | None]:
+    """Async variant of `local_generate_structured`."""
+    parsed, input_tokens, output_tokens, latency = _structured_response(model, input_text, schema)
+    await asimulate_latency(latency)
+    return parsed, input_tokens, output_tokens
+
+
+def local_stream_text(model: str, input_text: str) -> Iterator[tuple[str, int | None, int | None]]:
+    """
+    Stream deterministic placeholder text a few words at a time.
+
+    Yields:
+        Tuples of (text_delta, input_tokens, output_tokens); the last chunk
+        carries the usage totals.
+    """
+    for delta, delay, usage in _stream_plan(model, input_text):
+        simulate_latency(delay)
+        yield (delta, *usage)
+
+
+async def local_astream_text(model: str, input_text: str) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """Async variant of `local_stream_text`."""
+    for delta, delay, usage in _stream_plan(model, input_text):
+        await asimulate_latency(delay)
+        yield (delta, *usage)
+
+
+async def local_astream_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """
+    Stream a synthesized schema-valid object as JSON text deltas.
+
+    Yields:
+        Tuples of (json_text_delta, input_tokens, output_tokens); the last chunk
+        carries the usage totals.
+    """
+    parsed, input_tokens, output_tokens, latency = _structured_response(model, input_text, schema)
+    text = json.dumps(parsed, ensure_ascii=False)
+    chunk_size = 64
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    per_chunk = latency / max(1, len(chunks))
+    for chunk in chunks:
+        await asimulate_latency(per_chunk)
+        yield chunk, None, None
+    yield "", input_tokens, output_tokens
+
+
+# ============================================================================
+# Synthesis
+# ============================================================================
+
+def _text_response(model: str, input_text: str) -> tuple[str, int, int, float]:
+    rng = seeded_rng("text", model, input_text)
+    target = sample_count(rng, settings.local_llm_output_tokens, settings.local_llm_output_tokens_stddev)
+    text = _sentences(rng, max(1, round(target * _WORDS_PER_TOKEN)))
+    output_tokens = count_tokens(text)
+    latency = llm_latency_profile().sample(rng, output_tokens)
+    return text, count_tokens(input_text), output_tokens, latency
+
+
+def _structured_response(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], int, int, float]:
+    json_schema = compile_schema(schema).json_schema
+    seed = ("structured", model, input_text, schema.__name__)
+
+    # Size string fields so the whole object lands near the sampled token count
+    rng = seeded_rng(*seed)
+    target = sample_count(rng, settings.local_llm_output_tokens, settings.local_llm_output_tokens_stddev)
+    skeleton = _SchemaSynthesizer(seeded_rng(*seed), json_schema, words_per_string=1)
+    skeleton.build()
+    words = max(2, round(target * _WORDS_PER_TOKEN / max(1, skeleton.string_count)))
+
+    parsed = _SchemaSynthesizer(seeded_rng(*seed), json_schema, words_per_string=words).build()
+    output_tokens = count_tokens(json.dumps(parsed, ensure_ascii=False))
+    latency = llm_latency_profile().sample(rng, output_tokens)
+    return parsed, count_tokens(input_text), output_tokens, latency
+
+
+def _stream_plan(model: str, input_text: str) -> list[tuple[str, float, tuple[int | None, int | None]]]:
+    text, input_tokens, output_tokens, _ = _text_response(model, input_text)
+    profile = llm_latency_profile()
+    rng = seeded_rng("stream", model, input_text)
+    words = text.split(" ")
+    chunks = [" ".join(words[i:i + 4]) + " " for i in range(0, len(words), 4)]
+    chunks[-1] = chunks[-1].rstrip()
+
+    plan: list[tuple[str, float, tuple[int | None, int | None]]] = []
+    for index, chunk in enumerate(chunks):
+        # Time to first token is the base latency; later chunks pay per-token cost only
+        delay = profile.sample(rng, count_tokens(chunk)) if index == 0 else (
+            profile.per_output_token_ms * count_tokens(chunk) / 1000.0
+        )
+        plan.append((chunk, delay, (None, None)))
+    plan.append(("", 0.0, (input_tokens, output_tokens)))
+    return plan
+
+
+def _sentences(rng, word_count: int) -> str:
+    words: list[str] = []
+    sentence_length = 0
+    for _ in range(word_count):
+        word = rng.choice(_WORDS)
+        words.append(word.capitalize() if sentence_length == 0 else word)
+        sentence_length += 1
+        if sentence_length >= rng.randint(6, 14):
+            words[-1] += "."
+            sentence_length = 0
+    text = " ".join(words)
+    return text if text.endswith(".") else text + "."
+
+
+class _SchemaSynthesizer:
+    """Walks a JSON schema and builds a value that validates against it."""
+
+    def __init__(self, rng, root: dict[str, Any], words_per_string: int) -> None:
+        self.rng = rng
+        self.root = root
+        self.words_per_string = words_per_string
+        self.string_count = 0
+
+    def build(self) -> dict[str, Any]:
+        return self._value(self.root, name="", index=None)
+
+    def _resolve(self, node: dict[str, Any]) -> dict[str, Any]:
+        seen = 0
+        while "$ref" in node and seen < 32:
+            path = node["$ref"].lstrip("#/").split("/")
+            target: Any = self.root
+            for part in path:
+                target = target[part]
+            node = {**target, **{k: v for k, v in node.items() if k != "$ref"}}
+            seen += 1
+        return node
+
+    def _value(self, node: dict[str, Any], name: str, index: int | None) -> Any:
+        node = self._resolve(node)
+        if "const" in node:
+            return node["const"]
+        if node.get("enum"):
+            return self.rng.choice(node["enum"])
+        for key in ("anyOf", "oneOf"):
+            if key in node:
+                options = [o for o in node[key] if self._resolve(o).get("type") != "null"] or node[key]
+                return self._value(options[0], name, index)
+        if "allOf" in node:
+            merged: dict[str, Any] = {}
+            for part in node["allOf"]:
+                merged.update(self._resolve(part))
+            return self._value(merged, name, index)
+
+        kind = node.get("type")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "null")
+        if kind is None:
+            kind = "object" if "properties" in node else "string"
+
+        if kind == "object":
+            return {
+                key: self._value(prop, key, index)
+                for key, prop in (node.get("properties") or {}).items()
+            }
+        if kind == "array":
+            return [self._value(node.get("items") or {}, name, i) for i in range(self._array_length(node))]
+        if kind == "integer":
+            return int(self._number(node, name, index, integer=True))
+        if kind == "number":
+            return self._number(node, name, index, integer=False)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(node, name)
+
+    def _array_length(self, node: dict[str, Any]) -> int:
+        minimum = node.get("minItems", 0)
+        maximum = node.get("maxItems")
+        hint = _COUNT_HINT.search(node.get("description") or "")
+        if hint and int(hint.group(1)) <= _MAX_HINTED_ITEMS:
+            length = int(hint.group(1))
+        else:
+            length = settings.local_llm_array_items
+        length = max(minimum, length)
+        return min(maximum, length) if maximum is not None else length
+
+    def _number(self, node: dict[str, Any], name: str, index: int | None, integer: bool) -> float:
+        low = node.get("minimum", node.get("exclusiveMinimum", 0))
+        high = node.get("maximum", node.get("exclusiveMaximum", low + 100))
+        if "exclusiveMinimum" in node:
+            low += 1 if integer else 1e-6
+        if "exclusiveMaximum" in node:
+            high -= 1 if integer else 1e-6
+        if index is not None and (name.endswith("_number") or name in {"index", "number", "order"}):
+            value = index + 1  # Sequence fields inside arrays count from 1
+            return min(max(value, low), high)
+        return self.rng.randint(int(low), int(high)) if integer else round(self.rng.uniform(low, high), 3)
+
+    def _string(self, node: dict[str, Any], name: str) -> str:
+        fmt = node.get("format")
+        if fmt == "uuid" or name.endswith("_id") or name == "id":
+            return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+        if fmt == "date-time":
+            return datetime.fromtimestamp(self.rng.randint(1_600_000_000, 1_900_000_000), timezone.utc).isoformat()
+        if fmt == "date":
+            return date.fromordinal(self.rng.randint(737_000, 740_000)).isoformat()
+        if fmt == "email":
+            return f"user{self.rng.randint(1, 9999)}@example.com"
+
+        self.string_count += 1
+        text = _sentences(self.rng, self.words_per_string)
+        min_length = node.get("minLength", 0)
+        max_length = node.get("maxLength")
+        while len(text) < min_length:
+            text += " " + _sentences(self.rng, self.words_per_string)
+        if max_length is not None:
+            text = text[:max_length]
+        return text
@@ -3,63 +3,39 @@
 # ============================================================================
 
 import json
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 from pydantic import BaseModel
-from pathlib import Path
-import os
-from dotenv import load_dotenv
 
+from app.shared.providers.cassette import recorded
+from app.shared.providers.clients import get_async_openai_client, get_openai_client
 
+from .schema import compile_schema
+
+
+@recorded("openai", "llm.text")
 def openai_generate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
     """
     Generate text using OpenAI Responses API.
-    
+
     Args:
         model: OpenAI model name
         input_text: Input prompt text
-        
+
     Returns:
         Tuple of (output_text, input_tokens, output_tokens)
     """
-    # Load .env locally (no .env.example fallback)
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from openai import OpenAI
-
-    client = OpenAI()
+    client = get_openai_client()
 
     response = client.responses.create(
         model=model,
         input=input_text,
     )
-    
-    # Extract text from response
-    text = ""
-    if response.output and len(response.output) > 0:
-        # Find the message type item (skip reasoning items)
-        for output_item in response.output:
-            if hasattr(output_item, 'type') and output_item.type == 'message':
-                if hasattr(output_item, 'content') and output_item.content and len(output_item.content) > 0:
-                    for content_item in output_item.content:
-                        if hasattr(content_item, 'type') and content_item.type == 'output_text':
-                            if hasattr(content_item, 'text'):
-                                text = content_item.text
-                                break
-                break
-    
-    # Extract token usage
-    input_tokens = None
-    output_tokens = None
-    if hasattr(response, 'usage') and response.usage:
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-    
-    return text, input_tokens, output_tokens
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return _extract_output_text(response) or "", input_tokens, output_tokens
 
 
+@recorded("openai", "llm.structured")
 def openai_generate_structured(
     model: str,
     input_text: str,
@@ -67,72 +43,274 @@ def openai_generate_structured(
 ) -> tuple[dict[str, Any], int | None, int | None]:
     """
     Generate structured output using OpenAI Responses API with Pydantic schema.
-    
+
     Args:
         model: OpenAI model name
         input_text: Input prompt text
         schema: Pydantic model class for validation
-        
+
     Returns:
         Tuple of (parsed_dict, input_tokens, output_tokens)
     """
-    # Load .env locally (no .env.example fallback)
-    root = Path(__file__).resolve().parents[3]
-    env_path = root / ".env"
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=False)
-
-    from openai import OpenAI
-
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    # Get schema as JSON Schema for structured output
-    json_schema = schema.model_json_schema()
-    
-    # Ensure additionalProperties is false for OpenAI API
-    if "additionalProperties" not in json_schema:
-        json_schema["additionalProperties"] = False
-    
-    # Ensure all properties have additionalProperties: false
-    if "properties" in json_schema:
-        for prop_name, prop_schema in json_schema["properties"].items():
-            if isinstance(prop_schema, dict) and "additionalProperties" not in prop_schema:
-                prop_schema["additionalProperties"] = False
-    
+    client = get_openai_client()
+
     response = client.responses.create(
         model=model,
         input=input_text,
-        text={
-            "format": {
-                "type": "json_schema",
-                "name": "structured_output",
-                "schema": json_schema
-            }
-        }
+        text=_structured_text_format(schema),
+    )
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return _parse_json_output(response), input_tokens, output_tokens
+
+
+@recorded("openai", "llm.text")
+async def openai_agenerate_text(model: str, input_text: str) -> tuple[str, int | None, int | None]:
+    """Async variant of `openai_generate_text` using `AsyncOpenAI`."""
+    client = get_async_openai_client()
+
+    response = await client.responses.create(
+        model=model,
+        input=input_text,
     )
-    
-    # Extract parsed object from response
-    parsed_dict = {}
-    if response.output and len(response.output) > 0:
-        # Find the message type item (skip reasoning items)
-        for output_item in response.output:
-            if hasattr(output_item, 'type') and output_item.type == 'message':
-                if hasattr(output_item, 'content') and output_item.content and len(output_item.content) > 0:
-                    for content_item in output_item.content:
-                        if hasattr(content_item, 'type') and content_item.type == 'output_text':
-                            if hasattr(content_item, 'text'):
-                                try:
-                                    parsed_dict = json.loads(content_item.text)
-                                except json.JSONDecodeError:
-                                    parsed_dict = {}
-                                break
-                break
-    
-    # Extract token usage
-    input_tokens = None
-    output_tokens = None
-    if hasattr(response, 'usage') and response.usage:
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-    
-    return parsed_dict, input_tokens, output_tokens
\ No newline at end of file
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return _extract_output_text(response) or "", input_tokens, output_tokens
+
+
+@recorded("openai", "llm.structured")
+async def openai_agenerate_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> tuple[dict[str, Any], int | None, int | None]:
+    """Async variant of `openai_generate_structured` using `AsyncOpenAI`."""
+    client = get_async_openai_client()
+
+    response = await client.responses.create(
+        model=model,
+        input=input_text,
+        text=_structured_text_format(schema),
+    )
+
+    input_tokens, output_tokens = _extract_usage(response)
+    return _parse_json_output(response), input_tokens, output_tokens
+
+
+@recorded("openai", "llm.stream")
+def openai_stream_text(model: str, input_text: str) -> Iterator[tuple[str, int | None, int | None]]:
+    """
+    Stream text using OpenAI Responses API.
+
+    Args:
+        model: OpenAI model name
+        input_text: Input prompt text
+
+    Yields:
+        Tuples of (text_delta, input_tokens, output_tokens). Token counts are
+        None until the final `response.completed` event.
+    """
+    client = get_openai_client()
+
+    stream = client.responses.create(
+        model=model,
+        input=input_text,
+        stream=True,
+    )
+    for event in stream:
+        chunk = _stream_event_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+@recorded("openai", "llm.stream")
+async def openai_astream_text(model: str, input_text: str) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """Async variant of `openai_stream_text` using `AsyncOpenAI`."""
+    client = get_async_openai_client()
+
+    stream = await client.responses.create(
+        model=model,
+        input=input_text,
+        stream=True,
+    )
+    async for event in stream:
+        chunk = _stream_event_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+# Batch API status -> "pending" | "completed" | "failed"
+_BATCH_STATUS = {
+    "validating": "pending",
+    "in_progress": "pending",
+    "finalizing": "pending",
+    "cancelling": "pending",
+    "completed": "completed",
+    "failed": "failed",
+    "expired": "failed",
+    "cancelled": "failed",
+}
+
+
+@recorded("openai", "llm.structured_stream")
+async def openai_astream_structured(
+    model: str,
+    input_text: str,
+    schema: type[BaseModel],
+) -> AsyncIterator[tuple[str, int | None, int | None]]:
+    """
+    Stream structured output (raw JSON text deltas) using the Responses API.
+
+    Args:
+        model: OpenAI model name
+        input_text: Input prompt text
+        schema: Pydantic model class the JSON must match
+
+    Yields:
+        Tuples of (json_text_delta, input_tokens, output_tokens)
+    """
+    client = get_async_openai_client()
+
+    stream = await client.responses.create(
+        model=model,
+        input=input_text,
+        text=_structured_text_format(schema),
+        stream=True,
+    )
+    async for event in stream:
+        chunk = _stream_event_chunk(event)
+        if chunk is not None:
+            yield chunk
+
+
+def openai_submit_batch(
+    model: str,
+    requests: list[tuple[str, str, type[BaseModel]]],
+) -> str:
+    """
+    Submit structured requests to the OpenAI Batch API (`/v1/responses`).
+
+    Args:
+        model: OpenAI model name
+        requests: (custom_id, input_text, schema) per request
+
+    Returns:
+        Batch ID
+    """
+    client = get_openai_client()
+
+    lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {
+                "model": model,
+                "input": input_text,
+                "text": _structured_text_format(schema),
+            },
+        }, ensure_ascii=False)
+        for custom_id, input_text, schema in requests
+    ]
+    input_file = client.files.create(
+        file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def openai_batch_status(batch_id: str) -> str:
+    """Return "pending", "completed" or "failed" for an OpenAI batch."""
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    return _BATCH_STATUS.get(batch.status, "pending")
+
+
+def openai_batch_results(batch_id: str) -> dict[str, tuple[dict[str, Any] | None, int | None, int | None, str | None]]:
+    """
+    Download the results of a finished OpenAI batch.
+
+    Returns:
+        Mapping of custom_id to (parsed_dict, input_tokens, output_tokens, error)
+    """
+    from openai.types.responses import Response
+
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+
+    results: dict[str, tuple[dict[str, Any] | None, int | None, int | None, str | None]] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            custom_id = item["custom_id"]
+            response_body = (item.get("response") or {}).get("body") or {}
+            if item.get("error") or (item.get("response") or {}).get("status_code", 200) >= 400:
+                error = item.get("error") or response_body.get("error") or "request failed"
+                results[custom_id] = (None, None, None, json.dumps(error, ensure_ascii=False))
+                continue
+            response = Response.construct(**response_body)
+            input_tokens, output_tokens = _extract_usage(response)
+            results[custom_id] = (_parse_json_output(response), input_tokens, output_tokens, None)
+    return results
+
+
+def _stream_event_chunk(event: Any) -> tuple[str, int | None, int | None] | None:
+    event_type = getattr(event, "type", None)
+    if event_type == "response.output_text.delta":
+        return event.delta, None, None
+    if event_type == "response.completed":
+        input_tokens, output_tokens = _extract_usage(event.response)
+        return "", input_tokens, output_tokens
+    return None
+
+
+def _structured_text_format(schema: type[BaseModel]) -> dict[str, Any]:
+    """Build the Responses API `text` parameter for a JSON schema output."""
+    # Strict-mode normalized schema, compiled once per schema class
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": "structured_output",
+            "schema": compile_schema(schema, "openai").json_schema
+        }
+    }
+
+
+def _extract_output_text(response: Any) -> str | None:
+    """Return the first output_text of the message item (reasoning items are skipped)."""
+    if not response.output:
+        return None
+    for output_item in response.output:
+        if getattr(output_item, "type", None) != "message":
+            continue
+        for content_item in getattr(output_item, "content", None) or []:
+            if getattr(content_item, "type", None) == "output_text" and hasattr(content_item, "text"):
+                return content_item.text
+        break
+    return None
+
+
+def _parse_json_output(response: Any) -> dict[str, Any]:
+    text = _extract_output_text(response)
+    if text is None:
+        return {}
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+
+
+def _extract_usage(response: Any) -> tuple[int | None, int | None]:
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return None, None
+    return usage.input_tokens, usage.output_tokens
@@ -0,0 +1,202 @@
+"""
+Incremental JSON Parsing
+
+Parses a JSON document as it streams in and emits the elements of one array
+(e.g. `spreads` of a FinalScriptSchema) as soon as each element closes, so
+callers can act on spread 1 while spread 14 is still being generated.
+
+The parser is a small character-level state machine. It only tracks container
+nesting, object keys and string/escape state; completed elements are sliced
+from the buffer and decoded with `json.loads`. Anything before the first `{`
+or `[` (e.g. a Markdown code fence) is ignored.
+
+Usage:
+    parser = IncrementalJSONParser(item_path=("spreads",))
+    for delta in deltas:
+        for index, item in parser.feed(delta):
+            ...  # item is the decoded dict of spreads[index]
+    document = parser.close()
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class _Frame:
+    kind: str  # "object" | "array"
+    path: tuple[str, ...]
+    key: str | None = None  # Last key seen (objects)
+    expecting_key: bool = True  # Next string is a key (objects)
+    count: int = 0  # Elements started so far (arrays)
+
+
+@dataclass
+class IncrementalJSONParser:
+    """
+    Streaming parser that yields elements of the array at `item_path`.
+
+    Args:
+        item_path: Keys from the root to the target array, e.g. ("spreads",);
+            elements of an enclosing array are addressed with "[]"
+    """
+    item_path: tuple[str, ...]
+    _text: str = ""
+    _pos: int = 0
+    _root_start: int | None = None
+    _root_end: int | None = None
+    _stack: list[_Frame] = field(default_factory=list)
+    _in_string: bool = False
+    _escape: bool = False
+    _string_start: int = 0
+    _item_start: int | None = None
+    _item_index: int = 0
+    _emitted: int = 0
+
+    @property
+    def emitted(self) -> int:
+        """Number of target elements emitted so far."""
+        return self._emitted
+
+    def feed(self, delta: str) -> list[tuple[int, Any]]:
+        """
+        Consume more text.
+
+        Returns:
+            (index, decoded element) for every target element completed by `delta`
+        """
+        if not delta or self._root_end is not None:
+            return []
+        self._text += delta
+        completed: list[tuple[int, Any]] = []
+        text = self._text
+        i = self._pos
+        while i < len(text):
+            char = text[i]
+            if self._root_start is None:
+                if char in "{[":
+                    self._root_start = i
+                    self._open(char)
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_string(text, i)
+                i += 1
+                continue
+
+            if char == '"':
+                self._begin_value(i)
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._begin_value(i)
+                self._open(char)
+            elif char in "}]":
+                item = self._close(text, i)
+                if item is not None:
+                    completed.append(item)
+                if not self._stack:
+                    self._root_end = i + 1
+                    i += 1
+                    break
+            elif char == ":":
+                if self._stack and self._stack[-1].kind == "object":
+                    self._stack[-1].expecting_key = False
+            elif char == ",":
+                frame = self._stack[-1] if self._stack else None
+                if frame is not None and frame.kind == "object":
+                    frame.expecting_key = True
+                item = self._finish_scalar_item(text, i)
+                if item is not None:
+                    completed.append(item)
+            elif not char.isspace():
+                self._begin_value(i)
+            i += 1
+        self._pos = i
+        return completed
+
+    def close(self) -> Any:
+        """
+        Decode the complete document.
+
+        Raises:
+            json.JSONDecodeError: If the stream ended before the document closed
+        """
+        if self._root_start is None:
+            raise json.JSONDecodeError("No JSON document in stream", self._text, 0)
+        end = self._root_end if self._root_end is not None else len(self._text)
+        return json.loads(self._text[self._root_start:end])
+
+    # ------------------------------------------------------------------
+    # State machine helpers
+    # ------------------------------------------------------------------
+
+    def _value_path(self) -> tuple[str, ...]:
+        if not self._stack:
+            return ()
+        frame = self._stack[-1]
+        if frame.kind == "object":
+            return frame.path + (frame.key or "",)
+        return frame.path + ("[]",)
+
+    def _in_target_array(self) -> bool:
+        return (
+            bool(self._stack)
+            and self._stack[-1].kind == "array"
+            and self._stack[-1].path == self.item_path
+        )
+
+    def _begin_value(self, index: int) -> None:
+        """Mark the start of a value; records where target elements begin."""
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if frame.kind == "object" and frame.expecting_key:
+            return  # An object key, not a value
+        if self._in_target_array() and self._item_start is None:
+            self._item_start = index
+            self._item_index = frame.count
+            frame.count += 1
+
+    def _open(self, char: str) -> None:
+        # A container's path is the keys leading to it; array elements add "[]"
+        self._stack.append(_Frame("object" if char == "{" else "array", self._value_path()))
+
+    def _close_string(self, text: str, index: int) -> None:
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame.kind == "object" and frame.expecting_key:
+            frame.key = json.loads(text[self._string_start:index + 1])
+
+    def _close(self, text: str, index: int) -> tuple[int, Any] | None:
+        item = self._finish_scalar_item(text, index)
+        self._stack.pop()
+        if item is not None:
+            return item
+        if self._in_target_array() and self._item_start is not None:
+            return self._emit(text, index + 1)
+        return None
+
+    def _finish_scalar_item(self, text: str, index: int) -> tuple[int, Any] | None:
+        """Emit a scalar element of the target array ending at a `,` or `]`."""
+        if not self._in_target_array() or self._item_start is None:
+            return None
+        return self._emit(text, index)
+
+    def _emit(self, text: str, end: int) -> tuple[int, Any]:
+        raw = text[self._item_start:end]
+        self._item_start = None
+        self._emitted += 1
+        return self._item_index, json.loads(raw)
+
+
+__all__ = ["IncrementalJSONParser"]
@@ -0,0 +1,169 @@
+"""
+LLM Request Routing - hedging and failover across providers
+
+A `RoutePolicy` is looked up by `usage_metadata["service"]` (see
+`LLM_ROUTING_POLICIES` in llm_config.py). The caller's provider/model is the
+primary leg and the policy's fallbacks are secondary legs.
+
+- Async calls hedge: if the primary has not answered after `hedge_after`
+  seconds, the next leg is fired as well. The first valid result wins and the
+  remaining legs are cancelled.
+- Any failed leg immediately fails over to the next one.
+- Sync calls only fail over (a blocking SDK call in a thread cannot be cancelled).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Generic, Sequence, TypeVar
+
+from app.core.config import settings
+
+from .llm_config import LLM_ROUTING_POLICIES
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RouteLeg:
+    """One provider/model pair a request can be sent to."""
+    provider: str
+    model: str
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Secondary legs and hedge delay for a service."""
+    fallbacks: tuple[RouteLeg, ...] = ()
+    hedge_after: float | None = None  # Seconds; None = failover only
+
+    def legs(self, primary: RouteLeg) -> list[RouteLeg]:
+        """Primary leg followed by fallbacks, without duplicates."""
+        legs = [primary]
+        for leg in self.fallbacks:
+            if leg not in legs:
+                legs.append(leg)
+        return legs
+
+
+@dataclass
+class RouteOutcome(Generic[T]):
+    """Winning result of a routed call."""
+    result: T
+    leg: RouteLeg
+    leg_index: int  # 0 = primary
+    attempted: int  # Number of legs that were started
+
+
+@lru_cache(maxsize=256)
+def get_route_policy(service: str | None) -> RoutePolicy | None:
+    """
+    Resolve the routing policy for a service key.
+
+    Keys are matched on dotted prefixes, so a policy for "storybook.bible"
+    also covers "storybook.bible.full_generation". The most specific key wins.
+
+    Returns:
+        RoutePolicy, or None if routing is disabled or no policy matches
+    """
+    if not service or not settings.llm_routing_enabled:
+        return None
+
+    parts = service.split(".")
+    for end in range(len(parts), 0, -1):
+        config = LLM_ROUTING_POLICIES.get(".".join(parts[:end]))
+        if config is not None:
+            return RoutePolicy(
+                fallbacks=tuple(RouteLeg(provider, model) for provider, model in config.get("fallbacks", ())),
+                hedge_after=config.get("hedge_after"),
+            )
+    return None
+
+
+def run_with_failover(
+    legs: Sequence[RouteLeg],
+    call: Callable[[RouteLeg], T],
+) -> RouteOutcome[T]:
+    """
+    Try legs in order until one succeeds.
+
+    Raises:
+        The primary leg's exception if every leg fails
+    """
+    errors: list[Exception] = []
+    for index, leg in enumerate(legs):
+        try:
+            return RouteOutcome(result=call(leg), leg=leg, leg_index=index, attempted=index + 1)
+        except Exception as e:
+            errors.append(e)
+    raise errors[0]
+
+
+async def arun_hedged(
+    legs: Sequence[RouteLeg],
+    call: Callable[[RouteLeg], Awaitable[T]],
+    hedge_after: float | None = None,
+) -> RouteOutcome[T]:
+    """
+    Race legs with staggered starts; return the first success and cancel the rest.
+
+    The next leg starts when `hedge_after` elapses without a result, or as soon
+    as a running leg fails.
+
+    Raises:
+        The primary leg's exception if every leg fails
+    """
+    pending: dict[asyncio.Task, int] = {}
+    errors: dict[int, BaseException] = {}
+    next_index = 0
+
+    def launch() -> None:
+        nonlocal next_index
+        task = asyncio.create_task(call(legs[next_index]))
+        pending[task] = next_index
+        next_index += 1
+
+    launch()
+    try:
+        while pending:
+            can_hedge = hedge_after is not None and next_index < len(legs)
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=hedge_after if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                launch()
+                continue
+
+            failed = False
+            for task in sorted(done, key=pending.__getitem__):
+                index = pending.pop(task)
+                error = task.exception()
+                if error is None:
+                    return RouteOutcome(
+                        result=task.result(), leg=legs[index], leg_index=index, attempted=next_index
+                    )
+                errors[index] = error
+                failed = True
+            if failed and next_index < len(legs):
+                launch()
+
+        raise errors[min(errors)]
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+__all__ = [
+    "RouteLeg",
+    "RoutePolicy",
+    "RouteOutcome",
+    "get_route_policy",
+    "run_with_failover",
+    "arun_hedged",
+]
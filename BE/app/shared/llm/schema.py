@@ -0,0 +1,112 @@
+"""
+Structured Output Schema Compilation
+
+Converts Pydantic models into provider-ready JSON Schema once per
+(schema class, provider) and memoizes the result, instead of calling
+`model_json_schema()` and re-patching it on every request.
+
+Compiled forms:
+- "openai": recursive strict-mode normalization. Every object schema,
+  including nested `$defs` entries, array items and union branches, gets
+  `additionalProperties: false` and lists all of its properties as required.
+- "claude": the raw schema plus a compact serialization for prompt embedding.
+- "raw": the raw schema, used for fingerprints (e.g. response cache keys).
+
+The compiled `json_schema` dict is shared between callers; treat it as read-only.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """Provider-ready JSON Schema for a Pydantic model."""
+    json_schema: dict[str, Any]
+    compact_json: str
+    fingerprint: str
+
+
+# Keys whose values are a single subschema
+_SUBSCHEMA_KEYS = ("items", "additionalItems", "contains", "not", "if", "then", "else")
+# Keys whose values are a list of subschemas
+_SUBSCHEMA_LIST_KEYS = ("anyOf", "allOf", "oneOf", "prefixItems")
+# Keys whose values map names to subschemas
+_SUBSCHEMA_MAP_KEYS = ("properties", "$defs", "definitions", "patternProperties")
+
+
+def _normalize_strict(node: Any) -> None:
+    """Apply OpenAI strict-mode object rules to every object schema in place."""
+    if isinstance(node, list):
+        for item in node:
+            _normalize_strict(item)
+        return
+    if not isinstance(node, dict):
+        return
+
+    properties = node.get("properties")
+    if node.get("type") == "object" or isinstance(properties, dict):
+        node["additionalProperties"] = False
+        if isinstance(properties, dict):
+            node["required"] = list(properties.keys())
+
+    for key in _SUBSCHEMA_KEYS:
+        if key in node:
+            _normalize_strict(node[key])
+    for key in _SUBSCHEMA_LIST_KEYS:
+        if key in node:
+            _normalize_strict(node[key])
+    for key in _SUBSCHEMA_MAP_KEYS:
+        if isinstance(node.get(key), dict):
+            for subschema in node[key].values():
+                _normalize_strict(subschema)
+
+
+def _compact(json_schema: dict[str, Any]) -> str:
+    return json.dumps(json_schema, separators=(",", ":"), ensure_ascii=False)
+
+
+@lru_cache(maxsize=128)
+def compile_schema(schema: type[BaseModel], provider: str = "raw") -> CompiledSchema:
+    """
+    Compile a Pydantic model for the given provider (memoized).
+
+    Args:
+        schema: Pydantic model class
+        provider: "openai", "claude", "google" or "raw"
+
+    Returns:
+        CompiledSchema with the schema dict, its compact JSON and a fingerprint
+
+    Raises:
+        ValueError: If the provider is unknown
+    """
+    if provider not in {"openai", "claude", "google", "raw"}:
+        raise ValueError(f"Unsupported schema provider: {provider}")
+
+    json_schema = copy.deepcopy(schema.model_json_schema())
+    if provider == "openai":
+        _normalize_strict(json_schema)
+
+    canonical = json.dumps(json_schema, sort_keys=True, separators=(",", ":"))
+    return CompiledSchema(
+        json_schema=json_schema,
+        compact_json=_compact(json_schema),
+        fingerprint=hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16],
+    )
+
+
+def clear_schema_cache() -> None:
+    """Drop memoized schemas (e.g. after hot-reloading model definitions)."""
+    compile_schema.cache_clear()
+
+
+__all__ = ["CompiledSchema", "compile_schema", "clear_schema_cache"]
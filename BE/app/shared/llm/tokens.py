@@ -0,0 +1,168 @@
+"""
+Token Estimation
+
+Local token counts for pre-flight budget checks (rate-limit admission) and as
+the billing fallback when a provider does not report usage.
+
+Estimators:
+- "tiktoken": BPE encoder (`o200k_base` by default). The encoder is loaded once
+  and cached. tiktoken is an optional dependency, and loading the encoder may
+  need a one-time download, so failures fall back to the heuristic.
+- "heuristic": script-aware character heuristic. ASCII text counts as ~4
+  characters per token. Hangul syllables and other CJK characters count as
+  roughly one token each, where the old `len/4` rule under-counted Korean
+  prompts by 3-4x.
+- "auto" (default): tiktoken when available, otherwise the heuristic.
+
+Select with `LLM_TOKEN_ESTIMATOR`, or register a custom estimator with
+`register_token_estimator`.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from functools import lru_cache
+from typing import Callable, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenEstimator(Protocol):
+    """Counts tokens for a piece of text."""
+
+    name: str
+
+    def count(self, text: str) -> int: ...
+
+
+# Tokens per character by script, calibrated against o200k_base
+_ASCII_TOKENS_PER_CHAR = 0.25
+_HANGUL_TOKENS_PER_CHAR = 0.8
+_CJK_TOKENS_PER_CHAR = 1.0
+_OTHER_TOKENS_PER_CHAR = 0.5
+
+
+def _is_hangul(code: int) -> bool:
+    return (
+        0xAC00 <= code <= 0xD7A3  # Syllables
+        or 0x1100 <= code <= 0x11FF  # Jamo
+        or 0x3130 <= code <= 0x318F  # Compatibility Jamo
+    )
+
+
+def _is_cjk(code: int) -> bool:
+    return (
+        0x4E00 <= code <= 0x9FFF  # CJK Unified Ideographs
+        or 0x3040 <= code <= 0x30FF  # Hiragana / Katakana
+        or 0x3000 <= code <= 0x303F  # CJK punctuation
+        or 0xFF00 <= code <= 0xFFEF  # Full-width forms
+    )
+
+
+class HeuristicEstimator:
+    """Script-aware character heuristic (no dependencies)."""
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        ascii_chars = hangul = cjk = other = 0
+        for char in text:
+            code = ord(char)
+            if code < 128:
+                ascii_chars += 1
+            elif _is_hangul(code):
+                hangul += 1
+            elif _is_cjk(code):
+                cjk += 1
+            else:
+                other += 1
+        tokens = (
+            ascii_chars * _ASCII_TOKENS_PER_CHAR
+            + hangul * _HANGUL_TOKENS_PER_CHAR
+            + cjk * _CJK_TOKENS_PER_CHAR
+            + other * _OTHER_TOKENS_PER_CHAR
+        )
+        return max(1, math.ceil(tokens))
+
+
+class TiktokenEstimator:
+    """BPE token counts from tiktoken."""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding: str = "o200k_base") -> None:
+        self.encoding_name = encoding
+        self._encoder = _load_encoder(encoding)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._encoder.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=4)
+def _load_encoder(encoding: str):
+    import tiktoken
+
+    return tiktoken.get_encoding(encoding)
+
+
+_custom_estimators: dict[str, Callable[[], TokenEstimator]] = {}
+_estimator: TokenEstimator | None = None
+_estimator_lock = threading.Lock()
+
+
+def register_token_estimator(name: str, factory: Callable[[], TokenEstimator]) -> None:
+    """Register an estimator selectable via `LLM_TOKEN_ESTIMATOR=<name>`."""
+    global _estimator
+    with _estimator_lock:
+        _custom_estimators[name] = factory
+        _estimator = None
+
+
+def _build_estimator(name: str) -> TokenEstimator:
+    if name in _custom_estimators:
+        return _custom_estimators[name]()
+    if name == "heuristic":
+        return HeuristicEstimator()
+    if name in {"tiktoken", "auto"}:
+        try:
+            return TiktokenEstimator(settings.llm_tiktoken_encoding)
+        except Exception as e:
+            log = logger.warning if name == "tiktoken" else logger.info
+            log("tiktoken estimator unavailable, using heuristic: %s", e)
+            return HeuristicEstimator()
+    raise ValueError(f"Unknown token estimator: {name}")
+
+
+def get_token_estimator() -> TokenEstimator:
+    """Return the process-wide estimator selected by settings (built once)."""
+    global _estimator
+    if _estimator is None:
+        with _estimator_lock:
+            if _estimator is None:
+                _estimator = _build_estimator(settings.llm_token_estimator)
+    return _estimator
+
+
+def count_tokens(text: str) -> int:
+    """Estimate the token count of `text` with the configured estimator."""
+    if not text:
+        return 0
+    return get_token_estimator().count(text)
+
+
+__all__ = [
+    "TokenEstimator",
+    "HeuristicEstimator",
+    "TiktokenEstimator",
+    "register_token_estimator",
+    "get_token_estimator",
+    "count_tokens",
+]
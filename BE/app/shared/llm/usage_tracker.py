@@ -1,15 +1,38 @@
 """
 LLM 사용량 기록 모듈.
 
-단일 함수에서 토큰 합계 산출 및 프로필 크레딧 업데이트를 처리한다.
+토큰 합계 산출과 프로필 크레딧 업데이트를 처리한다.
+
+기본은 write-behind 방식이다. 호출마다 DB 를 치지 않고 프로세스 내
+`UsageAccumulator` 에 사용자별 토큰 증가분을 합산해 두었다가,
+`USAGE_FLUSH_INTERVAL_MS` 마다 또는 `USAGE_FLUSH_MAX_EVENTS` 건이 쌓이면
+일괄 RPC 한 번과 원장(ledger) insert 한 번으로 반영한다.
+
+- DB 에 닿지 못하면 반영하지 못한 증가분/원장 행을 로컬 스풀 파일
+  (`USAGE_SPOOL_PATH`)에 남기고, 다음 flush 때 다시 시도한다.
+- 종료 시(lifespan 종료, atexit) 남은 증가분을 flush 한다.
+- `USAGE_WRITE_BEHIND_ENABLED=false` 이면 호출마다 즉시 반영한다.
 """
 
 from __future__ import annotations
 
+import atexit
+import json
 import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any, Mapping
 
-from app.shared.database.profile_repository import increment_credits_used
+from app.core.config import settings
+from app.shared.database.profile_repository import (
+    PartialCreditUpdateError,
+    increment_credits_used,
+    increment_credits_used_bulk,
+)
+from app.shared.database.usage_ledger_repository import insert_usage_ledger_rows
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +43,241 @@ def _normalize_tokens(value: int | None) -> int:
     return max(0, int(value))
 
 
+def _json_safe(metadata: Mapping[str, Any] | None) -> dict[str, Any]:
+    if not metadata:
+        return {}
+    return json.loads(json.dumps(dict(metadata), ensure_ascii=False, default=str))
+
+
+class UsageAccumulator:
+    """
+    사용자별 토큰 증가분과 원장 행을 모았다가 일괄 반영하는 write-behind 버퍼.
+
+    add() 는 잠금 하나만 잡고 즉시 반환한다. 실제 DB 반영은 백그라운드
+    스레드(또는 flush() 직접 호출)가 수행한다.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        flush_max_events: int,
+        spool_path: str | os.PathLike[str] | None = None,
+        ledger_enabled: bool = True,
+    ) -> None:
+        self.flush_interval = max(0.01, flush_interval)
+        self.flush_max_events = max(1, flush_max_events)
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.ledger_enabled = ledger_enabled
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._deltas: dict[str, int] = {}
+        self._ledger: list[dict[str, Any]] = []
+        self._events = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: threading.Thread | None = None
+        self._stats = {"events": 0, "flushes": 0, "failed_flushes": 0, "spooled_batches": 0}
+
+    def add(self, user_id: str, tokens: int, ledger_row: dict[str, Any] | None = None) -> None:
+        """사용량 한 건을 버퍼에 합산한다."""
+        with self._lock:
+            self._deltas[user_id] = self._deltas.get(user_id, 0) + tokens
+            if ledger_row is not None and self.ledger_enabled:
+                self._ledger.append(ledger_row)
+            self._events += 1
+            self._stats["events"] += 1
+            full = self._events >= self.flush_max_events
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def pending(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._deltas),
+                "tokens": sum(self._deltas.values()),
+                "ledger_rows": len(self._ledger),
+                "events": self._events,
+            }
+
+    def flush(self) -> bool:
+        """
+        버퍼와 스풀 파일의 증가분을 DB 에 반영한다.
+
+        Returns:
+            모든 항목이 반영되었으면 True, 일부가 스풀로 남았으면 False
+        """
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._deltas = self._deltas, {}
+                ledger, self._ledger = self._ledger, []
+                self._events = 0
+
+            spooled_deltas, spooled_ledger = self._read_spool()
+            for user_id, amount in spooled_deltas.items():
+                deltas[user_id] = deltas.get(user_id, 0) + amount
+            ledger = spooled_ledger + ledger
+            if not deltas and not ledger:
+                return True
+
+            failed_deltas: dict[str, int] = {}
+            failed_ledger: list[dict[str, Any]] = []
+            try:
+                increment_credits_used_bulk(deltas)
+            except PartialCreditUpdateError as exc:
+                # 성공한 사용자까지 다시 스풀하면 다음 flush 에서 이중 청구된다.
+                logger.warning("Failed to flush LLM credit usage for %d users: %s", len(exc.failed_user_ids), exc)
+                failed_deltas = {
+                    user_id: amount for user_id, amount in deltas.items() if user_id in exc.failed_user_ids
+                }
+            except Exception as exc:
+                logger.warning("Failed to flush LLM credit usage for %d users: %s", len(deltas), exc)
+                failed_deltas = deltas
+            if ledger:
+                try:
+                    insert_usage_ledger_rows(ledger)
+                except Exception as exc:
+                    logger.warning("Failed to insert %d usage ledger rows: %s", len(ledger), exc)
+                    failed_ledger = ledger
+
+            self._stats["flushes"] += 1
+            self._write_spool(failed_deltas, failed_ledger)
+            if failed_deltas or failed_ledger:
+                self._stats["failed_flushes"] += 1
+                return False
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, **{f"pending_{k}": v for k, v in self.pending().items()}}
+
+    def close(self) -> None:
+        """워커를 멈추고 남은 증가분을 flush 한다."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join(timeout=5)
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # 내부 구현
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name="llm-usage-flush", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.flush()
+            except Exception as exc:  # pragma: no cover - 워커는 죽지 않아야 한다
+                logger.warning("LLM usage flush failed: %s", exc)
+
+    def _read_spool(self) -> tuple[dict[str, int], list[dict[str, Any]]]:
+        if self.spool_path is None or not self.spool_path.exists():
+            return {}, []
+        deltas: dict[str, int] = {}
+        ledger: list[dict[str, Any]] = []
+        try:
+            for line in self.spool_path.read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                for user_id, amount in (entry.get("deltas") or {}).items():
+                    deltas[user_id] = deltas.get(user_id, 0) + int(amount)
+                ledger.extend(entry.get("ledger") or [])
+            # 읽은 항목은 이번 flush 가 책임진다. 실패분은 _write_spool 로 다시 기록된다.
+            self.spool_path.unlink()
+        except Exception as exc:
+            logger.warning("Failed to read usage spool %s: %s", self.spool_path, exc)
+            return {}, []
+        return deltas, ledger
+
+    def _write_spool(self, deltas: dict[str, int], ledger: list[dict[str, Any]]) -> None:
+        if not deltas and not ledger:
+            return
+        if self.spool_path is None:
+            logger.error(
+                "Dropping unflushed LLM usage (no spool configured): %d users, %d ledger rows",
+                len(deltas),
+                len(ledger),
+            )
+            return
+        try:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spool_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"deltas": deltas, "ledger": ledger}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._stats["spooled_batches"] += 1
+        except Exception as exc:
+            logger.error("Failed to spool unflushed LLM usage to %s: %s", self.spool_path, exc)
+
+
+_accumulator: UsageAccumulator | None = None
+_accumulator_lock = threading.Lock()
+
+
+def get_usage_accumulator() -> UsageAccumulator:
+    """설정값으로 구성된 프로세스 전역 accumulator 를 반환한다."""
+    global _accumulator
+    if _accumulator is None:
+        with _accumulator_lock:
+            if _accumulator is None:
+                _accumulator = UsageAccumulator(
+                    flush_interval=settings.usage_flush_interval_ms / 1000.0,
+                    flush_max_events=settings.usage_flush_max_events,
+                    spool_path=settings.usage_spool_path or None,
+                    ledger_enabled=settings.usage_ledger_enabled,
+                )
+                atexit.register(_accumulator.close)
+    return _accumulator
+
+
+def flush_llm_usage() -> bool:
+    """남은 사용량을 즉시 반영한다 (종료 훅, 배치 스크립트용)."""
+    if _accumulator is None:
+        return True
+    return _accumulator.flush()
+
+
+def get_llm_usage_stats() -> dict[str, Any]:
+    """write-behind 버퍼의 누적 이벤트/flush 횟수와 대기 중인 항목 수."""
+    if _accumulator is None:
+        return {}
+    return _accumulator.stats()
+
+
+def _ledger_row(
+    user_id: str,
+    provider: str | None,
+    model: str | None,
+    input_tokens: int,
+    output_tokens: int,
+    metadata: Mapping[str, Any] | None,
+) -> dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "provider": provider,
+        "model": model,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "metadata": _json_safe(metadata),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "recorded_at_ms": int(time.time() * 1000),
+    }
+
+
 def record_llm_usage(
     *,
     user_id: str | None,
@@ -34,19 +292,29 @@ def record_llm_usage(
 
     Args:
         user_id: 토큰 사용을 청구할 사용자 ID. 없으면 기록하지 않는다.
-        provider: 사용된 LLM 공급자 (로깅용).
-        model: 사용된 모델 식별자 (로깅용).
+        provider: 사용된 LLM 공급자.
+        model: 사용된 모델 식별자.
         input_tokens: 프롬프트 토큰 수.
         output_tokens: 생성 토큰 수.
-        metadata: 호출 컨텍스트 (storybook_id 등) - 현재는 로깅에만 활용.
+        metadata: 호출 컨텍스트 (storybook_id, service 등) - 원장 행에 함께 저장된다.
     """
     if not user_id:
         return
 
-    total_tokens = _normalize_tokens(input_tokens) + _normalize_tokens(output_tokens)
+    input_count = _normalize_tokens(input_tokens)
+    output_count = _normalize_tokens(output_tokens)
+    total_tokens = input_count + output_count
     if total_tokens <= 0:
         return
 
+    if settings.usage_write_behind_enabled:
+        get_usage_accumulator().add(
+            user_id,
+            total_tokens,
+            _ledger_row(user_id, provider, model, input_count, output_count, metadata),
+        )
+        return
+
     try:
         increment_credits_used(user_id, total_tokens)
     except Exception as exc:  # pragma: no cover - Supabase 오류 대비
@@ -61,6 +329,10 @@ def record_llm_usage(
         )
 
 
-__all__ = ["record_llm_usage"]
-
-
+__all__ = [
+    "UsageAccumulator",
+    "get_usage_accumulator",
+    "flush_llm_usage",
+    "get_llm_usage_stats",
+    "record_llm_usage",
+]
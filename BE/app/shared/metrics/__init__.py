@@ -0,0 +1,42 @@
+"""
+Metrics
+
+In-process counters and fixed-bucket histograms for LLM and image calls,
+exposed at `/metrics` in the Prometheus text format.
+
+Usage:
+    from app.shared.metrics import get_metrics_registry, track_llm_call
+
+    with track_llm_call("openai", "gpt-5-mini", {"service": "storybook.draft"}):
+        ...  # Latency and error class are recorded per provider/model/service
+
+    print(get_metrics_registry().render())
+"""
+
+from .registry import (
+    DEFAULT_LATENCY_BUCKETS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+)
+from .instruments import (
+    get_metrics_registry,
+    record_llm_cache_lookup,
+    record_llm_tokens,
+    service_label,
+    track_image_call,
+    track_llm_call,
+)
+
+__all__ = [
+    "DEFAULT_LATENCY_BUCKETS",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "record_llm_cache_lookup",
+    "record_llm_tokens",
+    "service_label",
+    "track_image_call",
+    "track_llm_call",
+]
@@ -0,0 +1,32 @@
+"""
+Metrics endpoint
+
+`GET /metrics` serves the registry in the Prometheus text format. Scrapers
+must send `Authorization: Bearer <METRICS_TOKEN>`; without a token configured
+the endpoint is only served in DEBUG and answers 404 otherwise.
+"""
+
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+
+from .instruments import get_metrics_registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: str | None = Header(default=None)):
+    """Render all metrics for a Prometheus scrape."""
+    if not settings.metrics_token and not settings.debug:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.metrics_token:
+        expected = f"Bearer {settings.metrics_token}"
+        if not authorization or not hmac.compare_digest(authorization, expected):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,244 @@
+"""
+LLM and Image Instruments
+
+The series recorded by `app.shared.llm` and `app.shared.image`, plus
+scrape-time collectors for the stats the provider layer already tracks.
+
+Series:
+- llm_request_duration_seconds{provider,model,service}: provider call latency
+  (cache hits are not observed)
+- llm_tokens_total{provider,model,service,direction}: billed input/output tokens
+- llm_errors_total{provider,model,service,error}: failed calls by error class
+- llm_cache_lookups_total{service,result}: response cache hits and misses
+- image_request_duration_seconds{provider,model,operation}
+- image_bytes_total{provider,model,operation}: bytes of generated images
+- image_errors_total{provider,model,operation,error}
+
+`service` is the `usage_metadata["service"]` tag (e.g. "storybook.bible.full_generation"),
+so latency can be split by storybook stage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Mapping
+
+from .registry import DEFAULT_LATENCY_BUCKETS, MetricsRegistry, Sample
+
+UNKNOWN_SERVICE = "unknown"
+
+
+@lru_cache(maxsize=1)
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide registry with the default collectors installed."""
+    registry = MetricsRegistry()
+    registry.register_collector("llm_cache", _collect_llm_cache)
+    registry.register_collector("llm_usage", _collect_llm_usage)
+    registry.register_collector("provider_pools", _collect_client_pools)
+    registry.register_collector("rate_limits", _collect_rate_limits)
+    registry.register_collector("circuit_breakers", _collect_circuit_breakers)
+    registry.register_collector("cassettes", _collect_cassettes)
+    registry.register_collector("jobs", _collect_jobs)
+    registry.register_collector("events", _collect_events)
+    return registry
+
+
+def _registry() -> MetricsRegistry:
+    return get_metrics_registry()
+
+
+def llm_latency():
+    return _registry().histogram(
+        "llm_request_duration_seconds",
+        "LLM provider call latency in seconds",
+        ("provider", "model", "service"),
+        buckets=DEFAULT_LATENCY_BUCKETS,
+    )
+
+
+def llm_tokens():
+    return _registry().counter(
+        "llm_tokens_total",
+        "Billed LLM tokens",
+        ("provider", "model", "service", "direction"),
+    )
+
+
+def llm_errors():
+    return _registry().counter(
+        "llm_errors_total",
+        "Failed LLM calls by error class",
+        ("provider", "model", "service", "error"),
+    )
+
+
+def llm_cache_lookups():
+    return _registry().counter(
+        "llm_cache_lookups_total",
+        "LLM response cache lookups",
+        ("service", "result"),
+    )
+
+
+def image_latency():
+    return _registry().histogram(
+        "image_request_duration_seconds",
+        "Image provider call latency in seconds",
+        ("provider", "model", "operation"),
+        buckets=DEFAULT_LATENCY_BUCKETS,
+    )
+
+
+def image_bytes():
+    return _registry().counter(
+        "image_bytes_total",
+        "Bytes of generated images",
+        ("provider", "model", "operation"),
+    )
+
+
+def image_errors():
+    return _registry().counter(
+        "image_errors_total",
+        "Failed image calls by error class",
+        ("provider", "model", "operation", "error"),
+    )
+
+
+def service_label(usage_metadata: Mapping[str, Any] | None) -> str:
+    return str((usage_metadata or {}).get("service") or UNKNOWN_SERVICE)
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str, usage_metadata: Mapping[str, Any] | None) -> Iterator[None]:
+    """
+    Time one LLM provider call and count its failure, if any.
+
+    Works around `await` and stream loops too. Cancelled calls (e.g. losing
+    hedge legs) and abandoned streams are neither timed nor counted as errors.
+    """
+    service = service_label(usage_metadata)
+    start = time.perf_counter()
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        raise
+    except BaseException as e:
+        llm_errors().inc(provider=provider, model=model, service=service, error=type(e).__name__)
+        llm_latency().observe(time.perf_counter() - start, provider=provider, model=model, service=service)
+        raise
+    llm_latency().observe(time.perf_counter() - start, provider=provider, model=model, service=service)
+
+
+def record_llm_tokens(
+    provider: str,
+    model: str,
+    usage_metadata: Mapping[str, Any] | None,
+    input_tokens: int | None,
+    output_tokens: int | None,
+) -> None:
+    service = service_label(usage_metadata)
+    counter = llm_tokens()
+    counter.inc(max(0, input_tokens or 0), provider=provider, model=model, service=service, direction="input")
+    counter.inc(max(0, output_tokens or 0), provider=provider, model=model, service=service, direction="output")
+
+
+def record_llm_cache_lookup(usage_metadata: Mapping[str, Any] | None, hit: bool) -> None:
+    llm_cache_lookups().inc(service=service_label(usage_metadata), result="hit" if hit else "miss")
+
+
+@contextmanager
+def track_image_call(provider: str, model: str, operation: str) -> Iterator[dict[str, int]]:
+    """
+    Time one image call. Set `info["bytes"]` inside the block to count the image size.
+    """
+    info = {"bytes": 0}
+    start = time.perf_counter()
+    try:
+        yield info
+    except BaseException as e:
+        image_errors().inc(provider=provider, model=model, operation=operation, error=type(e).__name__)
+        raise
+    finally:
+        image_latency().observe(time.perf_counter() - start, provider=provider, model=model, operation=operation)
+    image_bytes().inc(info["bytes"], provider=provider, model=model, operation=operation)
+
+
+# ----------------------------------------------------------------------------
+# Scrape-time collectors
+# ----------------------------------------------------------------------------
+
+def _stats_samples(prefix: str, label: str, stats_by_key: Mapping[str, Mapping[str, Any]]) -> Iterable[Sample]:
+    """Flatten {key: {field: value}} stats into gauges; strings become a labelled 1."""
+    for key, stats in stats_by_key.items():
+        for field, value in stats.items():
+            if isinstance(value, (bool, int, float)):
+                yield f"{prefix}_{field}", {label: key}, float(value)
+            elif isinstance(value, str):
+                yield f"{prefix}_{field}", {label: key, field: value}, 1.0
+
+
+def _collect_llm_cache() -> Iterable[Sample]:
+    from app.shared.llm.cache import get_llm_cache_stats
+
+    return _stats_samples("llm_cache", "cache", {"response": get_llm_cache_stats()})
+
+
+def _collect_llm_usage() -> Iterable[Sample]:
+    from app.shared.llm.usage_tracker import get_llm_usage_stats
+
+    stats = get_llm_usage_stats()
+    return _stats_samples("llm_usage_buffer", "buffer", {"credits": stats}) if stats else []
+
+
+def _collect_client_pools() -> Iterable[Sample]:
+    from app.shared.providers.clients import get_client_pool_stats
+
+    return _stats_samples("provider_client", "client", get_client_pool_stats())
+
+
+def _collect_rate_limits() -> Iterable[Sample]:
+    from app.shared.providers.rate_limit import get_rate_limit_stats
+
+    return _stats_samples("provider_rate_limit", "limiter", get_rate_limit_stats())
+
+
+def _collect_circuit_breakers() -> Iterable[Sample]:
+    from app.shared.providers.resilience import get_circuit_breaker_stats
+
+    return _stats_samples("provider_circuit", "breaker", get_circuit_breaker_stats())
+
+
+def _collect_cassettes() -> Iterable[Sample]:
+    from app.shared.providers.cassette import get_cassette_stats
+
+    stats = get_cassette_stats()
+    return _stats_samples("provider_cassette", "cassette", {"default": stats}) if stats else []
+
+
+def _collect_jobs() -> Iterable[Sample]:
+    from app.shared.jobs import get_job_stats
+
+    stats = get_job_stats()
+    return _stats_samples("background_job", "pool", {"default": stats}) if stats else []
+
+
+def _collect_events() -> Iterable[Sample]:
+    from app.shared.events import get_event_stats
+
+    stats = get_event_stats()
+    return _stats_samples("progress_event", "broker", {"default": stats}) if stats else []
+
+
+__all__ = [
+    "UNKNOWN_SERVICE",
+    "get_metrics_registry",
+    "service_label",
+    "track_llm_call",
+    "record_llm_tokens",
+    "record_llm_cache_lookup",
+    "track_image_call",
+]
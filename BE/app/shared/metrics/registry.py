@@ -0,0 +1,260 @@
+"""
+Metrics Registry
+
+Small in-process counters and histograms rendered in the Prometheus text
+exposition format (version 0.0.4). Nothing is pushed anywhere; `/metrics`
+renders the current values on each scrape.
+
+Memory is bounded:
+- Histograms use fixed buckets. Each series is a list of bucket counts plus a
+  sum and a count, however many observations it records.
+- Each metric keeps at most `max_series` label sets. Label sets past the cap
+  fold into one series whose labels are all "other".
+
+Collectors are callables that return gauge samples on each scrape. They are
+used to expose stats that other modules already track (cache, client pools,
+rate limiters, circuit breakers).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+# Latency buckets in seconds, from sub-second cache-adjacent calls up to
+# multi-minute long-form generations
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+OVERFLOW_LABEL = "other"
+
+# (metric name, labels, value)
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], max_series: int) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.max_series = max(1, max_series)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object], existing: dict) -> tuple[str, ...]:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"Unknown labels for {self.name}: {sorted(unknown)}")
+        key = tuple(str(labels.get(name) or "") for name in self.labelnames)
+        if key not in existing and len(existing) >= self.max_series:
+            return tuple(OVERFLOW_LABEL for _ in self.labelnames)
+        return key
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), max_series: int = 500) -> None:
+        super().__init__(name, help, labelnames, max_series)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            key = self._key(labels, self._values)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels, self._values), 0.0)
+
+    def total(self, **labels: object) -> float:
+        """Sum over every series whose labels include the given ones."""
+        wanted = {name: str(value) for name, value in labels.items()}
+        unknown = set(wanted) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"Unknown labels for {self.name}: {sorted(unknown)}")
+        with self._lock:
+            items = list(self._values.items())
+        return sum(
+            value for key, value in items
+            if all(self._labels(key)[name] == label for name, label in wanted.items())
+        )
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; memory per series is O(len(buckets))."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        max_series: int = 500,
+    ) -> None:
+        super().__init__(name, help, labelnames, max_series)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        # series -> [per-bucket counts..., +Inf count], sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels, self._series)
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def snapshot(self, **labels: object) -> dict[str, object]:
+        """Cumulative bucket counts, sum and count of one series."""
+        with self._lock:
+            series = self._series.get(self._key(labels, self._series))
+            counts = list(series[0]) if series else [0] * (len(self.buckets) + 1)
+            total = series[1][0] if series else 0.0
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return {
+            "buckets": dict(zip([*self.buckets, math.inf], cumulative)),
+            "sum": total,
+            "count": running,
+        }
+
+    def quantile(self, q: float, **labels: object) -> float | None:
+        """Approximate quantile (upper bound of the bucket holding it)."""
+        snap = self.snapshot(**labels)
+        count = snap["count"]
+        if not count:
+            return None
+        target = q * count
+        for bound, cumulative in snap["buckets"].items():
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        lines = self.header()
+        for key, counts, total in items:
+            labels = self._labels(key)
+            running = 0
+            for bound, count in zip([*self.buckets, math.inf], counts):
+                running += count
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {running}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors; renders them as Prometheus text."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = (), **kwargs) -> Counter:
+        return self._register(name, lambda: Counter(name, help, labelnames, **kwargs), Counter)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help, labelnames, **kwargs), Histogram)
+
+    def register_collector(self, name: str, collect: Callable[[], Iterable[Sample]]) -> None:
+        """Register (or replace) a callable that returns gauge samples at scrape time."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _register(self, name: str, factory: Callable[[], _Metric], kind: type) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric {name} is already registered as {metric.kind}")
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        gauges: dict[str, list[tuple[dict[str, str], float]]] = {}
+        for collector_name, collect in collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                lines.append(f"# collector {collector_name} failed: {_escape(str(e))}")
+                continue
+            for name, labels, value in samples:
+                gauges.setdefault(name, []).append((labels, value))
+        for name, samples in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "DEFAULT_LATENCY_BUCKETS",
+    "OVERFLOW_LABEL",
+    "Sample",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+]
@@ -0,0 +1,26 @@
+"""
+Pipelines
+
+DAG executor for multi-stage generation pipelines: stages declare the values
+they consume and produce, and each one starts the moment its inputs exist.
+
+Usage:
+    from app.shared.pipeline import PipelineDAG, Stage
+
+    dag = PipelineDAG(
+        "storybook.generate",
+        [
+            Stage("storybook", load_storybook, inputs=("storybook_id",)),
+            Stage("bible", generate_bible, inputs=("storybook",)),
+            Stage("arc", generate_arc, inputs=("storybook", "bible")),
+            Stage("spread_characters", build_context, inputs=("bible",)),  # Overlaps "arc"
+        ],
+        initial=("storybook_id",),
+    )
+    run = await dag.run({"storybook_id": sid})
+    print(run["arc"], run.summary())  # Per-stage start offsets and durations
+"""
+
+from .dag import PipelineDAG, PipelineRun, Stage, StageListener, StageTiming
+
+__all__ = ["PipelineDAG", "PipelineRun", "Stage", "StageListener", "StageTiming"]
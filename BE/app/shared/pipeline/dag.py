@@ -0,0 +1,234 @@
+"""
+Stage DAG Executor
+
+Runs a pipeline expressed as stages with declared inputs and outputs. Each
+stage starts as soon as every input it names exists, so independent stages
+overlap (e.g. page-character context is built while the arc is generated).
+
+Stages are coroutine functions, or plain functions which run in a worker
+thread (blocking Supabase calls stay off the event loop). A stage receives its
+inputs as keyword arguments; a single-output stage returns the value, a
+multi-output stage returns a dict keyed by output name.
+
+The first failing stage cancels the stages still running and its exception
+is re-raised unchanged, so callers keep their existing error handling.
+
+An optional `on_stage` listener is told when each stage starts and finishes
+(e.g. to publish progress events); listener errors are logged, never raised.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from app.shared.metrics import DEFAULT_LATENCY_BUCKETS, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of the pipeline."""
+    name: str
+    run: Callable[..., Any]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+    def produces(self) -> tuple[str, ...]:
+        return self.outputs or (self.name,)
+
+
+@dataclass
+class StageTiming:
+    """When a stage started and finished (seconds since the run began)."""
+    stage: str
+    started_at: float
+    finished_at: float | None = None
+    error: str | None = None
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+
+StageListener = Callable[[str, StageTiming], None]  # ("started" | "finished" | "failed", timing)
+
+
+@dataclass
+class PipelineRun:
+    """Outputs of every completed stage plus per-stage timings."""
+    name: str
+    values: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, StageTiming] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+    def summary(self) -> str:
+        parts = [
+            f"{t.stage}={t.duration:.2f}s@{t.started_at:.2f}"
+            for t in sorted(self.timings.values(), key=lambda t: t.started_at)
+            if t.duration is not None
+        ]
+        return f"{self.name} {self.wall_time:.2f}s: " + ", ".join(parts)
+
+
+class PipelineDAG:
+    """A validated set of stages; `run()` executes them with maximal concurrency."""
+
+    def __init__(self, name: str, stages: list[Stage], initial: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError(f"Pipeline {name}: duplicate stage names")
+        self.initial = initial
+        self._producer: dict[str, str] = {}
+        for stage in stages:
+            for output in stage.produces():
+                if output in self._producer or output in initial:
+                    raise ValueError(f"Pipeline {name}: '{output}' is produced more than once")
+                self._producer[output] = stage.name
+        for stage in stages:
+            missing = [i for i in stage.inputs if i not in self._producer and i not in initial]
+            if missing:
+                raise ValueError(f"Pipeline {name}: stage '{stage.name}' needs unknown inputs {missing}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list[str]:
+        order: list[str] = []
+        state: dict[str, int] = {}
+
+        def visit(name: str, trail: tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Pipeline {self.name}: cycle {' -> '.join(trail + (name,))}")
+            state[name] = 1
+            for dependency in self.dependencies(name):
+                visit(dependency, trail + (name,))
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    def dependencies(self, stage_name: str) -> set[str]:
+        """Stages whose outputs `stage_name` consumes."""
+        return {self._producer[i] for i in self.stages[stage_name].inputs if i in self._producer}
+
+    async def run(
+        self,
+        initial: Mapping[str, Any] | None = None,
+        *,
+        skip: Mapping[str, Any] | None = None,
+        on_stage: StageListener | None = None,
+    ) -> PipelineRun:
+        """
+        Execute the pipeline.
+
+        Args:
+            initial: Values for the declared initial inputs
+            skip: Stage outputs that are already known (e.g. from a previous
+                attempt); stages whose outputs are all given here do not run
+            on_stage: Called with ("started" | "finished" | "failed", timing)
+                as each stage starts and ends
+
+        Raises:
+            Whatever the first failing stage raised
+        """
+        run = PipelineRun(self.name, values={**(initial or {}), **(skip or {})})
+        missing = [name for name in self.initial if name not in run.values]
+        if missing:
+            raise ValueError(f"Pipeline {self.name}: missing initial inputs {missing}")
+
+        clock = time.perf_counter()
+        pending = {
+            name for name in self.order
+            if not all(output in run.values for output in self.stages[name].produces())
+        }
+        running: dict[asyncio.Task, str] = {}
+        try:
+            while pending or running:
+                for name in [n for n in self.order if n in pending]:
+                    stage = self.stages[name]
+                    if all(i in run.values for i in stage.inputs):
+                        pending.discard(name)
+                        run.timings[name] = StageTiming(name, started_at=time.perf_counter() - clock)
+                        _notify(on_stage, "started", run.timings[name])
+                        kwargs = {i: run.values[i] for i in stage.inputs}
+                        running[asyncio.create_task(_call(stage, kwargs), name=f"{self.name}.{name}")] = name
+                if not running:
+                    raise ValueError(f"Pipeline {self.name}: stages {sorted(pending)} can never run")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    timing = run.timings[name]
+                    timing.finished_at = time.perf_counter() - clock
+                    error = task.exception()
+                    _observe(self.name, name, timing, error)
+                    if error is not None:
+                        timing.error = f"{type(error).__name__}: {error}"
+                        _notify(on_stage, "failed", timing)
+                        raise error
+                    run.values.update(_outputs(self.stages[name], task.result()))
+                    _notify(on_stage, "finished", timing)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            run.wall_time = time.perf_counter() - clock
+            logger.info("Pipeline %s", run.summary())
+        return run
+
+
+async def _call(stage: Stage, kwargs: dict[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(stage.run):
+        return await stage.run(**kwargs)
+    result = await asyncio.to_thread(stage.run, **kwargs)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def _outputs(stage: Stage, result: Any) -> dict[str, Any]:
+    outputs = stage.produces()
+    if len(outputs) == 1:
+        return {outputs[0]: result}
+    if not isinstance(result, Mapping) or set(outputs) - set(result):
+        raise ValueError(f"Stage '{stage.name}' must return a dict with keys {list(outputs)}")
+    return {output: result[output] for output in outputs}
+
+
+def _notify(listener: StageListener | None, phase: str, timing: StageTiming) -> None:
+    if listener is None:
+        return
+    try:
+        listener(phase, timing)
+    except Exception:
+        logger.exception("Stage listener failed on %s %s", phase, timing.stage)
+
+
+def _observe(pipeline: str, stage: str, timing: StageTiming, error: BaseException | None) -> None:
+    get_metrics_registry().histogram(
+        "pipeline_stage_duration_seconds",
+        "Pipeline stage run time in seconds",
+        ("pipeline", "stage", "outcome"),
+        buckets=DEFAULT_LATENCY_BUCKETS,
+    ).observe(
+        timing.duration or 0.0,
+        pipeline=pipeline,
+        stage=stage,
+        outcome="ok" if error is None else type(error).__name__,
+    )
+
+
+__all__ = ["Stage", "StageTiming", "StageListener", "PipelineRun", "PipelineDAG"]
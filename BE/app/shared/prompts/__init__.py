@@ -0,0 +1,21 @@
+"""
+Prompt Templates
+
+File-based prompt templates with `{{name}}` placeholders, compiled once and
+rendered in a single pass. Each template carries a content `version` hash
+that caches and checkpoints can key on instead of the full text.
+
+Usage:
+    from app.shared.prompts import PromptRegistry
+
+    registry = PromptRegistry("path/to/prompts", hot_reload=settings.debug)
+    registry.preload()  # At startup
+
+    template = registry.get("arc.md")
+    prompt = template.render(user_input=prompt, story_bible=bible_text)
+    cache_key = (template.version, ...)
+"""
+
+from .templates import PLACEHOLDER, PromptRegistry, PromptTemplate
+
+__all__ = ["PLACEHOLDER", "PromptRegistry", "PromptTemplate"]
@@ -0,0 +1,125 @@
+"""
+Compiled Prompt Templates
+
+Prompt files use `{{name}}` placeholders. A template is parsed once into
+literal and placeholder segments, so rendering is a single join instead of
+one `str.replace` pass over the whole text per placeholder (and a value that
+happens to contain `{{...}}` is never substituted again).
+
+`PromptRegistry` loads every template of a directory once and hands out the
+compiled templates; with `hot_reload` it re-reads a file whose mtime changed,
+so prompt edits show up without a restart during development.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A parsed template: literals and placeholder names, alternating."""
+    name: str
+    source: str
+    # Even indexes are literal text, odd indexes placeholder names
+    segments: tuple[str, ...] = field(repr=False)
+    placeholders: frozenset[str]
+    # Content hash; changes whenever the template text changes
+    version: str
+
+    @classmethod
+    def compile(cls, name: str, source: str) -> "PromptTemplate":
+        segments = tuple(PLACEHOLDER.split(source))
+        return cls(
+            name=name,
+            source=source,
+            segments=segments,
+            placeholders=frozenset(segments[1::2]),
+            version=hashlib.sha256(source.encode("utf-8")).hexdigest()[:16],
+        )
+
+    def render(self, **values: Any) -> str:
+        """
+        Substitute every placeholder in one pass.
+
+        Raises:
+            ValueError: If a placeholder of the template has no value
+        """
+        missing = self.placeholders - values.keys()
+        if missing:
+            raise ValueError(f"Prompt template {self.name} is missing values for {sorted(missing)}")
+        return "".join(
+            segment if index % 2 == 0 else str(values[segment])
+            for index, segment in enumerate(self.segments)
+        )
+
+
+class PromptRegistry:
+    """Compiled templates of one directory, keyed by file name (e.g. "arc.md")."""
+
+    def __init__(self, directory: str, *, suffix: str = ".md", hot_reload: bool = False) -> None:
+        self.directory = os.path.abspath(directory)
+        self.suffix = suffix
+        self.hot_reload = hot_reload
+        self._lock = threading.Lock()
+        self._templates: dict[str, tuple[float, PromptTemplate]] = {}
+        self.reloads = 0
+
+    def preload(self) -> int:
+        """Compile every template in the directory; returns how many were loaded."""
+        names = sorted(
+            name for name in os.listdir(self.directory) if name.endswith(self.suffix)
+        )
+        for name in names:
+            self.get(name)
+        return len(names)
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        The compiled template `name`, read from disk only on first use (or
+        when its mtime changed, with hot_reload).
+
+        Raises:
+            ValueError: If the template does not exist or cannot be read
+        """
+        cached = self._templates.get(name)
+        if cached is not None and not self.hot_reload:
+            return cached[1]
+
+        path = os.path.join(self.directory, name)
+        try:
+            mtime = os.stat(path).st_mtime
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            with open(path, "r", encoding="utf-8") as f:
+                template = PromptTemplate.compile(name, f.read())
+        except FileNotFoundError:
+            raise ValueError(f"Prompt template {name} not found in {self.directory}")
+        except Exception as e:
+            raise ValueError(f"Failed to load prompt template {name}: {e}")
+
+        with self._lock:
+            if cached is not None:
+                self.reloads += 1
+            self._templates[name] = (mtime, template)
+        return template
+
+    def versions(self) -> dict[str, str]:
+        """name -> version of every template loaded so far."""
+        return {name: template.version for name, (_, template) in sorted(self._templates.items())}
+
+    @property
+    def version(self) -> str:
+        """Combined hash of every loaded template; changes when any of them does."""
+        encoded = ",".join(f"{name}={version}" for name, version in self.versions().items())
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+__all__ = ["PLACEHOLDER", "PromptTemplate", "PromptRegistry"]
@@ -0,0 +1,82 @@
+"""
+Provider Infrastructure
+
+Cross-cutting plumbing shared by `app.shared.llm` and `app.shared.image`:
+long-lived SDK clients with pooled HTTP connections, per-provider rate
+limiting with an adaptive (AIMD) concurrency window, retries with
+per-provider circuit breakers, and record/replay cassettes for provider
+calls.
+
+Usage:
+    from app.shared.providers import get_openai_client, get_client_pool_stats
+
+    client = get_openai_client()  # Built once per worker, then reused
+    print(get_client_pool_stats()["openai"])
+
+    with get_rate_limiter("openai", "gpt-5-mini").limit(tokens=1500) as permit:
+        ...  # Queued until RPM / TPM / concurrency allow the call
+    print(get_rate_limit_stats())  # Queue depth, wait times, concurrency limit
+
+    # PROVIDER_CASSETTE_MODE=record captures provider responses once;
+    # PROVIDER_CASSETTE_MODE=replay serves them back with their original timing
+"""
+
+from .clients import (
+    client_registry,
+    get_openai_client,
+    get_anthropic_client,
+    get_google_client,
+    get_async_openai_client,
+    get_async_anthropic_client,
+    get_http_client,
+    get_client_pool_stats,
+    close_provider_clients,
+    aclose_provider_clients,
+)
+from .rate_limit import (
+    RateLimitTimeout,
+    get_rate_limiter,
+    get_rate_limit_stats,
+    is_rate_limit_error,
+)
+from .resilience import (
+    ProviderUnavailableError,
+    RetryPolicy,
+    call_with_retry,
+    acall_with_retry,
+    get_circuit_breaker,
+    get_circuit_breaker_stats,
+)
+from .cassette import (
+    CassetteMissError,
+    get_cassette_store,
+    get_cassette_stats,
+    recorded,
+)
+
+__all__ = [
+    "client_registry",
+    "get_openai_client",
+    "get_anthropic_client",
+    "get_google_client",
+    "get_async_openai_client",
+    "get_async_anthropic_client",
+    "get_http_client",
+    "get_client_pool_stats",
+    "close_provider_clients",
+    "aclose_provider_clients",
+    "RateLimitTimeout",
+    "get_rate_limiter",
+    "get_rate_limit_stats",
+    "is_rate_limit_error",
+    "ProviderUnavailableError",
+    "RetryPolicy",
+    "call_with_retry",
+    "acall_with_retry",
+    "get_circuit_breaker",
+    "get_circuit_breaker_stats",
+    "CassetteMissError",
+    "get_cassette_store",
+    "get_cassette_stats",
+    "recorded",
+]
@@ -0,0 +1,363 @@
+"""
+Provider Cassettes - record and replay provider calls
+
+Captures real provider responses once and replays them, with their original
+timing, so pipeline performance changes can be measured against identical
+content.
+
+Provider functions in `app.shared.llm` and `app.shared.image` are wrapped with
+`@recorded(provider, operation)`. With `PROVIDER_CASSETTE_MODE`:
+- "" (default): calls pass straight through.
+- "record": the real call runs and its result and elapsed time are appended
+  to the cassette.
+- "replay": results come from the cassette, after sleeping for the recorded
+  elapsed time (scaled by `PROVIDER_CASSETTE_TIMING_SCALE`, 0 for no delay).
+  A request missing from the cassette raises `CassetteMissError`.
+- "auto": replay when recorded, record otherwise.
+
+Store layout (`PROVIDER_CASSETTE_DIR`):
+- cassette.jsonl: one compact JSON line per recorded call, keyed by request
+  fingerprint. Repeated identical requests replay their recordings in order.
+- blobs/<sha256>: binary payloads (generated images), content-addressed so
+  identical images are stored once.
+
+Fingerprints hash the provider, the operation and the call arguments.
+Pydantic schemas are hashed by their JSON schema. UUIDs in prompts are masked
+(`PROVIDER_CASSETTE_MASK_UUIDS`) because storybook and user IDs differ
+between runs. Sync and async variants of an operation share recordings.
+Streams are recorded chunk by chunk with inter-chunk delays.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+CASSETTE_MODES = frozenset({"", "record", "replay", "auto"})
+
+_UUID_PATTERN = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b")
+_BLOB_KEY = "$blob"
+_TUPLE_KEY = "$tuple"
+
+
+class CassetteMissError(LookupError):
+    """Replay mode found no recording for a request."""
+
+
+class CassetteStore:
+    """Append-only cassette file plus content-addressed blobs."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.path = self.root / "cassette.jsonl"
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict[str, Any]]] | None = None
+        self._cursors: dict[str, int] = {}
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def lookup(self, key: str) -> dict[str, Any] | None:
+        """Return the next recording for `key` (cycling through repeats), or None."""
+        with self._lock:
+            entries = self._load().get(key)
+            if not entries:
+                self._stats["misses"] += 1
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self._stats["replayed"] += 1
+            return entries[cursor % len(entries)]
+
+    def append(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            entries = self._load()
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            entries.setdefault(entry["key"], []).append(entry)
+            self._stats["recorded"] += 1
+
+    def rewind(self) -> None:
+        """Start replaying every key from its first recording again."""
+        with self._lock:
+            self._cursors.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._load()
+            return {
+                **self._stats,
+                "keys": len(entries),
+                "recordings": sum(len(v) for v in entries.values()),
+            }
+
+    def _load(self) -> dict[str, list[dict[str, Any]]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                with self.path.open(encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries.setdefault(entry["key"], []).append(entry)
+        return self._entries
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_dir / digest
+        if not path.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        try:
+            return (self.blob_dir / digest).read_bytes()
+        except FileNotFoundError:
+            raise CassetteMissError(f"Cassette blob {digest} is missing from {self.blob_dir}")
+
+    # ------------------------------------------------------------------
+    # Value encoding
+    # ------------------------------------------------------------------
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray)):
+            return {_BLOB_KEY: self.put_blob(bytes(value))}
+        if isinstance(value, tuple):
+            return {_TUPLE_KEY: [self.encode(v) for v in value]}
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.encode(v) for k, v in value.items()}
+        return value
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {_BLOB_KEY}:
+                return self.get_blob(value[_BLOB_KEY])
+            if set(value) == {_TUPLE_KEY}:
+                return tuple(self.decode(v) for v in value[_TUPLE_KEY])
+            return {k: self.decode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.decode(v) for v in value]
+        return value
+
+
+@lru_cache(maxsize=4)
+def _store_for(root: str) -> CassetteStore:
+    return CassetteStore(root)
+
+
+def get_cassette_store() -> CassetteStore:
+    """Return the process-wide store at `PROVIDER_CASSETTE_DIR`."""
+    return _store_for(settings.provider_cassette_dir)
+
+
+def cassette_mode() -> str:
+    mode = settings.provider_cassette_mode
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"Unknown PROVIDER_CASSETTE_MODE: {mode}")
+    return mode
+
+
+# ----------------------------------------------------------------------------
+# Fingerprints
+# ----------------------------------------------------------------------------
+
+@lru_cache(maxsize=256)
+def _schema_digest(schema: type[BaseModel]) -> str:
+    payload = json.dumps(schema.model_json_schema(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {"schema": _schema_digest(value)}
+    if isinstance(value, str):
+        return _UUID_PATTERN.sub("<uuid>", value) if settings.provider_cassette_mask_uuids else value
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    return value
+
+
+def fingerprint(provider: str, operation: str, arguments: dict[str, Any]) -> str:
+    """Stable key for a provider request."""
+    payload = json.dumps(
+        [provider, operation, _normalize(arguments)],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------------
+# Decorator
+# ----------------------------------------------------------------------------
+
+def _delay(elapsed: float) -> float:
+    return max(0.0, elapsed * settings.provider_cassette_timing_scale)
+
+
+def recorded(provider: str, operation: str, ignore: tuple[str, ...] = ()) -> Callable:
+    """
+    Make a provider function recordable and replayable.
+
+    Args:
+        provider: Provider name stored with the recording (e.g. "openai")
+        operation: Operation shared by sync/async variants (e.g. "llm.structured")
+        ignore: Argument names left out of the fingerprint (e.g. volatile URLs)
+    """
+    def decorate(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        def prepare(args: tuple, kwargs: dict) -> tuple[str, CassetteStore, dict[str, Any] | None]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in ignore}
+            key = fingerprint(provider, operation, arguments)
+            store = get_cassette_store()
+            mode = cassette_mode()
+            entry = store.lookup(key) if mode in {"replay", "auto"} else None
+            if entry is None and mode == "replay":
+                raise CassetteMissError(
+                    f"No cassette recording for {provider} {operation} "
+                    f"(model={arguments.get('model')}, key={key[:12]})"
+                )
+            return key, store, entry
+
+        def record(store: CassetteStore, key: str, elapsed: float, **payload: Any) -> None:
+            store.append({
+                "key": key,
+                "provider": provider,
+                "operation": operation,
+                "elapsed": round(elapsed, 4),
+                "recorded_at": time.time(),
+                **payload,
+            })
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def astream_wrapper(*args, **kwargs):
+                if not settings.provider_cassette_mode:
+                    async for item in fn(*args, **kwargs):
+                        yield item
+                    return
+                key, store, entry = prepare(args, kwargs)
+                if entry is not None:
+                    for delay, chunk in entry["chunks"]:
+                        await asyncio.sleep(_delay(delay))
+                        yield store.decode(chunk)
+                    return
+                chunks, start, last = [], time.perf_counter(), time.perf_counter()
+                async for item in fn(*args, **kwargs):
+                    now = time.perf_counter()
+                    chunks.append([round(now - last, 4), store.encode(item)])
+                    last = now
+                    yield item
+                record(store, key, time.perf_counter() - start, chunks=chunks)
+
+            return astream_wrapper
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def stream_wrapper(*args, **kwargs):
+                if not settings.provider_cassette_mode:
+                    yield from fn(*args, **kwargs)
+                    return
+                key, store, entry = prepare(args, kwargs)
+                if entry is not None:
+                    for delay, chunk in entry["chunks"]:
+                        time.sleep(_delay(delay))
+                        yield store.decode(chunk)
+                    return
+                chunks, start, last = [], time.perf_counter(), time.perf_counter()
+                for item in fn(*args, **kwargs):
+                    now = time.perf_counter()
+                    chunks.append([round(now - last, 4), store.encode(item)])
+                    last = now
+                    yield item
+                record(store, key, time.perf_counter() - start, chunks=chunks)
+
+            return stream_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not settings.provider_cassette_mode:
+                    return await fn(*args, **kwargs)
+                key, store, entry = prepare(args, kwargs)
+                if entry is not None:
+                    await asyncio.sleep(_delay(entry["elapsed"]))
+                    return store.decode(entry["result"])
+                start = time.perf_counter()
+                result = await fn(*args, **kwargs)
+                record(store, key, time.perf_counter() - start, result=store.encode(result))
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def sync_wrapper(*args, **kwargs):
+            if not settings.provider_cassette_mode:
+                return fn(*args, **kwargs)
+            key, store, entry = prepare(args, kwargs)
+            if entry is not None:
+                time.sleep(_delay(entry["elapsed"]))
+                return store.decode(entry["result"])
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            record(store, key, time.perf_counter() - start, result=store.encode(result))
+            return result
+
+        return sync_wrapper
+
+    return decorate
+
+
+def get_cassette_stats() -> dict[str, Any]:
+    """Recorded / replayed / missed counts of the active cassette."""
+    if not settings.provider_cassette_mode:
+        return {}
+    return get_cassette_store().stats()
+
+
+__all__ = [
+    "CASSETTE_MODES",
+    "CassetteMissError",
+    "CassetteStore",
+    "get_cassette_store",
+    "get_cassette_stats",
+    "cassette_mode",
+    "fingerprint",
+    "recorded",
+]
@@ -0,0 +1,350 @@
+"""
+Provider Client Registry
+
+Builds each provider SDK client once per worker process and hands out the same
+instance on every call, so TLS sessions and keep-alive connections are reused
+instead of being renegotiated per request. Pool size and timeouts come from
+`app.core.config.settings`.
+
+Async clients are additionally bound to an event loop: each loop gets its own
+client, which is closed by `aclose_provider_clients` or dropped once the loop
+is closed or garbage collected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.config import settings
+
+
+@dataclass
+class _PooledClient:
+    """A built SDK client plus the HTTP client that owns its connection pool."""
+    client: Any
+    http_client: Any | None
+    created_at: float
+    checkouts: int = 0
+
+
+def _sdk_limits(sdk: Any) -> Any:
+    # Each SDK may ship its own httpx flavour; build Limits from the SDK's own class.
+    limits_cls = type(sdk.DEFAULT_CONNECTION_LIMITS)
+    return limits_cls(
+        max_connections=settings.provider_max_connections,
+        max_keepalive_connections=settings.provider_max_keepalive_connections,
+        keepalive_expiry=settings.provider_keepalive_expiry,
+    )
+
+
+def _sdk_timeout(sdk: Any) -> Any:
+    return sdk.Timeout(
+        settings.provider_read_timeout,
+        connect=settings.provider_connect_timeout,
+    )
+
+
+def _build_openai() -> _PooledClient:
+    import openai
+
+    http_client = openai.DefaultHttpxClient(
+        limits=_sdk_limits(openai),
+        timeout=_sdk_timeout(openai),
+    )
+    client = openai.OpenAI(
+        api_key=settings.openai_api_key or None,
+        http_client=http_client,
+        max_retries=0,  # Retries are owned by providers/resilience.py
+    )
+    return _PooledClient(client=client, http_client=http_client, created_at=time.time())
+
+
+def _build_anthropic() -> _PooledClient:
+    import anthropic
+
+    http_client = anthropic.DefaultHttpxClient(
+        limits=_sdk_limits(anthropic),
+        timeout=_sdk_timeout(anthropic),
+    )
+    client = anthropic.Anthropic(
+        api_key=settings.anthropic_api_keys or None,
+        http_client=http_client,
+        max_retries=0,  # Retries are owned by providers/resilience.py
+    )
+    return _PooledClient(client=client, http_client=http_client, created_at=time.time())
+
+
+def _build_openai_async() -> _PooledClient:
+    import openai
+
+    http_client = openai.DefaultAsyncHttpxClient(
+        limits=_sdk_limits(openai),
+        timeout=_sdk_timeout(openai),
+    )
+    client = openai.AsyncOpenAI(
+        api_key=settings.openai_api_key or None,
+        http_client=http_client,
+        max_retries=0,  # Retries are owned by providers/resilience.py
+    )
+    return _PooledClient(client=client, http_client=http_client, created_at=time.time())
+
+
+def _build_anthropic_async() -> _PooledClient:
+    import anthropic
+
+    http_client = anthropic.DefaultAsyncHttpxClient(
+        limits=_sdk_limits(anthropic),
+        timeout=_sdk_timeout(anthropic),
+    )
+    client = anthropic.AsyncAnthropic(
+        api_key=settings.anthropic_api_keys or None,
+        http_client=http_client,
+        max_retries=0,  # Retries are owned by providers/resilience.py
+    )
+    return _PooledClient(client=client, http_client=http_client, created_at=time.time())
+
+
+def _build_google() -> _PooledClient:
+    from google import genai
+
+    # google-genai manages its own transport; only the timeout (ms) is configurable.
+    client = genai.Client(
+        api_key=settings.google_api_key or None,
+        http_options={"timeout": int(settings.provider_read_timeout * 1000)},
+    )
+    return _PooledClient(client=client, http_client=None, created_at=time.time())
+
+
+def _build_http() -> _PooledClient:
+    import httpx
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.provider_max_connections,
+            max_keepalive_connections=settings.provider_max_keepalive_connections,
+            keepalive_expiry=settings.provider_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            settings.provider_read_timeout,
+            connect=settings.provider_connect_timeout,
+        ),
+        follow_redirects=True,
+    )
+    return _PooledClient(client=http_client, http_client=http_client, created_at=time.time())
+
+
+_BUILDERS: dict[str, Callable[[], _PooledClient]] = {
+    "openai": _build_openai,
+    "anthropic": _build_anthropic,
+    "google": _build_google,
+    "http": _build_http,
+    "openai_async": _build_openai_async,
+    "anthropic_async": _build_anthropic_async,
+}
+
+# Clients whose connection pools belong to a single event loop
+_ASYNC_CLIENTS = {"openai_async", "anthropic_async"}
+
+
+def _pool_snapshot(http_client: Any | None) -> dict[str, Any]:
+    """Read connection counts from an httpx client's connection pool, if reachable."""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    if pool is None:
+        return {"pooled": False}
+
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return {
+        "pooled": True,
+        "max_connections": getattr(pool, "_max_connections", None),
+        "max_keepalive_connections": getattr(pool, "_max_keepalive_connections", None),
+        "connections": len(connections),
+        "idle_connections": idle,
+        "active_connections": len(connections) - idle,
+    }
+
+
+class ProviderClientRegistry:
+    """Process-wide registry of lazily built, long-lived provider clients."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: dict[str, _PooledClient] = {}
+        # Async clients per owning loop; entries go away with their loop
+        self._async_clients: dict[str, weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PooledClient]] = {
+            name: weakref.WeakKeyDictionary() for name in _ASYNC_CLIENTS
+        }
+        self._pid = os.getpid()
+
+    def get(self, name: str) -> Any:
+        """
+        Return the shared client for `name`, building it on first use.
+
+        Args:
+            name: Registry key ("openai", "anthropic", "google", "http",
+                "openai_async", "anthropic_async")
+
+        Raises:
+            ValueError: If no builder is registered for the name
+        """
+        if name not in _BUILDERS:
+            raise ValueError(f"Unknown provider client: {name}. Available: {list(_BUILDERS.keys())}")
+
+        self._reset_after_fork()
+        loop = _running_loop() if name in _ASYNC_CLIENTS else None
+        clients: Any = self._clients if loop is None else self._async_clients[name]
+        key = name if loop is None else loop
+        entry = clients.get(key)
+        if entry is None:
+            with self._lock:
+                entry = clients.get(key)
+                if entry is None:
+                    if loop is not None:
+                        self._prune_closed_loops(name)
+                    entry = _BUILDERS[name]()
+                    clients[key] = entry
+        entry.checkouts += 1
+        return entry.client
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-client pool statistics for every client built so far."""
+        snapshot: dict[str, dict[str, Any]] = {}
+        entries = list(self._clients.items())
+        for name, by_loop in self._async_clients.items():
+            # One row per owning loop: "openai_async", "openai_async#1", ...
+            for index, entry in enumerate(list(by_loop.values())):
+                entries.append((name if index == 0 else f"{name}#{index}", entry))
+        for name, entry in entries:
+            snapshot[name] = {
+                "created_at": entry.created_at,
+                "checkouts": entry.checkouts,
+                **_pool_snapshot(entry.http_client),
+            }
+        return snapshot
+
+    def close(self) -> None:
+        """Close all synchronous pooled connections. Clients are rebuilt on next use."""
+        with self._lock:
+            entries = [
+                self._clients.pop(name)
+                for name in list(self._clients)
+                if name not in _ASYNC_CLIENTS
+            ]
+        for entry in entries:
+            closer = getattr(entry.http_client, "close", None)
+            if callable(closer):
+                try:
+                    closer()
+                except Exception:
+                    pass
+
+    async def aclose(self) -> None:
+        """
+        Close every pooled client. Async clients are closed on the loop that
+        owns them: directly for the running loop, via `run_coroutine_threadsafe`
+        for loops running in other threads.
+        """
+        self.close()
+        loop = _running_loop()
+        with self._lock:
+            entries = [
+                (owner, entry)
+                for by_loop in self._async_clients.values()
+                for owner, entry in list(by_loop.items())
+            ]
+            for by_loop in self._async_clients.values():
+                by_loop.clear()
+            for name in _ASYNC_CLIENTS:
+                self._clients.pop(name, None)
+        for owner, entry in entries:
+            closer = getattr(entry.http_client, "aclose", None)
+            if not callable(closer):
+                continue
+            try:
+                if owner is loop:
+                    await closer()
+                elif owner.is_running() and not owner.is_closed():
+                    future = asyncio.run_coroutine_threadsafe(closer(), owner)
+                    await asyncio.wait_for(asyncio.wrap_future(future), timeout=5)
+            except Exception:
+                pass
+
+    def _prune_closed_loops(self, name: str) -> None:
+        # Connections of a closed loop cannot be awaited any more; drop the client
+        by_loop = self._async_clients[name]
+        for owner in [owner for owner in list(by_loop) if owner.is_closed()]:
+            by_loop.pop(owner, None)
+
+    def _reset_after_fork(self) -> None:
+        # Sockets must not be shared across forked workers.
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        with self._lock:
+            if pid != self._pid:
+                self._clients.clear()
+                for by_loop in self._async_clients.values():
+                    by_loop.clear()
+                self._pid = pid
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# Singleton instance
+client_registry = ProviderClientRegistry()
+
+
+def get_openai_client() -> Any:
+    """Shared `openai.OpenAI` client."""
+    return client_registry.get("openai")
+
+
+def get_anthropic_client() -> Any:
+    """Shared `anthropic.Anthropic` client."""
+    return client_registry.get("anthropic")
+
+
+def get_google_client() -> Any:
+    """Shared `google.genai.Client`."""
+    return client_registry.get("google")
+
+
+def get_async_openai_client() -> Any:
+    """Shared `openai.AsyncOpenAI` client for the running event loop."""
+    return client_registry.get("openai_async")
+
+
+def get_async_anthropic_client() -> Any:
+    """Shared `anthropic.AsyncAnthropic` client for the running event loop."""
+    return client_registry.get("anthropic_async")
+
+
+def get_http_client() -> Any:
+    """Shared `httpx.Client` for plain downloads (e.g. reference images)."""
+    return client_registry.get("http")
+
+
+def get_client_pool_stats() -> dict[str, dict[str, Any]]:
+    """Pool statistics keyed by client name."""
+    return client_registry.stats()
+
+
+def close_provider_clients() -> None:
+    """Close every synchronous pooled client."""
+    client_registry.close()
+
+
+async def aclose_provider_clients() -> None:
+    """Close every pooled client (call on application shutdown)."""
+    await client_registry.aclose()
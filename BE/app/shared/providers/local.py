@@ -0,0 +1,84 @@
+"""
+Local Stand-in Provider Support
+
+Shared helpers for the deterministic "local" LLM and image providers
+(`app/shared/llm/local.py`, `app/shared/image/local.py`). They make no network
+calls, so the whole generation pipeline can run offline for development,
+load tests and benchmarks.
+
+Content is deterministic: every draw comes from an RNG seeded with the model
+and the prompt, so the same request always gives the same output (and the
+same simulated latency). Latency and output length follow clipped normal
+distributions configured by the `LOCAL_*` settings.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class LocalLatencyProfile:
+    """Simulated latency: base ~ N(mean, stddev), plus a per-output-token cost."""
+    mean_ms: float = 0.0
+    stddev_ms: float = 0.0
+    per_output_token_ms: float = 0.0
+
+    def sample(self, rng: random.Random, output_tokens: int = 0) -> float:
+        """Return a latency in seconds."""
+        base = rng.gauss(self.mean_ms, self.stddev_ms) if self.stddev_ms > 0 else self.mean_ms
+        return max(0.0, base + self.per_output_token_ms * output_tokens) / 1000.0
+
+
+def llm_latency_profile() -> LocalLatencyProfile:
+    return LocalLatencyProfile(
+        mean_ms=settings.local_llm_latency_ms,
+        stddev_ms=settings.local_llm_latency_stddev_ms,
+        per_output_token_ms=settings.local_llm_ms_per_output_token,
+    )
+
+
+def image_latency_profile() -> LocalLatencyProfile:
+    return LocalLatencyProfile(
+        mean_ms=settings.local_image_latency_ms,
+        stddev_ms=settings.local_image_latency_stddev_ms,
+    )
+
+
+def seeded_rng(*parts: object) -> random.Random:
+    """RNG seeded from the request, so identical requests give identical output."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def sample_count(rng: random.Random, mean: float, stddev: float, minimum: int = 1) -> int:
+    """Draw a clipped normal integer (token counts, item counts)."""
+    value = rng.gauss(mean, stddev) if stddev > 0 else mean
+    return max(minimum, int(round(value)))
+
+
+def simulate_latency(seconds: float) -> None:
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+async def asimulate_latency(seconds: float) -> None:
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+
+
+__all__ = [
+    "LocalLatencyProfile",
+    "llm_latency_profile",
+    "image_latency_profile",
+    "seeded_rng",
+    "sample_count",
+    "simulate_latency",
+    "asimulate_latency",
+]
@@ -0,0 +1,388 @@
+"""
+Provider Rate Limiting
+
+Shared per-(provider, model) admission control for LLM and image calls:
+
+- Token buckets for requests per minute (RPM) and tokens per minute (TPM).
+  Callers reserve an estimated token count up front; the reservation is
+  reconciled with the billed usage when the call finishes.
+- An AIMD concurrency governor: the in-flight limit grows by ~1 per window of
+  successful calls and is cut multiplicatively on 429s or latency spikes.
+- Callers that cannot be admitted are queued (FIFO) instead of failing. Only a
+  caller that waits longer than `RATE_LIMIT_MAX_WAIT` gets `RateLimitTimeout`.
+
+Budgets live in `PROVIDER_RATE_LIMITS` and are keyed by "provider" or
+"provider:model" (the more specific key wins field by field).
+
+Usage:
+    limiter = get_rate_limiter("openai", "gpt-5-mini")
+    async with limiter.alimit(tokens=estimated) as permit:
+        ...
+        permit.settle(input_tokens + output_tokens)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Iterator
+
+from app.core.config import settings
+
+
+# Budgets per provider, optionally overridden per "provider:model".
+# rpm / tpm of 0 disable that bucket; tpm is ignored for image models (tokens=0).
+PROVIDER_RATE_LIMITS: dict[str, dict[str, Any]] = {
+    "openai": {"rpm": 500, "tpm": 500_000, "max_concurrency": 32},
+    "google": {"rpm": 1000, "tpm": 1_000_000, "max_concurrency": 32},
+    "claude": {"rpm": 50, "tpm": 80_000, "max_concurrency": 8},
+    "openai:gpt-image-1": {"rpm": 50, "max_concurrency": 8},
+    "openai:dall-e-3": {"rpm": 50, "max_concurrency": 8},
+    "google:gemini-2.5-flash-image": {"rpm": 100, "max_concurrency": 8},
+    # Local stand-in provider: no budgets, only a concurrency window
+    "local": {"max_concurrency": 64},
+}
+
+# Poll interval while queued behind another caller or a full concurrency window
+_QUEUE_POLL_SECONDS = 0.02
+# Longest single sleep while waiting for a bucket to refill
+_MAX_SLEEP_SECONDS = 0.25
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a caller waited longer than the configured queue timeout."""
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    """Budget and AIMD tuning for one provider/model."""
+    rpm: int = 0
+    tpm: int = 0
+    max_concurrency: int = 16
+    min_concurrency: int = 1
+    initial_concurrency: int | None = None  # Defaults to max_concurrency
+    decrease_factor: float = 0.5  # Multiplier on 429
+    latency_decrease_factor: float = 0.8  # Multiplier on latency spikes
+    latency_spike_ratio: float = 3.0  # Spike = latency > ratio x EWMA
+    latency_min_samples: int = 20
+
+
+def resolve_rate_limit_config(provider: str, model: str | None = None) -> RateLimitConfig:
+    """Merge provider-level and model-level budgets into a config."""
+    values = dict(PROVIDER_RATE_LIMITS.get(provider, {}))
+    if model:
+        values.update(PROVIDER_RATE_LIMITS.get(f"{provider}:{model}", {}))
+    return replace(RateLimitConfig(), **values)
+
+
+class TokenBucket:
+    """Continuously refilled bucket; not thread-safe (guarded by the limiter lock)."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self, now: float) -> None:
+        if not self.enabled:
+            return
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (amounts above capacity are clamped)."""
+        if not self.enabled:
+            return 0.0
+        deficit = min(amount, self.capacity) - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Debit the bucket; may go negative when settling under-estimates."""
+        if self.enabled:
+            self.level -= amount
+
+
+@dataclass
+class RatePermit:
+    """Admission granted by a limiter; settle with billed tokens when known."""
+    limiter: "ProviderRateLimiter"
+    reserved_tokens: int
+    waited: float
+    started_at: float = field(default_factory=time.monotonic)
+    _settled_tokens: int | None = None
+
+    def settle(self, actual_tokens: int | None) -> None:
+        """Record the billed token count so the TPM bucket reflects real usage."""
+        if actual_tokens is not None:
+            self._settled_tokens = actual_tokens
+
+
+class ProviderRateLimiter:
+    """Token buckets plus an AIMD concurrency window for one provider/model."""
+
+    def __init__(self, provider: str, model: str | None, config: RateLimitConfig) -> None:
+        self.provider = provider
+        self.model = model
+        self.config = config
+        self._lock = threading.Lock()
+        self._rpm = TokenBucket(config.rpm)
+        self._tpm = TokenBucket(config.tpm)
+        self._limit = float(config.initial_concurrency or config.max_concurrency)
+        self._in_flight = 0
+        self._queue: deque[int] = deque()
+        self._tickets = itertools.count()
+        self._latency_ewma: float | None = None
+        self._latency_samples = 0
+        self._stats = {
+            "admitted": 0,
+            "throttled": 0,
+            "latency_spikes": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _enqueue(self) -> int:
+        with self._lock:
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            return ticket
+
+    def _dequeue(self, ticket: int) -> None:
+        with self._lock:
+            try:
+                self._queue.remove(ticket)
+            except ValueError:
+                pass
+
+    def _try_admit(self, ticket: int, tokens: int) -> float:
+        """Admit the caller (returns 0) or return how long to sleep before retrying."""
+        with self._lock:
+            if not self._queue or self._queue[0] != ticket:
+                return _QUEUE_POLL_SECONDS
+            if self._in_flight >= max(self.config.min_concurrency, int(self._limit)):
+                return _QUEUE_POLL_SECONDS
+
+            now = time.monotonic()
+            self._rpm.refill(now)
+            self._tpm.refill(now)
+            wait = max(self._rpm.wait_time(1), self._tpm.wait_time(tokens))
+            if wait > 0:
+                return min(wait, _MAX_SLEEP_SECONDS)
+
+            self._rpm.take(1)
+            self._tpm.take(tokens)
+            self._in_flight += 1
+            self._queue.popleft()
+            return 0.0
+
+    def _admitted(self, tokens: int, waited: float) -> RatePermit:
+        with self._lock:
+            self._stats["admitted"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+        return RatePermit(limiter=self, reserved_tokens=tokens, waited=waited)
+
+    def _timed_out(self, ticket: int, waited: float) -> RateLimitTimeout:
+        self._dequeue(ticket)
+        with self._lock:
+            self._stats["timeouts"] += 1
+        return RateLimitTimeout(
+            f"Rate limit queue timeout for {self.provider}/{self.model} after {waited:.1f}s"
+        )
+
+    def acquire(self, tokens: int = 0, max_wait: float | None = None) -> RatePermit:
+        """Block the calling thread until admitted."""
+        max_wait = settings.rate_limit_max_wait if max_wait is None else max_wait
+        ticket = self._enqueue()
+        start = time.monotonic()
+        while True:
+            delay = self._try_admit(ticket, tokens)
+            waited = time.monotonic() - start
+            if delay == 0:
+                return self._admitted(tokens, waited)
+            if waited + delay > max_wait:
+                raise self._timed_out(ticket, waited)
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int = 0, max_wait: float | None = None) -> RatePermit:
+        """Wait on the event loop until admitted."""
+        max_wait = settings.rate_limit_max_wait if max_wait is None else max_wait
+        ticket = self._enqueue()
+        start = time.monotonic()
+        try:
+            while True:
+                delay = self._try_admit(ticket, tokens)
+                waited = time.monotonic() - start
+                if delay == 0:
+                    return self._admitted(tokens, waited)
+                if waited + delay > max_wait:
+                    raise self._timed_out(ticket, waited)
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._dequeue(ticket)
+            raise
+
+    # ------------------------------------------------------------------
+    # Completion / AIMD
+    # ------------------------------------------------------------------
+
+    def release(self, permit: RatePermit, error: BaseException | None = None) -> None:
+        """Return the concurrency slot and adapt the window from the outcome."""
+        latency = time.monotonic() - permit.started_at
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+            if permit._settled_tokens is not None:
+                # Reconcile the estimate with billed usage (refund or extra debit)
+                self._tpm.take(permit._settled_tokens - permit.reserved_tokens)
+
+            if error is not None and is_rate_limit_error(error):
+                self._stats["throttled"] += 1
+                self._decrease(self.config.decrease_factor)
+                return
+            if error is not None:
+                return
+
+            spike = (
+                self._latency_ewma is not None
+                and self._latency_samples >= self.config.latency_min_samples
+                and latency > self._latency_ewma * self.config.latency_spike_ratio
+            )
+            self._latency_ewma = latency if self._latency_ewma is None else (
+                0.9 * self._latency_ewma + 0.1 * latency
+            )
+            self._latency_samples += 1
+            if spike:
+                self._stats["latency_spikes"] += 1
+                self._decrease(self.config.latency_decrease_factor)
+            else:
+                # Additive increase: roughly +1 slot per window of successes
+                self._limit = min(float(self.config.max_concurrency), self._limit + 1.0 / max(self._limit, 1.0))
+
+    def _decrease(self, factor: float) -> None:
+        self._limit = max(float(self.config.min_concurrency), self._limit * factor)
+
+    @contextmanager
+    def limit(self, tokens: int = 0) -> Iterator[RatePermit]:
+        """Sync context manager around one provider call."""
+        permit = self.acquire(tokens)
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, e)
+            raise
+        self.release(permit)
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 0) -> AsyncIterator[RatePermit]:
+        """Async context manager around one provider call."""
+        permit = await self.aacquire(tokens)
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, e)
+            raise
+        self.release(permit)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._rpm.refill(now)
+            self._tpm.refill(now)
+            admitted = self._stats["admitted"]
+            return {
+                **self._stats,
+                "wait_seconds_avg": self._stats["wait_seconds_total"] / admitted if admitted else 0.0,
+                "queue_depth": len(self._queue),
+                "in_flight": self._in_flight,
+                "concurrency_limit": int(self._limit),
+                "rpm_available": self._rpm.level if self._rpm.enabled else None,
+                "tpm_available": self._tpm.level if self._tpm.enabled else None,
+                "latency_ewma": self._latency_ewma,
+            }
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True if the error (or an error it wraps) is a provider 429 / quota error."""
+    seen: set[int] = set()
+    current: BaseException | None = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        status = getattr(current, "status_code", None) or getattr(current, "code", None)
+        if status == 429 or type(current).__name__ in {"RateLimitError", "ResourceExhausted"}:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class _NullPermit:
+    def settle(self, actual_tokens: int | None) -> None:
+        pass
+
+
+class _NullLimiter:
+    """Stand-in used when rate limiting is disabled."""
+
+    @contextmanager
+    def limit(self, tokens: int = 0) -> Iterator[_NullPermit]:
+        yield _NullPermit()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 0) -> AsyncIterator[_NullPermit]:
+        yield _NullPermit()
+
+
+_limiters: dict[tuple[str, str | None], ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+_null_limiter = _NullLimiter()
+
+
+def get_rate_limiter(provider: str, model: str | None = None) -> ProviderRateLimiter | _NullLimiter:
+    """Return the shared limiter for a provider/model (a no-op one if disabled)."""
+    if not settings.rate_limit_enabled:
+        return _null_limiter
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limiter = ProviderRateLimiter(provider, model, resolve_rate_limit_config(provider, model))
+                _limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> dict[str, dict[str, Any]]:
+    """Queue depth, wait times and AIMD state per "provider:model"."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {f"{l.provider}:{l.model}" if l.model else l.provider: l.stats() for l in limiters}
+
+
+__all__ = [
+    "PROVIDER_RATE_LIMITS",
+    "RateLimitConfig",
+    "RateLimitTimeout",
+    "RatePermit",
+    "ProviderRateLimiter",
+    "TokenBucket",
+    "get_rate_limiter",
+    "get_rate_limit_stats",
+    "is_rate_limit_error",
+    "resolve_rate_limit_config",
+]
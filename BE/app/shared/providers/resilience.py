@@ -0,0 +1,351 @@
+"""
+Provider Resilience - retries and circuit breakers
+
+Wraps single provider calls from `app.shared.llm` and `app.shared.image`:
+
+- Errors are classified as retryable (timeouts, connection errors, 408/409/
+  425/429/5xx/529, truncated JSON) or fatal (everything else, e.g. 400/401/404).
+- Retryable errors are retried with exponential backoff and full jitter.
+  A provider's Retry-After header is honored when present.
+- Each provider has a circuit breaker. After N consecutive retryable failures
+  it opens and calls fail fast with `ProviderUnavailableError`. That lets the
+  router (see app/shared/llm/routing.py) fail over right away instead of tying
+  up a worker on timeouts. After the recovery timeout, one probe call is
+  allowed through (half-open).
+
+SDK-level retries are disabled in `clients.py` so this layer is the only one
+that retries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+# Exception class names that indicate a transient transport problem
+_RETRYABLE_ERROR_NAMES = frozenset({
+    "APIConnectionError",
+    "APITimeoutError",
+    "InternalServerError",
+    "OverloadedError",
+    "RateLimitError",
+    "ServiceUnavailable",
+    "ResourceExhausted",
+    "DeadlineExceeded",
+    "TimeoutException",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "ConnectError",
+    "ReadError",
+    "RemoteProtocolError",
+    "ConnectionError",
+    "TimeoutError",
+})
+
+
+class ProviderUnavailableError(ValueError):
+    """A provider call failed on retryable errors, or its circuit is open."""
+
+    def __init__(self, provider: str, message: str, retry_after: float | None = None) -> None:
+        super().__init__(f"{provider} is temporarily unavailable: {message}")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+def default_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=max(1, settings.provider_retry_max_attempts),
+        base_delay=settings.provider_retry_base_delay,
+        max_delay=settings.provider_retry_max_delay,
+    )
+
+
+def _error_chain(error: BaseException) -> list[BaseException]:
+    chain: list[BaseException] = []
+    current: BaseException | None = error
+    while current is not None and current not in chain:
+        chain.append(current)
+        current = current.__cause__ or current.__context__
+    return chain
+
+
+def _status_code(error: BaseException) -> int | None:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Classify an error (or anything it wraps) as transient."""
+    for current in _error_chain(error):
+        if isinstance(current, ProviderUnavailableError):
+            return False
+        status = _status_code(current)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        if isinstance(current, json.JSONDecodeError):
+            return True  # Truncated / malformed model output
+        if type(current).__name__ in _RETRYABLE_ERROR_NAMES:
+            return True
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Read Retry-After / retry-after-ms from the provider response, if any."""
+    for current in _error_chain(error):
+        headers = getattr(getattr(current, "response", None), "headers", None)
+        if not headers:
+            continue
+        try:
+            value = headers.get("retry-after-ms")
+            if value:
+                return float(value) / 1000.0
+            value = headers.get("retry-after")
+            if not value:
+                continue
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                parsed = email.utils.parsedate_to_datetime(value)
+                return max(0.0, parsed.timestamp() - time.time())
+        except Exception:
+            continue
+    return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"opened": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Raise `ProviderUnavailableError` if the call must fail fast.
+
+        In half-open state only one probe call is let through at a time.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self._stats["rejected"] += 1
+            remaining = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        raise ProviderUnavailableError(self.name, "circuit open", retry_after=remaining or None)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, error: BaseException) -> None:
+        """Count provider-health failures; fatal request errors do not trip the breaker."""
+        if not is_retryable_error(error):
+            self.record_neutral()
+            return
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def record_neutral(self) -> None:
+        """Release a half-open probe without judging provider health (e.g. cancellation)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a provider."""
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(provider)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    provider,
+                    failure_threshold=settings.circuit_breaker_failure_threshold,
+                    recovery_timeout=settings.circuit_breaker_recovery_timeout,
+                )
+                _breakers[provider] = breaker
+    return breaker
+
+
+def get_circuit_breaker_stats() -> dict[str, dict[str, Any]]:
+    """State and counters of every provider breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def _next_delay(policy: RetryPolicy, attempt: int, error: BaseException) -> float | None:
+    """Delay before the next attempt, or None to stop retrying."""
+    if attempt >= policy.max_attempts or not is_retryable_error(error):
+        return None
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return retry_after if retry_after <= policy.max_delay else None
+    return policy.backoff(attempt)
+
+
+def _exhausted(provider: str, error: BaseException) -> ProviderUnavailableError | None:
+    """The error to surface once retries are over; None when `error` is fatal and is re-raised as is."""
+    if is_retryable_error(error):
+        message = str(error) or type(error).__name__
+        return ProviderUnavailableError(provider, message, retry_after=retry_after_seconds(error))
+    return None
+
+
+def call_with_retry(
+    provider: str,
+    call: Callable[[], T],
+    policy: RetryPolicy | None = None,
+) -> T:
+    """
+    Run a provider call behind the provider's circuit breaker, retrying transient errors.
+
+    Raises:
+        ProviderUnavailableError: If the circuit is open or retryable errors persist
+        Exception: Fatal errors are re-raised unchanged
+    """
+    policy = policy or default_retry_policy()
+    breaker = get_circuit_breaker(provider)
+    attempt = 0
+    while True:
+        attempt += 1
+        breaker.before_call()
+        try:
+            result = call()
+        except Exception as e:
+            breaker.record_failure(e)
+            delay = _next_delay(policy, attempt, e)
+            if delay is None:
+                unavailable = _exhausted(provider, e)
+                if unavailable is None:
+                    raise
+                raise unavailable from e
+            time.sleep(delay)
+            continue
+        except BaseException:
+            breaker.record_neutral()
+            raise
+        breaker.record_success()
+        return result
+
+
+async def acall_with_retry(
+    provider: str,
+    call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy | None = None,
+) -> T:
+    """Async counterpart of `call_with_retry`; cancellation is not counted as a failure."""
+    policy = policy or default_retry_policy()
+    breaker = get_circuit_breaker(provider)
+    attempt = 0
+    while True:
+        attempt += 1
+        breaker.before_call()
+        try:
+            result = await call()
+        except Exception as e:
+            breaker.record_failure(e)
+            delay = _next_delay(policy, attempt, e)
+            if delay is None:
+                unavailable = _exhausted(provider, e)
+                if unavailable is None:
+                    raise
+                raise unavailable from e
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            breaker.record_neutral()
+            raise
+        breaker.record_success()
+        return result
+
+
+__all__ = [
+    "RETRYABLE_STATUS_CODES",
+    "ProviderUnavailableError",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "default_retry_policy",
+    "is_retryable_error",
+    "retry_after_seconds",
+    "get_circuit_breaker",
+    "get_circuit_breaker_stats",
+    "call_with_retry",
+    "acall_with_retry",
+]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Draft mode benchmark: single-call vs act-parallel final script generation.
+
+Builds one bible and arc, then drafts the final script N times in each mode
+and reports wall time and LLM tokens per run as JSON. Nothing is written to
+Supabase (the page-character context is a fixed placeholder).
+
+Run from BE/ against a stand-in provider, e.g.:
+
+    LLM_PROVIDER_OVERRIDE=local LOCAL_LLM_LATENCY_MS=800 \
+    LOCAL_LLM_MS_PER_OUTPUT_TOKEN=15 python benchmarks/draft_modes.py --runs 5
+
+or against recorded provider responses with PROVIDER_CASSETTE_MODE=replay.
+
+The local stand-in samples output length per call (LOCAL_LLM_OUTPUT_TOKENS),
+not per spread, and its arcs get the usual 3-act split; replayed cassettes
+give the realistic latency and token comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.features.studio.storybook_generator.services.arc import build_story_arc  # noqa: E402
+from app.features.studio.storybook_generator.services.bible import build_story_bible  # noqa: E402
+from app.features.studio.storybook_generator.services.context import StoryContext  # noqa: E402
+from app.features.studio.storybook_generator.services.draft import build_final_script  # noqa: E402
+from app.features.studio.storybook_generator.services.draft_acts import build_final_script_by_act  # noqa: E402
+from app.shared.metrics.instruments import llm_tokens  # noqa: E402
+
+PAGE_CHARACTERS = "No page-specific character information available. Use storybook-level characters from the Story Bible."
+DRAFT_SERVICES = ("storybook.draft.final_script", "storybook.draft.act", "storybook.draft.act_seams")
+
+
+def _draft_tokens() -> dict[str, float]:
+    counter = llm_tokens()
+    return {
+        direction: sum(counter.total(service=service, direction=direction) for service in DRAFT_SERVICES)
+        for direction in ("input", "output")
+    }
+
+
+async def _draft_once(context: StoryContext, mode: str, run: int) -> dict[str, float]:
+    # A distinct prompt per run keeps the LLM response cache out of the measurement
+    context = StoryContext(
+        storybook_id=context.storybook_id,
+        user_id=context.user_id,
+        creation_params={**context.creation_params, "prompt": f"{context.prompt} (run {run})"},
+        bible=context.bible,
+        arc=context.arc,
+    )
+    before = _draft_tokens()
+    start = time.perf_counter()
+    if mode == "act_parallel":
+        await build_final_script_by_act(context, page_specific_characters=PAGE_CHARACTERS)
+    else:
+        await build_final_script(context, page_specific_characters=PAGE_CHARACTERS)
+    wall = time.perf_counter() - start
+    after = _draft_tokens()
+    return {
+        "wall_seconds": wall,
+        "input_tokens": after["input"] - before["input"],
+        "output_tokens": after["output"] - before["output"],
+    }
+
+
+def _summarize(samples: list[dict[str, float]]) -> dict[str, float]:
+    walls = sorted(sample["wall_seconds"] for sample in samples)
+    return {
+        "runs": len(samples),
+        "wall_p50_seconds": statistics.median(walls),
+        "wall_max_seconds": walls[-1],
+        "input_tokens_mean": statistics.mean(sample["input_tokens"] for sample in samples),
+        "output_tokens_mean": statistics.mean(sample["output_tokens"] for sample in samples),
+    }
+
+
+def _use_standard_acts(context: StoryContext) -> None:
+    """Give a synthesized arc the usual 3 acts over spreads 1-3, 4-10 and 11-14."""
+    acts = [act.model_copy(update={"act_number": number}) for number, act in zip((1, 2, 3), context.arc.acts)]
+    spreads = [
+        spread.model_copy(update={"spread_number": index, "act_number": 1 if index <= 3 else 2 if index <= 10 else 3})
+        for index, spread in enumerate(context.arc.spreads[:14], start=1)
+    ]
+    context.arc = context.arc.model_copy(update={"acts": acts, "spreads": spreads})
+
+
+async def main(runs: int, prompt: str) -> dict:
+    # An empty user_id keeps the runs out of credit accounting
+    context = StoryContext(
+        storybook_id="benchmark",
+        user_id="",
+        creation_params={"prompt": prompt},
+        preset_characters=[],
+    )
+    await build_story_bible(context)
+    await build_story_arc(context)
+    if settings.llm_provider_override:
+        _use_standard_acts(context)
+
+    results = {}
+    for mode in ("single", "act_parallel"):
+        samples = [await _draft_once(context, mode, run) for run in range(runs)]
+        results[mode] = _summarize(samples)
+    return {
+        "benchmark": "draft_modes",
+        "llm_provider_override": settings.llm_provider_override,
+        "seam_pass": settings.studio_draft_seam_pass,
+        "modes": results,
+        "act_parallel_speedup": results["single"]["wall_p50_seconds"] / results["act_parallel"]["wall_p50_seconds"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--prompt", default="A shy little bear learns to share honey with forest friends")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.runs, args.prompt)), indent=2))
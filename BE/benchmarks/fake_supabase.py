@@ -0,0 +1,318 @@
+"""
+In-Memory Supabase Stand-In
+
+Implements the part of the supabase-py client the Studio pipelines use
+(table queries, storage uploads, rpc) over Python lists, so benchmarks run
+without a database. Every `execute()`, storage upload/remove and rpc counts
+as one round trip, and request/response bodies are measured as JSON bytes
+(raw bytes for storage). Round trips are attributed to the label in
+`current_stage` (a context variable, so it follows tasks and `to_thread`).
+
+An optional per-round-trip latency (`latency_ms`) makes round trip counts show
+up in wall time as they would against a hosted database; it is a blocking
+sleep, like the real synchronous client.
+"""
+
+import contextvars
+import copy
+import json
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+current_stage: contextvars.ContextVar[str] = contextvars.ContextVar("benchmark_stage", default="-")
+
+
+def _json_size(value: Any) -> int:
+    if value is None:
+        return 0
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+@dataclass
+class StageIO:
+    """Round trips and bytes moved under one stage label."""
+    round_trips: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    operations: Counter = field(default_factory=Counter)  # "pages.select" -> count
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "db_round_trips": self.round_trips,
+            "db_bytes_sent": self.bytes_sent,
+            "db_bytes_received": self.bytes_received,
+            "db_operations": dict(sorted(self.operations.items())),
+        }
+
+
+class APIError(Exception):
+    """Raised where PostgREST would reject the request (e.g. `.single()` without exactly one row)."""
+
+
+class _Response:
+    def __init__(self, data: Any, count: Optional[int] = None) -> None:
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    def __init__(self, db: "FakeSupabase", table: str) -> None:
+        self.db = db
+        self.table = table
+        self.operation = "select"
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.payload: Any = None
+        self.filters: List[tuple] = []
+        self.ordering: List[tuple] = []
+        self.bounds: Optional[tuple] = None
+        self.row_limit: Optional[int] = None
+        self.single_row: Optional[str] = None  # "single" | "maybe"
+
+    # Operations ---------------------------------------------------------
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "_Query":
+        self.columns, self.count = columns, count
+        return self
+
+    def insert(self, rows: Any, **_options: Any) -> "_Query":
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "id", **_options: Any) -> "_Query":
+        self.operation, self.payload, self.conflict_keys = "upsert", rows, on_conflict.split(",")
+        return self
+
+    def update(self, values: Dict[str, Any]) -> "_Query":
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self) -> "_Query":
+        self.operation = "delete"
+        return self
+
+    # Filters and modifiers ----------------------------------------------
+
+    def _filter(self, column: str, test: Callable[[Any], bool], description: tuple) -> "_Query":
+        self.filters.append((column, test, description))
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        return self._filter(column, lambda v: v == value, ("eq", column, value))
+
+    def neq(self, column: str, value: Any) -> "_Query":
+        return self._filter(column, lambda v: v != value, ("neq", column, value))
+
+    def gt(self, column: str, value: Any) -> "_Query":
+        return self._filter(column, lambda v: v is not None and v > value, ("gt", column, value))
+
+    def gte(self, column: str, value: Any) -> "_Query":
+        return self._filter(column, lambda v: v is not None and v >= value, ("gte", column, value))
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        return self._filter(column, lambda v: v is not None and v < value, ("lt", column, value))
+
+    def lte(self, column: str, value: Any) -> "_Query":
+        return self._filter(column, lambda v: v is not None and v <= value, ("lte", column, value))
+
+    def in_(self, column: str, values: List[Any]) -> "_Query":
+        allowed = set(values)
+        return self._filter(column, lambda v: v in allowed, ("in", column, list(values)))
+
+    def is_(self, column: str, value: Any) -> "_Query":
+        expected = None if value in (None, "null") else value
+        return self._filter(column, lambda v: v is expected or v == expected, ("is", column, value))
+
+    def contains(self, column: str, values: List[Any]) -> "_Query":
+        return self._filter(column, lambda v: set(values) <= set(v or []), ("contains", column, list(values)))
+
+    def order(self, column: str, desc: bool = False, **_options: Any) -> "_Query":
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self.bounds = (start, end)
+        return self
+
+    def limit(self, count: int) -> "_Query":
+        self.row_limit = count
+        return self
+
+    def single(self) -> "_Query":
+        self.single_row = "single"
+        return self
+
+    def maybe_single(self) -> "_Query":
+        self.single_row = "maybe"
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        raise NotImplementedError(f"FakeSupabase does not implement query method .{name}()")
+
+    # Execution -----------------------------------------------------------
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return all(test(row.get(column)) for column, test, _ in self.filters)
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self.columns.strip() == "*":
+            return copy.deepcopy(row)
+        columns = [column.strip() for column in self.columns.split(",")]
+        return {column: copy.deepcopy(row.get(column)) for column in columns}
+
+    def execute(self) -> _Response:
+        request = {
+            "payload": self.payload,
+            "filters": [description for _, _, description in self.filters],
+        }
+        with self.db.lock:
+            rows = self.db.tables[self.table]
+            if self.operation in ("insert", "upsert"):
+                data = self._write(rows)
+            elif self.operation == "update":
+                data = []
+                for row in rows:
+                    if self._matches(row):
+                        row.update(copy.deepcopy(self.payload))
+                        data.append(copy.deepcopy(row))
+            elif self.operation == "delete":
+                data = [row for row in rows if self._matches(row)]
+                self.db.tables[self.table] = [row for row in rows if not self._matches(row)]
+            else:
+                data = self._read(rows)
+        count = len(data) if self.count and isinstance(data, list) else None
+        if self.single_row is not None:
+            if len(data) > 1 or (not data and self.single_row == "single"):
+                self.db.record(f"{self.table}.{self.operation}", _json_size(request), 0)
+                raise APIError("JSON object requested, multiple (or no) rows returned")
+            data = data[0] if data else None
+        self.db.record(f"{self.table}.{self.operation}", _json_size(request), _json_size(data))
+        return _Response(data, count)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        written = []
+        for new_row in new_rows:
+            row = copy.deepcopy(new_row)
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", self.db.now())
+            existing = None
+            if self.operation == "upsert":
+                existing = next(
+                    (r for r in rows if all(r.get(key) == row.get(key) for key in self.conflict_keys)),
+                    None,
+                )
+            if existing is not None:
+                existing.update(row)
+                row = existing
+            else:
+                rows.append(row)
+            written.append(copy.deepcopy(row))
+        return written
+
+    def _read(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        matched = [row for row in rows if self._matches(row)]
+        for column, desc in reversed(self.ordering):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self.bounds is not None:
+            matched = matched[self.bounds[0]:self.bounds[1] + 1]
+        if self.row_limit is not None:
+            matched = matched[:self.row_limit]
+        return [self._project(row) for row in matched]
+
+
+class _Bucket:
+    def __init__(self, db: "FakeSupabase", name: str) -> None:
+        self.db = db
+        self.name = name
+
+    def upload(self, path: str, file: bytes, file_options: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        with self.db.lock:
+            self.db.buckets[self.name][path] = bytes(file)
+        self.db.record(f"storage.{self.name}.upload", len(file), 0)
+        return {"path": path}
+
+    def get_public_url(self, path: str) -> str:
+        # Built client-side by supabase-py; not a round trip
+        return f"https://storage.invalid/{self.name}/{path}"
+
+    def remove(self, paths: List[str]) -> List[Dict[str, str]]:
+        with self.db.lock:
+            removed = [path for path in paths if self.db.buckets[self.name].pop(path, None) is not None]
+        self.db.record(f"storage.{self.name}.remove", _json_size(paths), 0)
+        return [{"name": path} for path in removed]
+
+
+class _Storage:
+    def __init__(self, db: "FakeSupabase") -> None:
+        self.db = db
+
+    def from_(self, bucket: str) -> _Bucket:
+        return _Bucket(self.db, bucket)
+
+
+class _Rpc:
+    def __init__(self, db: "FakeSupabase", function: str, params: Dict[str, Any]) -> None:
+        self.db = db
+        self.function = function
+        self.params = params
+
+    def execute(self) -> _Response:
+        self.db.record(f"rpc.{self.function}", _json_size(self.params), 0)
+        return _Response(None)
+
+
+class FakeSupabase:
+    """In-memory tables and buckets with per-stage round trip accounting."""
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency = max(0.0, latency_ms) / 1000.0
+        self.lock = threading.RLock()
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.buckets: Dict[str, Dict[str, bytes]] = defaultdict(dict)
+        self.io: Dict[str, StageIO] = defaultdict(StageIO)
+        self.storage = _Storage(self)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> _Rpc:
+        return _Rpc(self, function, params or {})
+
+    @staticmethod
+    def now() -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+
+    def record(self, operation: str, bytes_sent: int, bytes_received: int) -> None:
+        with self.lock:
+            io = self.io[current_stage.get()]
+            io.round_trips += 1
+            io.bytes_sent += bytes_sent
+            io.bytes_received += bytes_received
+            io.operations[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def take_io(self) -> Dict[str, StageIO]:
+        """Round trips recorded so far, by stage label; the counters restart."""
+        with self.lock:
+            io, self.io = dict(self.io), defaultdict(StageIO)
+        return io
+
+    def install(self) -> Callable[[], None]:
+        """Route `app.shared.database.supabase_client.supabase` here; returns the undo."""
+        import app.shared.database.supabase_client as supabase_client
+
+        original = supabase_client.get_supabase_client
+        supabase_client.get_supabase_client = lambda: self
+
+        def restore() -> None:
+            supabase_client.get_supabase_client = original
+
+        return restore
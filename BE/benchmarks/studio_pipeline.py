@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Studio pipeline benchmark: end-to-end generation, rewrite, chat and images.
+
+Runs each scenario against the local stand-in providers (configurable
+latency) and an in-memory Supabase (`fake_supabase.py`), and reports per
+scenario, and per pipeline stage for generation:
+
+- wall_seconds: elapsed time
+- cpu_seconds: process CPU time for a scenario; for a stage, CPU time spent
+  in the stage's own code (its event-loop steps, or its worker thread for
+  blocking stages), so blocking calls an async stage hands to another
+  thread are not included
+- db_round_trips, db_bytes_sent, db_bytes_received: Supabase requests and
+  their JSON (or raw storage) sizes, plus db_operations by table/operation
+- llm_input_tokens, llm_output_tokens, image_bytes (per scenario)
+
+Scenarios:
+- generate: `run_storybook_generation` on a fresh storybook row (what the
+  generation job runs), timed per GENERATION_PIPELINE stage
+- rewrite: `rewrite_full_script_with_summary` on the generated script
+- rewrite_spreads: `rewrite_spreads_with_summary` for --rewrite-spreads only
+- chat: the `/chat` endpoint handler (`handle_studio_chat`)
+- images: `generate_missing_images` for the generated pages
+
+Without the generate scenario, a storybook is still generated (unmeasured)
+before the others run.
+
+Every run starts from an empty database and the LLM response cache is off,
+so runs are identical and results can be compared across commits:
+
+    python benchmarks/studio_pipeline.py --runs 5 --llm-latency-ms 200 --output base.json
+    # ... change code ...
+    python benchmarks/studio_pipeline.py --runs 5 --llm-latency-ms 200 --compare base.json
+
+With --compare, metrics worse than the baseline by more than --tolerance
+(relative; any increase for round trips) are listed under "regressions" and
+the exit status is 1. Run from BE/ with the usual .env (Supabase and the
+providers are never contacted). Credit usage is buffered as in production
+and flushed once at the end of each scenario, under the "usage_flush" stage.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+os.environ.setdefault("JOB_WORKERS", "0")
+
+from fake_supabase import FakeSupabase, StageIO, current_stage  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.features.studio.image_generator.image_generator import image_generator_service  # noqa: E402
+from app.features.studio.storybook_generator import api as studio_api  # noqa: E402
+from app.features.studio.storybook_generator.models import ChatRequest  # noqa: E402
+from app.features.studio.storybook_generator.output_schemas.draft import FinalScriptSchema  # noqa: E402
+from app.features.studio.storybook_generator.services import generate  # noqa: E402
+from app.features.studio.storybook_generator.services.rewrite import (  # noqa: E402
+    rewrite_full_script_with_summary,
+    rewrite_spreads_with_summary,
+)
+from app.shared.llm.usage_tracker import flush_llm_usage  # noqa: E402
+from app.shared.metrics.instruments import image_bytes, llm_tokens  # noqa: E402
+from app.shared.pipeline import PipelineDAG, Stage  # noqa: E402
+
+SCENARIOS = ("generate", "rewrite", "rewrite_spreads", "chat", "images")
+STORYBOOK_ID = "bench-storybook"
+USER_ID = "bench-user"
+# Lower is better for every reported metric; counts are deterministic, so any increase regresses
+TIMED_METRICS = ("wall_seconds", "cpu_seconds")
+COUNT_METRICS = ("db_round_trips", "db_bytes_sent", "db_bytes_received", "llm_input_tokens", "llm_output_tokens")
+
+
+class _CpuMeter:
+    """Await a coroutine while summing the thread CPU time of its own steps."""
+
+    def __init__(self, coroutine: Awaitable[Any]) -> None:
+        self.coroutine = coroutine
+        self.cpu = 0.0
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            start = time.thread_time()
+            try:
+                if error is not None:
+                    yielded = self.coroutine.throw(error)
+                else:
+                    yielded = self.coroutine.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.cpu += time.thread_time() - start
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                self.coroutine.close()
+                raise
+            except BaseException as exc:
+                error = exc
+
+
+class StageTimes:
+    """Wall and CPU seconds per stage label."""
+
+    def __init__(self) -> None:
+        self.wall: Dict[str, float] = {}
+        self.cpu: Dict[str, float] = {}
+
+    def add(self, stage: str, wall: float, cpu: float) -> None:
+        self.wall[stage] = self.wall.get(stage, 0.0) + wall
+        self.cpu[stage] = self.cpu.get(stage, 0.0) + cpu
+
+    async def measure(self, stage: str, call: Callable[[], Any], *, blocking: bool = False) -> Any:
+        """Await `call()` under `stage`; a blocking `call` runs in a worker thread."""
+        token = current_stage.set(stage)
+        start = time.perf_counter()
+        try:
+            if blocking:
+                return await asyncio.to_thread(self._measure_blocking, stage, call, start)
+            meter = _CpuMeter(call())
+            try:
+                return await meter
+            finally:
+                self.add(stage, time.perf_counter() - start, meter.cpu)
+        finally:
+            current_stage.reset(token)
+
+    def _measure_blocking(self, stage: str, call: Callable[[], Any], start: float) -> Any:
+        cpu = time.thread_time()
+        try:
+            return call()
+        finally:
+            self.add(stage, time.perf_counter() - start, time.thread_time() - cpu)
+
+    def instrument(self, stage: Stage) -> Stage:
+        """Copy of a pipeline stage that records its time under its name."""
+        run = stage.run
+        if inspect.iscoroutinefunction(run):
+            async def timed(**kwargs: Any) -> Any:
+                token = current_stage.set(stage.name)
+                start = time.perf_counter()
+                meter = _CpuMeter(run(**kwargs))
+                try:
+                    return await meter
+                finally:
+                    self.add(stage.name, time.perf_counter() - start, meter.cpu)
+                    current_stage.reset(token)
+        else:
+            def timed(**kwargs: Any) -> Any:
+                token = current_stage.set(stage.name)
+                start, cpu = time.perf_counter(), time.thread_time()
+                try:
+                    return run(**kwargs)
+                finally:
+                    self.add(stage.name, time.perf_counter() - start, time.thread_time() - cpu)
+                    current_stage.reset(token)
+        return Stage(stage.name, timed, stage.inputs, stage.outputs)
+
+
+def _instrumented_pipeline(times: StageTimes) -> PipelineDAG:
+    pipeline = generate.GENERATION_PIPELINE
+    return PipelineDAG(
+        pipeline.name,
+        [times.instrument(stage) for stage in pipeline.stages.values()],
+        initial=pipeline.initial,
+    )
+
+
+def _provider_totals() -> Dict[str, float]:
+    return {
+        "llm_input_tokens": llm_tokens().total(direction="input"),
+        "llm_output_tokens": llm_tokens().total(direction="output"),
+        "image_bytes": image_bytes().total(),
+    }
+
+
+def _stage_metrics(wall: float, cpu: float, io: StageIO) -> Dict[str, Any]:
+    return {"wall_seconds": wall, "cpu_seconds": cpu, **io.as_dict()}
+
+
+def _seed(db: FakeSupabase, prompt: str) -> None:
+    db.tables["storybooks"].append({
+        "id": STORYBOOK_ID,
+        "user_id": USER_ID,
+        "title": "Benchmark",
+        "status": "pending",
+        "page_count": 0,
+        "character_ids": [],
+        "creation_params": {"prompt": prompt, "character_ids": []},
+    })
+    db.tables["profiles"].append({"id": USER_ID, "credits_used": 0})
+
+
+def _current_script(db: FakeSupabase) -> FinalScriptSchema:
+    pages = sorted(
+        (row for row in db.tables["pages"] if row["storybook_id"] == STORYBOOK_ID),
+        key=lambda row: row["page_number"],
+    )
+    spreads = [
+        {"spread_number": number, "script_1": left.get("script_text") or "", "script_2": right.get("script_text") or ""}
+        for number, (left, right) in enumerate(zip(pages[::2], pages[1::2]), start=1)
+    ]
+    return FinalScriptSchema(storybook_id=STORYBOOK_ID, user_id=USER_ID, spreads=spreads)
+
+
+async def _run_once(scenarios: List[str], args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """One pass over the scenarios on a fresh database; returns metrics by scenario."""
+    db = FakeSupabase(latency_ms=args.db_latency_ms)
+    restore = db.install()
+    _seed(db, args.prompt)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        if "generate" not in scenarios:
+            # The other scenarios work on a generated storybook; set one up unmeasured
+            await generate.run_storybook_generation(STORYBOOK_ID)
+            flush_llm_usage()
+        for scenario in scenarios:
+            times = StageTimes()
+            before = _provider_totals()
+            db.take_io()
+            cpu_start = time.process_time()
+
+            if scenario == "generate":
+                original = generate.GENERATION_PIPELINE
+                generate.GENERATION_PIPELINE = _instrumented_pipeline(times)
+                try:
+                    await times.measure(scenario, lambda: generate.run_storybook_generation(STORYBOOK_ID))
+                finally:
+                    generate.GENERATION_PIPELINE = original
+            elif scenario == "rewrite":
+                script = _current_script(db).model_dump()
+                await times.measure(scenario, lambda: rewrite_full_script_with_summary(
+                    script_data=script,
+                    edit_request=args.edit_request,
+                    requesting_user_id=USER_ID,
+                ))
+            elif scenario == "rewrite_spreads":
+                script = _current_script(db).model_dump()
+                await times.measure(scenario, lambda: rewrite_spreads_with_summary(
+                    script_data=script,
+                    edit_request=args.edit_request,
+                    spread_numbers=args.rewrite_spreads,
+                    requesting_user_id=USER_ID,
+                ))
+            elif scenario == "chat":
+                payload = ChatRequest(script=_current_script(db), message=args.chat_message)
+                response = await times.measure(scenario, lambda: studio_api.handle_studio_chat(payload, USER_ID))
+                results.setdefault("_notes", {})["chat_action"] = response.action
+            elif scenario == "images":
+                await times.measure(
+                    scenario,
+                    lambda: image_generator_service.generate_missing_images(STORYBOOK_ID),
+                    blocking=True,
+                )
+
+            cpu = time.process_time() - cpu_start
+            after = _provider_totals()
+            await times.measure("usage_flush", flush_llm_usage, blocking=True)
+            io_by_stage = db.take_io()
+
+            # The scenario total covers everything but the usage flush, which is reported as its own stage
+            total_io = StageIO()
+            for stage, io in io_by_stage.items():
+                if stage != "usage_flush":
+                    total_io.round_trips += io.round_trips
+                    total_io.bytes_sent += io.bytes_sent
+                    total_io.bytes_received += io.bytes_received
+                    total_io.operations.update(io.operations)
+            metrics = _stage_metrics(times.wall[scenario], cpu, total_io)
+            metrics.update({key: after[key] - before[key] for key in after})
+            # Round trips outside any pipeline stage (e.g. the status update) only count in the total
+            stages = sorted((set(times.wall) | set(io_by_stage)) - {scenario})
+            metrics["stages"] = {
+                stage: _stage_metrics(times.wall.get(stage, 0.0), times.cpu.get(stage, 0.0), io_by_stage.get(stage, StageIO()))
+                for stage in stages
+            }
+            results[scenario] = metrics
+    finally:
+        restore()
+    return results
+
+
+def _summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median/min/max of timings and the median of counts over runs."""
+    summary: Dict[str, Any] = {"runs": len(samples)}
+    for metric in TIMED_METRICS:
+        values = sorted(sample[metric] for sample in samples)
+        summary[metric] = {"p50": statistics.median(values), "min": values[0], "max": values[-1]}
+    for metric in COUNT_METRICS + ("image_bytes",):
+        if metric in samples[0]:
+            summary[metric] = statistics.median(sample[metric] for sample in samples)
+    summary["db_operations"] = samples[-1]["db_operations"]
+    if "stages" in samples[0]:
+        summary["stages"] = {
+            stage: _summarize([sample["stages"][stage] for sample in samples if stage in sample["stages"]])
+            for stage in samples[0]["stages"]
+        }
+    return summary
+
+
+def _compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_seconds: float, path: str = "") -> List[Dict[str, Any]]:
+    """Metrics of `current` that are worse than `baseline`."""
+    regressions = []
+    for metric in TIMED_METRICS:
+        if metric in current and metric in baseline:
+            now, then = current[metric]["p50"], baseline[metric]["p50"]
+            if now > then * (1 + tolerance) and now - then > min_seconds:
+                regressions.append({"metric": f"{path}{metric}.p50", "baseline": then, "current": now})
+    for metric in COUNT_METRICS:
+        if metric in current and metric in baseline and current[metric] > baseline[metric]:
+            if metric == "db_round_trips" or current[metric] > baseline[metric] * (1 + tolerance):
+                regressions.append({"metric": f"{path}{metric}", "baseline": baseline[metric], "current": current[metric]})
+    for stage, stage_summary in (current.get("stages") or {}).items():
+        if stage in (baseline.get("stages") or {}):
+            regressions.extend(_compare(stage_summary, baseline["stages"][stage], tolerance, min_seconds, f"{path}stages.{stage}."))
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _configure(args: argparse.Namespace) -> Dict[str, Any]:
+    """Point every provider at the local stand-ins and return the run configuration."""
+    settings.llm_provider_override = "local"
+    settings.image_provider_override = "local"
+    settings.provider_cassette_mode = ""
+    settings.llm_cache_enabled = False
+    settings.local_llm_latency_ms = args.llm_latency_ms
+    settings.local_llm_latency_stddev_ms = 0.0
+    settings.local_llm_ms_per_output_token = args.llm_ms_per_output_token
+    settings.local_image_latency_ms = args.image_latency_ms
+    settings.local_image_latency_stddev_ms = 0.0
+    # Buffer credit usage until the explicit flush after each scenario
+    settings.usage_write_behind_enabled = True
+    settings.usage_flush_interval_ms = 3_600_000
+    settings.usage_flush_max_events = 1_000_000
+    settings.usage_spool_path = os.path.join(tempfile.gettempdir(), "studio_pipeline_bench_usage.jsonl")
+    return {
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "llm_latency_ms": args.llm_latency_ms,
+        "llm_ms_per_output_token": args.llm_ms_per_output_token,
+        "image_latency_ms": args.image_latency_ms,
+        "db_latency_ms": args.db_latency_ms,
+        "local_llm_output_tokens": settings.local_llm_output_tokens,
+        "studio_draft_mode": settings.studio_draft_mode,
+        "studio_stream_spreads_enabled": settings.studio_stream_spreads_enabled,
+        "studio_rewrite_targeted": settings.studio_rewrite_targeted,
+        "rewrite_spreads": args.rewrite_spreads,
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    config = _configure(args)
+    scenarios = [scenario for scenario in SCENARIOS if scenario in args.scenarios]
+    for _ in range(args.warmup):
+        await _run_once(scenarios, args)
+    samples = [await _run_once(scenarios, args) for _ in range(args.runs)]
+
+    report: Dict[str, Any] = {
+        "benchmark": "studio_pipeline",
+        "commit": _git_commit(),
+        "config": config,
+        "scenarios": {scenario: _summarize([sample[scenario] for sample in samples]) for scenario in scenarios},
+    }
+    notes = samples[-1].get("_notes")
+    if notes:
+        report["notes"] = notes
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline_commit"] = baseline.get("commit")
+        # Timings are only comparable under the same configuration
+        config_changes = {
+            key: {"baseline": baseline.get("config", {}).get(key), "current": value}
+            for key, value in config.items()
+            if baseline.get("config", {}).get(key) != value
+        }
+        if config_changes:
+            report["config_changes"] = config_changes
+        report["regressions"] = [
+            {"scenario": scenario, **regression}
+            for scenario, summary in report["scenarios"].items()
+            if scenario in baseline.get("scenarios", {})
+            for regression in _compare(summary, baseline["scenarios"][scenario], args.tolerance, args.min_seconds)
+        ]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="Unreported runs first (imports, tokenizer, templates)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-ms-per-output-token", type=float, default=0.0)
+    parser.add_argument("--image-latency-ms", type=float, default=0.0)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Added to every Supabase round trip")
+    parser.add_argument("--prompt", default="A shy little bear learns to share honey with forest friends")
+    parser.add_argument("--edit-request", default="Make the middle of the story funnier and add a friendly owl.")
+    parser.add_argument("--rewrite-spreads", nargs="+", type=int, default=[14], help="Spreads the rewrite_spreads scenario rewrites")
+    parser.add_argument("--chat-message", default="Can you make the ending a little more exciting?")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Ignore timing differences smaller than this")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    sys.exit(1 if report.get("regressions") else 0)
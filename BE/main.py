@@ -1,5 +1,9 @@
 """Main FastAPI application entry point."""
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -15,8 +19,39 @@ from app.features.studio.api.data import router as studio_data_router
 from app.features.studio.storybook_generator.api import (
     router as studio_rewrite_router,
 )
+from app.features.studio.storybook_generator.services.generate import recover_orphaned_generations
+from app.features.studio.storybook_generator.services.utils import get_prompt_registry
 from app.features.billing.api import router as billing_router
 from app.shared.database.supabase_client import SupabaseNotConfiguredError
+from app.shared.jobs import start_job_workers, stop_job_workers
+from app.shared.llm.tokens import get_token_estimator
+from app.shared.llm.usage_tracker import flush_llm_usage
+from app.shared.metrics.api import router as metrics_router
+from app.shared.providers.clients import aclose_provider_clients
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Application startup/shutdown hooks."""
+    # Load the tokenizer (may download its BPE file once) before serving requests
+    await asyncio.to_thread(get_token_estimator)
+    # Compile the storybook prompt templates once instead of on the first generation
+    await asyncio.to_thread(get_prompt_registry().preload)
+    # Fail Studio generations whose job failed here without its failure hook, then
+    # run queued background jobs (including ones left by a previous process)
+    if settings.job_workers > 0:
+        try:
+            await asyncio.to_thread(recover_orphaned_generations)
+        except Exception as exc:
+            logging.getLogger(__name__).warning("Skipped orphaned generation recovery: %s", exc)
+    start_job_workers()
+    yield
+    # Interrupted jobs go back to the persistent queue
+    await stop_job_workers()
+    # Write out buffered credit usage before the process exits
+    await asyncio.to_thread(flush_llm_usage)
+    # Release pooled provider connections
+    await aclose_provider_clients()
 
 
 def create_app() -> FastAPI:
@@ -25,6 +60,7 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
         debug=settings.debug,
+        lifespan=lifespan,
     )
     
     # Configure CORS
@@ -62,6 +98,8 @@ def create_app() -> FastAPI:
         tags=["studio-rewrite"],
     )
     app.include_router(billing_router, prefix="/api/billing", tags=["billing"])
+    if settings.metrics_enabled:
+        app.include_router(metrics_router)
     
     # Removed temporary global validation handler
     
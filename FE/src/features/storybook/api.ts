@@ -1,5 +1,6 @@
 import { apiClient } from '@/shared/lib/api-client';
-import { StorybookListResponse, StorybookResponse, CreateStorybookRequest, UpdateStorybookRequest, UpdateVisibilityRequest, GenerateStorybookRequest } from './types.ts';
+import { getApiUrl } from '@/shared/lib/api-config';
+import { StorybookListResponse, StorybookResponse, CreateStorybookRequest, UpdateStorybookRequest, UpdateVisibilityRequest, GenerateStorybookRequest, GenerateStorybookAccepted, GenerationEvent, GenerationStatusResponse } from './types.ts';
 
 export const storybookApi = {
   list: (
@@ -15,10 +16,50 @@ export const storybookApi = {
     return apiClient.get<StorybookListResponse>(endpoint, token);
   },
   create: (body: CreateStorybookRequest, token?: string) => apiClient.post<StorybookResponse>('storybooks', body as any, token),
-  generate: (body: GenerateStorybookRequest, token?: string) => apiClient.post<StorybookResponse>('studio/storybooks/generate', body as any, token),
+  generate: (body: GenerateStorybookRequest, token?: string) => apiClient.post<GenerateStorybookAccepted>('studio/storybooks/generate', body as any, token),
+  generationStatus: (id: string, token?: string) => apiClient.get<GenerationStatusResponse>(`studio/storybooks/${id}/generation`, token),
+  resumeGeneration: (id: string, token?: string) => apiClient.post<GenerateStorybookAccepted>(`studio/storybooks/${id}/generation/resume`, {}, token),
+  generationEvents: (id: string, onEvent: (event: GenerationEvent) => void, token?: string, signal?: AbortSignal) =>
+    streamEvents(`studio/storybooks/${id}/generation/events`, onEvent, token, signal),
   get: (id: string, token?: string) => apiClient.get<StorybookResponse>(`storybooks/${id}`, token),
   update: (id: string, body: UpdateStorybookRequest, token?: string) => apiClient.put<StorybookResponse>(`storybooks/${id}`, body, token),
   setVisibility: (id: string, body: UpdateVisibilityRequest, token?: string) => apiClient.put<StorybookResponse>(`storybooks/${id}/visibility`, body as any, token),
   delete: (id: string, token?: string) => apiClient.delete(`storybooks/${id}`, token),
 };
 
+
+// Reads a Server-Sent Events response with fetch (EventSource cannot send the auth header).
+// Resolves when the server ends the stream.
+async function streamEvents(endpoint: string, onEvent: (event: GenerationEvent) => void, token?: string, signal?: AbortSignal) {
+  const headers: Record<string, string> = { Accept: 'text/event-stream' };
+  if (token) headers['Authorization'] = `Bearer ${token}`;
+
+  const response = await fetch(getApiUrl(endpoint), { headers, signal });
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error((errorData as any).detail || `Request failed (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const fields: Record<string, string> = {};
+      for (const line of frame.split('\n')) {
+        if (!line || line.startsWith(':')) continue; // keep-alive comment
+        const colon = line.indexOf(':');
+        fields[line.slice(0, colon)] = line.slice(colon + 1).trimStart();
+      }
+      if (fields.event && fields.data) {
+        onEvent({ id: fields.id ? Number(fields.id) : undefined, event: fields.event, data: JSON.parse(fields.data) });
+      }
+    }
+  }
+}
@@ -58,6 +58,34 @@ export interface GenerateStorybookRequest {
   style?: string;
   theme?: string;
   pageCount?: number;
+  draftMode?: 'single' | 'act_parallel';
+}
+
+// Generation runs as a background job; these mirror the backend payloads as returned
+export interface GenerateStorybookAccepted {
+  storybook_id: string;
+  status: StorybookStatus;
+  job_id: string;
+  status_url: string;
+}
+
+export interface GenerationStatusResponse {
+  storybook_id: string;
+  status: StorybookStatus;
+  page_count: number;
+  job?: {
+    status: 'queued' | 'running' | 'succeeded' | 'failed';
+    attempts: number;
+    max_attempts: number;
+    errors: string[];
+  } | null;
+}
+
+// One Server-Sent Event from GET studio/storybooks/{id}/generation/events
+export interface GenerationEvent {
+  id?: number;
+  event: string; // status | stage_started | stage_finished | bible_ready | arc_ready | spread_drafted | image_uploaded | generation_finished | ...
+  data: any;
 }
 
 export interface UpdateStorybookRequest {
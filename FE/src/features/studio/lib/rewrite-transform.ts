@@ -29,6 +29,7 @@ export function toSnakeRewriteRequest(
   return {
     script: toSnakeFinalScript(request.script),
     edit_request: request.editRequest,
+    spread_numbers: request.spreadNumbers,
   };
 }
 
@@ -51,6 +52,7 @@ export function fromSnakeRewriteResponse(
 ): RewriteScriptResponse {
   return {
     script: fromSnakeFinalScript(response.script),
+    changedSpreads: response.changed_spreads ?? undefined,
   };
 }
 
@@ -60,6 +62,7 @@ export function toSnakeChatRequest(
   return {
     script: toSnakeFinalScript(request.script),
     message: request.message,
+    spread_numbers: request.spreadNumbers,
   };
 }
 
@@ -72,6 +75,7 @@ export function fromSnakeChatResponse(
     script: response.script
       ? fromSnakeFinalScript(response.script)
       : undefined,
+    changedSpreads: response.changed_spreads ?? undefined,
   };
 }
 
@@ -13,10 +13,12 @@ export type FinalScript = {
 export type RewriteScriptRequest = {
   script: FinalScript;
   editRequest: string;
+  spreadNumbers?: number[];
 };
 
 export type RewriteScriptResponse = {
   script: FinalScript;
+  changedSpreads?: number[];
 };
 
 export type FinalScriptSnakeCase = {
@@ -32,32 +34,38 @@ export type FinalScriptSnakeCase = {
 export type RewriteScriptRequestSnakeCase = {
   script: FinalScriptSnakeCase;
   edit_request: string;
+  spread_numbers?: number[];
 };
 
 export type RewriteScriptResponseSnakeCase = {
   script: FinalScriptSnakeCase;
+  changed_spreads?: number[] | null;
 };
 
 export type ChatRequest = {
   script: FinalScript;
   message: string;
+  spreadNumbers?: number[];
 };
 
 export type ChatResponse = {
   assistantMessage: string;
   action: "edit" | "question";
   script?: FinalScript;
+  changedSpreads?: number[];
 };
 
 export type ChatRequestSnakeCase = {
   script: FinalScriptSnakeCase;
   message: string;
+  spread_numbers?: number[];
 };
 
 export type ChatResponseSnakeCase = {
   assistant_message: string;
   action: "edit" | "question";
   script?: FinalScriptSnakeCase;
+  changed_spreads?: number[] | null;
 };
 
 
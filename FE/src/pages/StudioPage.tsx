@@ -651,7 +651,7 @@ const StudioPage = () => {
 
     try {
       const token = await session?.getToken({ template: 'storybook4me' });
-      const response = await storybookApi.generate({
+      const accepted = await storybookApi.generate({
         title: liveTitle || '',
         prompt: mainConcept,
         characterIds: selectedCharacters,
@@ -660,7 +660,30 @@ const StudioPage = () => {
         pageCount: 28,
       }, token || undefined);
 
-      const generated = response.storybook;
+      // Generation runs in the background; follow its progress events, then confirm the final status
+      try {
+        await storybookApi.generationEvents(accepted.storybook_id, (event) => {
+          if (event.event === 'spread_drafted') {
+            setChatHistory([
+              { role: "assistant", content: `Your story is being created! Spread ${event.data.spread_number} of 14 is written...` }
+            ]);
+          }
+        }, token || undefined);
+      } catch (streamError) {
+        console.warn('Progress stream unavailable, polling instead:', streamError);
+      }
+      let progress = await storybookApi.generationStatus(accepted.storybook_id, token || undefined);
+      while (progress.status === 'pending' || progress.status === 'script_generating') {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const freshToken = await session?.getToken({ template: 'storybook4me' });
+        progress = await storybookApi.generationStatus(accepted.storybook_id, freshToken || undefined);
+      }
+      if (progress.status === 'failed' || progress.status === 'canceled') {
+        throw new Error(progress.job?.errors?.slice(-1)[0] || 'Failed to generate storybook');
+      }
+
+      const latestToken = await session?.getToken({ template: 'storybook4me' });
+      const generated = (await storybookApi.get(accepted.storybook_id, latestToken || undefined)).storybook;
       setStorybook(generated);
       setChatHistory([
         { role: "assistant", content: "Your story has been created! I'm here to help you refine it. What would you like to change?" }